@@ -4,9 +4,12 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib
 import os
+import torch
+from omniisaacgymenvs.demonstrations.demo_store import TRANSITION_FIELDS, build_transitions
 matplotlib.style.use("seaborn")
 
-def parse_json_demo():
+def _read_json_demos():
+    """Reads the json demonstration files into one dataframe. Returns it with the number of steps of every file."""
     df = []
     for root, dir, filenames in os.walk(f'{os.getcwd()}{"/demonstrations/data"}'):
         for filename in filenames:
@@ -15,38 +18,33 @@ def parse_json_demo():
                 df_tmp = pd.json_normalize(data["Isaac Sim Data"])
                 df_tmp.columns = ["time", "timestep", "states", "actions", "rewards", "terminated", "applied_joint_act"]
                 df.append(df_tmp)
+    file_lengths = np.array([len(df_tmp) for df_tmp in df])
     if len(df) == 1:
         df = df[0]
     else:
         df = pd.concat(df).reset_index()
+    return df, file_lengths
 
-    states = df["states"]
-    actions = df["actions"]
-    rewards = df["rewards"]
-    terminated = df["terminated"]
+def parse_json_demo():
+    """The demonstrations as a list of steps, each a dict of states, actions, rewards, terminated and next_states.
 
+    The transitions are built without looping over steps, see demo_store.build_transitions. An episode
+    ends at a terminated step of the first env or at the end of a file. Its last step has no successor,
+    so it is linked to itself and marked as terminated.
+    """
+    df, file_lengths = _read_json_demos()
 
-    episode = []
-    dim = len(states)
-    for i, (s, a, r, t) in enumerate(zip(states, actions, rewards, terminated)):
-        if i == dim-1: break
-        timestep = {}
-        timestep["states"] = s
-        timestep["actions"] = a
-        timestep["rewards"] = r
-        timestep["terminated"] = t
-        # TODO fix unavailable next states
-        if not bool(t[0]):
-            timestep["next_states"] = states[i + 1]
-        else:
-            timestep["next_states"] = s
-            # a = np.empty_like(s)[:]
-            # a[:] = np.nan
-            # timestep["next_states"] = a
+    fields = ("states", "actions", "rewards", "terminated")
+    demos = {field: torch.from_numpy(np.stack(df[field].to_numpy())) for field in fields}
+    num_steps = len(df)
 
-        episode.append(timestep)
+    first_env_terminated = demos["terminated"].reshape(num_steps, -1)[:, 0].numpy().astype(bool)
+    episode_ends = np.union1d(np.flatnonzero(first_env_terminated) + 1, np.cumsum(file_lengths))
+    episode_offsets = np.concatenate(([0], episode_ends))
 
-    return episode
+    transitions = build_transitions(demos, episode_offsets)
+    columns = {field: transitions[field].numpy() for field in TRANSITION_FIELDS}
+    return [{field: columns[field][i] for field in TRANSITION_FIELDS} for i in range(num_steps)]
 
 if __name__ == "__main__":
     e = parse_json_demo()
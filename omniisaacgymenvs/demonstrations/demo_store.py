@@ -0,0 +1,329 @@
+import argparse
+import json
+import os
+from collections.abc import Sequence
+
+import numpy as np
+import torch
+from omniisaacgymenvs.utils.recorder import is_recording, load_recording
+
+# Columns written for every demonstration store. Each one is saved as a single
+# contiguous .npy array of shape (num_steps, dim) so it can be memory-mapped.
+DEMO_FIELDS = ("states", "actions", "rewards", "terminated", "applied_joint_actions")
+FIELD_DTYPES = {
+    "states": np.float32,
+    "actions": np.float32,
+    "rewards": np.float32,
+    "terminated": np.bool_,
+    "applied_joint_actions": np.float32,
+}
+
+# Fields of a (s, a, r, s', terminated) transition, as stored in the skrl demonstration memory
+TRANSITION_FIELDS = ("states", "actions", "rewards", "next_states", "terminated")
+
+STORE_VERSION = 1
+META_FILE = "meta.json"
+EPISODES_FILE = "episodes.npy"
+
+
+def default_data_dir():
+    return f'{os.getcwd()}{"/demonstrations/data"}'
+
+
+def default_store_dir():
+    return f'{os.getcwd()}{"/demonstrations/store"}'
+
+
+def _read_json_log(file_path, robot_name=None):
+    """Reads one DataLogger JSON file into per-field arrays.
+
+    Args:
+        file_path (str): path to the JSON log written by VecEnvRLGames.save_log.
+        robot_name (Optional[str]): name of the logged view. Defaults to the first one found.
+
+    Returns:
+        dict: field name -> np.ndarray of shape (num_envs, num_frames, dim).
+    """
+    with open(file_path) as f:
+        frames = json.load(f)["Isaac Sim Data"]
+    if len(frames) == 0:
+        return None
+    if robot_name is None:
+        robot_name = next(iter(frames[0]["data"]))
+
+    data = {}
+    for field in DEMO_FIELDS:
+        column = np.asarray([frame["data"][robot_name][field] for frame in frames], dtype=FIELD_DTYPES[field])
+        # (num_frames, num_envs[, dim]) -> (num_envs, num_frames, dim)
+        if column.ndim == 2:
+            column = column[..., None]
+        data[field] = np.ascontiguousarray(column.swapaxes(0, 1))
+    return data
+
+
+def _read_recording(path):
+    """Reads a StreamingRecorder recording into per-field arrays.
+
+    Args:
+        path (str): directory of the recording written by VecEnvRLGames.start_recording.
+
+    Returns:
+        dict: field name -> np.ndarray of shape (num_envs, num_frames, dim).
+    """
+    recording = load_recording(path, fields=DEMO_FIELDS)
+    data = {}
+    for field in DEMO_FIELDS:
+        column = recording[field].astype(FIELD_DTYPES[field], copy=False)
+        if column.ndim == 2:
+            column = column[..., None]
+        data[field] = np.ascontiguousarray(column.swapaxes(0, 1))
+    return data
+
+
+def _episode_offsets(terminated, offset):
+    """Returns the start offsets of the episodes contained in one env trajectory."""
+    ends = np.flatnonzero(terminated[:-1]) + 1
+    return np.concatenate(([0], ends)) + offset
+
+
+def convert_json_demos(src_dir=None, dst_dir=None, robot_name=None):
+    """Converts a directory of JSON demonstration logs into a columnar store.
+
+    Recordings written by StreamingRecorder found in sub-directories are converted
+    as well. Every env trajectory of every file is written contiguously. Episodes end at
+    a terminated step, at the end of an env trajectory and at the end of a file.
+
+    Args:
+        src_dir (Optional[str]): directory containing the JSON logs. Defaults to demonstrations/data.
+        dst_dir (Optional[str]): output directory of the store. Defaults to demonstrations/store.
+        robot_name (Optional[str]): name of the logged view. Defaults to the first one found.
+
+    Returns:
+        dict: metadata of the written store.
+    """
+    src_dir = default_data_dir() if src_dir is None else src_dir
+    dst_dir = default_store_dir() if dst_dir is None else dst_dir
+
+    columns = {field: [] for field in DEMO_FIELDS}
+    episode_starts = []
+    sources = []
+    num_steps = 0
+    for root, dirnames, filenames in os.walk(src_dir):
+        dirnames.sort()
+        if is_recording(root):
+            logs = [(root, _read_recording)]
+        else:
+            logs = [
+                (os.path.join(root, filename), lambda path: _read_json_log(path, robot_name))
+                for filename in sorted(filenames)
+                if filename.endswith(".json")
+            ]
+        for path, read_fn in logs:
+            data = read_fn(path)
+            if data is None:
+                continue
+            sources.append(os.path.relpath(path, src_dir))
+            num_envs, num_frames = data["states"].shape[:2]
+            for env in range(num_envs):
+                episode_starts.append(_episode_offsets(data["terminated"][env, :, 0], num_steps))
+                num_steps += num_frames
+            for field in DEMO_FIELDS:
+                columns[field].append(data[field].reshape(num_envs * num_frames, -1))
+
+    if num_steps == 0:
+        raise ValueError(f"No demonstrations found in {src_dir}")
+
+    os.makedirs(dst_dir, exist_ok=True)
+    meta = {"version": STORE_VERSION, "num_steps": num_steps, "sources": sources, "fields": {}}
+    for field in DEMO_FIELDS:
+        array = np.concatenate(columns[field])
+        np.save(os.path.join(dst_dir, f"{field}.npy"), array)
+        meta["fields"][field] = {"dtype": array.dtype.str, "shape": list(array.shape)}
+        columns[field] = None
+
+    offsets = np.concatenate(episode_starts + [np.array([num_steps])]).astype(np.int64)
+    np.save(os.path.join(dst_dir, EPISODES_FILE), offsets)
+    meta["num_episodes"] = len(offsets) - 1
+
+    with open(os.path.join(dst_dir, META_FILE), "w") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+class DemoStore:
+    """Read-only view on a columnar demonstration store.
+
+    Fields are memory-mapped, so opening a store is O(1) in its size and only
+    the slices that are accessed are read from disk.
+    """
+
+    def __init__(self, path=None, mmap_mode="r"):
+        self.path = default_store_dir() if path is None else path
+        with open(os.path.join(self.path, META_FILE)) as f:
+            self.meta = json.load(f)
+        if self.meta["version"] != STORE_VERSION:
+            raise ValueError(f"Unsupported demonstration store version {self.meta['version']} in {self.path}")
+
+        self.fields = {
+            field: np.load(os.path.join(self.path, f"{field}.npy"), mmap_mode=mmap_mode) for field in self.meta["fields"]
+        }
+        self.episode_offsets = np.load(os.path.join(self.path, EPISODES_FILE))
+
+    def __len__(self):
+        return self.meta["num_steps"]
+
+    def __getitem__(self, field):
+        return self.fields[field]
+
+    @property
+    def num_episodes(self):
+        return len(self.episode_offsets) - 1
+
+    @property
+    def episode_lengths(self):
+        return np.diff(self.episode_offsets)
+
+    def episode(self, idx):
+        """Returns the fields of one episode as views on the store."""
+        start, end = self.episode_offsets[idx], self.episode_offsets[idx + 1]
+        return {field: array[start:end] for field, array in self.fields.items()}
+
+    def to_tensors(self, device="cpu", fields=None):
+        """Loads whole fields as batched tensors of shape (num_steps, dim).
+
+        Args:
+            device (str): device to move the tensors to.
+            fields (Optional[Sequence[str]]): fields to load. Defaults to all of them.
+
+        Returns:
+            dict: field name -> torch.Tensor. Floating point fields are float32, terminated is bool.
+        """
+        fields = self.fields.keys() if fields is None else fields
+        return {field: torch.from_numpy(np.array(self.fields[field])).to(device) for field in fields}
+
+    def next_states(self, states=None):
+        """Returns the successor state of every step.
+
+        The last step of an episode has no successor and is linked to itself.
+        """
+        states = self.to_tensors(fields=["states"])["states"] if states is None else states
+        return link_next_states(states, self.episode_offsets)
+
+    def transitions(self, device="cpu"):
+        """Loads the store as (s, a, r, s', terminated) transitions, see build_transitions."""
+        return build_transitions(self.to_tensors(device=device), self.episode_offsets)
+
+
+def link_next_states(states, episode_offsets):
+    """Links every step to the state of the following step of the same episode.
+
+    Args:
+        states (torch.Tensor): states of shape (num_steps, dim), episodes stored contiguously.
+        episode_offsets (np.ndarray): start offset of every episode, followed by num_steps.
+
+    Returns:
+        torch.Tensor: next states of shape (num_steps, dim). The last step of an episode is linked to itself.
+    """
+    next_states = torch.empty_like(states)
+    next_states[:-1] = states[1:]
+    last = torch.as_tensor(episode_offsets[1:] - 1, device=states.device)
+    next_states[last] = states[last]
+    return next_states
+
+
+def build_transitions(demos, episode_offsets):
+    """Builds the transitions of contiguously stored episodes without looping over steps.
+
+    Episodes that end without a terminated step (end of an env trajectory or of a file)
+    have no successor state, so their last step is marked as terminated too: its
+    self-linked next state must not be bootstrapped from.
+
+    Args:
+        demos (dict): field name -> torch.Tensor of shape (num_steps, dim), with states and terminated.
+        episode_offsets (np.ndarray): start offset of every episode, followed by num_steps.
+
+    Returns:
+        dict: the fields of demos plus "next_states", with terminated set at the last step of every episode.
+    """
+    transitions = dict(demos)
+    transitions["next_states"] = link_next_states(demos["states"], episode_offsets)
+    terminated = demos["terminated"].clone()
+    terminated[torch.as_tensor(episode_offsets[1:] - 1, device=terminated.device)] = True
+    transitions["terminated"] = terminated
+    return transitions
+
+
+class TransitionView(Sequence):
+    """Per-step view on batched transitions, in the format expected by skrl's Pretrainer.
+
+    Items are built on access as (1, dim) slices of the batched tensors, so wrapping
+    100k+ transitions costs nothing up front.
+    """
+
+    # item key -> transition field, the Pretrainer reads rewards as "reward"
+    keys = {
+        "states": "states",
+        "actions": "actions",
+        "reward": "rewards",
+        "next_states": "next_states",
+        "terminated": "terminated",
+    }
+
+    def __init__(self, transitions):
+        self.transitions = transitions
+
+    def __len__(self):
+        return len(self.transitions["states"])
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(f"Transition index {idx} out of range")
+        return {key: self.transitions[field][idx : idx + 1] for key, field in self.keys.items()}
+
+
+def is_store_stale(src_dir=None, dst_dir=None):
+    """Checks whether the store is missing or older than any of the logs."""
+    src_dir = default_data_dir() if src_dir is None else src_dir
+    dst_dir = default_store_dir() if dst_dir is None else dst_dir
+    meta_path = os.path.join(dst_dir, META_FILE)
+    if not os.path.isfile(meta_path):
+        return True
+    store_mtime = os.path.getmtime(meta_path)
+    for root, _, filenames in os.walk(src_dir):
+        for filename in filenames:
+            # recordings are covered by their recording.json, written when they are closed
+            if filename.endswith(".json") and os.path.getmtime(os.path.join(root, filename)) > store_mtime:
+                return True
+    return False
+
+
+def load_demonstrations(device="cpu", src_dir=None, dst_dir=None):
+    """Loads the demonstrations as batched transitions, converting the logs first if needed.
+
+    Args:
+        device (str): device to move the tensors to.
+        src_dir (Optional[str]): directory containing the JSON logs. Defaults to demonstrations/data.
+        dst_dir (Optional[str]): directory of the store. Defaults to demonstrations/store.
+
+    Returns:
+        dict: field name -> torch.Tensor of shape (num_steps, dim), plus "next_states".
+            terminated is also set at the last step of every episode, see build_transitions.
+    """
+    if is_store_stale(src_dir, dst_dir):
+        convert_json_demos(src_dir, dst_dir)
+    return DemoStore(dst_dir).transitions(device=device)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert JSON demonstration logs to a columnar store.")
+    parser.add_argument("--src", default=None, help="Directory with the JSON logs")
+    parser.add_argument("--dst", default=None, help="Output directory of the store")
+    parser.add_argument("--robot", default=None, help="Name of the logged view")
+    args = parser.parse_args()
+
+    meta = convert_json_demos(args.src, args.dst, args.robot)
+    print(f"Converted {len(meta['sources'])} files: {meta['num_steps']} steps, {meta['num_episodes']} episodes")
@@ -185,8 +185,8 @@ class AnymalTerrainDemo(AnymalTerrainTask):
             self.reset_idx(env_ids)
 
         self.get_observations()
-        if self.add_noise:
-            self.obs_buf += (2 * torch.rand_like(self.obs_buf) - 1) * self.noise_scale_vec
+        self.observation_spec.add_noise = self.add_noise
+        self.observation_spec.compute(self.obs_buf)
 
         self.last_actions[:] = self.actions[:]
         self.last_dof_vel[:] = self.dof_vel[:]
@@ -0,0 +1,141 @@
+# Copyright (c) 2018-2022, NVIDIA Corporation
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+
+
+class PipelinedStepper:
+    """Overlaps the physics of the next step with the post-processing of the current one.
+
+    `simulate(actions)` runs on a single worker thread, so all physics calls happen on the
+    same thread. It returns a dict of raw results. Tensors in the dict, and in the dicts it
+    nests such as extras, are copied into one of two alternating snapshot buffers before the
+    worker moves on, because tasks write their buffers in place. `process(raw)` runs on the
+    calling thread on the previous snapshot while the worker simulates the next step.
+
+    This adds one step of action latency: `step(actions)` returns the results of the step
+    launched by the previous call and only then launches a step with `actions`. A policy
+    that acts on the observations returned by call t sees its actions applied one physics
+    step after those observations were taken.
+
+    Thread safety: neither Kit nor the PhysX tensor views are safe to use from two threads
+    at once, and Kit only renders from the main thread. The simulation therefore belongs to
+    the worker thread while a step is in flight: the calling thread must not step, render,
+    read or write views or task buffers until `wait` or `drain` returned. Code that has to
+    touch the simulation between steps should call `require_idle` first. Rendering, cameras
+    and video recording are not supported, the owner has to check this before creating a
+    stepper and fall back to sequential stepping otherwise.
+    """
+
+    def __init__(self, simulate, process):
+        """
+        Args:
+            simulate (Callable[[torch.Tensor], dict]): runs one step with the given actions and
+                returns its raw results. Called on the worker thread.
+            process (Callable[[dict], Any]): turns a snapshot of raw results into the value
+                returned by `step`. Called on the calling thread.
+        """
+        self._simulate = simulate
+        self._process = process
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="PipelinedStepper")
+        self._buffers = [{}, {}]
+        self._index = 0
+        self._future = None
+
+    @property
+    def in_flight(self):
+        """Whether a step was launched and its results were not collected yet."""
+        return self._future is not None
+
+    def _snapshot(self, raw, index):
+        return self._copy_into(self._buffers[index], raw)
+
+    def _copy_into(self, buffer, values):
+        """Copies the tensors of values into the tensors of buffer, recursing into nested dicts such as extras."""
+        snapshot = {}
+        for name, value in values.items():
+            if isinstance(value, torch.Tensor):
+                copy = buffer.get(name)
+                if not isinstance(copy, torch.Tensor) or copy.shape != value.shape or copy.dtype != value.dtype:
+                    copy = buffer[name] = torch.empty_like(value)
+                value = copy.copy_(value)
+            elif isinstance(value, dict):
+                if not isinstance(buffer.get(name), dict):
+                    buffer[name] = {}
+                value = self._copy_into(buffer[name], value)
+            snapshot[name] = value
+        return snapshot
+
+    def _simulate_into(self, actions, index):
+        return self._snapshot(self._simulate(actions), index)
+
+    def launch(self, actions):
+        """Starts a step with `actions` on the worker thread."""
+        if self._future is not None:
+            raise RuntimeError("A step is already in flight, collect it with wait() first")
+        # the caller may reuse its action tensor while the worker reads it
+        self._future = self._executor.submit(self._simulate_into, actions.clone(), self._index)
+        self._index ^= 1
+
+    def wait(self):
+        """Waits for the step in flight and returns its raw snapshot."""
+        if self._future is None:
+            raise RuntimeError("No step in flight")
+        future, self._future = self._future, None
+        return future.result()
+
+    def step(self, actions):
+        """Collects the step in flight, launches a step with `actions` and processes the collected one."""
+        raw = self.wait()
+        self.launch(actions)
+        return self._process(raw)
+
+    def run(self, actions):
+        """Runs one step without pipelining, on the worker thread. No step may be in flight."""
+        self.launch(actions)
+        return self._process(self.wait())
+
+    def require_idle(self, operation):
+        """Raises if a step is in flight, since `operation` would touch the simulation from the calling thread."""
+        if self._future is not None:
+            raise RuntimeError(
+                f"Cannot {operation} while a pipelined step is in flight, the simulation belongs to the worker thread"
+            )
+
+    def drain(self):
+        """Waits for the step in flight, if any, and drops its results."""
+        if self._future is not None:
+            self.wait()
+
+    def close(self):
+        self.drain()
+        self._executor.shutdown()
@@ -32,12 +32,17 @@ from datetime import datetime
 import numpy as np
 import torch
 from omni.isaac.gym.vec_env import VecEnvBase
+from omniisaacgymenvs.envs.pipelined_step import PipelinedStepper
+from omniisaacgymenvs.utils.recorder import StreamingRecorder
 
 
 # VecEnv Wrapper for RL training
 class VecEnvRLGames(VecEnvBase):
     def _process_data(self):
-        self._obs = torch.clamp(self._obs, -self._task.clip_obs, self._task.clip_obs).to(self._task.rl_device)
+        # tasks with an observation spec already clip obs_buf, unless noise was added afterwards
+        if getattr(self._task, "observation_spec", None) is None or self._task.randomize_observations:
+            self._obs = torch.clamp(self._obs, -self._task.clip_obs, self._task.clip_obs)
+        self._obs = self._obs.to(self._task.rl_device)
         self._rew = self._rew.to(self._task.rl_device)
         self._states = torch.clamp(self._states, -self._task.clip_obs, self._task.clip_obs).to(self._task.rl_device)
         self._resets = self._resets.to(self._task.rl_device)
@@ -49,7 +54,43 @@ class VecEnvRLGames(VecEnvBase):
         self.num_states = self._task.num_states
         self.state_space = self._task.state_space
 
+        self._stepper = None
+        if self._task.cfg.get("pipelined_stepping", False):
+            self._check_pipelined_stepping()
+            self._stepper = PipelinedStepper(self._simulate, self._process_step)
+
+    def _check_pipelined_stepping(self):
+        """Pipelined stepping runs physics off the main thread, which Kit only supports without rendering."""
+        unsupported = {
+            "headless=False": not self._task.cfg["headless"],
+            "enable_livestream": self._task.cfg.get("enable_livestream", False),
+            "enable_cameras": self._task.enable_cameras,
+            "enable_recording": self._record or self._task.cfg.get("enable_recording", False),
+            "a viewport": self._render,
+        }
+        enabled = [name for name, value in unsupported.items() if value]
+        if enabled:
+            raise ValueError(
+                "pipelined_stepping steps the simulation on a worker thread and cannot be used with "
+                f"{', '.join(enabled)}, set pipelined_stepping=False"
+            )
+
     def step(self, actions):
+        """Steps the task with the given actions.
+
+        With pipelined_stepping, physics runs on a worker thread and the step launched with
+        `actions` only completes during the next call: this call returns the observations,
+        rewards and resets of the step launched by the previous call (or by reset), and the
+        policy can run while the worker simulates. The simulation and the task buffers belong
+        to the worker thread while a step is in flight, so rendering, logging and recording
+        are refused, and set_task rejects the mode when anything renders. Returned tensors
+        stay valid until the next call to step.
+        """
+        if self._stepper is not None:
+            return self._stepper.step(actions)
+        return self._process_step(self._simulate(actions))
+
+    def _simulate(self, actions):
         # only enable rendering when we are recording, or if the task already has it enabled
         to_render = self._render
         if self._record:
@@ -89,14 +130,18 @@ class VecEnvRLGames(VecEnvBase):
                 self._world.step(render=False)
                 self.sim_frame_count += 1
 
-        self._obs, self._rew, self._resets, self._extras = self._task.post_physics_step()
+        obs, rew, resets, extras = self._task.post_physics_step()
+        return {"obs": obs, "rew": rew, "resets": resets, "extras": extras, "states": self._task.get_states()}
+
+    def _process_step(self, raw):
+        self._obs, self._rew, self._resets, self._extras = raw["obs"], raw["rew"], raw["resets"], raw["extras"]
 
         if self._task.randomize_observations:
             self._obs = self._task._dr_randomizer.apply_observations_randomization(
-                observations=self._obs.to(device=self._task.rl_device), reset_buf=self._task.reset_buf
+                observations=self._obs.to(device=self._task.rl_device), reset_buf=self._resets
             )
 
-        self._states = self._task.get_states()
+        self._states = raw["states"]
         self._process_data()
 
         obs_dict = {"obs": self._obs, "states": self._states}
@@ -108,11 +153,29 @@ class VecEnvRLGames(VecEnvBase):
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         print(f"[{now}] Running RL reset")
 
-        self._task.reset()
         actions = torch.zeros((self.num_envs, self._task.num_actions), device=self._task.rl_device)
+        if self._stepper is not None:
+            # the step in flight started before the reset, and the next one is launched with zero actions
+            self._stepper.drain()
+            self._task.reset()
+            obs_dict, _, _, _ = self._stepper.run(actions)
+            self._stepper.launch(actions)
+            return obs_dict
+
+        self._task.reset()
         obs_dict, _, _, _ = self.step(actions)
 
         return obs_dict
+
+    def render(self, mode="human"):
+        if getattr(self, "_stepper", None) is not None:
+            self._stepper.require_idle("render")
+        return super().render(mode)
+
+    def close(self):
+        if getattr(self, "_stepper", None) is not None:
+            self._stepper.close()
+        super().close()
     
     def start_logging(self, save_path):
         self.data_logger = self._world.get_data_logger() # a DataLogger object is defined in the World by default
@@ -137,10 +200,46 @@ class VecEnvRLGames(VecEnvBase):
 
     
     def logging_step(self):
+        if self._stepper is not None:
+            self._stepper.require_idle("log the task buffers")
         data = self.data_logger._data_frame_logging_func(tasks=self._world.get_current_tasks(), scene=self._world.scene)
         self.data_logger.add_data(
             data=data, current_time_step=self._world.current_time_step_index, current_time=self._world.current_time
         )
 
     def save_log(self):
-        self.data_logger.save(self._save_path)
\ No newline at end of file
+        self.data_logger.save(self._save_path)
+
+    def start_recording(self, save_dir, chunk_length=256, num_buffers=3):
+        """Streams the task buffers of every env to chunked binary files in save_dir.
+
+        Unlike start_logging, data is never converted to Python lists and host memory
+        stays bounded by num_buffers * chunk_length steps.
+        """
+        metadata = {}
+        if getattr(self._task, "observation_spec", None) is not None:
+            metadata["observation_terms"] = self._task.observation_spec.layout()
+        self.recorder = StreamingRecorder(
+            save_dir, chunk_length=chunk_length, num_buffers=num_buffers, metadata=metadata
+        )
+
+    def recording_step(self):
+        if self._stepper is not None:
+            self._stepper.require_idle("record the task buffers")
+        task = self._task
+        self.recorder.record(
+            states=task.obs_buf,
+            actions=task.actions,
+            rewards=task.rew_buf,
+            terminated=task.reset_buf,
+            applied_joint_actions=task._robots.get_applied_actions(clone=False).joint_positions,
+        )
+
+    def stop_recording(self):
+        self.recorder.close()
+
+    @property
+    def observation_terms(self):
+        """Names of the observation terms, in order, for tasks that declare an observation spec."""
+        spec = getattr(self._task, "observation_spec", None)
+        return None if spec is None else spec.names
\ No newline at end of file
@@ -1,3 +1,2 @@
 @echo off
-C:\Users\OWS-User\AppData\Local\ov\pkg\isaac_sim-2023.1.1\python.bat yaml2bash.py
-autogenerated_launch.bat
\ No newline at end of file
+C:\Users\OWS-User\AppData\Local\ov\pkg\isaac_sim-2023.1.1\python.bat sweep.py %*
\ No newline at end of file
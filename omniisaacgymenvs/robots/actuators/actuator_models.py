@@ -0,0 +1,247 @@
+# Copyright (c) 2018-2022, NVIDIA Corporation
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import math
+
+import torch
+
+
+class ActuatorModel:
+    """Batched actuator of a group of joints, evaluated for all envs at once.
+
+    Models preallocate their state in __init__ and write the joint efforts of a step into
+    the `out` tensor of compute, which can be a (non-contiguous) slice of the efforts of
+    the whole articulation, without allocating device memory. Parameters are read from
+    the group config, as a scalar or as one value per joint of the group.
+    """
+
+    def __init__(self, num_envs, num_joints, device, cfg):
+        """Allocates the parameters and state of the model.
+
+        Args:
+            num_envs (int): number of environments.
+            num_joints (int): number of joints of the group.
+            device (str): device of the model tensors.
+            cfg (dict): config of the joint group. All models read effortLimit [N*m], defaulting
+                to no limit.
+        """
+        self.num_envs = num_envs
+        self.num_joints = num_joints
+        self.device = device
+        self.effort_limit = self._joint_param(cfg, "effortLimit", math.inf)
+        self._neg_effort_limit = -self.effort_limit
+
+    def _joint_param(self, cfg, name, default=None):
+        """(num_joints,) tensor of a scalar or per-joint parameter of the config."""
+        value = cfg.get(name, default)
+        if value is None:
+            raise KeyError(f"{type(self).__name__} actuators need a value for {name}")
+        param = torch.as_tensor(value, dtype=torch.float, device=self.device)
+        if param.numel() not in (1, self.num_joints):
+            raise ValueError(f"{name} has {param.numel()} values for a group of {self.num_joints} joints")
+        return param.expand(self.num_joints).contiguous()
+
+    def compute(self, targets, dof_pos, dof_vel, out):
+        """Writes the efforts of the joints for the position targets into out.
+
+        Args:
+            targets (torch.Tensor): (num_envs, num_joints) joint position targets [rad].
+            dof_pos (torch.Tensor): (num_envs, num_joints) joint positions [rad].
+            dof_vel (torch.Tensor): (num_envs, num_joints) joint velocities [rad/s].
+            out (torch.Tensor): (num_envs, num_joints) joint efforts [N*m].
+
+        Returns:
+            torch.Tensor: out.
+        """
+        raise NotImplementedError
+
+    def reset(self, env_ids):
+        """Clears the state of the models of env_ids, for models with a state."""
+        pass
+
+
+class IdealPD(ActuatorModel):
+    """PD law on the position error, clipped to the effort limit.
+
+    Reads stiffness [N*m/rad] and damping [N*m*s/rad] from the config.
+    """
+
+    def __init__(self, num_envs, num_joints, device, cfg):
+        super().__init__(num_envs, num_joints, device, cfg)
+        self.stiffness = self._joint_param(cfg, "stiffness")
+        self.damping = self._joint_param(cfg, "damping")
+
+    def compute(self, targets, dof_pos, dof_vel, out):
+        return compute_pd_efforts(
+            targets, dof_pos, dof_vel, self.stiffness, self.damping, self._neg_effort_limit, self.effort_limit, out
+        )
+
+
+class DCMotor(IdealPD):
+    """PD law clipped to the torque-speed curve of a DC motor.
+
+    The motor delivers saturationEffort [N*m] at rest and no effort at velocityLimit
+    [rad/s], linearly in between, and never more than effortLimit [N*m]:
+
+        max effort = clamp(saturationEffort * (1 - dof_vel / velocityLimit), 0, effortLimit)
+        min effort = clamp(saturationEffort * (-1 - dof_vel / velocityLimit), -effortLimit, 0)
+
+    saturationEffort defaults to effortLimit.
+    """
+
+    def __init__(self, num_envs, num_joints, device, cfg):
+        super().__init__(num_envs, num_joints, device, cfg)
+        self.saturation_effort = self._joint_param(cfg, "saturationEffort", cfg.get("effortLimit"))
+        self.velocity_limit = self._joint_param(cfg, "velocityLimit")
+        self._min_effort = torch.zeros((num_envs, num_joints), device=device)
+        self._max_effort = torch.zeros((num_envs, num_joints), device=device)
+
+    def compute(self, targets, dof_pos, dof_vel, out):
+        compute_dc_motor_limits(
+            dof_vel,
+            self.saturation_effort,
+            self.velocity_limit,
+            self._neg_effort_limit,
+            self.effort_limit,
+            self._min_effort,
+            self._max_effort,
+        )
+        return compute_pd_efforts(
+            targets, dof_pos, dof_vel, self.stiffness, self.damping, self._min_effort, self._max_effort, out
+        )
+
+
+class ActuatorNet(ActuatorModel):
+    """Learned actuator model, an MLP from the recent position errors and velocities of a joint to its effort.
+
+    The network is shared by all the joints of the group and evaluated for all envs and
+    joints in one batch. Its input for a joint is
+
+        [pos_error[t - k] * positionScale for k in inputIndices]
+        + [dof_vel[t - k] * velocityScale for k in inputIndices]
+
+    where t is the current step, and its output is scaled by effortScale and clipped to
+    effortLimit. Reads from the config:
+        network: path of the TorchScript network, or a torch.nn.Module.
+        inputIndices: steps into the past of the network inputs, defaults to [0, 1, 2].
+        positionScale, velocityScale, effortScale: input and output scales, default to 1.
+    """
+
+    def __init__(self, num_envs, num_joints, device, cfg):
+        super().__init__(num_envs, num_joints, device, cfg)
+        network = cfg["network"]
+        if isinstance(network, str):
+            network = torch.jit.load(network, map_location=device)
+        self.network = network.to(device).eval()
+
+        input_indices = list(cfg.get("inputIndices", [0, 1, 2]))
+        self.history_length = max(input_indices) + 1
+        self.position_scale = cfg.get("positionScale", 1.0)
+        self.velocity_scale = cfg.get("velocityScale", 1.0)
+        self.effort_scale = cfg.get("effortScale", 1.0)
+        # (num_envs, num_joints, [position error, velocity], history) ring buffer of the scaled inputs,
+        # written at self._step
+        self._history = torch.zeros((num_envs, num_joints, 2, self.history_length), device=device)
+        self._step = 0
+        # history slots of the network inputs for every slot of the current step
+        self._input_slots = [
+            torch.tensor([(step - k) % self.history_length for k in input_indices], dtype=torch.long, device=device)
+            for step in range(self.history_length)
+        ]
+        self._inputs = torch.zeros((num_envs, num_joints, 2, len(input_indices)), device=device)
+        self._efforts = torch.zeros((num_envs, num_joints), device=device)
+
+    def compute(self, targets, dof_pos, dof_vel, out):
+        slot = self._step % self.history_length
+        torch.sub(targets, dof_pos, out=self._history[:, :, 0, slot]).mul_(self.position_scale)
+        torch.mul(dof_vel, self.velocity_scale, out=self._history[:, :, 1, slot])
+        self._step += 1
+
+        torch.index_select(self._history, 3, self._input_slots[slot], out=self._inputs)
+        with torch.no_grad():
+            efforts = self.network(self._inputs.view(self.num_envs * self.num_joints, -1))
+        torch.mul(efforts.view(self.num_envs, self.num_joints), self.effort_scale, out=self._efforts)
+        return torch.clamp(self._efforts, self._neg_effort_limit, self.effort_limit, out=out)
+
+    def reset(self, env_ids):
+        self._history[env_ids] = 0.0
+
+
+class DelayBuffer:
+    """Delays batched commands by a fixed number of calls to push.
+
+    Envs reset with reset start from the first commands pushed after the reset, as if
+    they had been commanded so for the whole delay.
+    """
+
+    def __init__(self, num_envs, num_joints, delay, device):
+        """Allocates the buffer.
+
+        Args:
+            num_envs (int): number of environments.
+            num_joints (int): number of joints of the commands.
+            delay (int): number of calls to push a command is delayed by.
+            device (str): device of the buffer.
+        """
+        self.delay = delay
+        self._buffer = torch.zeros((delay + 1, num_envs, num_joints), device=device)
+        self._step = 0
+        self._restarted = torch.ones((1, num_envs, 1), dtype=torch.bool, device=device)
+        self._any_restarted = True
+
+    def push(self, commands):
+        """Stores commands and returns the commands pushed delay calls ago."""
+        self._buffer[self._step % (self.delay + 1)].copy_(commands)
+        if self._any_restarted:
+            torch.where(self._restarted, commands.unsqueeze(0), self._buffer, out=self._buffer)
+            self._restarted.zero_()
+            self._any_restarted = False
+        self._step += 1
+        return self._buffer[self._step % (self.delay + 1)]
+
+    def reset(self, env_ids):
+        self._restarted[0, env_ids] = True
+        self._any_restarted = True
+
+
+#####################################################################
+###=========================jit functions=========================###
+#####################################################################
+
+
+@torch.jit.script
+def compute_pd_efforts(targets, dof_pos, dof_vel, stiffness, damping, min_effort, max_effort, out):
+    return torch.clamp(stiffness * (targets - dof_pos) - damping * dof_vel, min_effort, max_effort, out=out)
+
+
+@torch.jit.script
+def compute_dc_motor_limits(dof_vel, saturation_effort, velocity_limit, min_limit, max_limit, min_effort, max_effort):
+    torch.clamp(saturation_effort * (1.0 - dof_vel / velocity_limit), max=max_limit, out=max_effort).clamp_(min=0.0)
+    torch.clamp(saturation_effort * (-1.0 - dof_vel / velocity_limit), min=min_limit, out=min_effort).clamp_(max=0.0)
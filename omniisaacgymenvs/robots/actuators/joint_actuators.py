@@ -0,0 +1,183 @@
+# Copyright (c) 2018-2022, NVIDIA Corporation
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import re
+
+import torch
+from omniisaacgymenvs.robots.actuators.actuator_models import ActuatorNet, DCMotor, DelayBuffer, IdealPD
+
+ACTUATOR_MODELS = {
+    "IdealPD": IdealPD,
+    "DCMotor": DCMotor,
+    "ActuatorNet": ActuatorNet,
+}
+
+
+class ActuatorGroup:
+    """Actuator model of a group of joints of an articulation, with its optional command delay.
+
+    joint_ids is a slice for consecutive joints, whose inputs and efforts are views of the
+    articulation tensors, or else a device tensor of the joint ids, whose inputs and
+    efforts are gathered into and scattered from preallocated buffers.
+    """
+
+    def __init__(self, name, joint_ids, model, delay_buffer=None):
+        self.name = name
+        self.joint_ids = joint_ids
+        self.model = model
+        self.delay_buffer = delay_buffer
+        if not isinstance(joint_ids, slice):
+            shape = (model.num_envs, model.num_joints)
+            self._targets = torch.zeros(shape, device=model.device)
+            self._dof_pos = torch.zeros(shape, device=model.device)
+            self._dof_vel = torch.zeros(shape, device=model.device)
+            self._efforts = torch.zeros(shape, device=model.device)
+
+    def compute(self, targets, dof_pos, dof_vel, efforts):
+        """Writes the efforts of the group joints into the articulation efforts."""
+        joint_ids = self.joint_ids
+        if isinstance(joint_ids, slice):
+            group_targets = targets[:, joint_ids]
+            if self.delay_buffer is not None:
+                group_targets = self.delay_buffer.push(group_targets)
+            self.model.compute(group_targets, dof_pos[:, joint_ids], dof_vel[:, joint_ids], efforts[:, joint_ids])
+        else:
+            group_targets = torch.index_select(targets, 1, joint_ids, out=self._targets)
+            if self.delay_buffer is not None:
+                group_targets = self.delay_buffer.push(group_targets)
+            self.model.compute(
+                group_targets,
+                torch.index_select(dof_pos, 1, joint_ids, out=self._dof_pos),
+                torch.index_select(dof_vel, 1, joint_ids, out=self._dof_vel),
+                self._efforts,
+            )
+            efforts.index_copy_(1, joint_ids, self._efforts)
+
+    def reset(self, env_ids):
+        self.model.reset(env_ids)
+        if self.delay_buffer is not None:
+            self.delay_buffer.reset(env_ids)
+
+
+class JointActuators:
+    """Actuator models of the joints of an articulation view, evaluated together for all envs.
+
+    The joints are split into groups in the task config, each with its own actuator model,
+    e.g. for the AnymalTerrain task:
+
+        actuators:
+          hips:
+            joints: [".*_HAA"]     # regular expressions matched against the dof names
+            model: DCMotor         # one of ACTUATOR_MODELS
+            stiffness: 80.0        # model parameters, a value per group or per joint
+            damping: 2.0
+            effortLimit: 80.0
+            velocityLimit: 7.5
+          legs:
+            joints: [".*_HFE", ".*_KFE"]
+            model: IdealPD
+            stiffness: 80.0
+            damping: 2.0
+            effortLimit: 80.0
+            delay: 1               # physics steps the position targets are delayed by, defaults to 0
+
+    All buffers are allocated in __init__, and compute makes one call per group per physics
+    step. Joints outside of every group get no effort.
+    """
+
+    def __init__(self, cfg, dof_names, num_envs, device):
+        """Builds the actuator models of the joint groups in cfg.
+
+        Args:
+            cfg (dict): config of the joint groups, by group name.
+            dof_names (List[str]): dof names of the articulation view, in view order.
+            num_envs (int): number of environments.
+            device (str): device of the actuator tensors.
+        """
+        self.dof_names = list(dof_names)
+        self.num_dof = len(self.dof_names)
+        self.num_envs = num_envs
+        self.device = device
+        self.efforts = torch.zeros((num_envs, self.num_dof), device=device)
+
+        self.groups = []
+        owners = {}
+        for name, group_cfg in cfg.items():
+            joint_ids = self._find_joints(name, group_cfg["joints"])
+            for j in joint_ids:
+                if j in owners:
+                    raise ValueError(f"Joint {self.dof_names[j]} is in the actuator groups {owners[j]} and {name}")
+                owners[j] = name
+
+            model_name = group_cfg["model"]
+            if model_name not in ACTUATOR_MODELS:
+                raise KeyError(
+                    f"Unknown actuator model {model_name} in group {name}, expected one of {', '.join(ACTUATOR_MODELS)}"
+                )
+            model = ACTUATOR_MODELS[model_name](num_envs, len(joint_ids), device, group_cfg)
+            delay = group_cfg.get("delay", 0)
+            delay_buffer = DelayBuffer(num_envs, len(joint_ids), delay, device) if delay > 0 else None
+            self.groups.append(ActuatorGroup(name, self._joint_index(joint_ids), model, delay_buffer))
+
+    def _find_joints(self, name, patterns):
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        joint_ids = [
+            j for j, dof_name in enumerate(self.dof_names) if any(re.fullmatch(p, dof_name) for p in patterns)
+        ]
+        if not joint_ids:
+            raise ValueError(f"Actuator group {name} matches none of the joints {self.dof_names}")
+        return joint_ids
+
+    def _joint_index(self, joint_ids):
+        """A slice for consecutive joints, or else a device tensor of the joint ids."""
+        if joint_ids == list(range(joint_ids[0], joint_ids[-1] + 1)):
+            return slice(joint_ids[0], joint_ids[-1] + 1)
+        return torch.tensor(joint_ids, dtype=torch.long, device=self.device)
+
+    def compute(self, targets, dof_pos, dof_vel):
+        """Computes the joint efforts of one physics step.
+
+        Args:
+            targets (torch.Tensor): (num_envs, num_dof) joint position targets [rad].
+            dof_pos (torch.Tensor): (num_envs, num_dof) joint positions [rad].
+            dof_vel (torch.Tensor): (num_envs, num_dof) joint velocities [rad/s].
+
+        Returns:
+            torch.Tensor: (num_envs, num_dof) joint efforts [N*m], in a buffer reused by every call.
+        """
+        for group in self.groups:
+            group.compute(targets, dof_pos, dof_vel, self.efforts)
+        return self.efforts
+
+    def reset(self, env_ids):
+        """Clears the delayed commands and model states of env_ids."""
+        for group in self.groups:
+            group.reset(env_ids)
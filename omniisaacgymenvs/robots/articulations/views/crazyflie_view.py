@@ -46,3 +46,22 @@ class CrazyflieView(ArticulationView):
             RigidPrimView(prim_paths_expr=f"/World/envs/.*/Crazyflie/m{i}_prop", name=f"m{i}_prop_view")
             for i in range(1, 5)
         ]
+        # all the rotors in one view, ordered (env 0 m1..m4, env 1 m1..m4, ...) to apply the forces at once
+        self.rotors = RigidPrimView(prim_paths_expr="/World/envs/.*/Crazyflie/m[1-4]_prop", name="rotors_view")
+        self._check_rotor_order()
+
+    def _check_rotor_order(self):
+        """Rotor i of env k must be at index 4 * k + i of the rotor views, the forces are applied in that order."""
+        for i, view in enumerate(self.physics_rotors, start=1):
+            expected = [f"{path}/m{i}_prop" for path in self.prim_paths]
+            if list(view.prim_paths) != expected:
+                raise RuntimeError(
+                    f"{view.name} does not match the copters in order, expected {expected[:2]}... "
+                    f"but found {list(view.prim_paths)[:2]}..."
+                )
+        expected = [f"{path}/m{i}_prop" for path in self.prim_paths for i in range(1, 5)]
+        if list(self.rotors.prim_paths) != expected:
+            raise RuntimeError(
+                f"rotors_view is not ordered by copter then rotor, expected {expected[:5]}... "
+                f"but found {list(self.rotors.prim_paths)[:5]}..."
+            )
@@ -0,0 +1,167 @@
+"""CPU microbenchmark of the DianaTekkenTask reward and reset computation.
+
+Compares the scripted compute_diana_tekken_reward with the previous per-term
+implementation of calculate_metrics/is_done and checks that both agree. Only
+torch is needed, Isaac Sim is not started.
+
+Usage: python scripts/benchmarks/diana_tekken_reward.py [--num_envs 1024 4096 16384]
+"""
+
+import argparse
+import time
+
+import torch
+from omniisaacgymenvs.tasks.utils.diana_tekken_reward import REWARD_TERMS, compute_diana_tekken_reward, quat_diff_rad
+
+THUMB_IDXS = [16, 21, 26]
+FOUR_FINGER_IDXS = [i for i in range(12, 27) if i not in THUMB_IDXS]
+MAX_EPISODE_LENGTH = 800
+
+
+def make_inputs(num_envs, device="cpu"):
+    def rand_quat():
+        return torch.nn.functional.normalize(torch.randn((num_envs, 4), device=device), dim=1)
+
+    return {
+        "progress_buf": torch.randint(0, MAX_EPISODE_LENGTH, (num_envs,), device=device),
+        "joint_efforts": torch.rand((num_envs, 27), device=device) * 0.2,
+        "hand_pos": torch.rand((num_envs, 3), device=device) * 1.2 - 0.2,
+        "hand_in_drill_pos": (torch.rand((num_envs, 3), device=device) - 0.5) * 0.2,
+        "hand_in_drill_rot": rand_quat(),
+        "drill_pos": torch.rand((num_envs, 3), device=device) * torch.tensor([1.0, 1.2, 0.5], device=device)
+        + torch.tensor([0.2, -0.6, 0.4], device=device),
+        "drill_rot": rand_quat(),
+        "ref_grasp_in_drill_pos": torch.tensor([-0.0269, -0.0307, -0.0138], device=device).repeat(num_envs, 1),
+        "ref_grasp_in_drill_rot": torch.tensor([-0.9926, 0.1128, 0.0436, -0.0108], device=device).repeat(num_envs, 1),
+        "drill_zero_rot": torch.tensor([1.0, 0.0, 0.0, 0.0], device=device).repeat(num_envs, 1),
+        "hand_lower_bound": torch.tensor([0.0, -0.5, 0.2], device=device),
+        "hand_upper_bound": torch.tensor([0.9, 0.5, 0.9], device=device),
+        "drill_upper_bound": torch.tensor([0.8, 0.5, 0.53], device=device),
+        "drill_reset_lower_bound": torch.tensor([0.3, -0.5, 0.45], device=device),
+    }
+
+
+def add_reward_term(d, reward, w=1):
+    return reward + torch.log(1 / (1.0 + d**2)) * w
+
+
+def legacy_reward_and_reset(inputs, reset_buf):
+    """calculate_metrics followed by is_done, as they were before the scripted kernel, and the manipulability."""
+    hand_pos = inputs["hand_pos"]
+    drill_pos = inputs["drill_pos"]
+
+    reward = torch.zeros(hand_pos.shape[0], device=hand_pos.device)
+    d = torch.norm(inputs["hand_in_drill_pos"] - inputs["ref_grasp_in_drill_pos"], p=2, dim=1)
+    reward = add_reward_term(d, reward, 0.2)
+    reward = torch.where(
+        torch.norm(inputs["hand_in_drill_pos"] - inputs["ref_grasp_in_drill_pos"], p=2, dim=1) < 0.05,
+        reward + 0.05,
+        reward,
+    )
+    d = quat_diff_rad(inputs["hand_in_drill_rot"], inputs["ref_grasp_in_drill_rot"])
+    reward = add_reward_term(d, reward, 0.2)
+    d = torch.abs(0.7 - drill_pos[:, 2])
+    reward = add_reward_term(d, reward, 0.5)
+    d = quat_diff_rad(inputs["drill_zero_rot"], inputs["drill_rot"])
+    reward = add_reward_term(d, reward, 0.2)
+    reward = torch.where(torch.logical_and(d < 0.15, drill_pos[:, 2] > 0.7), reward + 0.5, reward)
+
+    res = inputs["joint_efforts"] > 1e-1
+    manipulability = torch.where(
+        torch.logical_and(torch.any(res[:, THUMB_IDXS], dim=1), torch.any(res[:, FOUR_FINGER_IDXS], dim=1)),
+        torch.count_nonzero(res, dim=1),
+        0.0,
+    )
+    reward += manipulability * 0.05
+    reward = torch.where(drill_pos[:, 2] > 0.7, reward + 1, reward)
+
+    upper, lower = inputs["drill_upper_bound"], inputs["drill_reset_lower_bound"]
+    hand_lower, hand_upper = inputs["hand_lower_bound"], inputs["hand_upper_bound"]
+    reward = torch.where(torch.any(drill_pos[:, :2] >= upper[:2], dim=1), reward - 10, reward)
+    reward = torch.where(torch.any(drill_pos <= lower, dim=1), reward - 10, reward)
+    reward = torch.where(torch.any(hand_pos[:, :2] >= hand_upper[:2], dim=1), reward - 10, reward)
+    reward = torch.where(torch.any(hand_pos[:, :2] <= hand_lower[:2], dim=1), reward - 10, reward)
+
+    ones = torch.ones_like(reset_buf)
+    reset_buf = torch.where(inputs["progress_buf"] >= MAX_EPISODE_LENGTH - 1, ones, reset_buf)
+    reset_buf = torch.where(torch.any(drill_pos[:, :2] >= upper[:2], dim=1), torch.ones_like(reset_buf), reset_buf)
+    reset_buf = torch.where(torch.any(drill_pos <= lower, dim=1), torch.ones_like(reset_buf), reset_buf)
+    reset_buf = torch.where(torch.any(hand_pos[:, :2] >= hand_upper[:2], dim=1), torch.ones_like(reset_buf), reset_buf)
+    reset_buf = torch.where(torch.any(hand_pos[:, :2] <= hand_lower[:2], dim=1), torch.ones_like(reset_buf), reset_buf)
+    return reward, reset_buf, manipulability
+
+
+def fused_reward_and_reset(inputs, rew_buf, reset_buf, reward_terms, manipulability, thumb_idxs, four_finger_idxs):
+    compute_diana_tekken_reward(
+        rew_buf,
+        reset_buf,
+        reward_terms,
+        manipulability,
+        inputs["progress_buf"],
+        inputs["joint_efforts"],
+        thumb_idxs,
+        four_finger_idxs,
+        inputs["hand_pos"],
+        inputs["hand_in_drill_pos"],
+        inputs["hand_in_drill_rot"],
+        inputs["drill_pos"],
+        inputs["drill_rot"],
+        inputs["ref_grasp_in_drill_pos"],
+        inputs["ref_grasp_in_drill_rot"],
+        inputs["drill_zero_rot"],
+        inputs["hand_lower_bound"],
+        inputs["hand_upper_bound"],
+        inputs["drill_upper_bound"],
+        inputs["drill_reset_lower_bound"],
+        MAX_EPISODE_LENGTH,
+    )
+
+
+def time_fn(fn, iterations):
+    for _ in range(10):
+        fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the DianaTekken reward and reset computation on CPU.")
+    parser.add_argument("--num_envs", type=int, nargs="+", default=[1024, 4096, 16384])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    print(f"{'num_envs':>10} {'legacy [us]':>12} {'fused [us]':>12} {'speedup':>8}")
+    for num_envs in args.num_envs:
+        inputs = make_inputs(num_envs)
+        rew_buf = torch.zeros(num_envs)
+        reset_buf = torch.zeros(num_envs, dtype=torch.long)
+        reward_terms = torch.zeros((num_envs, len(REWARD_TERMS)))
+        manipulability = torch.zeros(num_envs, dtype=torch.long)
+        thumb_idxs = torch.tensor(THUMB_IDXS)
+        four_finger_idxs = torch.tensor(FOUR_FINGER_IDXS)
+
+        legacy_rew, legacy_reset, legacy_manipulability = legacy_reward_and_reset(
+            inputs, torch.zeros(num_envs, dtype=torch.long)
+        )
+        fused_reward_and_reset(inputs, rew_buf, reset_buf, reward_terms, manipulability, thumb_idxs, four_finger_idxs)
+        assert torch.allclose(legacy_rew, rew_buf, atol=1e-5), "rewards differ from the legacy implementation"
+        assert torch.equal(legacy_reset, reset_buf), "resets differ from the legacy implementation"
+        assert torch.equal(legacy_manipulability.long(), manipulability), "manipulability differs"
+
+        legacy_us = time_fn(
+            lambda: legacy_reward_and_reset(inputs, torch.zeros(num_envs, dtype=torch.long)), args.iterations
+        )
+        fused_us = time_fn(
+            lambda: fused_reward_and_reset(
+                inputs, rew_buf, reset_buf.zero_(), reward_terms, manipulability, thumb_idxs, four_finger_idxs
+            ),
+            args.iterations,
+        )
+        print(f"{num_envs:>10} {legacy_us:>12.1f} {fused_us:>12.1f} {legacy_us / fused_us:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+"""Parity check and timing of the warp DianaTekkenTask against the torch task.
+
+Builds both implementations of the task with their own constructors and post_reset, on
+stand-in views that return the same random robot and drill states, as torch tensors to the
+torch task and as warp arrays to the warp task. Then checks that:
+  - get_observations writes the same observations and drill finger targets,
+  - calculate_metrics writes the same rewards, reward terms and resets,
+  - pre_physics_step sets the same joint position targets,
+  - deterministic resets write the same robot and drill states to the views,
+  - random resets stay within the reset bounds and differ between calls.
+Warp kernels also run on the CPU device, so the check does not need a GPU. The timing
+compares one step (actions, observations and rewards) of both implementations.
+
+Usage: python scripts/benchmarks/diana_tekken_warp.py [--num_envs 4096] [--device cpu]
+"""
+
+import argparse
+import time
+
+from omni.isaac.kit import SimulationApp
+
+simulation_app = SimulationApp({"headless": True})
+
+import torch
+import warp as wp
+from omniisaacgymenvs.robots.articulations.views.diana_tekken_view import DianaTekkenView
+from omniisaacgymenvs.tasks.diana_tekken_task import DianaTekkenTask as TorchDianaTekkenTask
+from omniisaacgymenvs.tasks.warp.diana_tekken import DianaTekkenTask as WarpDianaTekkenTask
+
+NUM_DOFS = 27
+ACTUATED_DOF_INDICES = list(range(7)) + list(range(12, 17))
+ACTUATED_FINGER_DOF_INDICES = list(range(12, 17))
+CLAMPED_FINGER_DOF_INDICES = list(range(17, 27))
+DEFAULT_DOF_POS = [0.3311, -0.8079, -0.4242, 2.2495, 2.7821, 0.0904, 1.6300] + [0.0] * 20
+DRILL_POSITION = [0.6, 0.0, 0.53]
+MAX_EPISODE_LENGTH = 800
+
+
+class StandInSimConfig:
+    def __init__(self, num_envs, device):
+        self.config = {"seed": 42, "test": False, "sim_device": device, "rl_device": device}
+        self.task_config = {
+            "env": {
+                "numEnvs": num_envs,
+                "envSpacing": 3.0,
+                "episodeLength": MAX_EPISODE_LENGTH,
+                "clipObservations": 5.0,
+                "clipActions": 1.0,
+                "controlFrequencyInv": 2,
+                "actionScale": 2.5,
+            },
+            "sim": {"dt": 0.0083},
+        }
+
+
+class StandInWorld:
+    def is_playing(self):
+        return True
+
+
+class StandInEnv:
+    def __init__(self):
+        self._world = StandInWorld()
+        self.world = self._world
+
+
+class StandInPrimView:
+    """Rigid or xform prim view over the tensors in `state`, which it hands out through `wrap`.
+
+    The tensors it is given are converted to torch and kept in `calls`.
+    """
+
+    def __init__(self, state, wrap):
+        self.state = state
+        self.wrap = wrap
+        self.calls = {}
+
+    def _record(self, name, *values):
+        self.calls[name] = [to_torch(value) for value in values]
+
+    def get_world_poses(self, clone=True):
+        return self.wrap(self.state["pos"]), self.wrap(self.state["rot"])
+
+    def get_velocities(self, clone=True):
+        return self.wrap(self.state["vel"])
+
+    def set_world_poses(self, positions, orientations, indices):
+        self._record("set_world_poses", positions, orientations, indices)
+
+    def set_velocities(self, velocities, indices):
+        self._record("set_velocities", velocities, indices)
+
+
+class StandInRobotView(StandInPrimView):
+    """DianaTekkenView with the dof indices it computes in initialize."""
+
+    name = "tekken_view"
+    num_dof = NUM_DOFS
+    actuated_dof_indices = ACTUATED_DOF_INDICES
+    actuated_finger_dof_indices = ACTUATED_FINGER_DOF_INDICES
+    clamped_finger_dof_indices = CLAMPED_FINGER_DOF_INDICES
+    clamp_joint0_joint1_joint2 = DianaTekkenView.clamp_joint0_joint1_joint2
+
+    def __init__(self, state, wrap):
+        super().__init__(state["robot"], wrap)
+        self.count = state["env_pos"].shape[0]
+        self._palm_centers = StandInPrimView(state["palm"], wrap)
+        self._index_fingers = StandInPrimView(state["palm"], wrap)
+        self._middle_fingers = StandInPrimView(state["palm"], wrap)
+        self._ring_fingers = StandInPrimView(state["palm"], wrap)
+        self._little_fingers = StandInPrimView(state["palm"], wrap)
+        self._thumb_fingers = StandInPrimView(state["palm"], wrap)
+
+    def get_joint_positions(self, clone=True):
+        return self.wrap(self.state["dof_pos"])
+
+    def get_joint_velocities(self, clone=True):
+        return self.wrap(self.state["dof_vel"])
+
+    def get_measured_joint_efforts(self, clone=True):
+        return self.wrap(self.state["efforts"])
+
+    def get_dof_limits(self):
+        # a torch tensor with both backends
+        return self.state["dof_limits"]
+
+    def set_joint_positions(self, positions, indices=None):
+        self._record("set_joint_positions", positions, indices)
+
+    def set_joint_velocities(self, velocities, indices=None):
+        self._record("set_joint_velocities", velocities, indices)
+
+    def set_joint_position_targets(self, positions, indices=None):
+        self._record("set_joint_position_targets", positions, indices)
+
+
+def to_torch(value):
+    if value is None or torch.is_tensor(value):
+        return value
+    if isinstance(value, wp.indexedarray):
+        return torch.from_numpy(value.numpy())
+    return wp.to_torch(value).clone()
+
+
+def random_quat(num_envs, device):
+    return torch.nn.functional.normalize(torch.randn((num_envs, 4), device=device), dim=1)
+
+
+def make_state(num_envs, device):
+    """Random robot and drill states around the reset poses, partly out of the task bounds."""
+    num_rows = int(num_envs**0.5 + 0.5)
+    env_ids = torch.arange(num_envs, device=device)
+    env_pos = torch.stack(
+        ((env_ids // num_rows) * 3.0, (env_ids % num_rows) * 3.0, torch.zeros(num_envs, device=device)), dim=1
+    )
+
+    lower = -torch.rand(NUM_DOFS, device=device) - 0.5
+    upper = torch.rand(NUM_DOFS, device=device) + 0.5
+    lower[:7] = torch.tensor(DEFAULT_DOF_POS[:7], device=device) - 1.0
+    upper[:7] = torch.tensor(DEFAULT_DOF_POS[:7], device=device) + 1.0
+    dof_limits = torch.stack((lower, upper), dim=-1).unsqueeze(0).repeat(num_envs, 1, 1)
+
+    drill_pos = torch.tensor(DRILL_POSITION, device=device) + env_pos
+    state = {
+        "env_pos": env_pos,
+        "robot": {
+            "dof_pos": torch.zeros((num_envs, NUM_DOFS), device=device),
+            "dof_vel": torch.zeros((num_envs, NUM_DOFS), device=device),
+            "efforts": torch.zeros((num_envs, NUM_DOFS), device=device),
+            "dof_limits": dof_limits,
+        },
+        "palm": {"pos": torch.zeros((num_envs, 3), device=device), "rot": torch.zeros((num_envs, 4), device=device)},
+        "drill": {
+            "pos": drill_pos.clone(),
+            "rot": torch.tensor([[1.0, 0.0, 0.0, 0.0]], device=device).repeat(num_envs, 1),
+            "vel": torch.zeros((num_envs, 6), device=device),
+        },
+        "finger_target": {
+            "pos": drill_pos + torch.tensor([0.02, -0.05, 0.1], device=device),
+            "rot": torch.tensor([[1.0, 0.0, 0.0, 0.0]], device=device).repeat(num_envs, 1),
+        },
+    }
+    return state
+
+
+def randomize_state(state):
+    """Overwrites the step state in place, so the warp arrays sharing its memory see the new values."""
+    robot, env_pos = state["robot"], state["env_pos"]
+    num_envs, device = env_pos.shape[0], env_pos.device
+    lower, upper = robot["dof_limits"][0, :, 0], robot["dof_limits"][0, :, 1]
+    robot["dof_pos"].copy_(lower + (upper - lower) * torch.rand((num_envs, NUM_DOFS), device=device))
+    robot["dof_vel"].copy_(torch.randn((num_envs, NUM_DOFS), device=device))
+    robot["efforts"].copy_(torch.rand((num_envs, NUM_DOFS), device=device) * 0.2)
+    palm_pos = torch.rand((num_envs, 3), device=device) * torch.tensor([1.2, 1.4, 0.9], device=device)
+    state["palm"]["pos"].copy_(palm_pos + torch.tensor([-0.15, -0.7, 0.1], device=device) + env_pos)
+    state["palm"]["rot"].copy_(random_quat(num_envs, device))
+    drill_pos = torch.rand((num_envs, 3), device=device) * torch.tensor([0.7, 1.2, 0.45], device=device)
+    state["drill"]["pos"].copy_(drill_pos + torch.tensor([0.2, -0.6, 0.4], device=device) + env_pos)
+    state["drill"]["rot"].copy_(random_quat(num_envs, device))
+    # near the reference grasp for a part of the envs, so all the reward terms are exercised
+    near = torch.rand(num_envs, device=device) < 0.3
+    state["drill"]["rot"][near] = torch.tensor([1.0, 0.0, 0.0, 0.0], device=device)
+    state["palm"]["pos"][near] = state["drill"]["pos"][near] + torch.tensor([-0.0269, -0.0307, -0.0138], device=device)
+
+
+def set_scene_constants(task, device):
+    """Attributes the torch task sets in get_robot and get_drill, while adding its prims to the stage."""
+    task._hand_lower_bound = torch.tensor([0.0, -0.5, 0.2], device=device)
+    task._hand_upper_bound = torch.tensor([0.9, 0.5, 0.9], device=device)
+    task._drill_position = torch.tensor(DRILL_POSITION, device=device)
+    task._drill_lower_bound = torch.tensor([0.3, -0.5, 0.53], device=device)
+    task._drill_reset_lower_bound = torch.tensor([0.3, -0.5, 0.45], device=device)
+    task._drill_upper_bound = torch.tensor([0.8, 0.5, 0.53], device=device)
+    task._drills_rot = torch.tensor([[1.0, 0.0, 0.0, 0.0]], device=device)
+
+
+def make_task(task_class, state, device, wrap):
+    num_envs = state["env_pos"].shape[0]
+    task = task_class("DianaTekken", StandInSimConfig(num_envs, device), StandInEnv())
+    if task_class is TorchDianaTekkenTask:
+        set_scene_constants(task, device)
+    task._robots = StandInRobotView(state, wrap)
+    task._drills = StandInPrimView(state["drill"], wrap)
+    task._drills_finger_targets = StandInPrimView(state["finger_target"], wrap)
+    task._env_pos = state["env_pos"] if task_class is TorchDianaTekkenTask else wp.from_torch(state["env_pos"])
+    task.post_reset()
+    return task
+
+
+def make_tasks(num_envs, device):
+    state = make_state(num_envs, device)
+    all_indices = wp.array(list(range(num_envs)), dtype=wp.int32, device=device)
+    torch_task = make_task(TorchDianaTekkenTask, state, device, lambda tensor: tensor)
+    warp_task = make_task(WarpDianaTekkenTask, state, device, lambda tensor: wp.from_torch(tensor)[all_indices])
+    return state, torch_task, warp_task
+
+
+def assert_close(value, expected, name, atol=1e-5):
+    value, expected = to_torch(value).to(expected.device), expected.to(dtype=torch.float)
+    error = (value.float() - expected).abs().max().item()
+    assert error <= atol, f"{name} differs by {error}"
+
+
+def check_parity(num_envs, device):
+    torch.manual_seed(0)
+    state, torch_task, warp_task = make_tasks(num_envs, device)
+
+    for step in range(5):
+        randomize_state(state)
+        progress = torch.randint(0, MAX_EPISODE_LENGTH, (num_envs,), device=device)
+        torch_task.progress_buf.copy_(progress)
+        wp.to_torch(warp_task.progress_buf).copy_(progress)
+        torch_task.reset_buf.zero_()
+        wp.to_torch(warp_task.reset_buf).zero_()
+
+        torch_task.get_observations()
+        warp_task.get_observations()
+        # the warp task writes the raw observations, which the VecEnv clamps
+        assert_close(warp_task.obs_buf, torch_task.observation_spec.raw_buf, f"observations at step {step}")
+        assert_close(
+            warp_task.drill_finger_targets_pos, torch_task.drill_finger_targets_pos, f"finger targets at step {step}"
+        )
+
+        torch_task.calculate_metrics()
+        warp_task.calculate_metrics()
+        assert_close(warp_task.reward_terms, torch_task.reward_terms, f"reward terms at step {step}")
+        assert_close(warp_task.rew_buf, torch_task.rew_buf, f"rewards at step {step}")
+        assert_close(warp_task.reset_buf, torch_task.reset_buf, f"resets at step {step}", atol=0)
+
+        # targets close to the limits, so the clamping is exercised
+        lower, upper = state["robot"]["dof_limits"][:, :, 0], state["robot"]["dof_limits"][:, :, 1]
+        targets = lower + (upper - lower) * (1.02 * torch.rand((num_envs, NUM_DOFS), device=device) - 0.01)
+        torch_task._robot_dof_targets = targets.clamp(lower, upper)
+        wp.to_torch(warp_task._robot_dof_targets).copy_(torch_task._robot_dof_targets)
+        torch_task.reset_buf.zero_()
+        wp.to_torch(warp_task.reset_buf).zero_()
+        actions = 2.0 * torch.rand((num_envs, 12), device=device) - 1.0
+        torch_task.pre_physics_step(actions)
+        warp_task.pre_physics_step(actions)
+        assert_close(
+            warp_task._robots.calls["set_joint_position_targets"][0],
+            torch_task._robots.calls["set_joint_position_targets"][0],
+            f"joint position targets at step {step}",
+        )
+    print(f"parity: observations, rewards, resets and targets match the torch task on {device}")
+
+    env_ids = torch.sort(torch.randperm(num_envs, device=device)[: num_envs // 3])[0]
+    torch_task.reset_idx(env_ids, deterministic=True)
+    reset_buf = wp.to_torch(warp_task.reset_buf)
+    reset_buf.zero_()
+    reset_buf[env_ids] = 1
+    warp_task.reset_idx(deterministic=True)
+    for view in ("_robots", "_drills"):
+        torch_calls, warp_calls = getattr(torch_task, view).calls, getattr(warp_task, view).calls
+        for call in ("set_joint_positions", "set_joint_velocities", "set_world_poses", "set_velocities"):
+            if call in torch_calls:
+                for k, (value, expected) in enumerate(zip(warp_calls[call], torch_calls[call])):
+                    assert_close(value, expected, f"{view}.{call} argument {k}", atol=1e-6)
+    assert not reset_buf.any() and not wp.to_torch(warp_task.progress_buf)[env_ids].any()
+    print("parity: deterministic resets match the torch task")
+
+    drill_pos = []
+    for _ in range(2):
+        wp.to_torch(warp_task.reset_buf).fill_(1)
+        warp_task.reset_idx()
+        dof_pos = warp_task._robots.calls["set_joint_positions"][0]
+        deviation = dof_pos[:, ACTUATED_DOF_INDICES] - torch.tensor(DEFAULT_DOF_POS)[ACTUATED_DOF_INDICES]
+        assert deviation.abs().max() <= 0.125 + 1e-6, "joint positions out of the reset range"
+        assert not dof_pos[:, [j for j in range(NUM_DOFS) if j not in ACTUATED_DOF_INDICES]].any()
+        drill_pos.append(warp_task._drills.calls["set_world_poses"][0] - state["env_pos"].cpu())
+        lower, upper = torch.tensor([0.3, -0.5, 0.53]), torch.tensor([0.8, 0.5, 0.53])
+        in_bounds = (drill_pos[-1] >= lower - 1e-5) & (drill_pos[-1] <= upper + 1e-5)
+        assert in_bounds.all(), "drill out of the reset bounds"
+    assert not torch.equal(drill_pos[0], drill_pos[1]), "random resets repeat between calls"
+    print("random resets stay within the reset bounds and differ between calls")
+
+
+def time_fn(fn, iterations, device):
+    for _ in range(3):
+        fn()
+    if device.startswith("cuda"):
+        wp.synchronize()
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    if device.startswith("cuda"):
+        wp.synchronize()
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and time the warp DianaTekkenTask against the torch task.")
+    parser.add_argument("--num_envs", type=int, default=4096)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--device", type=str, default="cpu")
+    args = parser.parse_args()
+
+    wp.init()
+    check_parity(min(args.num_envs, 1024), args.device)
+
+    state, torch_task, warp_task = make_tasks(args.num_envs, args.device)
+    randomize_state(state)
+    actions = 2.0 * torch.rand((args.num_envs, 12), device=args.device) - 1.0
+    timings = {}
+    for name, task in (("torch", torch_task), ("warp", warp_task)):
+        timings[name] = {
+            "pre_physics_step": time_fn(lambda: task.pre_physics_step(actions), args.iterations, args.device),
+            "get_observations": time_fn(task.get_observations, args.iterations, args.device),
+            "calculate_metrics": time_fn(task.calculate_metrics, args.iterations, args.device),
+        }
+
+    print(f"{args.num_envs} envs on {args.device}")
+    print(f"  {'operation':>18} {'torch [us]':>11} {'warp [us]':>10} {'speedup':>8}")
+    for op in timings["torch"]:
+        torch_us, warp_us = timings["torch"][op], timings["warp"][op]
+        print(f"  {op:>18} {torch_us:>11.1f} {warp_us:>10.1f} {torch_us / warp_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
+    simulation_app.close()
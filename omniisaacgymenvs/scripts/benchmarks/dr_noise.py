@@ -0,0 +1,162 @@
+"""Microbenchmark of the per-step observation and action noise of domain randomization.
+
+Times one step of observation and action randomization with DR off, with the previous
+Randomizer implementation (nonzero env ids and freshly allocated noise), and with the
+compiled BufferNoise streams, and reports the overhead of DR over the DR off step.
+
+Usage: python scripts/benchmarks/dr_noise.py [--num_envs 1024 4096 16384] [--device cuda:0]
+"""
+
+import argparse
+import time
+
+from omni.isaac.kit import SimulationApp
+
+simulation_app = SimulationApp({"headless": True})
+
+import numpy as np
+import torch
+from omniisaacgymenvs.utils.domain_randomization.noise import BufferNoise
+
+NUM_OBSERVATIONS = 64
+NUM_ACTIONS = 12
+RESET_PROBABILITY = 0.005
+DR_PARAMS = {
+    "on_reset": {"operation": "additive", "distribution": "gaussian", "distribution_parameters": [0.0, 0.01]},
+    "on_interval": {
+        "frequency_interval": 1,
+        "operation": "scaling",
+        "distribution": "uniform",
+        "distribution_parameters": [0.95, 1.05],
+    },
+}
+
+
+class LegacyBufferNoise:
+    """apply_observations_randomization/apply_actions_randomization as they were before BufferNoise."""
+
+    def __init__(self, dr_params, num_envs, dim, device):
+        self.dr_params = dr_params
+        self.device = device
+        self.counter = torch.zeros(num_envs, dtype=torch.int, device=device)
+        self.correlated_noise = torch.zeros((num_envs, dim), device=device)
+
+    def _noise(self, distribution, distribution_parameters, size):
+        if distribution == "gaussian" or distribution == "normal":
+            return torch.normal(
+                mean=distribution_parameters[0], std=distribution_parameters[1], size=size, device=self.device
+            )
+        elif distribution == "uniform":
+            return (distribution_parameters[1] - distribution_parameters[0]) * torch.rand(
+                size, device=self.device
+            ) + distribution_parameters[0]
+        elif distribution == "loguniform" or distribution == "log_uniform":
+            return torch.exp(
+                (np.log(distribution_parameters[1]) - np.log(distribution_parameters[0]))
+                * torch.rand(size, device=self.device)
+                + np.log(distribution_parameters[0])
+            )
+
+    def apply(self, buffer, reset_buf):
+        env_ids = reset_buf.nonzero(as_tuple=False).squeeze(-1)
+        self.counter[env_ids] = 0
+        self.counter += 1
+
+        if "on_reset" in self.dr_params.keys():
+            params = self.dr_params["on_reset"]
+            if len(env_ids) > 0:
+                self.correlated_noise[env_ids] = self._noise(
+                    params["distribution"], params["distribution_parameters"], (len(env_ids), buffer.shape[1])
+                )
+            if params["operation"] == "additive":
+                buffer += self.correlated_noise
+            elif params["operation"] == "scaling":
+                buffer *= self.correlated_noise
+
+        if "on_interval" in self.dr_params.keys():
+            params = self.dr_params["on_interval"]
+            randomize_ids = (self.counter >= params["frequency_interval"]).nonzero(as_tuple=False).squeeze(-1)
+            self.counter[randomize_ids] = 0
+            noise = self._noise(
+                params["distribution"], params["distribution_parameters"], (len(randomize_ids), buffer.shape[1])
+            )
+            if params["operation"] == "additive":
+                buffer[randomize_ids] += noise
+            elif params["operation"] == "scaling":
+                buffer[randomize_ids] *= noise
+        return buffer
+
+
+def time_steps(step, iterations, device):
+    for _ in range(10):
+        step()
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        step()
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the per-step overhead of observation and action DR.")
+    parser.add_argument("--num_envs", type=int, nargs="+", default=[1024, 4096, 16384])
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--device", type=str, default="cuda:0" if torch.cuda.is_available() else "cpu")
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    print(
+        f"{'num_envs':>10} {'off [us]':>10} {'legacy [us]':>12} {'compiled [us]':>14} "
+        f"{'legacy overhead':>16} {'compiled overhead':>18}"
+    )
+    for num_envs in args.num_envs:
+        observations = torch.zeros((num_envs, NUM_OBSERVATIONS), device=args.device)
+        actions = torch.zeros((num_envs, NUM_ACTIONS), device=args.device)
+        # resets are sampled up front so that the step itself only runs the randomization
+        reset_bufs = [
+            (torch.rand(num_envs, device=args.device) < RESET_PROBABILITY).long() for _ in range(args.iterations)
+        ]
+        step_idx = [0]
+
+        def make_step(observations_noise, actions_noise):
+            def step():
+                reset_buf = reset_bufs[step_idx[0] % len(reset_bufs)]
+                step_idx[0] += 1
+                actions.uniform_(-1.0, 1.0)
+                observations.uniform_(-1.0, 1.0)
+                if actions_noise is not None:
+                    actions_noise.apply(actions, reset_buf)
+                if observations_noise is not None:
+                    observations_noise.apply(observations, reset_buf)
+
+            return step
+
+        off_us = time_steps(make_step(None, None), args.iterations, args.device)
+        legacy_us = time_steps(
+            make_step(
+                LegacyBufferNoise(DR_PARAMS, num_envs, NUM_OBSERVATIONS, args.device),
+                LegacyBufferNoise(DR_PARAMS, num_envs, NUM_ACTIONS, args.device),
+            ),
+            args.iterations,
+            args.device,
+        )
+        compiled_us = time_steps(
+            make_step(
+                BufferNoise(DR_PARAMS, num_envs, NUM_OBSERVATIONS, args.device, seed=0),
+                BufferNoise(DR_PARAMS, num_envs, NUM_ACTIONS, args.device, seed=2),
+            ),
+            args.iterations,
+            args.device,
+        )
+        print(
+            f"{num_envs:>10} {off_us:>10.1f} {legacy_us:>12.1f} {compiled_us:>14.1f} "
+            f"{legacy_us - off_us:>16.1f} {compiled_us - off_us:>18.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
+    simulation_app.close()
@@ -0,0 +1,206 @@
+"""CPU microbenchmark and equivalence check of the Factory operational space controller.
+
+Compares the task-space mass matrix computed with torch.inverse(J @ torch.inverse(M) @ J^T),
+as compute_dof_torque did before, with the Cholesky factorization of get_task_mass_matrix_factor,
+using the controller gains of the nut-bolt pick, place and screw tasks. Both are checked against
+a float64 reference on well conditioned inputs, and near a kinematic singularity to show the
+effect of task_mass_matrix_damping. The cached timing reuses one factorization for all the
+controller calls of a control step, as FactoryBase does until the next tensor refresh.
+
+Usage: python scripts/benchmarks/factory_osc.py [--num_envs 128 1024 4096] [--damping 1e-4]
+"""
+
+import argparse
+import os
+import time
+
+from omni.isaac.kit import SimulationApp
+
+simulation_app = SimulationApp({"headless": True})
+
+import torch
+import yaml
+from omniisaacgymenvs.tasks.factory import factory_control as fc
+
+TASKS = ["FactoryTaskNutBoltPick", "FactoryTaskNutBoltPlace", "FactoryTaskNutBoltScrew"]
+CFG_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "cfg", "task")
+
+
+def make_cfg_ctrl(task_name, num_envs, damping=None):
+    """Controller configuration of FactoryBase.parse_controller_spec for operational_space_motion."""
+    with open(os.path.join(CFG_DIR, f"{task_name}.yaml")) as f:
+        cfg = yaml.safe_load(f)
+    ctrl = cfg["ctrl"]
+    osc = ctrl["operational_space_motion"]
+    return {
+        "num_envs": num_envs,
+        "jacobian_type": ctrl["all"]["jacobian_type"],
+        "gripper_prop_gains": torch.tensor(ctrl["all"]["gripper_prop_gains"]).repeat((num_envs, 1)),
+        "gripper_deriv_gains": torch.tensor(ctrl["all"]["gripper_deriv_gains"]).repeat((num_envs, 1)),
+        "motor_ctrl_mode": "manual",
+        "gain_space": "task",
+        "do_motion_ctrl": True,
+        "task_prop_gains": torch.tensor(osc["task_prop_gains"]).repeat((num_envs, 1)),
+        "task_deriv_gains": torch.tensor(osc["task_deriv_gains"]).repeat((num_envs, 1)),
+        "do_inertial_comp": True,
+        "motion_ctrl_axes": torch.tensor(osc["motion_ctrl_axes"]).repeat((num_envs, 1)),
+        "do_force_ctrl": False,
+        "task_mass_matrix_damping": ctrl["all"].get("task_mass_matrix_damping", 0.0) if damping is None else damping,
+    }
+
+
+def make_inputs(num_envs, singular=False, dtype=torch.float32):
+    """Random Franka-like Jacobians, mass matrices and controller targets."""
+    # mass matrices with a spread of eigenvalues similar to the Franka arm
+    a = torch.randn((num_envs, 7, 7), dtype=torch.float64)
+    diag = torch.logspace(0, -2, 7, dtype=torch.float64)
+    arm_mass_matrix = a @ a.transpose(1, 2) * 0.05 + torch.diag(diag)
+    # Jacobians with singular values in [0.2, 1], or one of them close to 0 near a singularity
+    u, _ = torch.linalg.qr(torch.randn((num_envs, 6, 6), dtype=torch.float64))
+    v, _ = torch.linalg.qr(torch.randn((num_envs, 7, 7), dtype=torch.float64))
+    singular_values = torch.rand((num_envs, 6), dtype=torch.float64) * 0.8 + 0.2
+    if singular:
+        singular_values[:, 5] = 1e-6
+    jacobian = u @ torch.diag_embed(singular_values) @ v[:, :6]
+
+    def rand_quat():
+        return torch.nn.functional.normalize(torch.randn((num_envs, 4), dtype=torch.float64), dim=1)
+
+    inputs = {
+        "dof_pos": torch.rand((num_envs, 9), dtype=torch.float64),
+        "dof_vel": torch.randn((num_envs, 9), dtype=torch.float64) * 0.1,
+        "fingertip_midpoint_pos": torch.rand((num_envs, 3), dtype=torch.float64),
+        "fingertip_midpoint_quat": rand_quat(),
+        "fingertip_midpoint_linvel": torch.randn((num_envs, 3), dtype=torch.float64) * 0.1,
+        "fingertip_midpoint_angvel": torch.randn((num_envs, 3), dtype=torch.float64) * 0.1,
+        "left_finger_force": torch.zeros((num_envs, 3), dtype=torch.float64),
+        "right_finger_force": torch.zeros((num_envs, 3), dtype=torch.float64),
+        "jacobian": jacobian,
+        "arm_mass_matrix": arm_mass_matrix,
+        "ctrl_target_gripper_dof_pos": torch.zeros((num_envs, 2), dtype=torch.float64),
+        "ctrl_target_fingertip_midpoint_pos": torch.rand((num_envs, 3), dtype=torch.float64) * 0.02,
+        "ctrl_target_fingertip_midpoint_quat": rand_quat(),
+        "ctrl_target_fingertip_contact_wrench": torch.zeros((num_envs, 6), dtype=torch.float64),
+    }
+    return {name: value.to(dtype) for name, value in inputs.items()}
+
+
+def make_inputs_like(inputs, dtype):
+    return {name: value.to(dtype) for name, value in inputs.items()}
+
+
+def legacy_task_mass_matrix(jacobian, arm_mass_matrix):
+    jacobian_T = torch.transpose(jacobian, dim0=1, dim1=2)
+    return torch.inverse(jacobian @ torch.inverse(arm_mass_matrix) @ jacobian_T)
+
+
+def motion_wrench(cfg_ctrl, inputs):
+    pos_error, axis_angle_error = fc.get_pose_error(
+        fingertip_midpoint_pos=inputs["fingertip_midpoint_pos"],
+        fingertip_midpoint_quat=inputs["fingertip_midpoint_quat"],
+        ctrl_target_fingertip_midpoint_pos=inputs["ctrl_target_fingertip_midpoint_pos"],
+        ctrl_target_fingertip_midpoint_quat=inputs["ctrl_target_fingertip_midpoint_quat"],
+        jacobian_type=cfg_ctrl["jacobian_type"],
+        rot_error_type="axis_angle",
+    )
+    return fc._apply_task_space_gains(
+        delta_fingertip_pose=torch.cat((pos_error, axis_angle_error), dim=1),
+        fingertip_midpoint_linvel=inputs["fingertip_midpoint_linvel"],
+        fingertip_midpoint_angvel=inputs["fingertip_midpoint_angvel"],
+        task_prop_gains=cfg_ctrl["task_prop_gains"].to(inputs["jacobian"].dtype),
+        task_deriv_gains=cfg_ctrl["task_deriv_gains"].to(inputs["jacobian"].dtype),
+    )
+
+
+def legacy_dof_torque(cfg_ctrl, inputs):
+    """Arm torques of compute_dof_torque with the previous task-space mass matrix."""
+    task_wrench = motion_wrench(cfg_ctrl, inputs)
+    task_mass_matrix = legacy_task_mass_matrix(inputs["jacobian"], inputs["arm_mass_matrix"])
+    task_wrench = cfg_ctrl["motion_ctrl_axes"] * (task_mass_matrix @ task_wrench.unsqueeze(-1)).squeeze(-1)
+    arm_torque = (inputs["jacobian"].transpose(1, 2) @ task_wrench.unsqueeze(-1)).squeeze(-1)
+    return torch.clamp(arm_torque, min=-100.0, max=100.0)
+
+
+def dof_torque(cfg_ctrl, inputs, task_mass_matrix_factor=None):
+    return fc.compute_dof_torque(
+        cfg_ctrl=cfg_ctrl, device="cpu", task_mass_matrix_factor=task_mass_matrix_factor, **inputs
+    )[:, 0:7]
+
+
+def max_rel_error(value, reference):
+    return ((value.double() - reference).norm(dim=1) / reference.norm(dim=1).clamp(min=1e-12)).max().item()
+
+
+def time_fn(fn, iterations):
+    for _ in range(5):
+        fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Factory operational space controller on CPU.")
+    parser.add_argument("--num_envs", type=int, nargs="+", default=[128, 1024, 4096])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--control_frequency_inv", type=int, default=2)
+    parser.add_argument("--damping", type=float, default=1e-4, help="damping of the near-singular check")
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    for task_name in TASKS:
+        print(f"{task_name}")
+
+        # equivalence against a float64 reference
+        cfg_ctrl = make_cfg_ctrl(task_name, 1024)
+        inputs = make_inputs(1024)
+        reference = legacy_dof_torque(make_cfg_ctrl(task_name, 1024), make_inputs_like(inputs, torch.float64))
+        legacy_error = max_rel_error(legacy_dof_torque(cfg_ctrl, inputs), reference)
+        cholesky_error = max_rel_error(dof_torque(cfg_ctrl, inputs), reference)
+        assert cholesky_error < 1e-3, f"torques differ from the reference by {cholesky_error:.2e}"
+        print(f"  max relative torque error vs float64: inverse {legacy_error:.2e}, cholesky {cholesky_error:.2e}")
+
+        # near a singularity Lambda blows up without damping
+        singular_inputs = make_inputs(1024, singular=True)
+        jacobian, arm_mass_matrix = singular_inputs["jacobian"], singular_inputs["arm_mass_matrix"]
+        legacy_norm = torch.linalg.matrix_norm(legacy_task_mass_matrix(jacobian, arm_mass_matrix), ord=2)
+        factor = fc.get_task_mass_matrix_factor(jacobian, arm_mass_matrix, damping=args.damping)
+        damped_norm = torch.linalg.matrix_norm(torch.cholesky_inverse(factor), ord=2)
+        assert torch.isfinite(damped_norm).all(), "damped task-space mass matrix is not finite"
+        print(
+            f"  near-singular median |Lambda|: inverse {legacy_norm.median().item():.3e}, "
+            f"cholesky with damping {args.damping:g} {damped_norm.median().item():.3e}"
+        )
+
+        # inertial compensation of all the controller calls of a control step
+        print(f"  {'num_envs':>10} {'inverse [us]':>13} {'cholesky [us]':>14} {'cached [us]':>12} {'speedup':>8}")
+        for num_envs in args.num_envs:
+            inputs = make_inputs(num_envs)
+            jacobian, arm_mass_matrix = inputs["jacobian"], inputs["arm_mass_matrix"]
+            task_wrench = motion_wrench(make_cfg_ctrl(task_name, num_envs), inputs).unsqueeze(-1)
+
+            def inverse():
+                for _ in range(args.control_frequency_inv):
+                    legacy_task_mass_matrix(jacobian, arm_mass_matrix) @ task_wrench
+
+            def cholesky():
+                for _ in range(args.control_frequency_inv):
+                    torch.cholesky_solve(task_wrench, fc.get_task_mass_matrix_factor(jacobian, arm_mass_matrix))
+
+            def cached():
+                factor = fc.get_task_mass_matrix_factor(jacobian, arm_mass_matrix)
+                for _ in range(args.control_frequency_inv):
+                    torch.cholesky_solve(task_wrench, factor)
+
+            inverse_us = time_fn(inverse, args.iterations)
+            cholesky_us = time_fn(cholesky, args.iterations)
+            cached_us = time_fn(cached, args.iterations)
+            print(
+                f"  {num_envs:>10} {inverse_us:>13.1f} {cholesky_us:>14.1f} {cached_us:>12.1f} "
+                f"{inverse_us / cached_us:>7.2f}x"
+            )
+
+if __name__ == "__main__":
+    main()
+    simulation_app.close()
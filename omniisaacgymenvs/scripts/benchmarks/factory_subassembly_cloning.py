@@ -0,0 +1,235 @@
+"""Startup cost of the Factory nut and bolt import with per-env references against grouped cloning.
+
+Runs FactoryEnvNutBolt._import_env_assets on a new stage with num_envs empty envs, local
+stand-in assets and a sim config that counts apply_articulation_settings calls, and
+compares it with the previous implementation, which drew a subassembly per env, appended
+its geometry to per-env lists and referenced the nut and bolt assets in every env. The
+grouped path authors every subassembly once and clones it to its group of envs, so a
+mixed-subassembly run should cost about as much as a single-subassembly run. Both paths
+draw the same subassemblies, so the geometry tensors and the composed nut and bolt prims
+of the first and last env of every group are checked for equality first. The size of the
+exported root layer stands in for the memory used by the scene description.
+
+Usage: python scripts/benchmarks/factory_subassembly_cloning.py [--num_envs 128 1024 4096]
+"""
+
+import argparse
+import os
+import time
+
+from omni.isaac.kit import SimulationApp
+
+simulation_app = SimulationApp({"headless": True})
+
+import numpy as np
+import omegaconf
+import torch
+import yaml
+from omni.isaac.core.utils.stage import create_new_stage, get_current_stage
+from omniisaacgymenvs.tasks.factory import factory_env_nut_bolt
+from omniisaacgymenvs.tasks.factory.factory_env_nut_bolt import FactoryEnvNutBolt
+from omniisaacgymenvs.tasks.utils.usd_utils import (
+    add_references,
+    bind_physics_material,
+    set_instanceable,
+)
+from pxr import Sdf, Usd, UsdGeom, UsdShade
+
+ASSET_INFO_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "..", "tasks", "factory", "yaml", "factory_asset_info_nut_bolt.yaml"
+)
+MATERIAL_PATH = "/World/Physics_Materials/NutBoltMaterial"
+GEOMETRY = ["nut_heights", "nut_widths_max", "bolt_widths", "bolt_head_heights", "bolt_shank_lengths", "thread_pitches"]
+SUBASSEMBLIES = {
+    "single": ["nut_bolt_m16"],
+    "mixed": ["nut_bolt_m4", "nut_bolt_m8", "nut_bolt_m12", "nut_bolt_m16"],
+}
+
+
+class StandInSimConfig:
+    """Counts the articulation settings applied by the import."""
+
+    def __init__(self):
+        self.num_applied = 0
+
+    def parse_actor_config(self, actor_name):
+        return {}
+
+    def apply_articulation_settings(self, name, prim, cfg):
+        assert prim.IsValid(), f"{prim.GetPath()} is not on stage"
+        self.num_applied += 1
+
+
+def make_asset_info():
+    """factory_asset_info_nut_bolt.yaml with the nut and bolt assets replaced by anonymous layers."""
+    with open(ASSET_INFO_PATH) as f:
+        asset_info = yaml.safe_load(f)
+    layers = []
+    for subassembly, components in asset_info.items():
+        for body in ("nut", "bolt"):
+            layer = Sdf.Layer.CreateAnonymous(f"{subassembly}_{body}.usda")
+            stage = Usd.Stage.Open(layer)
+            root = UsdGeom.Xform.Define(stage, f"/{body}")
+            stage.SetDefaultPrim(root.GetPrim())
+            collisions = UsdGeom.Xform.Define(stage, f"/{body}/factory_{body}/collisions").GetPrim()
+            UsdGeom.Mesh.Define(stage, f"/{body}/factory_{body}/collisions/mesh_0")
+            collisions.SetInstanceable(True)
+            components[body]["usd_path"] = layer.identifier
+            layers.append(layer)
+    return omegaconf.OmegaConf.create(asset_info), layers
+
+
+def make_task(num_envs, desired_subassemblies, asset_info):
+    """FactoryEnvNutBolt with the attributes read by _import_env_assets, on a new stage of empty envs."""
+    create_new_stage()
+    stage = get_current_stage()
+    UsdShade.Material.Define(stage, MATERIAL_PATH)
+    with Sdf.ChangeBlock():
+        for i in range(num_envs):
+            env = Sdf.CreatePrimInLayer(stage.GetRootLayer(), f"/World/envs/env_{i}")
+            env.specifier = Sdf.SpecifierDef
+            env.typeName = "Xform"
+
+    task = object.__new__(FactoryEnvNutBolt)
+    task._num_envs = num_envs
+    task._device = "cpu"
+    task._stage = stage
+    task._sim_config = StandInSimConfig()
+    task.nutboltPhysicsMaterialPath = MATERIAL_PATH
+    task.asset_info_nut_bolt = asset_info
+    task.cfg_env = omegaconf.OmegaConf.create(
+        {"env": {"desired_subassemblies": desired_subassemblies, "nut_lateral_offset": 0.1}}
+    )
+    task.cfg_base = omegaconf.OmegaConf.create({"env": {"table_height": 0.4}})
+    return task
+
+
+def legacy_import_env_assets(task):
+    """_import_env_assets as it was before grouped cloning."""
+    task.nut_heights = []
+    task.nut_widths_max = []
+    task.bolt_widths = []
+    task.bolt_head_heights = []
+    task.bolt_shank_lengths = []
+    task.thread_pitches = []
+    task.subassembly_ids = []
+
+    nut_translation = [0.0, task.cfg_env.env.nut_lateral_offset, task.cfg_base.env.table_height]
+    bolt_translation = [0.0, 0.0, task.cfg_base.env.table_height]
+    nut_paths, bolt_paths = {}, {}
+    collision_paths, mesh_paths = [], []
+
+    for i in range(0, task._num_envs):
+        j = np.random.randint(0, len(task.cfg_env.env.desired_subassemblies))
+        subassembly = task.cfg_env.env.desired_subassemblies[j]
+        task.subassembly_ids.append(j)
+        components = list(task.asset_info_nut_bolt[subassembly])
+        info = task.asset_info_nut_bolt[subassembly]
+
+        task.nut_heights.append(info[components[0]]["height"])
+        task.nut_widths_max.append(info[components[0]]["width_max"])
+        task.bolt_widths.append(info[components[1]]["width"])
+        task.bolt_head_heights.append(info[components[1]]["head_height"])
+        task.bolt_shank_lengths.append(info[components[1]]["shank_length"])
+        task.thread_pitches.append(info["thread_pitch"])
+
+        nut_paths.setdefault(info[components[0]]["usd_path"], []).append(f"/World/envs/env_{i}/nut")
+        bolt_paths.setdefault(info[components[1]]["usd_path"], []).append(f"/World/envs/env_{i}/bolt")
+        for body, component in zip(("nut", "bolt"), components[:2]):
+            collisions = f"/World/envs/env_{i}/{body}/factory_{component}/collisions"
+            collision_paths.append(collisions)
+            mesh_paths.append(collisions + "/mesh_0")
+
+    for nut_file, paths in nut_paths.items():
+        add_references(task._stage, paths, nut_file, translations=[nut_translation] * len(paths))
+    for bolt_file, paths in bolt_paths.items():
+        add_references(task._stage, paths, bolt_file, translations=[bolt_translation] * len(paths))
+    set_instanceable(task._stage, collision_paths, False)
+    bind_physics_material(task._stage, mesh_paths, task.nutboltPhysicsMaterialPath)
+    for i in range(0, task._num_envs):
+        for body in ("nut", "bolt"):
+            prim = task._stage.GetPrimAtPath(f"/World/envs/env_{i}/{body}")
+            task._sim_config.apply_articulation_settings(body, prim, {})
+
+    for name in GEOMETRY:
+        setattr(task, name, torch.tensor(getattr(task, name), device=task._device).unsqueeze(-1))
+    task.subassembly_ids = torch.tensor(task.subassembly_ids, device=task._device)
+
+
+def describe(stage, path):
+    prim = stage.GetPrimAtPath(path)
+    return (
+        prim.IsValid(),
+        prim.GetTypeName(),
+        sorted(prim.GetAppliedSchemas()),
+        prim.IsInstanceable(),
+        {attr.GetName(): attr.Get() for attr in prim.GetAttributes() if attr.HasAuthoredValue()},
+        {rel.GetName(): rel.GetTargets() for rel in prim.GetRelationships()},
+    )
+
+
+def checked_paths(subassembly_ids):
+    paths = []
+    for j in torch.unique(subassembly_ids).tolist():
+        env_ids = torch.nonzero(subassembly_ids == j).squeeze(-1).tolist()
+        for i in (env_ids[0], env_ids[-1]):
+            for body in ("nut", "bolt"):
+                collisions = f"/World/envs/env_{i}/{body}/factory_{body}/collisions"
+                paths += [f"/World/envs/env_{i}/{body}", collisions, collisions + "/mesh_0"]
+    return paths
+
+
+def run(num_envs, desired_subassemblies, asset_info, legacy, seed):
+    task = make_task(num_envs, desired_subassemblies, asset_info)
+    np.random.seed(seed)
+    start = time.perf_counter()
+    if legacy:
+        legacy_import_env_assets(task)
+    else:
+        task._import_env_assets(add_to_stage=True)
+    elapsed = time.perf_counter() - start
+
+    paths = checked_paths(task.subassembly_ids)
+    return {
+        "seconds": elapsed,
+        "layer_kb": len(task._stage.GetRootLayer().ExportToString()) / 1024,
+        "num_applied": task._sim_config.num_applied,
+        "geometry": {name: getattr(task, name) for name in GEOMETRY + ["subassembly_ids"]},
+        "prims": {path: describe(task._stage, path) for path in paths},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Factory nut and bolt import.")
+    parser.add_argument("--num_envs", type=int, nargs="+", default=[128, 1024, 4096])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # the benchmark assets are local layers, not Nucleus paths
+    factory_env_nut_bolt.get_assets_root_path = lambda: ""
+    asset_info, layers = make_asset_info()
+
+    print(
+        f"{'subassemblies':>13} {'num_envs':>9} {'per-env [s]':>12} {'grouped [s]':>12} {'speedup':>8} "
+        f"{'per-env [KiB]':>14} {'grouped [KiB]':>14} {'settings calls':>15}"
+    )
+    for num_envs in args.num_envs:
+        for name, desired_subassemblies in SUBASSEMBLIES.items():
+            legacy = run(num_envs, desired_subassemblies, asset_info, legacy=True, seed=args.seed)
+            grouped = run(num_envs, desired_subassemblies, asset_info, legacy=False, seed=args.seed)
+
+            for field, expected in legacy["geometry"].items():
+                assert torch.equal(grouped["geometry"][field], expected), f"{field} differs"
+            for path, expected in legacy["prims"].items():
+                assert grouped["prims"][path] == expected, f"{path} differs:\n{expected}\n{grouped['prims'][path]}"
+
+            print(
+                f"{name:>13} {num_envs:>9} {legacy['seconds']:>12.3f} {grouped['seconds']:>12.3f} "
+                f"{legacy['seconds'] / grouped['seconds']:>7.1f}x {legacy['layer_kb']:>14.0f} "
+                f"{grouped['layer_kb']:>14.0f} {legacy['num_applied']:>7} -> {grouped['num_applied']:<5}"
+            )
+
+
+if __name__ == "__main__":
+    main()
+    simulation_app.close()
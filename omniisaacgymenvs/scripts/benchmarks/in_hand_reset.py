@@ -0,0 +1,230 @@
+"""Reset cost of InHandManipulationTask as a function of the number of resetting envs.
+
+Runs reset_idx of the ShadowHand / AllegroHand base task on views that only record the
+tensors they are given, and compares it with the previous implementation, which allocated
+full (num_envs, num_hand_dofs) dof tensors and cloned the goal buffers on every reset.
+Both paths draw the same random numbers, so the recorded tensors are checked for equality
+first. The new path should scale with the number of resetting envs, not with num_envs.
+
+Usage: python scripts/benchmarks/in_hand_reset.py [--num_envs 16384] [--num_resets 1 64 1024 16384]
+"""
+
+import argparse
+import time
+
+from omni.isaac.kit import SimulationApp
+
+simulation_app = SimulationApp({"headless": True})
+
+import torch
+from omni.isaac.core.utils.torch import torch_rand_float
+from omniisaacgymenvs.tasks.shared.in_hand_manipulation import InHandManipulationTask, randomize_rotation
+
+NUM_HAND_DOFS = {"ShadowHand": 24, "AllegroHand": 16}
+
+
+class RecordingView:
+    """Stands in for the hand and rigid prim views, keeps the last tensors it was given when recording."""
+
+    def __init__(self, record):
+        self.record = record
+        self.calls = {}
+
+    def _record(self, name, *tensors):
+        if self.record:
+            self.calls[name] = [tensor.clone() for tensor in tensors]
+
+    def set_world_poses(self, positions, orientations, indices):
+        self._record("set_world_poses", positions, orientations, indices)
+
+    def set_velocities(self, velocities, indices):
+        self._record("set_velocities", velocities, indices)
+
+    def set_joint_position_targets(self, positions, indices):
+        self._record("set_joint_position_targets", positions, indices)
+
+    def set_joint_positions(self, positions, indices):
+        self._record("set_joint_positions", positions, indices)
+
+    def set_joint_velocities(self, velocities, indices):
+        self._record("set_joint_velocities", velocities, indices)
+
+
+class StandInHandTask(InHandManipulationTask):
+    """InHandManipulationTask with the buffers of post_reset and no stage."""
+
+    def get_hand(self):
+        pass
+
+    def get_hand_view(self, scene):
+        pass
+
+    def get_observations(self):
+        pass
+
+
+def make_task(num_envs, num_hand_dofs, device, record=False):
+    task = object.__new__(StandInHandTask)
+    task._num_envs = num_envs
+    task._device = device
+    task.num_hand_dofs = num_hand_dofs
+    task.reset_position_noise = 0.01
+    task.reset_dof_pos_noise = 0.2
+    task.reset_dof_vel_noise = 0.1
+
+    task.x_unit_tensor = torch.tensor([1, 0, 0], dtype=torch.float, device=device).repeat((num_envs, 1))
+    task.y_unit_tensor = torch.tensor([0, 1, 0], dtype=torch.float, device=device).repeat((num_envs, 1))
+    task._env_pos = torch.rand((num_envs, 3), device=device) * 10.0
+    task.goal_displacement_tensor = torch.tensor([-0.2, -0.06, 0.12], device=device)
+
+    task.hand_dof_lower_limits = -torch.rand(num_hand_dofs, device=device)
+    task.hand_dof_upper_limits = torch.rand(num_hand_dofs, device=device)
+    task.hand_dof_default_pos = torch.zeros(num_hand_dofs, dtype=torch.float, device=device)
+    task.hand_dof_default_vel = torch.zeros(num_hand_dofs, dtype=torch.float, device=device)
+    task.hand_dof_targets = torch.zeros((num_envs, num_hand_dofs), dtype=torch.float, device=device)
+    task.prev_targets = torch.zeros((num_envs, num_hand_dofs), dtype=torch.float, device=device)
+    task.cur_targets = torch.zeros((num_envs, num_hand_dofs), dtype=torch.float, device=device)
+
+    task.object_init_pos = torch.rand((num_envs, 3), device=device)
+    task.object_init_rot = torch.nn.functional.normalize(torch.rand((num_envs, 4), device=device), dim=1)
+    task.object_init_velocities = torch.zeros((num_envs, 6), dtype=torch.float, device=device)
+    task.goal_pos = task.object_init_pos.clone()
+    task.goal_pos[:, 2] -= 0.04
+    task.goal_rot = task.object_init_rot.clone()
+    task.goal_init_pos = task.goal_pos.clone()
+    task.goal_init_rot = task.goal_rot.clone()
+
+    task.progress_buf = torch.zeros(num_envs, dtype=torch.long, device=device)
+    task.reset_buf = torch.ones(num_envs, dtype=torch.long, device=device)
+    task.reset_goal_buf = torch.ones(num_envs, dtype=torch.long, device=device)
+    task.successes = torch.zeros(num_envs, dtype=torch.float, device=device)
+
+    task._hands = RecordingView(record)
+    task._objects = RecordingView(record)
+    task._goals = RecordingView(record)
+    task.allocate_reset_buffers()
+    return task
+
+
+def legacy_reset_target_pose(task, env_ids):
+    """reset_target_pose as it was before the reset scratch buffers."""
+    indices = env_ids.to(dtype=torch.int32)
+    rand_floats = torch_rand_float(-1.0, 1.0, (len(env_ids), 4), device=task.device)
+
+    new_rot = randomize_rotation(
+        rand_floats[:, 0], rand_floats[:, 1], task.x_unit_tensor[env_ids], task.y_unit_tensor[env_ids]
+    )
+
+    task.goal_pos[env_ids] = task.goal_init_pos[env_ids, 0:3]
+    task.goal_rot[env_ids] = new_rot
+
+    goal_pos, goal_rot = task.goal_pos.clone(), task.goal_rot.clone()
+    goal_pos[env_ids] = task.goal_pos[env_ids] + task.goal_displacement_tensor + task._env_pos[env_ids]
+
+    task._goals.set_world_poses(goal_pos[env_ids], goal_rot[env_ids], indices)
+    task.reset_goal_buf[env_ids] = 0
+
+
+def legacy_reset_idx(task, env_ids):
+    """reset_idx as it was before the reset scratch buffers."""
+    indices = env_ids.to(dtype=torch.int32)
+    rand_floats = torch_rand_float(-1.0, 1.0, (len(env_ids), task.num_hand_dofs * 2 + 5), device=task.device)
+
+    legacy_reset_target_pose(task, env_ids)
+
+    new_object_pos = (
+        task.object_init_pos[env_ids] + task.reset_position_noise * rand_floats[:, 0:3] + task._env_pos[env_ids]
+    )
+    new_object_rot = randomize_rotation(
+        rand_floats[:, 3], rand_floats[:, 4], task.x_unit_tensor[env_ids], task.y_unit_tensor[env_ids]
+    )
+
+    object_velocities = torch.zeros_like(task.object_init_velocities, dtype=torch.float, device=task.device)
+    task._objects.set_velocities(object_velocities[env_ids], indices)
+    task._objects.set_world_poses(new_object_pos, new_object_rot, indices)
+
+    delta_max = task.hand_dof_upper_limits - task.hand_dof_default_pos
+    delta_min = task.hand_dof_lower_limits - task.hand_dof_default_pos
+    rand_delta = delta_min + (delta_max - delta_min) * 0.5 * (rand_floats[:, 5 : 5 + task.num_hand_dofs] + 1.0)
+
+    pos = task.hand_dof_default_pos + task.reset_dof_pos_noise * rand_delta
+    dof_pos = torch.zeros((task.num_envs, task.num_hand_dofs), device=task.device)
+    dof_pos[env_ids, :] = pos
+
+    dof_vel = torch.zeros((task.num_envs, task.num_hand_dofs), device=task.device)
+    dof_vel[env_ids, :] = (
+        task.hand_dof_default_vel
+        + task.reset_dof_vel_noise * rand_floats[:, 5 + task.num_hand_dofs : 5 + task.num_hand_dofs * 2]
+    )
+
+    task.prev_targets[env_ids, : task.num_hand_dofs] = pos
+    task.cur_targets[env_ids, : task.num_hand_dofs] = pos
+    task.hand_dof_targets[env_ids, :] = pos
+
+    task._hands.set_joint_position_targets(task.hand_dof_targets[env_ids], indices)
+    task._hands.set_joint_positions(dof_pos[env_ids], indices)
+    task._hands.set_joint_velocities(dof_vel[env_ids], indices)
+
+    task.progress_buf[env_ids] = 0
+    task.reset_buf[env_ids] = 0
+    task.successes[env_ids] = 0
+
+
+def check_parity(num_envs, num_hand_dofs, device):
+    env_ids = torch.randperm(num_envs, device=device)[: num_envs // 3]
+    legacy = make_task(num_envs, num_hand_dofs, device, record=True)
+    task = make_task(num_envs, num_hand_dofs, device, record=True)
+    task.__dict__.update({name: value.clone() for name, value in legacy.__dict__.items() if torch.is_tensor(value)})
+    task.allocate_reset_buffers()
+
+    torch.manual_seed(0)
+    legacy_reset_idx(legacy, env_ids)
+    torch.manual_seed(0)
+    task.reset_idx(env_ids)
+
+    for view in ("_hands", "_objects", "_goals"):
+        for call, tensors in getattr(legacy, view).calls.items():
+            for expected, value in zip(tensors, getattr(task, view).calls[call]):
+                assert torch.allclose(value, expected, atol=1e-6), f"{view}.{call} differs"
+    for name in ("goal_pos", "goal_rot", "prev_targets", "cur_targets", "hand_dof_targets", "reset_buf"):
+        assert torch.allclose(getattr(task, name), getattr(legacy, name), atol=1e-6), f"{name} differs"
+
+
+def time_fn(fn, iterations, device):
+    for _ in range(5):
+        fn()
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the InHandManipulationTask reset path.")
+    parser.add_argument("--num_envs", type=int, default=16384)
+    parser.add_argument("--num_resets", type=int, nargs="+", default=[1, 64, 1024, 16384])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--device", type=str, default="cuda:0" if torch.cuda.is_available() else "cpu")
+    args = parser.parse_args()
+
+    for hand, num_hand_dofs in NUM_HAND_DOFS.items():
+        check_parity(args.num_envs, num_hand_dofs, args.device)
+        print(f"{hand} ({num_hand_dofs} dofs, {args.num_envs} envs): reset tensors match the previous implementation")
+
+        legacy = make_task(args.num_envs, num_hand_dofs, args.device)
+        task = make_task(args.num_envs, num_hand_dofs, args.device)
+        print(f"  {'num_resets':>10} {'previous [us]':>14} {'subset [us]':>12} {'speedup':>8}")
+        for num_resets in args.num_resets:
+            env_ids = torch.randperm(args.num_envs, device=args.device)[: min(num_resets, args.num_envs)]
+            legacy_us = time_fn(lambda: legacy_reset_idx(legacy, env_ids), args.iterations, args.device)
+            subset_us = time_fn(lambda: task.reset_idx(env_ids), args.iterations, args.device)
+            print(f"  {num_resets:>10} {legacy_us:>14.1f} {subset_us:>12.1f} {legacy_us / subset_us:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
+    simulation_app.close()
@@ -0,0 +1,250 @@
+"""Parity checks and CPU timing of the batched actuator models of robots/actuators.
+
+Checks JointActuators against the code it replaced or mirrors:
+  - IdealPD on all joints against the PD law hand-coded in AnymalTerrainTask.pre_physics_step,
+    bitwise over the substeps of several policy steps;
+  - DCMotor with an infinite velocity limit against IdealPD, and its efforts against the
+    torque-speed bounds otherwise;
+  - delayed groups against targets shifted by hand, with resets starting from the first
+    targets after the reset;
+  - ActuatorNet against an actuator net with an explicitly shifted history, as in legged_gym;
+  - groups of non-consecutive joints against the same models on consecutive joints.
+Then times one physics step of every setup, with the 12 joints and dof names of Anymal, as
+the cost per joint and relative to the hand-coded PD law. No simulation app is needed.
+
+Usage: python scripts/benchmarks/joint_actuators.py [--num_envs 4096 16384] [--iterations 200]
+"""
+
+import argparse
+import time
+
+import torch
+from omniisaacgymenvs.robots.actuators.joint_actuators import JointActuators
+
+DOF_NAMES = [
+    "LF_HAA", "LH_HAA", "RF_HAA", "RH_HAA",
+    "LF_HFE", "LH_HFE", "RF_HFE", "RH_HFE",
+    "LF_KFE", "LH_KFE", "RF_KFE", "RH_KFE",
+]  # fmt: skip
+NUM_DOF = len(DOF_NAMES)
+KP = 80.0
+KD = 2.0
+ACTION_SCALE = 0.5
+DECIMATION = 4
+INPUT_INDICES = [0, 2, 4]
+
+
+def make_network(device):
+    torch.manual_seed(0)
+    network = torch.nn.Sequential(
+        torch.nn.Linear(2 * len(INPUT_INDICES), 32),
+        torch.nn.Softsign(),
+        torch.nn.Linear(32, 32),
+        torch.nn.Softsign(),
+        torch.nn.Linear(32, 1),
+    )
+    return network.to(device)
+
+
+def make_cfgs(network):
+    pd = {"model": "IdealPD", "stiffness": KP, "damping": KD, "effortLimit": 80.0}
+    dc_motor = {"model": "DCMotor", "stiffness": KP, "damping": KD, "effortLimit": 80.0, "velocityLimit": 7.5}
+    actuator_net = {
+        "model": "ActuatorNet",
+        "network": network,
+        "inputIndices": INPUT_INDICES,
+        "positionScale": 2.0,
+        "velocityScale": 0.05,
+        "effortScale": 20.0,
+        "effortLimit": 80.0,
+    }
+    return {
+        "IdealPD": {"legs": {"joints": [".*"], **pd}},
+        "DCMotor": {"legs": {"joints": [".*"], **dc_motor}},
+        "IdealPD, delay 2": {"legs": {"joints": [".*"], "delay": 2, **pd}},
+        "ActuatorNet": {"legs": {"joints": [".*"], **actuator_net}},
+        "mixed": {
+            "hips": {"joints": [".*_HAA"], **dc_motor},
+            "thighs": {"joints": [".*_HFE"], "delay": 1, **pd},
+            "knees": {"joints": [".*_KFE"], **actuator_net},
+        },
+        "sides": {
+            "left": {"joints": ["L.*"], **dc_motor},
+            "right": {"joints": ["R.*"], "delay": 1, **pd},
+        },
+    }
+
+
+def legacy_torques(actions, default_dof_pos, dof_pos, dof_vel):
+    """Efforts of AnymalTerrainTask.pre_physics_step before the actuator models."""
+    return torch.clip(KP * (ACTION_SCALE * actions + default_dof_pos - dof_pos) - KD * dof_vel, -80.0, 80.0)
+
+
+class ReferenceActuatorNet:
+    """Actuator net with the position error and velocity histories shifted by one column per step."""
+
+    def __init__(self, network, num_envs, device):
+        self.network = network
+        self.pos_errors = torch.zeros((num_envs, NUM_DOF, max(INPUT_INDICES) + 1), device=device)
+        self.velocities = torch.zeros((num_envs, NUM_DOF, max(INPUT_INDICES) + 1), device=device)
+
+    def compute(self, targets, dof_pos, dof_vel):
+        self.pos_errors = torch.cat(((targets - dof_pos).unsqueeze(-1), self.pos_errors[..., :-1]), dim=-1)
+        self.velocities = torch.cat((dof_vel.unsqueeze(-1), self.velocities[..., :-1]), dim=-1)
+        inputs = torch.cat(
+            (self.pos_errors[..., INPUT_INDICES] * 2.0, self.velocities[..., INPUT_INDICES] * 0.05), dim=-1
+        )
+        with torch.no_grad():
+            efforts = self.network(inputs.view(-1, 2 * len(INPUT_INDICES))).view(targets.shape) * 20.0
+        return torch.clip(efforts, -80.0, 80.0)
+
+    def reset(self, env_ids):
+        self.pos_errors[env_ids] = 0.0
+        self.velocities[env_ids] = 0.0
+
+
+def random_state(num_envs, device):
+    dof_pos = torch.randn((num_envs, NUM_DOF), device=device) * 0.5
+    dof_vel = torch.randn((num_envs, NUM_DOF), device=device) * 5.0
+    return dof_pos, dof_vel
+
+
+def check_ideal_pd(cfgs, num_envs, device):
+    actuators = JointActuators(cfgs["IdealPD"], DOF_NAMES, num_envs, device)
+    default_dof_pos = torch.randn((num_envs, NUM_DOF), device=device) * 0.3
+    dof_targets = torch.zeros((num_envs, NUM_DOF), device=device)
+    for step in range(10):
+        actions = torch.randn((num_envs, NUM_DOF), device=device) * 2.0
+        torch.mul(actions, ACTION_SCALE, out=dof_targets).add_(default_dof_pos)
+        for _ in range(DECIMATION):
+            dof_pos, dof_vel = random_state(num_envs, device)
+            expected = legacy_torques(actions, default_dof_pos, dof_pos, dof_vel)
+            assert torch.equal(actuators.compute(dof_targets, dof_pos, dof_vel), expected), f"step {step} differs"
+    print("IdealPD: efforts equal to the hand-coded AnymalTerrain PD law")
+
+
+def check_dc_motor(cfgs, num_envs, device):
+    pd = JointActuators(cfgs["IdealPD"], DOF_NAMES, num_envs, device)
+    unlimited = dict(cfgs["DCMotor"]["legs"], velocityLimit=float("inf"))
+    dc_motor = JointActuators({"legs": unlimited}, DOF_NAMES, num_envs, device)
+    targets = torch.randn((num_envs, NUM_DOF), device=device)
+    dof_pos, dof_vel = random_state(num_envs, device)
+    assert torch.equal(dc_motor.compute(targets, dof_pos, dof_vel), pd.compute(targets, dof_pos, dof_vel))
+
+    dc_motor = JointActuators(cfgs["DCMotor"], DOF_NAMES, num_envs, device)
+    efforts = dc_motor.compute(targets, dof_pos, dof_vel)
+    max_effort = torch.clip(80.0 * (1.0 - dof_vel / 7.5), 0.0, 80.0)
+    min_effort = torch.clip(80.0 * (-1.0 - dof_vel / 7.5), -80.0, 0.0)
+    assert torch.all(efforts <= max_effort) and torch.all(efforts >= min_effort)
+    pd_efforts = pd.compute(targets, dof_pos, dof_vel)
+    inside = (pd_efforts < max_effort) & (pd_efforts > min_effort)
+    assert torch.equal(efforts[inside], pd_efforts[inside]), "DCMotor changes efforts inside the torque-speed bounds"
+    print("DCMotor: IdealPD without a velocity limit, efforts within the torque-speed bounds")
+
+
+def check_delay(cfgs, num_envs, device):
+    actuators = JointActuators(cfgs["IdealPD, delay 2"], DOF_NAMES, num_envs, device)
+    pd = JointActuators(cfgs["IdealPD"], DOF_NAMES, num_envs, device)
+    history = []
+    reset_ids = torch.arange(0, num_envs, 3, device=device)
+    for step in range(12):
+        if step == 6:
+            actuators.reset(reset_ids)
+        targets = torch.randn((num_envs, NUM_DOF), device=device)
+        dof_pos, dof_vel = random_state(num_envs, device)
+        history.append(targets)
+        delayed = history[max(step - 2, 0)].clone()
+        if step in (6, 7):
+            delayed[reset_ids] = history[6][reset_ids]
+        expected = pd.compute(delayed, dof_pos, dof_vel)
+        assert torch.equal(actuators.compute(targets, dof_pos, dof_vel), expected), f"step {step} differs"
+    print("delay: targets delayed by 2 steps, reset envs start from their first targets")
+
+
+def check_actuator_net(cfgs, network, num_envs, device):
+    actuators = JointActuators(cfgs["ActuatorNet"], DOF_NAMES, num_envs, device)
+    reference = ReferenceActuatorNet(network, num_envs, device)
+    reset_ids = torch.arange(1, num_envs, 4, device=device)
+    for step in range(12):
+        if step == 7:
+            actuators.reset(reset_ids)
+            reference.reset(reset_ids)
+        targets = torch.randn((num_envs, NUM_DOF), device=device)
+        dof_pos, dof_vel = random_state(num_envs, device)
+        expected = reference.compute(targets, dof_pos, dof_vel)
+        efforts = actuators.compute(targets, dof_pos, dof_vel)
+        assert torch.allclose(efforts, expected, atol=1e-5), f"step {step} differs"
+    print("ActuatorNet: efforts match an actuator net with a shifted history")
+
+
+def check_joint_groups(cfgs, num_envs, device):
+    """Groups of non-consecutive joints against the same models on a reordering with consecutive joints."""
+    order = [i for i, name in enumerate(DOF_NAMES) if name.startswith("L")]
+    order += [i for i, name in enumerate(DOF_NAMES) if name.startswith("R")]
+    sides = JointActuators(cfgs["sides"], DOF_NAMES, num_envs, device)
+    ordered = JointActuators(cfgs["sides"], [DOF_NAMES[i] for i in order], num_envs, device)
+    assert all(not isinstance(group.joint_ids, slice) for group in sides.groups)
+    assert all(isinstance(group.joint_ids, slice) for group in ordered.groups)
+    for step in range(4):
+        targets = torch.randn((num_envs, NUM_DOF), device=device)
+        dof_pos, dof_vel = random_state(num_envs, device)
+        efforts = sides.compute(targets, dof_pos, dof_vel)
+        expected = ordered.compute(targets[:, order], dof_pos[:, order], dof_vel[:, order])
+        assert torch.equal(efforts[:, order], expected), f"step {step} differs"
+    print("joint groups: gathered groups equal to the same groups on consecutive joints")
+
+
+def time_fn(fn, iterations, device):
+    for _ in range(5):
+        fn()
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and time the batched actuator models.")
+    parser.add_argument("--num_envs", type=int, nargs="+", default=[4096, 16384])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--num_threads", type=int, default=0, help="torch CPU threads, 0 keeps the default")
+    parser.add_argument("--device", type=str, default="cpu")
+    args = parser.parse_args()
+    if args.num_threads > 0:
+        torch.set_num_threads(args.num_threads)
+
+    network = make_network(args.device)
+    cfgs = make_cfgs(network)
+    check_ideal_pd(cfgs, 256, args.device)
+    check_dc_motor(cfgs, 256, args.device)
+    check_delay(cfgs, 256, args.device)
+    check_actuator_net(cfgs, network, 256, args.device)
+    check_joint_groups(cfgs, 256, args.device)
+
+    for num_envs in args.num_envs:
+        actions = torch.randn((num_envs, NUM_DOF), device=args.device)
+        default_dof_pos = torch.randn((num_envs, NUM_DOF), device=args.device) * 0.3
+        targets = ACTION_SCALE * actions + default_dof_pos
+        dof_pos, dof_vel = random_state(num_envs, args.device)
+
+        legacy_us = time_fn(
+            lambda: legacy_torques(actions, default_dof_pos, dof_pos, dof_vel), args.iterations, args.device
+        )
+        print(f"{num_envs} envs, {NUM_DOF} joints on {args.device}, one physics step")
+        print(f"  {'actuators':>18} {'[us]':>10} {'[ns/joint]':>11} {'vs hand-coded PD':>17}")
+        print(f"  {'hand-coded PD':>18} {legacy_us:>10.1f} {legacy_us * 1e3 / (num_envs * NUM_DOF):>11.2f}")
+        for name, cfg in cfgs.items():
+            actuators = JointActuators(cfg, DOF_NAMES, num_envs, args.device)
+            actuator_us = time_fn(lambda: actuators.compute(targets, dof_pos, dof_vel), args.iterations, args.device)
+            print(
+                f"  {name:>18} {actuator_us:>10.1f} {actuator_us * 1e3 / (num_envs * NUM_DOF):>11.2f} "
+                f"{actuator_us / legacy_us:>16.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
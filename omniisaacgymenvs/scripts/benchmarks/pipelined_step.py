@@ -0,0 +1,211 @@
+"""Parity check and loop timing of pipelined stepping with a CPU stand-in task.
+
+StandInEnv splits its step into _simulate and _process_step as VecEnvRLGames does, and
+drives StandInTask, a task with toy dynamics whose physics takes a fixed wall time, the
+way GPU physics keeps the host waiting. No simulation app is needed, so the pipeline can
+be tested on CPU. The parity check verifies the one-step action latency: the pipelined
+env returns the results of a sequential env that was stepped with zero actions first,
+including the extras, which the task writes in place. It also checks that physics only
+runs on the worker thread and that require_idle refuses while a step is in flight.
+The timing runs a policy with a fixed inference time on the returned observations.
+
+Usage: python scripts/benchmarks/pipelined_step.py [--num_envs 4096] [--physics_ms 4] [--policy_ms 3]
+"""
+
+import argparse
+import threading
+import time
+
+import torch
+from omniisaacgymenvs.envs.pipelined_step import PipelinedStepper
+
+NUM_OBSERVATIONS = 32
+NUM_ACTIONS = 8
+MAX_EPISODE_LENGTH = 50
+
+
+class StandInTask:
+    """Task with the interface used by VecEnvRLGames and deterministic toy dynamics."""
+
+    def __init__(self, num_envs, device="cpu", physics_ms=0.0):
+        self.num_envs = num_envs
+        self.num_actions = NUM_ACTIONS
+        self.device = device
+        self.rl_device = device
+        self.clip_obs = 5.0
+        self.clip_actions = 1.0
+        self.control_frequency_inv = 2
+        self.dt = 1.0 / 60.0
+        self.physics_ms = physics_ms
+        self.physics_threads = set()
+
+        self.state = torch.zeros((num_envs, NUM_OBSERVATIONS), device=device)
+        self.actions = torch.zeros((num_envs, NUM_ACTIONS), device=device)
+        self.obs_buf = torch.zeros((num_envs, NUM_OBSERVATIONS), device=device)
+        self.states_buf = torch.zeros((num_envs, 1), device=device)
+        self.rew_buf = torch.zeros(num_envs, device=device)
+        self.reset_buf = torch.ones(num_envs, device=device, dtype=torch.long)
+        self.progress_buf = torch.zeros(num_envs, device=device, dtype=torch.long)
+        # extras hold live task buffers, written in place on every step
+        self.extras = {
+            "reward_terms": torch.zeros((num_envs, 2), device=device),
+            "episode": {"progress": torch.zeros((), device=device)},
+        }
+        # fixed coupling of the actions into the state
+        generator = torch.Generator().manual_seed(0)
+        self.action_map = torch.randn((NUM_ACTIONS, NUM_OBSERVATIONS), generator=generator).to(device)
+
+    def reset(self):
+        self.reset_buf = torch.ones_like(self.reset_buf)
+
+    def pre_physics_step(self, actions):
+        reset = self.reset_buf.bool().unsqueeze(-1)
+        self.state.masked_fill_(reset, 0.0)
+        self.progress_buf.masked_fill_(reset.squeeze(-1), 0)
+        self.actions.copy_(actions)
+
+    def physics_step(self):
+        self.physics_threads.add(threading.get_ident())
+        self.state.add_(self.dt * (self.actions @ self.action_map - 0.5 * self.state))
+        if self.physics_ms > 0.0:
+            time.sleep(self.physics_ms * 1e-3)
+
+    def post_physics_step(self):
+        self.progress_buf += 1
+        self.obs_buf.copy_(self.state)
+        self.states_buf.copy_(self.progress_buf.unsqueeze(-1))
+        torch.norm(self.state, dim=1, out=self.rew_buf).neg_()
+        self.reset_buf = (self.progress_buf >= MAX_EPISODE_LENGTH).long()
+        self.extras["reward_terms"][:, 0].copy_(self.rew_buf)
+        self.extras["reward_terms"][:, 1].copy_(self.progress_buf)
+        torch.mean(self.progress_buf.float(), out=self.extras["episode"]["progress"])
+        return self.obs_buf, self.rew_buf, self.reset_buf, self.extras
+
+    def get_states(self):
+        return self.states_buf
+
+
+class StandInEnv:
+    """VecEnvRLGames.step, reset and _process_data over a StandInTask."""
+
+    def __init__(self, task, pipelined=False):
+        self._task = task
+        self.num_envs = task.num_envs
+        self._stepper = PipelinedStepper(self._simulate, self._process_step) if pipelined else None
+
+    def step(self, actions):
+        if self._stepper is not None:
+            return self._stepper.step(actions)
+        return self._process_step(self._simulate(actions))
+
+    def _simulate(self, actions):
+        actions = torch.clamp(actions, -self._task.clip_actions, self._task.clip_actions).to(self._task.device)
+        self._task.pre_physics_step(actions)
+        for _ in range(self._task.control_frequency_inv):
+            self._task.physics_step()
+        obs, rew, resets, extras = self._task.post_physics_step()
+        return {"obs": obs, "rew": rew, "resets": resets, "extras": extras, "states": self._task.get_states()}
+
+    def _process_step(self, raw):
+        obs = torch.clamp(raw["obs"], -self._task.clip_obs, self._task.clip_obs).to(self._task.rl_device)
+        states = torch.clamp(raw["states"], -self._task.clip_obs, self._task.clip_obs).to(self._task.rl_device)
+        obs_dict = {"obs": obs, "states": states}
+        return obs_dict, raw["rew"].to(self._task.rl_device), raw["resets"].to(self._task.rl_device), raw["extras"]
+
+    def reset(self):
+        actions = torch.zeros((self.num_envs, self._task.num_actions), device=self._task.rl_device)
+        if self._stepper is not None:
+            self._stepper.drain()
+            self._task.reset()
+            obs_dict, _, _, _ = self._stepper.run(actions)
+            self._stepper.launch(actions)
+            return obs_dict
+
+        self._task.reset()
+        obs_dict, _, _, _ = self.step(actions)
+        return obs_dict
+
+    def close(self):
+        if self._stepper is not None:
+            self._stepper.close()
+
+
+def check_parity(num_envs, steps):
+    """Pipelined results of actions a_0..a_n match sequential results of 0, a_0..a_n."""
+    generator = torch.Generator().manual_seed(1)
+    actions = [2.0 * torch.rand((num_envs, NUM_ACTIONS), generator=generator) - 1.0 for _ in range(steps)]
+
+    sequential = StandInEnv(StandInTask(num_envs))
+    sequential_obs = [sequential.reset()["obs"].clone()]
+    expected = []
+    for action in [torch.zeros_like(actions[0])] + actions[:-1]:
+        obs_dict, rew, resets, extras = sequential.step(action)
+        expected_extras = (extras["reward_terms"].clone(), extras["episode"]["progress"].clone())
+        expected.append((obs_dict["obs"].clone(), rew.clone(), resets.clone(), expected_extras))
+
+    pipelined = StandInEnv(StandInTask(num_envs), pipelined=True)
+    pipelined_obs = pipelined.reset()["obs"].clone()
+    assert torch.equal(pipelined_obs, sequential_obs[0]), "reset observations differ"
+    for t, action in enumerate(actions):
+        # the caller overwrites its action buffer, the worker must have taken a copy
+        buffer = action.clone()
+        obs_dict, rew, resets, extras = pipelined.step(buffer)
+        buffer.fill_(float("nan"))
+        # the worker runs the next step meanwhile, the collected step must not change
+        time.sleep(1e-3)
+        obs, expected_rew, expected_resets, (reward_terms, progress) = expected[t]
+        assert torch.equal(obs_dict["obs"], obs), f"observations differ at step {t}"
+        assert torch.equal(rew, expected_rew), f"rewards differ at step {t}"
+        assert torch.equal(resets, expected_resets), f"resets differ at step {t}"
+        assert torch.equal(extras["reward_terms"], reward_terms), f"extras differ at step {t}"
+        assert torch.equal(extras["episode"]["progress"], progress), f"nested extras differ at step {t}"
+    try:
+        pipelined._stepper.require_idle("render")
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("require_idle accepted a call while a step was in flight")
+    pipelined.close()
+    pipelined._stepper.require_idle("render")
+    physics_threads = pipelined._task.physics_threads
+    assert len(physics_threads) == 1, "physics ran on more than one thread"
+    assert threading.get_ident() not in physics_threads, "physics ran on the calling thread"
+    print(f"parity: {steps} pipelined steps match the sequential steps delayed by one action")
+    print("threads: all physics ran on the worker thread, require_idle refuses while a step is in flight")
+
+
+def time_loop(num_envs, pipelined, physics_ms, policy_ms, steps):
+    env = StandInEnv(StandInTask(num_envs, physics_ms=physics_ms), pipelined=pipelined)
+    policy = torch.randn((NUM_OBSERVATIONS, NUM_ACTIONS))
+
+    obs = env.reset()["obs"]
+    start = time.perf_counter()
+    for _ in range(steps):
+        actions = torch.tanh(obs @ policy)
+        time.sleep(policy_ms * 1e-3)
+        obs = env.step(actions)[0]["obs"]
+    elapsed = (time.perf_counter() - start) / steps
+    env.close()
+    return elapsed * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and time pipelined stepping on a CPU stand-in task.")
+    parser.add_argument("--num_envs", type=int, default=4096)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--physics_ms", type=float, default=4.0, help="wall time of one physics step")
+    parser.add_argument("--policy_ms", type=float, default=3.0, help="wall time of one policy inference")
+    args = parser.parse_args()
+
+    check_parity(args.num_envs, 3 * MAX_EPISODE_LENGTH)
+
+    sequential_ms = time_loop(args.num_envs, False, args.physics_ms, args.policy_ms, args.steps)
+    pipelined_ms = time_loop(args.num_envs, True, args.physics_ms, args.policy_ms, args.steps)
+    print(f"{'mode':>12} {'loop step [ms]':>15}")
+    print(f"{'sequential':>12} {sequential_ms:>15.2f}")
+    print(f"{'pipelined':>12} {pipelined_ms:>15.2f}")
+    print(f"speedup {sequential_ms / pipelined_ms:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Step latency of a task with masked resets and with index (nonzero) resets.
+
+Each configuration runs in a fresh process: the task is created from the hydra configs,
+stepped with random actions, and the mean wall time of VecEnvRLGames.step is reported.
+The index path calls reset_idx with the reset env ids; with a compaction interval of 1 it is
+the previous behavior, reset_buf.nonzero() followed by reset_idx on every step. The mask
+path calls reset_masked on every step without syncing and reset_views with the ids compacted
+every --compaction_interval steps. The index path is also run at that interval for reference.
+
+Usage: python scripts/benchmarks/reset_latency.py [--task Crazyflie] [--num_envs 4096] [--compaction_interval 4]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+CFG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "cfg")
+
+
+def child(args, masked, compaction_interval):
+    from hydra import compose, initialize_config_dir
+    from omniisaacgymenvs.envs.vec_env_rlgames import VecEnvRLGames
+    from omniisaacgymenvs.utils.config_utils.path_utils import get_experience
+    from omniisaacgymenvs.utils.hydra_cfg.reformat import omegaconf_to_dict
+
+    with initialize_config_dir(version_base=None, config_dir=os.path.abspath(CFG_DIR)):
+        cfg = compose(
+            config_name="config",
+            overrides=[
+                f"task={args.task}",
+                f"num_envs={args.num_envs}",
+                "headless=True",
+                f"++task.env.maskedResets={masked}",
+                f"++task.env.resetCompactionInterval={compaction_interval}",
+            ],
+        )
+    cfg_dict = omegaconf_to_dict(cfg)
+
+    # creating the env boots the simulation app, omni modules are imported afterwards
+    env = VecEnvRLGames(
+        headless=True,
+        sim_device=cfg.device_id,
+        enable_livestream=False,
+        enable_viewport=False,
+        experience=get_experience(True, False, False, False, cfg.kit_app),
+    )
+
+    import torch
+    from omni.isaac.core.utils.torch.maths import set_seed
+    from omniisaacgymenvs.utils.task_util import initialize_task
+
+    cfg_dict["seed"] = set_seed(cfg.seed, torch_deterministic=cfg.torch_deterministic)
+    task = initialize_task(cfg_dict, env)
+    env.reset()
+
+    def step():
+        actions = 2.0 * torch.rand((env.num_envs, task.num_actions), device=task.rl_device) - 1.0
+        env.step(actions)
+
+    for _ in range(args.warmup):
+        step()
+    if torch.cuda.is_available():
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        step()
+    if torch.cuda.is_available():
+        torch.cuda.synchronize()
+    elapsed = (time.perf_counter() - start) / args.steps
+
+    print(json.dumps({"step_ms": elapsed * 1e3, "masked": task.reset_scheduler.masked}), flush=True)
+    env.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the step latency of masked and index resets.")
+    parser.add_argument("--task", type=str, default="Crazyflie")
+    parser.add_argument("--num_envs", type=int, default=4096)
+    parser.add_argument("--steps", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--compaction_interval", type=int, default=4, help="steps between compactions of reset ids")
+    parser.add_argument("--child", type=str, choices=["mask", "index"], default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        child(args, args.child == "mask", args.compaction_interval)
+        return
+
+    print(f"{args.task}, {args.num_envs} envs")
+    print(f"{'path':>6} {'interval':>9} {'step [ms]':>10}")
+    configs = [("index", 1), ("index", args.compaction_interval), ("mask", args.compaction_interval)]
+    for path, interval in dict.fromkeys(configs):
+        # the flags given last win
+        command = [sys.executable, __file__] + sys.argv[1:] + ["--child", path, "--compaction_interval", str(interval)]
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        # the simulation app logs to stdout as well, the result is the last json line
+        result = json.loads([line for line in output.splitlines() if line.startswith("{")][-1])
+        note = "" if result["masked"] == (path == "mask") else "  (task has no reset_masked, index path used)"
+        print(f"{path:>6} {interval:>9} {result['step_ms']:>10.3f}{note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Cold start import time of the task registry.
+
+Every measurement runs in a fresh interpreter, so nothing is cached by sys.modules.
+"eager" imports every registered task, as import_tasks did before the registry was lazy,
+"lazy" builds the task maps and loads the class of --task only.
+
+Usage: python scripts/benchmarks/task_import.py [--task Cartpole] [--repeats 3]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+
+def child(mode, task, warp):
+    from omni.isaac.kit import SimulationApp
+
+    simulation_app = SimulationApp({"headless": True})
+
+    start = time.perf_counter()
+    from omniisaacgymenvs.utils.task_util import import_tasks, load_task_class
+
+    task_map, task_map_warp = import_tasks()
+    if mode == "eager":
+        for name in list(task_map):
+            task_map[name]
+        for name in list(task_map_warp):
+            task_map_warp[name]
+    else:
+        load_task_class(task, warp=warp)
+    elapsed = time.perf_counter() - start
+    num_modules = len([name for name in sys.modules if name.startswith("omniisaacgymenvs.tasks")])
+
+    print(json.dumps({"seconds": elapsed, "task_modules": num_modules}), flush=True)
+    simulation_app.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the cold start import time of the tasks.")
+    parser.add_argument("--task", type=str, default="Cartpole")
+    parser.add_argument("--warp", action="store_true")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--child", type=str, choices=["eager", "lazy"], default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        child(args.child, args.task, args.warp)
+        return
+
+    print(f"{'mode':>6} {'import [s]':>11} {'task modules':>13}")
+    for mode in ("eager", "lazy"):
+        results = []
+        for _ in range(args.repeats):
+            command = [sys.executable, __file__, "--child", mode, "--task", args.task]
+            command += ["--warp"] if args.warp else []
+            output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+            # the simulation app logs to stdout as well, the result is the last json line
+            line = [line for line in output.splitlines() if line.startswith("{")][-1]
+            results.append(json.loads(line))
+        seconds = min(result["seconds"] for result in results)
+        print(f"{mode:>6} {seconds:>11.2f} {results[0]['task_modules']:>13}")
+
+
+if __name__ == "__main__":
+    main()
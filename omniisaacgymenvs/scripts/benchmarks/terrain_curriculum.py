@@ -0,0 +1,176 @@
+"""Parity check and timing of the AnymalTerrain curriculum against the previous per-env code.
+
+Compares TerrainCurriculum with the code it replaced in AnymalTerrainTask: the per-env loop
+of post_reset that filled env_origins, and update_terrain_level. Random episode outcomes are
+fed to the previous update, to TerrainCurriculum.update with the reset env ids and to
+TerrainCurriculum.update_masked with the reset mask, and the levels and origins of the three
+are checked for equality after every step. On CUDA the curriculum updates and statistics run
+with the sync debug mode set to error, so any host sync fails the benchmark.
+
+Usage: python scripts/benchmarks/terrain_curriculum.py [--num_envs 4096] [--reset_fraction 0.02]
+"""
+
+import argparse
+import time
+
+from omni.isaac.kit import SimulationApp
+
+simulation_app = SimulationApp({"headless": True})
+
+import torch
+from omniisaacgymenvs.tasks.utils.terrain_curriculum import TerrainCurriculum
+
+NUM_LEVELS = 10
+NUM_TYPES = 20
+MAP_SIZE = 8.0
+
+
+def make_terrain_origins(device):
+    levels, types = torch.meshgrid(torch.arange(NUM_LEVELS), torch.arange(NUM_TYPES), indexing="ij")
+    heights = torch.rand((NUM_LEVELS, NUM_TYPES)) * 0.5
+    return torch.stack(((levels + 0.5) * MAP_SIZE, (types + 0.5) * MAP_SIZE, heights), dim=-1).to(device)
+
+
+def legacy_env_origins(terrain_origins, terrain_levels, terrain_types):
+    """env_origins as filled by post_reset before the curriculum manager."""
+    env_origins = torch.zeros((len(terrain_levels), 3), device=terrain_origins.device)
+    for i in range(len(terrain_levels)):
+        env_origins[i] = terrain_origins[terrain_levels[i], terrain_types[i]]
+    return env_origins
+
+
+def legacy_update(state, env_ids, distance, required_distance):
+    """update_terrain_level before the curriculum manager."""
+    state["levels"][env_ids] -= 1 * (distance < required_distance)
+    state["levels"][env_ids] += 1 * (distance > MAP_SIZE / 2)
+    state["levels"][env_ids] = torch.clip(state["levels"][env_ids], 0) % NUM_LEVELS
+    state["origins"][env_ids] = state["terrain_origins"][state["levels"][env_ids], state["types"][env_ids]]
+
+
+def episode_outcomes(num_envs, device):
+    """Distance walked and required distance of every env, spread around both thresholds."""
+    distance = torch.rand(num_envs, device=device) * MAP_SIZE * 0.75
+    required_distance = torch.rand(num_envs, device=device) * MAP_SIZE * 0.5
+    return distance, required_distance
+
+
+def check_parity(num_envs, steps, reset_fraction, device):
+    torch.manual_seed(0)
+    terrain_origins = make_terrain_origins(device)
+    indexed = TerrainCurriculum(terrain_origins, num_envs, device, max_init_level=3, promote_distance=MAP_SIZE / 2)
+    masked = TerrainCurriculum(terrain_origins, num_envs, device, max_init_level=3, promote_distance=MAP_SIZE / 2)
+    masked.levels.copy_(indexed.levels)
+    masked.types.copy_(indexed.types)
+    masked.env_origins.copy_(indexed.env_origins)
+
+    legacy = {
+        "terrain_origins": terrain_origins,
+        "levels": indexed.levels.clone(),
+        "types": indexed.types.clone(),
+    }
+    legacy["origins"] = legacy_env_origins(terrain_origins, legacy["levels"], legacy["types"])
+    assert torch.equal(legacy["origins"], indexed.env_origins), "initial env origins differ"
+
+    for step in range(steps):
+        mask = torch.rand(num_envs, device=device) < reset_fraction
+        env_ids = torch.nonzero(mask).squeeze(-1)
+        distance, required_distance = episode_outcomes(num_envs, device)
+
+        legacy_update(legacy, env_ids, distance[env_ids], required_distance[env_ids])
+        indexed.update(env_ids, distance[env_ids], required_distance[env_ids])
+        masked.update_masked(mask, distance, required_distance)
+
+        for curriculum in (indexed, masked):
+            assert torch.equal(curriculum.levels, legacy["levels"]), f"levels differ at step {step}"
+            assert torch.equal(curriculum.env_origins, legacy["origins"]), f"env origins differ at step {step}"
+
+    assert torch.equal(indexed.episodes, masked.episodes), "episode counts differ"
+    assert torch.equal(indexed.promotions, masked.promotions), "promotion counts differ"
+    assert torch.equal(indexed.level_counts(), torch.bincount(legacy["levels"], minlength=NUM_LEVELS).float())
+    print(f"parity: {steps} curriculum updates match update_terrain_level, indexed and masked")
+
+
+def check_no_sync(num_envs, reset_fraction, device):
+    curriculum = TerrainCurriculum(make_terrain_origins(device), num_envs, device, solved_level="random")
+    mask = torch.rand(num_envs, device=device) < reset_fraction
+    env_ids = torch.nonzero(mask).squeeze(-1)
+    distance, required_distance = episode_outcomes(num_envs, device)
+    torch.cuda.synchronize()
+
+    torch.cuda.set_sync_debug_mode("error")
+    try:
+        curriculum.update(env_ids, distance[env_ids], required_distance[env_ids])
+        curriculum.update_masked(mask, distance, required_distance)
+        curriculum.sample_positions(env_ids)
+        curriculum.assign(env_ids, *curriculum.sample_levels(len(env_ids)))
+        curriculum.mean_level()
+        curriculum.level_counts()
+        curriculum.success_rates()
+    finally:
+        torch.cuda.set_sync_debug_mode("default")
+    print("no host sync in the curriculum updates and statistics")
+
+
+def time_fn(fn, iterations, device):
+    for _ in range(3):
+        fn()
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and time the AnymalTerrain terrain curriculum.")
+    parser.add_argument("--num_envs", type=int, default=4096)
+    parser.add_argument("--reset_fraction", type=float, default=0.02, help="fraction of envs reset per step")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--device", type=str, default="cuda:0" if torch.cuda.is_available() else "cpu")
+    args = parser.parse_args()
+
+    check_parity(args.num_envs, 200, max(args.reset_fraction, 0.1), args.device)
+    if args.device.startswith("cuda"):
+        check_no_sync(args.num_envs, args.reset_fraction, args.device)
+
+    terrain_origins = make_terrain_origins(args.device)
+    curriculum = TerrainCurriculum(terrain_origins, args.num_envs, args.device, max_init_level=3)
+    legacy = {
+        "terrain_origins": terrain_origins,
+        "levels": curriculum.levels.clone(),
+        "types": curriculum.types.clone(),
+        "origins": curriculum.env_origins.clone(),
+    }
+    mask = torch.rand(args.num_envs, device=args.device) < args.reset_fraction
+    env_ids = torch.nonzero(mask).squeeze(-1)
+    distance, required_distance = episode_outcomes(args.num_envs, args.device)
+
+    loop_us = time_fn(lambda: legacy_env_origins(terrain_origins, legacy["levels"], legacy["types"]), 3, args.device)
+    init_us = time_fn(
+        lambda: TerrainCurriculum(terrain_origins, args.num_envs, args.device), args.iterations, args.device
+    )
+    legacy_us = time_fn(
+        lambda: legacy_update(legacy, env_ids, distance[env_ids], required_distance[env_ids]),
+        args.iterations,
+        args.device,
+    )
+    indexed_us = time_fn(
+        lambda: curriculum.update(env_ids, distance[env_ids], required_distance[env_ids]), args.iterations, args.device
+    )
+    masked_us = time_fn(
+        lambda: curriculum.update_masked(mask, distance, required_distance), args.iterations, args.device
+    )
+
+    print(f"{args.num_envs} envs, {len(env_ids)} resets per update on {args.device}")
+    print(f"  {'operation':>22} {'previous [us]':>14} {'curriculum [us]':>16} {'speedup':>8}")
+    print(f"  {'env origins at reset':>22} {loop_us:>14.1f} {init_us:>16.1f} {loop_us / init_us:>7.1f}x")
+    print(f"  {'indexed update':>22} {legacy_us:>14.1f} {indexed_us:>16.1f} {legacy_us / indexed_us:>7.1f}x")
+    print(f"  {'masked update':>22} {legacy_us:>14.1f} {masked_us:>16.1f} {legacy_us / masked_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
+    simulation_app.close()
@@ -0,0 +1,156 @@
+"""CPU benchmark of the AnymalTerrain terrain generator.
+
+Compares the batched sub-terrain generation of Terrain with the previous per sub-terrain
+loops, for both the curriculum and the randomized layouts, and checks that both produce
+the same heightfield for the same seed.
+
+Usage: python scripts/benchmarks/terrain_generation.py [--num_levels 10] [--num_terrains 20] [--num_workers 4]
+"""
+
+import argparse
+import time
+
+from omni.isaac.kit import SimulationApp
+
+simulation_app = SimulationApp({"headless": True})
+
+import numpy as np
+from omniisaacgymenvs.tasks.utils.anymal_terrain_generator import Terrain
+from omniisaacgymenvs.utils.terrain_utils.terrain_utils import *
+
+
+class LegacyTerrain(Terrain):
+    """Terrain with the sub-terrains generated one at a time, as before the batched generators."""
+
+    def randomized_terrain(self):
+        for k in range(self.num_maps):
+            (i, j) = np.unravel_index(k, (self.env_rows, self.env_cols))
+            start_x = self.border + i * self.length_per_env_pixels
+            end_x = self.border + (i + 1) * self.length_per_env_pixels
+            start_y = self.border + j * self.width_per_env_pixels
+            end_y = self.border + (j + 1) * self.width_per_env_pixels
+
+            terrain = SubTerrain(
+                "terrain",
+                width=self.width_per_env_pixels,
+                length=self.width_per_env_pixels,
+                vertical_scale=self.vertical_scale,
+                horizontal_scale=self.horizontal_scale,
+            )
+            choice = np.random.uniform(0, 1)
+            if choice < 0.1:
+                if np.random.choice([0, 1]):
+                    pyramid_sloped_terrain(terrain, np.random.choice([-0.3, -0.2, 0, 0.2, 0.3]))
+                    random_uniform_terrain(terrain, min_height=-0.1, max_height=0.1, step=0.05, downsampled_scale=0.2)
+                else:
+                    pyramid_sloped_terrain(terrain, np.random.choice([-0.3, -0.2, 0, 0.2, 0.3]))
+            elif choice < 0.6:
+                step_height = np.random.choice([-0.15, 0.15])
+                pyramid_stairs_terrain(terrain, step_width=0.31, step_height=step_height, platform_size=3.0)
+            elif choice < 1.0:
+                discrete_obstacles_terrain(terrain, 0.15, 1.0, 2.0, 40, platform_size=3.0)
+            self.height_field_raw[start_x:end_x, start_y:end_y] = terrain.height_field_raw
+            self._set_origin(i, j, terrain)
+
+    def curiculum(self, num_robots, num_terrains, num_levels):
+        for j in range(num_terrains):
+            for i in range(num_levels):
+                terrain = SubTerrain(
+                    "terrain",
+                    width=self.width_per_env_pixels,
+                    length=self.width_per_env_pixels,
+                    vertical_scale=self.vertical_scale,
+                    horizontal_scale=self.horizontal_scale,
+                )
+                difficulty = i / num_levels
+                choice = j / num_terrains
+
+                slope = difficulty * 0.4
+                step_height = 0.05 + 0.175 * difficulty
+                discrete_obstacles_height = 0.025 + difficulty * 0.15
+                stepping_stones_size = 2 - 1.8 * difficulty
+                if choice < self.proportions[0]:
+                    if choice < 0.05:
+                        slope *= -1
+                    pyramid_sloped_terrain(terrain, slope=slope, platform_size=3.0)
+                elif choice < self.proportions[1]:
+                    if choice < 0.15:
+                        slope *= -1
+                    pyramid_sloped_terrain(terrain, slope=slope, platform_size=3.0)
+                    random_uniform_terrain(terrain, min_height=-0.1, max_height=0.1, step=0.025, downsampled_scale=0.2)
+                elif choice < self.proportions[3]:
+                    if choice < self.proportions[2]:
+                        step_height *= -1
+                    pyramid_stairs_terrain(terrain, step_width=0.31, step_height=step_height, platform_size=3.0)
+                elif choice < self.proportions[4]:
+                    discrete_obstacles_terrain(terrain, discrete_obstacles_height, 1.0, 2.0, 40, platform_size=3.0)
+                else:
+                    stepping_stones_terrain(
+                        terrain, stone_size=stepping_stones_size, stone_distance=0.1, max_height=0.0, platform_size=3.0
+                    )
+
+                start_x = self.border + i * self.length_per_env_pixels
+                end_x = self.border + (i + 1) * self.length_per_env_pixels
+                start_y = self.border + j * self.width_per_env_pixels
+                end_y = self.border + (j + 1) * self.width_per_env_pixels
+                self.height_field_raw[start_x:end_x, start_y:end_y] = terrain.height_field_raw
+                self._set_origin(i, j, terrain)
+
+    def _set_origin(self, i, j, terrain):
+        x1 = int((self.env_length / 2.0 - 1) / self.horizontal_scale)
+        x2 = int((self.env_length / 2.0 + 1) / self.horizontal_scale)
+        y1 = int((self.env_width / 2.0 - 1) / self.horizontal_scale)
+        y2 = int((self.env_width / 2.0 + 1) / self.horizontal_scale)
+        env_origin_z = np.max(terrain.height_field_raw[x1:x2, y1:y2]) * self.vertical_scale
+        self.env_origins[i, j] = [(i + 0.5) * self.env_length, (j + 0.5) * self.env_width, env_origin_z]
+
+
+def make_cfg(args, curriculum, num_workers):
+    return {
+        "curriculum": curriculum,
+        "mapLength": 8.0,
+        "mapWidth": 8.0,
+        "numLevels": args.num_levels,
+        "numTerrains": args.num_terrains,
+        # all five curriculum terrain types, including stepping stones
+        "terrainProportions": [0.1, 0.1, 0.2, 0.2, 0.2, 0.2],
+        "slopeTreshold": 0.5,
+        "numWorkers": num_workers,
+    }
+
+
+def time_terrain(terrain_cls, cfg, seed, repeats):
+    times = []
+    for _ in range(repeats):
+        np.random.seed(seed)
+        start = time.perf_counter()
+        terrain = terrain_cls(cfg, num_robots=4096)
+        times.append(time.perf_counter() - start)
+    return terrain, min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the AnymalTerrain terrain generator on CPU.")
+    parser.add_argument("--num_levels", type=int, default=10)
+    parser.add_argument("--num_terrains", type=int, default=20)
+    parser.add_argument("--num_workers", type=int, default=4)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'layout':>12} {'legacy [s]':>11} {'batched [s]':>12} {'pool [s]':>9} {'speedup':>8}")
+    for curriculum in (True, False):
+        legacy, legacy_s = time_terrain(LegacyTerrain, make_cfg(args, curriculum, 0), args.seed, args.repeats)
+        batched, batched_s = time_terrain(Terrain, make_cfg(args, curriculum, 0), args.seed, args.repeats)
+        pooled, pooled_s = time_terrain(Terrain, make_cfg(args, curriculum, args.num_workers), args.seed, args.repeats)
+        for terrain in (batched, pooled):
+            assert np.array_equal(legacy.height_field_raw, terrain.height_field_raw), "heightfields differ"
+            assert np.array_equal(legacy.env_origins, terrain.env_origins), "env origins differ"
+
+        layout = "curriculum" if curriculum else "randomized"
+        print(f"{layout:>12} {legacy_s:>11.3f} {batched_s:>12.3f} {pooled_s:>9.3f} {legacy_s / batched_s:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
+    simulation_app.close()
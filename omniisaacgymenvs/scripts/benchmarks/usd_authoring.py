@@ -0,0 +1,213 @@
+"""Scene setup time of per-env USD authoring loops against the batched Sdf helpers of usd_utils.
+
+Builds a plain in-memory pxr stage with num_envs cloned env prims and times two setups:
+  - the ball balance anchors: three D6 joints per env fixing the legs to the ground, created
+    with UsdPhysics in a per-env loop reading the env translation from the stage, as the task
+    did before, and with define_fixed_joints and the env positions of the cloner;
+  - the Factory nut and bolt import: a reference, an xform, a non instanceable collision prim
+    and a physics material binding per env and body, with add_reference_to_stage-like Usd
+    calls, and with add_references, set_instanceable and bind_physics_material.
+The composed prims of both paths are compared on the first and last env.
+
+Only pxr is needed. usd_utils imports two omni.isaac.core helpers at module level that the
+batched helpers never call, so they are stood in for and Isaac Sim is not started.
+
+Usage: python scripts/benchmarks/usd_authoring.py [--num_envs 256 1024 4096]
+"""
+
+import argparse
+import sys
+import time
+import types
+
+
+def stand_in_omni_helpers():
+    """Registers the omni.isaac.core modules imported by usd_utils, with helpers that need Kit to run."""
+
+    def requires_kit(name):
+        def helper(*args, **kwargs):
+            raise RuntimeError(f"{name} needs Isaac Sim, which this benchmark does not start")
+
+        return helper
+
+    for name in ("omni", "omni.isaac", "omni.isaac.core", "omni.isaac.core.utils"):
+        sys.modules.setdefault(name, types.ModuleType(name))
+    for name, helper in (("prims", "get_prim_at_path"), ("stage", "get_current_stage")):
+        module = types.ModuleType(f"omni.isaac.core.utils.{name}")
+        setattr(module, helper, requires_kit(helper))
+        sys.modules[module.__name__] = module
+
+
+stand_in_omni_helpers()
+
+from omniisaacgymenvs.tasks.utils.usd_utils import (
+    add_references,
+    bind_physics_material,
+    define_fixed_joints,
+    set_instanceable,
+)
+from pxr import Gf, Sdf, Usd, UsdGeom, UsdPhysics, UsdShade
+
+ENV_SPACING = 2.0
+LEG_OFFSETS = [(0.4, 0, 0.08), (-0.2, 0.34641, 0), (-0.2, -0.34641, 0)]
+GROUND_PATH = "/World/defaultGroundPlane"
+MATERIAL_PATH = "/World/Physics_Materials/NutBoltMaterial"
+BODIES = ("nut", "bolt")
+
+
+def make_asset(body):
+    """Anonymous layer shaped like a Factory nut or bolt asset."""
+    layer = Sdf.Layer.CreateAnonymous(f"{body}.usda")
+    stage = Usd.Stage.Open(layer)
+    root = UsdGeom.Xform.Define(stage, f"/{body}")
+    stage.SetDefaultPrim(root.GetPrim())
+    collisions = UsdGeom.Xform.Define(stage, f"/{body}/factory_{body}/collisions").GetPrim()
+    UsdGeom.Mesh.Define(stage, f"/{body}/factory_{body}/collisions/mesh_0")
+    collisions.SetInstanceable(True)
+    return layer
+
+
+def make_stage(num_envs):
+    """Stage with num_envs envs on a grid, as cloned by GridCloner. Returns the stage and env positions."""
+    stage = Usd.Stage.CreateInMemory()
+    UsdGeom.Xform.Define(stage, GROUND_PATH)
+    UsdShade.Material.Define(stage, MATERIAL_PATH)
+    num_rows = int(num_envs**0.5 + 0.5)
+    env_pos = []
+    layer = stage.GetRootLayer()
+    with Sdf.ChangeBlock():
+        for i in range(num_envs):
+            pos = ((i // num_rows) * ENV_SPACING, (i % num_rows) * ENV_SPACING, 0.0)
+            env_pos.append(pos)
+            env = Sdf.CreatePrimInLayer(layer, f"/World/envs/env_{i}")
+            env.specifier = Sdf.SpecifierDef
+            env.typeName = "Xform"
+            translate = Sdf.AttributeSpec(env, "xformOp:translate", Sdf.ValueTypeNames.Double3)
+            translate.default = Gf.Vec3d(*pos)
+            for j in range(len(LEG_OFFSETS)):
+                leg = Sdf.CreatePrimInLayer(layer, f"/World/envs/env_{i}/BalanceBot/lower_leg{j}")
+                leg.specifier = Sdf.SpecifierDef
+                leg.typeName = "Xform"
+    return stage, env_pos
+
+
+def legacy_anchors(stage, num_envs):
+    for i in range(num_envs):
+        base_path = f"/World/envs/env_{i}/BalanceBot"
+        for j, leg_offset in enumerate(LEG_OFFSETS):
+            leg_path = f"{base_path}/lower_leg{j}"
+            env_pos = stage.GetPrimAtPath(f"/World/envs/env_{i}").GetAttribute("xformOp:translate").Get()
+            joint = UsdPhysics.Joint.Define(stage, leg_path + "_ground")
+            joint.CreateBody0Rel().SetTargets([GROUND_PATH])
+            joint.CreateBody1Rel().SetTargets([leg_path])
+            joint.CreateLocalPos0Attr().Set(env_pos + Gf.Vec3d(*leg_offset))
+            joint.CreateLocalRot0Attr().Set(Gf.Quatf(1.0, Gf.Vec3f(0, 0, 0)))
+            joint.CreateLocalPos1Attr().Set(Gf.Vec3f(0, 0, 0.18))
+            joint.CreateLocalRot1Attr().Set(Gf.Quatf(1.0, Gf.Vec3f(0, 0, 0)))
+            for axis in ("transX", "transY", "transZ"):
+                limit = UsdPhysics.LimitAPI.Apply(joint.GetPrim(), axis)
+                limit.CreateLowAttr(1.0)
+                limit.CreateHighAttr(-1.0)
+
+
+def batched_anchors(stage, env_pos):
+    leg_paths, anchor_pos = [], []
+    for i, pos in enumerate(env_pos):
+        for j, leg_offset in enumerate(LEG_OFFSETS):
+            leg_paths.append(f"/World/envs/env_{i}/BalanceBot/lower_leg{j}")
+            anchor_pos.append([p + o for p, o in zip(pos, leg_offset)])
+    define_fixed_joints(
+        stage,
+        joint_paths=[leg_path + "_ground" for leg_path in leg_paths],
+        body0_paths=GROUND_PATH,
+        body1_paths=leg_paths,
+        local_positions0=anchor_pos,
+        local_position1=(0, 0, 0.18),
+    )
+
+
+def legacy_import(stage, num_envs, assets):
+    material = UsdShade.Material(stage.GetPrimAtPath(MATERIAL_PATH))
+    for i in range(num_envs):
+        for body in BODIES:
+            prim = stage.DefinePrim(f"/World/envs/env_{i}/{body}", "Xform")
+            prim.GetReferences().AddReference(assets[body].identifier)
+            xform = UsdGeom.Xformable(prim)
+            xform.AddTranslateOp(UsdGeom.XformOp.PrecisionDouble).Set(Gf.Vec3d(0.0, 0.0, 0.4))
+            xform.AddOrientOp(UsdGeom.XformOp.PrecisionDouble).Set(Gf.Quatd(1.0, Gf.Vec3d(0.0, 0.0, 0.0)))
+            xform.AddScaleOp(UsdGeom.XformOp.PrecisionDouble).Set(Gf.Vec3d(1.0, 1.0, 1.0))
+            collisions = f"/World/envs/env_{i}/{body}/factory_{body}/collisions"
+            stage.GetPrimAtPath(collisions).SetInstanceable(False)
+            binding = UsdShade.MaterialBindingAPI.Apply(stage.GetPrimAtPath(collisions + "/mesh_0"))
+            binding.Bind(material, UsdShade.Tokens.weakerThanDescendants, "physics")
+
+
+def batched_import(stage, num_envs, assets):
+    collision_paths = []
+    for body in BODIES:
+        paths = [f"/World/envs/env_{i}/{body}" for i in range(num_envs)]
+        add_references(stage, paths, assets[body].identifier, translations=[(0.0, 0.0, 0.4)] * num_envs)
+        collision_paths += [f"{path}/factory_{body}/collisions" for path in paths]
+    set_instanceable(stage, collision_paths, False)
+    bind_physics_material(stage, [path + "/mesh_0" for path in collision_paths], MATERIAL_PATH)
+
+
+def describe(stage, path):
+    prim = stage.GetPrimAtPath(path)
+    return (
+        prim.GetTypeName(),
+        sorted(prim.GetAppliedSchemas()),
+        prim.IsInstanceable(),
+        {attr.GetName(): attr.Get() for attr in prim.GetAttributes() if attr.HasAuthoredValue()},
+        {rel.GetName(): rel.GetTargets() for rel in prim.GetRelationships()},
+    )
+
+
+def check_equal(legacy_stage, batched_stage, paths):
+    for path in paths:
+        legacy, batched = describe(legacy_stage, path), describe(batched_stage, path)
+        assert legacy == batched, f"{path} differs:\n{legacy}\n{batched}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-env and batched USD scene authoring.")
+    parser.add_argument("--num_envs", type=int, nargs="+", default=[256, 1024, 4096])
+    args = parser.parse_args()
+
+    assets = {body: make_asset(body) for body in BODIES}
+    print(f"{'setup':>8} {'num_envs':>9} {'per-env [s]':>12} {'batched [s]':>12} {'speedup':>8}")
+    for num_envs in args.num_envs:
+        last = num_envs - 1
+        for setup in ("anchors", "import"):
+            legacy_stage, _ = make_stage(num_envs)
+            batched_stage, env_pos = make_stage(num_envs)
+
+            start = time.perf_counter()
+            if setup == "anchors":
+                legacy_anchors(legacy_stage, num_envs)
+            else:
+                legacy_import(legacy_stage, num_envs, assets)
+            legacy_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            if setup == "anchors":
+                batched_anchors(batched_stage, env_pos)
+            else:
+                batched_import(batched_stage, num_envs, assets)
+            batched_s = time.perf_counter() - start
+
+            if setup == "anchors":
+                paths = [f"/World/envs/env_{i}/BalanceBot/lower_leg{j}_ground" for i in (0, last) for j in range(3)]
+            else:
+                paths = [
+                    f"/World/envs/env_{i}/{body}{suffix}"
+                    for i in (0, last)
+                    for body in BODIES
+                    for suffix in ("", f"/factory_{body}/collisions", f"/factory_{body}/collisions/mesh_0")
+                ]
+            check_equal(legacy_stage, batched_stage, paths)
+            print(f"{setup:>8} {num_envs:>9} {legacy_s:>12.3f} {batched_s:>12.3f} {legacy_s / batched_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -101,14 +101,14 @@ def parse_hydra_configs(cfg: DictConfig):
     # Saving path
     for i in range(15):
         dire = f'{os.getcwd()}{"/demonstrations/data"}'
-        file_path = f'{dire}{"/"}{str(i)}{".json"}'
-        if not os.path.isfile(file_path):
-            print("Saving demonstration in: " + file_path)
+        save_dir = f'{dire}{"/"}{str(i)}'
+        if not os.path.exists(save_dir) and not os.path.isfile(f'{save_dir}{".json"}'):
+            print("Saving demonstration in: " + save_dir)
             break
         if i == 14:
             print("Directory busy")
             exit()
-    env.start_logging(file_path)
+    env.start_recording(save_dir)
     
     while env.simulation_app.is_running():
         if env.world.is_playing():
@@ -118,10 +118,10 @@ def parse_hydra_configs(cfg: DictConfig):
             env._world.step(render=render)
             env.sim_frame_count += 1
             env._task.post_physics_step()
-            env.logging_step()
+            env.recording_step()
 
             if input_manager.kill: 
-                env.save_log()
+                env.stop_recording()
                 env._simulation_app.close()
 
         else:
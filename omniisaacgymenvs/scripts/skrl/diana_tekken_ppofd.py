@@ -13,7 +13,7 @@ from skrl.resources.preprocessors.torch import RunningStandardScaler
 from skrl.resources.schedulers.torch import KLAdaptiveRL
 from skrl.trainers.torch import SequentialTrainer, Pretrainer
 from skrl.utils import set_seed
-from omniisaacgymenvs.demonstrations.demo_parser import parse_json_demo
+from omniisaacgymenvs.demonstrations.demo_store import TRANSITION_FIELDS, TransitionView, load_demonstrations
 from omniisaacgymenvs.utils.parse_algo_config import parse_arguments
 
 
@@ -220,8 +220,8 @@ for key, value in algo_config.items():
 
 
 # Buffer prefill
-episode = parse_json_demo()
-demo_size = len(episode)
+demonstrations = load_demonstrations(device=device)
+demo_size = len(demonstrations["states"])
 demonstration_memory = RandomMemory(memory_size=demo_size, num_envs=1, device=device)
 
 agent = PPOFD(models=models,
@@ -240,21 +240,9 @@ trainer = SequentialTrainer(cfg=cfg_trainer, env=env, agents=agent)
 
 # demonstrations injection
 if cfg["pretrain"]:
-    transitions = []
-    for tstep in episode:
-        states = torch.tensor(tstep["states"], device=device)
-        actions = torch.tensor(tstep["actions"], device=device)
-        rewards = torch.tensor(tstep["rewards"], device=device)
-        terminated = torch.tensor(tstep["terminated"], device=device)
-        next_states = torch.tensor(tstep["next_states"], device=device)
-        dict = {}
-        dict["states"] = states
-        dict["actions"] = actions
-        dict["reward"] = rewards
-        dict["next_states"] = next_states
-        dict["terminated"] = terminated
-        transitions.append(dict)
-        demonstration_memory.add_samples(states=states, actions=actions, rewards=rewards, next_states=next_states,terminated=terminated)
+    # the memory has a single env, so the whole (demo_size, dim) batch is written in one call
+    demonstration_memory.add_samples(**{field: demonstrations[field] for field in TRANSITION_FIELDS})
+    transitions = TransitionView(demonstrations)
 
     # trainer.pre_train(transitions, 10)
     pt = Pretrainer(agent=agent,
@@ -0,0 +1,225 @@
+"""Runs the Cartesian product of launch_config.yaml in parallel on the local machine.
+
+Every configuration runs as its own process. At most `len(slots) * jobs_per_slot` run at
+once, and each one holds a slot (e.g. a GPU id, exported with --slot_env) while it runs.
+The output of every run goes to <sweep_dir>/<run_id>/output.log. Results are appended to
+<sweep_dir>/index.jsonl. Runs that already completed are skipped on restart, so a killed
+sweep resumes where it stopped.
+
+Usage: python sweep.py [--config launch_config.yaml] [--slots 0 1] [--jobs_per_slot 2] [headless=True]
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+INDEX_FILE = "index.jsonl"
+LOG_FILE = "output.log"
+
+
+def expand_configurations(configurations):
+    """Expands the launch configurations into one parameter dict per run.
+
+    Args:
+        configurations (list): list of {name: [values]} dicts, as in launch_config.yaml.
+
+    Returns:
+        list: one {name: value} dict for every combination of values, in the order of yaml2bash.
+    """
+    param_values = {}
+    for param_dict in configurations:
+        param_values.update(param_dict)
+    names = list(param_values)
+    values = [value if isinstance(value, list) else [value] for value in param_values.values()]
+    return [dict(zip(names, combination)) for combination in itertools.product(*values)]
+
+
+def run_id(script, params):
+    """Stable id of a run, so that a restarted sweep finds the runs it already completed."""
+    key = json.dumps({"script": script, "params": params}, sort_keys=True)
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+def read_index(index_path):
+    """Returns the last index record of every run. Lines cut by a killed sweep are ignored."""
+    records = {}
+    if not os.path.isfile(index_path):
+        return records
+    with open(index_path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            records[record["run_id"]] = record
+    return records
+
+
+class SweepRunner:
+    """Bounded pool of training processes sharing a set of resource slots."""
+
+    def __init__(self, script, sweep_dir, slots, jobs_per_slot=1, slot_env=None, python=None, extra_args=None):
+        """
+        Args:
+            script (str): training script, called with +name=value arguments.
+            sweep_dir (str): directory of the run logs and of the index file.
+            slots (Sequence[str]): resource slots, e.g. GPU ids. Every run holds one of them.
+            jobs_per_slot (int): number of runs sharing a slot at the same time.
+            slot_env (Optional[str]): environment variable set to the slot of a run, e.g. CUDA_VISIBLE_DEVICES.
+            python (Optional[str]): python executable. Defaults to the current one.
+            extra_args (Optional[Sequence[str]]): arguments passed to every run.
+        """
+        self.script = script
+        self.sweep_dir = sweep_dir
+        self.slot_env = slot_env
+        self.python = sys.executable if python is None else python
+        self.extra_args = [] if extra_args is None else list(extra_args)
+        self.num_workers = len(slots) * jobs_per_slot
+
+        self._slots = queue.Queue()
+        for _ in range(jobs_per_slot):
+            for slot in slots:
+                self._slots.put(str(slot))
+        self._index_lock = threading.Lock()
+        self._processes = {}
+        self._stopping = False
+
+        os.makedirs(self.sweep_dir, exist_ok=True)
+        self.index_path = os.path.join(self.sweep_dir, INDEX_FILE)
+
+    def command(self, params):
+        arguments = [f"+{name}={value}" for name, value in params.items()]
+        return [self.python, self.script] + arguments + self.extra_args
+
+    def _record(self, record):
+        with self._index_lock:
+            with open(self.index_path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _run(self, rid, params):
+        slot = self._slots.get()
+        try:
+            if self._stopping:
+                return None
+            run_dir = os.path.join(self.sweep_dir, rid)
+            os.makedirs(run_dir, exist_ok=True)
+            log_path = os.path.join(run_dir, LOG_FILE)
+            env = dict(os.environ)
+            if self.slot_env is not None:
+                env[self.slot_env] = slot
+
+            record = {"run_id": rid, "params": params, "slot": slot, "log": os.path.relpath(log_path, self.sweep_dir)}
+            start = time.time()
+            self._record({**record, "status": "running", "start": start})
+            with open(log_path, "w") as log:
+                process = subprocess.Popen(self.command(params), stdout=log, stderr=subprocess.STDOUT, env=env)
+                self._processes[rid] = process
+                returncode = process.wait()
+                del self._processes[rid]
+
+            status = "completed" if returncode == 0 else ("killed" if self._stopping else "failed")
+            record.update(status=status, returncode=returncode, start=start, duration=time.time() - start)
+            self._record(record)
+            return record
+        finally:
+            self._slots.put(slot)
+
+    def run(self, runs, rerun_failed=True):
+        """Runs the configurations that are not completed yet.
+
+        Args:
+            runs (list): parameter dicts of the runs.
+            rerun_failed (bool): run again the configurations that failed or were killed.
+
+        Returns:
+            list: final index records of the runs started by this call.
+        """
+        previous = read_index(self.index_path)
+        pending = []
+        for params in runs:
+            rid = run_id(self.script, params)
+            status = previous.get(rid, {}).get("status")
+            if status == "completed" or (status == "failed" and not rerun_failed):
+                continue
+            pending.append((rid, params))
+        print(f"{len(runs) - len(pending)} of {len(runs)} runs already done, {self.num_workers} parallel workers")
+
+        results = []
+        with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+            futures = [executor.submit(self._run, rid, params) for rid, params in pending]
+            try:
+                for i, future in enumerate(futures, start=1):
+                    record = future.result()
+                    if record is not None:
+                        results.append(record)
+                        print(
+                            f"[{i}/{len(pending)}] {record['run_id']} {record['status']} "
+                            f"in {record['duration']:.0f}s: {record['params']}"
+                        )
+            except KeyboardInterrupt:
+                self.stop()
+                raise
+        return results
+
+    def stop(self):
+        """Terminates the running processes and prevents queued runs from starting."""
+        self._stopping = True
+        for process in list(self._processes.values()):
+            process.terminate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a hyperparameter sweep in parallel.")
+    parser.add_argument("--config", default="launch_config.yaml")
+    parser.add_argument("--script", default="scripts/skrl/diana_tekken_ppofd.py")
+    parser.add_argument("--sweep_dir", default=None, help="Defaults to sweeps/<config name>")
+    parser.add_argument("--slots", nargs="+", default=["0"], help="Resource slots shared by the runs, e.g. GPU ids")
+    parser.add_argument("--jobs_per_slot", type=int, default=1)
+    parser.add_argument("--slot_env", default=None, help="Environment variable set to the slot of every run")
+    parser.add_argument("--python", default=None, help="Python executable. Defaults to the current one")
+    parser.add_argument("--no_rerun_failed", action="store_true", help="Skip the runs that failed before")
+    parser.add_argument("--dry_run", action="store_true", help="Print the commands without running them")
+    parser.add_argument("extra_args", nargs="*", help="Arguments passed to every run, e.g. headless=True")
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        runs = expand_configurations(yaml.safe_load(f)["configurations"])
+    sweep_dir = args.sweep_dir
+    if sweep_dir is None:
+        sweep_dir = os.path.join("sweeps", os.path.splitext(os.path.basename(args.config))[0])
+
+    runner = SweepRunner(
+        args.script,
+        sweep_dir,
+        args.slots,
+        jobs_per_slot=args.jobs_per_slot,
+        slot_env=args.slot_env,
+        python=args.python,
+        extra_args=args.extra_args,
+    )
+    if args.dry_run:
+        for params in runs:
+            print(run_id(args.script, params), " ".join(runner.command(params)))
+        return
+
+    results = runner.run(runs, rerun_failed=not args.no_rerun_failed)
+    failed = [record for record in results if record["status"] != "completed"]
+    print(f"{len(results) - len(failed)} runs completed, {len(failed)} failed. Index: {runner.index_path}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
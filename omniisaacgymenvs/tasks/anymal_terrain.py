@@ -34,10 +34,14 @@ from omni.isaac.core.simulation_context import SimulationContext
 from omni.isaac.core.utils.prims import get_prim_at_path
 from omni.isaac.core.utils.stage import get_current_stage
 from omni.isaac.core.utils.torch.rotations import *
+from omniisaacgymenvs.tasks.base.observation_spec import ObservationSpec
 from omniisaacgymenvs.tasks.base.rl_task import RLTask
+from omniisaacgymenvs.robots.actuators.joint_actuators import JointActuators
 from omniisaacgymenvs.robots.articulations.anymal import Anymal
 from omniisaacgymenvs.robots.articulations.views.anymal_view import AnymalView
 from omniisaacgymenvs.tasks.utils.anymal_terrain_generator import *
+from omniisaacgymenvs.tasks.utils.heightfield_sampler import HeightfieldSampler, HeightScanPattern
+from omniisaacgymenvs.tasks.utils.terrain_curriculum import TerrainCurriculum
 from omniisaacgymenvs.utils.terrain_utils.terrain_utils import *
 from pxr import UsdLux, UsdPhysics
 
@@ -50,14 +54,14 @@ class AnymalTerrainTask(RLTask):
         self.init_done = False
         self._env_spacing = 0.0
 
-        self._num_observations = 188
         self._num_actions = 12
 
         self.update_config(sim_config)
+        self._init_observation_spec()
 
         RLTask.__init__(self, name, env)
 
-        self.height_points = self.init_height_points()
+        self.height_scan = self.init_height_points()
         self.measured_heights = None
         # joint positions offsets
         self.default_dof_pos = torch.zeros(
@@ -93,6 +97,8 @@ class AnymalTerrainTask(RLTask):
         self.dof_pos_scale = self._task_cfg["env"]["learn"]["dofPositionScale"]
         self.dof_vel_scale = self._task_cfg["env"]["learn"]["dofVelocityScale"]
         self.height_meas_scale = self._task_cfg["env"]["learn"]["heightMeasurementScale"]
+        self.height_meas_mode = self._task_cfg["env"]["learn"].get("heightMeasurementMode", "min")
+        self.height_meas_yaw_resolution = self._task_cfg["env"]["learn"].get("heightMeasurementYawResolution")
         self.action_scale = self._task_cfg["env"]["control"]["actionScale"]
 
         # reward scales
@@ -133,6 +139,17 @@ class AnymalTerrainTask(RLTask):
         self.push_interval = int(self._task_cfg["env"]["learn"]["pushInterval_s"] / self.dt + 0.5)
         self.Kp = self._task_cfg["env"]["control"]["stiffness"]
         self.Kd = self._task_cfg["env"]["control"]["damping"]
+        # configs without actuator groups keep the PD law on all joints
+        default_actuators = {
+            "legs": {
+                "joints": [".*"],
+                "model": "IdealPD",
+                "stiffness": self.Kp,
+                "damping": self.Kd,
+                "effortLimit": 80.0,
+            }
+        }
+        self.actuators_cfg = self._task_cfg["env"]["control"].get("actuators", default_actuators)
         self.curriculum = self._task_cfg["env"]["terrain"]["curriculum"]
         self.base_threshold = 0.2
         self.knee_threshold = 0.1
@@ -154,21 +171,36 @@ class AnymalTerrainTask(RLTask):
 
         self._task_cfg["sim"]["add_ground_plane"] = False
 
-    def _get_noise_scale_vec(self, cfg):
-        noise_vec = torch.zeros_like(self.obs_buf[0])
-        self.add_noise = self._task_cfg["env"]["learn"]["addNoise"]
-        noise_level = self._task_cfg["env"]["learn"]["noiseLevel"]
-        noise_vec[:3] = self._task_cfg["env"]["learn"]["linearVelocityNoise"] * noise_level * self.lin_vel_scale
-        noise_vec[3:6] = self._task_cfg["env"]["learn"]["angularVelocityNoise"] * noise_level * self.ang_vel_scale
-        noise_vec[6:9] = self._task_cfg["env"]["learn"]["gravityNoise"] * noise_level
-        noise_vec[9:12] = 0.0  # commands
-        noise_vec[12:24] = self._task_cfg["env"]["learn"]["dofPositionNoise"] * noise_level * self.dof_pos_scale
-        noise_vec[24:36] = self._task_cfg["env"]["learn"]["dofVelocityNoise"] * noise_level * self.dof_vel_scale
-        noise_vec[36:176] = (
-            self._task_cfg["env"]["learn"]["heightMeasurementNoise"] * noise_level * self.height_meas_scale
+    def _init_observation_spec(self):
+        learn_cfg = self._task_cfg["env"]["learn"]
+        self.add_noise = learn_cfg["addNoise"]
+        noise_level = learn_cfg["noiseLevel"]
+
+        self.observation_spec = ObservationSpec()
+        self.observation_spec.add_term(
+            "base_lin_vel", 3, scale=self.lin_vel_scale, noise=learn_cfg["linearVelocityNoise"] * noise_level
+        )
+        self.observation_spec.add_term(
+            "base_ang_vel", 3, scale=self.ang_vel_scale, noise=learn_cfg["angularVelocityNoise"] * noise_level
+        )
+        self.observation_spec.add_term("projected_gravity", 3, noise=learn_cfg["gravityNoise"] * noise_level)
+        self.observation_spec.add_term(
+            "commands", 3, scale=[self.lin_vel_scale, self.lin_vel_scale, self.ang_vel_scale]
+        )
+        self.observation_spec.add_term(
+            "dof_pos", 12, scale=self.dof_pos_scale, noise=learn_cfg["dofPositionNoise"] * noise_level
+        )
+        self.observation_spec.add_term(
+            "dof_vel", 12, scale=self.dof_vel_scale, noise=learn_cfg["dofVelocityNoise"] * noise_level
+        )
+        self.observation_spec.add_term(
+            "heights",
+            140,
+            scale=self.height_meas_scale,
+            clip=1.0,
+            noise=learn_cfg["heightMeasurementNoise"] * noise_level,
         )
-        noise_vec[176:188] = 0.0  # previous actions
-        return noise_vec
+        self.observation_spec.add_term("actions", 12)
 
     def init_height_points(self):
         # 1mx1.6m rectangle (without center line)
@@ -181,13 +213,14 @@ class AnymalTerrainTask(RLTask):
         grid_x, grid_y = torch.meshgrid(x, y, indexing='ij')
 
         self.num_height_points = grid_x.numel()
-        points = torch.zeros(self.num_envs, self.num_height_points, 3, device=self.device, requires_grad=False)
-        points[:, :, 0] = grid_x.flatten()
-        points[:, :, 1] = grid_y.flatten()
-        return points
+        points = torch.stack((grid_x.flatten(), grid_y.flatten()), dim=1)
+        return HeightScanPattern(points, self.num_envs, self.device, yaw_resolution=self.height_meas_yaw_resolution)
 
     def _create_trimesh(self, create_mesh=True):
-        self.terrain = Terrain(self._task_cfg["env"]["terrain"], num_robots=self.num_envs)
+        terrain_cfg = self._task_cfg["env"]["terrain"]
+        self.terrain = Terrain(
+            terrain_cfg, num_robots=self.num_envs, seed=self._rand_seed, cache_dir=terrain_cfg.get("cacheDir")
+        )
         vertices = self.terrain.vertices
         triangles = self.terrain.triangles
         position = torch.tensor([-self.terrain.border_size, -self.terrain.border_size, 0.0])
@@ -196,6 +229,13 @@ class AnymalTerrainTask(RLTask):
         self.height_samples = (
             torch.tensor(self.terrain.heightsamples).view(self.terrain.tot_rows, self.terrain.tot_cols).to(self.device)
         )
+        self.height_sampler = HeightfieldSampler(
+            self.height_samples,
+            self.terrain.horizontal_scale,
+            self.terrain.vertical_scale,
+            border_size=self.terrain.border_size,
+            mode=self.height_meas_mode,
+        )
 
     def set_up_scene(self, scene) -> None:
         self._stage = get_current_stage()
@@ -228,17 +268,23 @@ class AnymalTerrainTask(RLTask):
         scene.add(self._anymals._base)
 
     def get_terrain(self, create_mesh=True):
-        self.env_origins = torch.zeros((self.num_envs, 3), device=self.device, requires_grad=False)
+        terrain_cfg = self._task_cfg["env"]["terrain"]
         if not self.curriculum:
-            self._task_cfg["env"]["terrain"]["maxInitMapLevel"] = self._task_cfg["env"]["terrain"]["numLevels"] - 1
-        self.terrain_levels = torch.randint(
-            0, self._task_cfg["env"]["terrain"]["maxInitMapLevel"] + 1, (self.num_envs,), device=self.device
-        )
-        self.terrain_types = torch.randint(
-            0, self._task_cfg["env"]["terrain"]["numTerrains"], (self.num_envs,), device=self.device
-        )
+            terrain_cfg["maxInitMapLevel"] = terrain_cfg["numLevels"] - 1
         self._create_trimesh(create_mesh=create_mesh)
-        self.terrain_origins = torch.from_numpy(self.terrain.env_origins).to(self.device).to(torch.float)
+        self.terrain_curriculum = TerrainCurriculum(
+            torch.from_numpy(self.terrain.env_origins),
+            self.num_envs,
+            self.device,
+            max_init_level=terrain_cfg["maxInitMapLevel"],
+            promote_distance=self.terrain.env_length / 2,
+            solved_level=terrain_cfg.get("solvedLevel", "wrap"),
+        )
+        # views of the curriculum tensors, updated in place
+        self.terrain_levels = self.terrain_curriculum.levels
+        self.terrain_types = self.terrain_curriculum.types
+        self.terrain_origins = self.terrain_curriculum.terrain_origins
+        self.env_origins = self.terrain_curriculum.env_origins
 
     def get_anymal(self):
         anymal_translation = torch.tensor([0.0, 0.0, 0.66])
@@ -272,7 +318,6 @@ class AnymalTerrainTask(RLTask):
         self.up_axis_idx = 2
         self.common_step_counter = 0
         self.extras = {}
-        self.noise_scale_vec = self._get_noise_scale_vec(self._task_cfg)
         self.commands = torch.zeros(
             self.num_envs, 4, dtype=torch.float, device=self.device, requires_grad=False
         )  # x vel, y vel, yaw vel, heading
@@ -299,8 +344,6 @@ class AnymalTerrainTask(RLTask):
         self.feet_air_time = torch.zeros(self.num_envs, 4, dtype=torch.float, device=self.device, requires_grad=False)
         self.last_dof_vel = torch.zeros((self.num_envs, 12), dtype=torch.float, device=self.device, requires_grad=False)
 
-        for i in range(self.num_envs):
-            self.env_origins[i] = self.terrain_origins[self.terrain_levels[i], self.terrain_types[i]]
         self.num_dof = self._anymals.num_dof
         self.dof_pos = torch.zeros((self.num_envs, self.num_dof), dtype=torch.float, device=self.device)
         self.dof_vel = torch.zeros((self.num_envs, self.num_dof), dtype=torch.float, device=self.device)
@@ -309,8 +352,14 @@ class AnymalTerrainTask(RLTask):
         self.base_velocities = torch.zeros((self.num_envs, 6), dtype=torch.float, device=self.device)
 
         self.knee_pos = torch.zeros((self.num_envs * 4, 3), dtype=torch.float, device=self.device)
+        self.measured_heights = torch.zeros(
+            (self.num_envs, self.num_height_points), dtype=torch.float, device=self.device
+        )
         self.knee_quat = torch.zeros((self.num_envs * 4, 4), dtype=torch.float, device=self.device)
 
+        self.actuators = JointActuators(self.actuators_cfg, self.dof_names, self.num_envs, self.device)
+        self.dof_targets = torch.zeros((self.num_envs, self.num_dof), dtype=torch.float, device=self.device)
+
         indices = torch.arange(self._num_envs, dtype=torch.int64, device=self._device)
         self.reset_idx(indices)
         self.init_done = True
@@ -325,9 +374,7 @@ class AnymalTerrainTask(RLTask):
         self.dof_vel[env_ids] = velocities
 
         self.update_terrain_level(env_ids)
-        self.base_pos[env_ids] = self.base_init_state[0:3]
-        self.base_pos[env_ids, 0:3] += self.env_origins[env_ids]
-        self.base_pos[env_ids, 0:2] += torch_rand_float(-0.5, 0.5, (len(env_ids), 2), device=self.device)
+        self.base_pos[env_ids] = self.base_init_state[0:3] + self.terrain_curriculum.sample_positions(env_ids, 0.5)
         self.base_quat[env_ids] = self.base_init_state[3:7]
         self.base_velocities[env_ids] = self.base_init_state[7:]
 
@@ -353,6 +400,7 @@ class AnymalTerrainTask(RLTask):
 
         self.last_actions[env_ids] = 0.0
         self.last_dof_vel[env_ids] = 0.0
+        self.actuators.reset(env_ids)
         self.feet_air_time[env_ids] = 0.0
         self.progress_buf[env_ids] = 0
         self.reset_buf[env_ids] = 1
@@ -364,7 +412,7 @@ class AnymalTerrainTask(RLTask):
                 torch.mean(self.episode_sums[key][env_ids]) / self.max_episode_length_s
             )
             self.episode_sums[key][env_ids] = 0.0
-        self.extras["episode"]["terrain_level"] = torch.mean(self.terrain_levels.float())
+        self.extras["episode"]["terrain_level"] = self.terrain_curriculum.mean_level()
 
     def update_terrain_level(self, env_ids):
         if not self.init_done or not self.curriculum:
@@ -372,12 +420,9 @@ class AnymalTerrainTask(RLTask):
             return
         root_pos, _ = self._anymals.get_world_poses(clone=False)
         distance = torch.norm(root_pos[env_ids, :2] - self.env_origins[env_ids, :2], dim=1)
-        self.terrain_levels[env_ids] -= 1 * (
-            distance < torch.norm(self.commands[env_ids, :2]) * self.max_episode_length_s * 0.25
-        )
-        self.terrain_levels[env_ids] += 1 * (distance > self.terrain.env_length / 2)
-        self.terrain_levels[env_ids] = torch.clip(self.terrain_levels[env_ids], 0) % self.terrain.env_rows
-        self.env_origins[env_ids] = self.terrain_origins[self.terrain_levels[env_ids], self.terrain_types[env_ids]]
+        # envs that walked less than a quarter of their commanded distance move down
+        required_distance = torch.norm(self.commands[env_ids, :2], dim=1) * self.max_episode_length_s * 0.25
+        self.terrain_curriculum.update(env_ids, distance, required_distance)
 
     def refresh_dof_state_tensors(self):
         self.dof_pos = self._anymals.get_joint_positions(clone=False)
@@ -393,16 +438,11 @@ class AnymalTerrainTask(RLTask):
             return
 
         self.actions = actions.clone().to(self.device)
+        torch.mul(self.actions, self.action_scale, out=self.dof_targets).add_(self.default_dof_pos)
         for i in range(self.decimation):
             if self.world.is_playing():
-                torques = torch.clip(
-                    self.Kp * (self.action_scale * self.actions + self.default_dof_pos - self.dof_pos)
-                    - self.Kd * self.dof_vel,
-                    -80.0,
-                    80.0,
-                )
-                self._anymals.set_joint_efforts(torques)
-                self.torques = torques
+                self.torques = self.actuators.compute(self.dof_targets, self.dof_pos, self.dof_vel)
+                self._anymals.set_joint_efforts(self.torques)
                 SimulationContext.step(self.world, render=False)
                 self.refresh_dof_state_tensors()
 
@@ -430,13 +470,11 @@ class AnymalTerrainTask(RLTask):
             self.get_states()
             self.calculate_metrics()
 
-            env_ids = self.reset_buf.nonzero(as_tuple=False).flatten()
-            if len(env_ids) > 0:
-                self.reset_idx(env_ids)
+            self.apply_resets()
 
             self.get_observations()
-            if self.add_noise:
-                self.obs_buf += (2 * torch.rand_like(self.obs_buf) - 1) * self.noise_scale_vec
+            self.observation_spec.add_noise = self.add_noise
+            self.observation_spec.compute(self.obs_buf)
 
             self.last_actions[:] = self.actions[:]
             self.last_dof_vel[:] = self.dof_vel[:]
@@ -533,83 +571,29 @@ class AnymalTerrainTask(RLTask):
         self.episode_sums["hip"] += rew_hip
 
     def get_observations(self):
-        self.measured_heights = self.get_heights()
-        heights = (
-            torch.clip(self.base_pos[:, 2].unsqueeze(1) - 0.5 - self.measured_heights, -1, 1.0) * self.height_meas_scale
-        )
-        self.obs_buf = torch.cat(
-            (
-                self.base_lin_vel * self.lin_vel_scale,
-                self.base_ang_vel * self.ang_vel_scale,
-                self.projected_gravity,
-                self.commands[:, :3] * self.commands_scale,
-                self.dof_pos * self.dof_pos_scale,
-                self.dof_vel * self.dof_vel_scale,
-                heights,
-                self.actions,
-            ),
-            dim=-1,
-        )
+        obs = self.observation_spec.raw
+        self.get_heights(out=self.measured_heights)
+        torch.sub(self.base_pos[:, 2].unsqueeze(1) - 0.5, self.measured_heights, out=obs["heights"])
+        obs["base_lin_vel"].copy_(self.base_lin_vel)
+        obs["base_ang_vel"].copy_(self.base_ang_vel)
+        obs["projected_gravity"].copy_(self.projected_gravity)
+        obs["commands"].copy_(self.commands[:, :3])
+        obs["dof_pos"].copy_(self.dof_pos)
+        obs["dof_vel"].copy_(self.dof_vel)
+        obs["actions"].copy_(self.actions)
 
     def get_ground_heights_below_knees(self):
-        points = self.knee_pos.reshape(self.num_envs, 4, 3)
-        points += self.terrain.border_size
-        points = (points / self.terrain.horizontal_scale).long()
-        px = points[:, :, 0].view(-1)
-        py = points[:, :, 1].view(-1)
-        px = torch.clip(px, 0, self.height_samples.shape[0] - 2)
-        py = torch.clip(py, 0, self.height_samples.shape[1] - 2)
-
-        heights1 = self.height_samples[px, py]
-        heights2 = self.height_samples[px + 1, py + 1]
-        heights = torch.min(heights1, heights2)
-        return heights.view(self.num_envs, -1) * self.terrain.vertical_scale
+        return self.height_sampler.sample(self.knee_pos.view(self.num_envs, 4, 3), mode="min")
 
     def get_ground_heights_below_base(self):
-        points = self.base_pos.reshape(self.num_envs, 1, 3)
-        points += self.terrain.border_size
-        points = (points / self.terrain.horizontal_scale).long()
-        px = points[:, :, 0].view(-1)
-        py = points[:, :, 1].view(-1)
-        px = torch.clip(px, 0, self.height_samples.shape[0] - 2)
-        py = torch.clip(py, 0, self.height_samples.shape[1] - 2)
-
-        heights1 = self.height_samples[px, py]
-        heights2 = self.height_samples[px + 1, py + 1]
-        heights = torch.min(heights1, heights2)
-        return heights.view(self.num_envs, -1) * self.terrain.vertical_scale
-
-    def get_heights(self, env_ids=None):
-        if env_ids:
-            points = quat_apply_yaw(
-                self.base_quat[env_ids].repeat(1, self.num_height_points), self.height_points[env_ids]
-            ) + (self.base_pos[env_ids, 0:3]).unsqueeze(1)
-        else:
-            points = quat_apply_yaw(self.base_quat.repeat(1, self.num_height_points), self.height_points) + (
-                self.base_pos[:, 0:3]
-            ).unsqueeze(1)
-
-        points += self.terrain.border_size
-        points = (points / self.terrain.horizontal_scale).long()
-        px = points[:, :, 0].view(-1)
-        py = points[:, :, 1].view(-1)
-        px = torch.clip(px, 0, self.height_samples.shape[0] - 2)
-        py = torch.clip(py, 0, self.height_samples.shape[1] - 2)
+        return self.height_sampler.sample(self.base_pos.view(self.num_envs, 1, 3), mode="min")
 
-        heights1 = self.height_samples[px, py]
-
-        heights2 = self.height_samples[px + 1, py + 1]
-        heights = torch.min(heights1, heights2)
-
-        return heights.view(self.num_envs, -1) * self.terrain.vertical_scale
-
-
-@torch.jit.script
-def quat_apply_yaw(quat, vec):
-    quat_yaw = quat.clone().view(-1, 4)
-    quat_yaw[:, 1:3] = 0.0
-    quat_yaw = normalize(quat_yaw)
-    return quat_apply(quat_yaw, vec)
+    def get_heights(self, env_ids=None, out=None):
+        if env_ids is None:
+            points = self.height_scan.transform(self.base_pos, self.base_quat)
+        else:
+            points = self.height_scan.transform(self.base_pos[env_ids], self.base_quat[env_ids])
+        return self.height_sampler.sample(points, out=out)
 
 
 @torch.jit.script
@@ -38,6 +38,7 @@ from omni.isaac.core.utils.stage import get_current_stage
 from omni.isaac.core.utils.torch.maths import *
 from omniisaacgymenvs.tasks.base.rl_task import RLTask
 from omniisaacgymenvs.robots.articulations.balance_bot import BalanceBot
+from omniisaacgymenvs.tasks.utils.usd_utils import define_fixed_joints
 from pxr import PhysxSchema
 
 
@@ -121,40 +122,23 @@ class BallBalanceTask(RLTask):
         )
 
     def set_up_table_anchors(self):
-        from pxr import Gf
         height = 0.08
-        stage = get_current_stage()
-        for i in range(self._num_envs):
-            base_path = f"{self.default_base_env_path}/env_{i}/BalanceBot"
-            for j, leg_offset in enumerate([(0.4, 0, height), (-0.2, 0.34641, 0), (-0.2, -0.34641, 0)]):
-                # fix the legs to ground
-                leg_path = f"{base_path}/lower_leg{j}"
-                ground_joint_path = leg_path + "_ground"
-                env_pos = stage.GetPrimAtPath(f"{self.default_base_env_path}/env_{i}").GetAttribute("xformOp:translate").Get()
-                anchor_pos = env_pos + Gf.Vec3d(*leg_offset)
-                self.fix_to_ground(stage, ground_joint_path, leg_path, anchor_pos)
-
-    def fix_to_ground(self, stage, joint_path, prim_path, anchor_pos):
-        from pxr import UsdPhysics, Gf
-        # D6 fixed joint
-        d6FixedJoint = UsdPhysics.Joint.Define(stage, joint_path)
-        d6FixedJoint.CreateBody0Rel().SetTargets(["/World/defaultGroundPlane"])
-        d6FixedJoint.CreateBody1Rel().SetTargets([prim_path])
-        d6FixedJoint.CreateLocalPos0Attr().Set(anchor_pos)
-        d6FixedJoint.CreateLocalRot0Attr().Set(Gf.Quatf(1.0, Gf.Vec3f(0, 0, 0)))
-        d6FixedJoint.CreateLocalPos1Attr().Set(Gf.Vec3f(0, 0, 0.18))
-        d6FixedJoint.CreateLocalRot1Attr().Set(Gf.Quatf(1.0, Gf.Vec3f(0, 0, 0)))
-        # lock all DOF (lock - low is greater than high)
-        d6Prim = stage.GetPrimAtPath(joint_path)
-        limitAPI = UsdPhysics.LimitAPI.Apply(d6Prim, "transX")
-        limitAPI.CreateLowAttr(1.0)
-        limitAPI.CreateHighAttr(-1.0)
-        limitAPI = UsdPhysics.LimitAPI.Apply(d6Prim, "transY")
-        limitAPI.CreateLowAttr(1.0)
-        limitAPI.CreateHighAttr(-1.0)
-        limitAPI = UsdPhysics.LimitAPI.Apply(d6Prim, "transZ")
-        limitAPI.CreateLowAttr(1.0)
-        limitAPI.CreateHighAttr(-1.0)
+        leg_offsets = torch.tensor([(0.4, 0, height), (-0.2, 0.34641, 0), (-0.2, -0.34641, 0)])
+        # fix the legs to ground with D6 joints locking all translations, anchored at the env positions of the cloner
+        anchor_pos = (self._env_pos.cpu().unsqueeze(1) + leg_offsets).view(-1, 3).tolist()
+        leg_paths = [
+            f"{self.default_base_env_path}/env_{i}/BalanceBot/lower_leg{j}"
+            for i in range(self._num_envs)
+            for j in range(len(leg_offsets))
+        ]
+        define_fixed_joints(
+            get_current_stage(),
+            joint_paths=[leg_path + "_ground" for leg_path in leg_paths],
+            body0_paths="/World/defaultGroundPlane",
+            body1_paths=leg_paths,
+            local_positions0=anchor_pos,
+            local_position1=(0, 0, 0.18),
+        )
 
     def get_observations(self) -> dict:
         ball_positions, ball_orientations = self._balls.get_world_poses(clone=False)
@@ -0,0 +1,181 @@
+# Copyright (c) 2018-2022, NVIDIA Corporation
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import math
+
+import numpy as np
+import torch
+
+
+class ObservationSpec:
+    """Declarative layout of a task observation vector.
+
+    Tasks register named terms with `add_term` before calling `RLTask.__init__`, write the
+    raw (unscaled) value of every term into the views in `raw`, and `RLTask` turns the raw
+    buffer into `obs_buf` with `compute`. For every column, in order:
+
+        obs = clamp(clamp(raw, term clip) * scale + noise, -clip_obs, clip_obs)
+
+    which matches scaling the terms by hand and clamping globally in the VecEnv, without
+    allocating or concatenating tensors each step.
+    """
+
+    def __init__(self):
+        self.terms = {}
+        self.num_observations = 0
+        self.raw_buf = None
+        self.raw = {}
+        self.add_noise = False
+
+    def add_term(self, name, size, scale=1.0, clip=None, noise=0.0):
+        """Registers a term at the end of the observation vector.
+
+        Args:
+            name (str): name of the term.
+            size (int): number of columns of the term.
+            scale (Union[float, Sequence[float]]): scale applied to the raw values, per term or per column.
+            clip (Optional[Union[float, Tuple[float, float]]]): bounds of the raw values, before scaling.
+                A single value c clips to [-c, c]. Defaults to no clipping.
+            noise (Union[float, Sequence[float]]): amplitude of the uniform noise added when add_noise
+                is set, in raw units (it is scaled together with the term).
+
+        Returns:
+            slice: columns of the term in the observation vector.
+        """
+        if name in self.terms:
+            raise ValueError(f"Observation term {name} is already registered")
+        if clip is None:
+            clip = (-math.inf, math.inf)
+        elif np.isscalar(clip):
+            clip = (-clip, clip)
+
+        obs_slice = slice(self.num_observations, self.num_observations + size)
+        self.terms[name] = {
+            "slice": obs_slice,
+            "size": size,
+            "scale": np.broadcast_to(np.asarray(scale, dtype=np.float32), (size,)),
+            "clip": (float(clip[0]), float(clip[1])),
+            "noise": np.broadcast_to(np.asarray(noise, dtype=np.float32), (size,)),
+        }
+        self.num_observations += size
+        return obs_slice
+
+    @property
+    def names(self):
+        return list(self.terms)
+
+    @property
+    def slices(self):
+        return {name: term["slice"] for name, term in self.terms.items()}
+
+    def layout(self):
+        """Returns the layout as plain python data, to be stored with recordings and checkpoints."""
+        return [
+            {
+                "name": name,
+                "size": term["size"],
+                "scale": term["scale"].tolist(),
+                "clip": list(term["clip"]),
+            }
+            for name, term in self.terms.items()
+        ]
+
+    def allocate(self, num_envs, device, clip_obs=math.inf):
+        """Allocates the raw buffer and the per-column normalization vectors.
+
+        Args:
+            num_envs (int): number of environments.
+            device (str): device of the buffers.
+            clip_obs (float): global clip applied to the scaled observations.
+        """
+        self.num_envs = num_envs
+        self.device = device
+        self.clip_obs = float(clip_obs)
+
+        self.raw_buf = torch.zeros((num_envs, self.num_observations), device=device, dtype=torch.float)
+        self.raw = {name: self.raw_buf[:, term["slice"]] for name, term in self.terms.items()}
+        self._noise_buf = torch.zeros((num_envs, self.num_observations), device=device, dtype=torch.float)
+
+        scale = np.concatenate([term["scale"] for term in self.terms.values()])
+        lower = np.concatenate([np.full(term["size"], term["clip"][0]) for term in self.terms.values()])
+        upper = np.concatenate([np.full(term["size"], term["clip"][1]) for term in self.terms.values()])
+        noise = np.concatenate([term["noise"] for term in self.terms.values()]) * np.abs(scale)
+
+        self._scaled = bool(np.any(scale != 1.0))
+        # Without noise, the global clip is folded into the bounds of the raw values
+        # so that the whole normalization is a single clamp (and a multiply if scaled)
+        self._fold_clip = bool(np.all(scale > 0.0))
+        raw_clip = self.clip_obs / np.where(scale > 0.0, scale, 1.0)
+        self._folded_lower = torch.tensor(np.maximum(lower, -raw_clip), device=device, dtype=torch.float)
+        self._folded_upper = torch.tensor(np.minimum(upper, raw_clip), device=device, dtype=torch.float)
+        self._lower = torch.tensor(lower, device=device, dtype=torch.float)
+        self._upper = torch.tensor(upper, device=device, dtype=torch.float)
+        self._scale = torch.tensor(scale, device=device, dtype=torch.float)
+        self._noise_scale = torch.tensor(noise, device=device, dtype=torch.float)
+
+    def compute(self, obs_buf):
+        """Writes the normalized observations into obs_buf."""
+        fold_clip = self._fold_clip and not self.add_noise
+        if fold_clip:
+            torch.clamp(self.raw_buf, self._folded_lower, self._folded_upper, out=obs_buf)
+        else:
+            torch.clamp(self.raw_buf, self._lower, self._upper, out=obs_buf)
+        if self._scaled:
+            obs_buf.mul_(self._scale)
+        if self.add_noise:
+            torch.rand((self.num_envs, self.num_observations), device=self.device, out=self._noise_buf)
+            obs_buf.add_(self._noise_buf.mul_(2.0).sub_(1.0).mul_(self._noise_scale))
+        if not fold_clip and self.clip_obs != math.inf:
+            obs_buf.clamp_(-self.clip_obs, self.clip_obs)
+        return obs_buf
+
+    def select_columns(self, layout):
+        """Returns the columns of this spec that reproduce an older layout.
+
+        Lets a policy trained with `layout` (as returned by `layout()`) run on observations of
+        this spec after terms have been added or reordered: `obs[:, spec.select_columns(layout)]`.
+
+        Args:
+            layout (list): layout the policy was trained with.
+
+        Returns:
+            torch.Tensor: column indices into the observation vector of this spec.
+        """
+        columns = []
+        for term in layout:
+            name = term["name"]
+            if name not in self.terms:
+                raise KeyError(f"Observation term {name} is not provided by this task")
+            if self.terms[name]["size"] != term["size"]:
+                raise ValueError(
+                    f"Observation term {name} has size {self.terms[name]['size']}, expected {term['size']}"
+                )
+            obs_slice = self.terms[name]["slice"]
+            columns.extend(range(obs_slice.start, obs_slice.stop))
+        return torch.tensor(columns, dtype=torch.long, device=self.device)
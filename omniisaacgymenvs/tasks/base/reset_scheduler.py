@@ -0,0 +1,123 @@
+# Copyright (c) 2018-2022, NVIDIA Corporation
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import torch
+
+
+class ResetScheduler:
+    """Keeps the envs flagged for reset as device masks and compacts them into ids when due.
+
+    Compacting the flagged envs into an index tensor with nonzero() is the only device to
+    host sync of a reset, and it is only needed by the view setters. With compaction_interval
+    k, ids are compacted every k steps only.
+
+    Tasks that implement `reset_masked(mask)` and `reset_views(env_ids)` reset in two parts.
+    Every step, `reset_masked` gets the mask of the newly flagged envs and starts their new
+    episode with masked operations on the task buffers, without syncing. Their simulation
+    state is written by `reset_views` on the next compaction step, up to k - 1 steps later.
+    Until then these envs are held: they step on their previous state, and `hold` clears
+    their reset flags so that a new episode is not reported done again before it starts.
+
+    Other tasks get `reset_idx(env_ids)` on compaction steps. Their flagged envs keep their
+    reset_buf set until then.
+    """
+
+    def __init__(self, num_envs, device, masked=True, compaction_interval=1):
+        """Allocates the masks.
+
+        Args:
+            num_envs (int): number of environments.
+            device (str): device of the task buffers.
+            masked (bool): reset with reset_masked and reset_views instead of reset_idx.
+            compaction_interval (int): number of steps between two compactions of the reset env ids.
+        """
+        if compaction_interval < 1:
+            raise ValueError("The reset compaction interval must be at least 1")
+        self.num_envs = num_envs
+        self.device = device
+        self.masked = masked
+        self.compaction_interval = compaction_interval
+
+        # envs newly flagged at this step
+        self.mask = torch.zeros(num_envs, dtype=torch.bool, device=device)
+        # flagged envs whose ids were not compacted yet
+        self.pending = torch.zeros(num_envs, dtype=torch.bool, device=device)
+        # envs with a reset in progress at this step, compacted at this step or still pending
+        self.held = torch.zeros(num_envs, dtype=torch.bool, device=device)
+        self._flags = torch.zeros(num_envs, dtype=torch.bool, device=device)
+        self._steps = 0
+
+    def update(self, reset_buf):
+        """Adds the reset flags of the current step to the pending resets. Does not sync."""
+        torch.ne(reset_buf, 0, out=self._flags)
+        # envs held for a reset that are flagged again do not start another one
+        torch.logical_and(self._flags, self.pending.logical_not(), out=self.mask)
+        self.pending.logical_or_(self.mask)
+        self.held.copy_(self.pending)
+        self._steps += 1
+
+    @property
+    def due(self):
+        """Whether the pending resets are compacted at this step."""
+        return self._steps % self.compaction_interval == 0
+
+    def compact(self):
+        """Returns the ids of the pending resets and clears them if compaction is due, else None.
+
+        This is the only place where the reset flags are synchronized to the host.
+        """
+        return self.compact_mask(self.pending)
+
+    def compact_mask(self, mask):
+        """Compacts another device mask accumulated by the task on the reset schedule.
+
+        Returns the ids of mask and clears it if compaction is due, else None.
+        """
+        if not self.due:
+            return None
+        env_ids = mask.nonzero(as_tuple=False).squeeze(-1)
+        mask.zero_()
+        return env_ids
+
+    def hold(self, reset_buf):
+        """Clears the reset flags of the envs still pending, which started their new episode already."""
+        if self.masked:
+            reset_buf.masked_fill_(self.pending, 0)
+
+    def masked_mean(self, values, previous=None):
+        """Mean of values over the envs in mask, as a 0-d tensor, without syncing.
+
+        If previous is given, it is kept when mask is empty.
+        """
+        count = self.mask.sum()
+        mean = torch.sum(values * self.mask) / count.clamp(min=1)
+        if previous is None:
+            return mean
+        return torch.where(count > 0, mean, previous)
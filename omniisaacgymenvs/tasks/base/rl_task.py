@@ -43,6 +43,7 @@ from omni.isaac.core.utils.prims import define_prim
 from omni.isaac.core.utils.stage import get_current_stage
 from omni.isaac.core.utils.types import ArticulationAction
 from omni.isaac.gym.tasks.rl_task import RLTaskInterface
+from omniisaacgymenvs.tasks.base.reset_scheduler import ResetScheduler
 from omniisaacgymenvs.utils.domain_randomization.randomize import Randomizer
 from pxr import Gf, UsdGeom, UsdLux
 
@@ -123,6 +124,10 @@ class RLTask(RLTaskInterface):
             self._num_agents = 1  # used for multi-agent environments
         if not hasattr(self, "_num_states"):
             self._num_states = 0
+        if not hasattr(self, "observation_spec"):
+            self.observation_spec = None  # optional ObservationSpec declaring the observation terms
+        if self.observation_spec is not None:
+            self._num_observations = self.observation_spec.num_observations
 
         # initialize data spaces (defaults to gym.Box)
         if not hasattr(self, "action_space"):
@@ -152,6 +157,16 @@ class RLTask(RLTaskInterface):
         self.reset_buf = torch.ones(self._num_envs, device=self._device, dtype=torch.long)
         self.progress_buf = torch.zeros(self._num_envs, device=self._device, dtype=torch.long)
         self.extras = {}
+        if self.observation_spec is not None:
+            self.observation_spec.allocate(self._num_envs, self._device, self.clip_obs)
+        # tasks implementing reset_masked reset without syncing on most steps, unless disabled in the config
+        masked = self._task_cfg["env"].get("maskedResets", True) and hasattr(self, "reset_masked")
+        self.reset_scheduler = ResetScheduler(
+            self._num_envs,
+            self._device,
+            masked=masked,
+            compaction_interval=self._task_cfg["env"].get("resetCompactionInterval", 4 if masked else 1),
+        )
 
     def set_up_scene(
         self, scene, replicate_physics=True, collision_filter_global_paths=[], filter_collisions=True, copy_from_source=False
@@ -252,6 +267,23 @@ class RLTask(RLTaskInterface):
         """Flags all environments for reset."""
         self.reset_buf = torch.ones_like(self.reset_buf)
 
+    def apply_resets(self):
+        """Resets the envs flagged in reset_buf.
+
+        When the task implements it, calls reset_masked(mask) with the newly flagged envs on every
+        step, and reset_views(env_ids) with the envs to write whenever the scheduler compacts them.
+        Otherwise calls reset_idx(env_ids) whenever the scheduler compacts them.
+        """
+        self.reset_scheduler.update(self.reset_buf)
+        if self.reset_scheduler.masked:
+            self.reset_masked(self.reset_scheduler.mask)
+        env_ids = self.reset_scheduler.compact()
+        if env_ids is not None and len(env_ids) > 0:
+            if self.reset_scheduler.masked:
+                self.reset_views(env_ids)
+            else:
+                self.reset_idx(env_ids)
+
     def post_physics_step(self):
         """Processes RL required computations for observations, states, rewards, resets, and extras.
             Also maintains progress buffer for tracking step count per environment.
@@ -267,9 +299,12 @@ class RLTask(RLTaskInterface):
 
         if self._env.world.is_playing():
             self.get_observations()
+            if self.observation_spec is not None:
+                self.observation_spec.compute(self.obs_buf)
             self.get_states()
             self.calculate_metrics()
             self.is_done()
+            self.reset_scheduler.hold(self.reset_buf)
             self.get_extras()
 
         return self.obs_buf, self.rew_buf, self.reset_buf, self.extras
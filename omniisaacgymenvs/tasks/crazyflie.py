@@ -33,18 +33,24 @@ from omni.isaac.core.objects import DynamicSphere
 from omni.isaac.core.prims import RigidPrimView
 from omni.isaac.core.utils.prims import get_prim_at_path
 from omni.isaac.core.utils.torch.rotations import *
+from omniisaacgymenvs.tasks.base.observation_spec import ObservationSpec
 from omniisaacgymenvs.tasks.base.rl_task import RLTask
+from omniisaacgymenvs.tasks.utils.rotor_dynamics import RotorDynamics
 from omniisaacgymenvs.robots.articulations.crazyflie import Crazyflie
 from omniisaacgymenvs.robots.articulations.views.crazyflie_view import CrazyflieView
 
-EPS = 1e-6  # small constant to avoid divisions by 0 and log(0)
-
 
 class CrazyflieTask(RLTask):
     def __init__(self, name, sim_config, env, offset=None) -> None:
         self.update_config(sim_config)
 
-        self._num_observations = 18
+        self.observation_spec = ObservationSpec()
+        self.observation_spec.add_term("target_pos", 3)
+        self.observation_spec.add_term("rot_x", 3)
+        self.observation_spec.add_term("rot_y", 3)
+        self.observation_spec.add_term("rot_z", 3)
+        self.observation_spec.add_term("lin_vel", 3)
+        self.observation_spec.add_term("ang_vel", 3)
         self._num_actions = 4
 
         self._crazyflie_position = torch.tensor([0, 0, 1.0])
@@ -72,11 +78,6 @@ class CrazyflieTask(RLTask):
         self.motor_damp_time_up = 0.15
         self.motor_damp_time_down = 0.15
 
-        # I use the multiplier 4, since 4*T ~ time for a step response to finish, where
-        # T is a time constant of the first-order filter
-        self.motor_tau_up = 4 * self.dt / (self.motor_damp_time_up + EPS)
-        self.motor_tau_down = 4 * self.dt / (self.motor_damp_time_down + EPS)
-
         # thrust max
         self.mass = 0.028
         self.thrust_to_weight = 1.9
@@ -97,6 +98,7 @@ class CrazyflieTask(RLTask):
         scene.add(self._balls)
         for i in range(4):
             scene.add(self._copters.physics_rotors[i])
+        scene.add(self._copters.rotors)
         return
 
     def initialize_views(self, scene):
@@ -107,12 +109,15 @@ class CrazyflieTask(RLTask):
             scene.remove_object("ball_view", registry_only=True)
         for i in range(1, 5):
             scene.remove_object(f"m{i}_prop_view", registry_only=True)
+        if scene.object_exists("rotors_view"):
+            scene.remove_object("rotors_view", registry_only=True)
         self._copters = CrazyflieView(prim_paths_expr="/World/envs/.*/Crazyflie", name="crazyflie_view")
         self._balls = RigidPrimView(prim_paths_expr="/World/envs/.*/ball", name="ball_view")
         scene.add(self._copters)
         scene.add(self._balls)
         for i in range(4):
             scene.add(self._copters.physics_rotors[i])
+        scene.add(self._copters.rotors)
 
     def get_crazyflie(self):
         copter = Crazyflie(
@@ -141,24 +146,18 @@ class CrazyflieTask(RLTask):
         self.root_pos, self.root_rot = self._copters.get_world_poses(clone=False)
         self.root_velocities = self._copters.get_velocities(clone=False)
 
-        root_positions = self.root_pos - self._env_pos
+        obs = self.observation_spec.raw
         root_quats = self.root_rot
 
-        rot_x = quat_axis(root_quats, 0)
-        rot_y = quat_axis(root_quats, 1)
-        rot_z = quat_axis(root_quats, 2)
-
-        root_linvels = self.root_velocities[:, :3]
-        root_angvels = self.root_velocities[:, 3:]
+        torch.sub(self.target_positions, self.root_pos, out=obs["target_pos"])
+        obs["target_pos"].add_(self._env_pos)
 
-        self.obs_buf[..., 0:3] = self.target_positions - root_positions
+        obs["rot_x"].copy_(quat_axis(root_quats, 0))
+        obs["rot_y"].copy_(quat_axis(root_quats, 1))
+        obs["rot_z"].copy_(quat_axis(root_quats, 2))
 
-        self.obs_buf[..., 3:6] = rot_x
-        self.obs_buf[..., 6:9] = rot_y
-        self.obs_buf[..., 9:12] = rot_z
-
-        self.obs_buf[..., 12:15] = root_linvels
-        self.obs_buf[..., 15:18] = root_angvels
+        obs["lin_vel"].copy_(self.root_velocities[:, :3])
+        obs["ang_vel"].copy_(self.root_velocities[:, 3:])
 
         observations = {self._copters.name: {"obs_buf": self.obs_buf}}
         return observations
@@ -167,104 +166,59 @@ class CrazyflieTask(RLTask):
         if not self.world.is_playing():
             return
 
-        reset_env_ids = self.reset_buf.nonzero(as_tuple=False).squeeze(-1)
-        if len(reset_env_ids) > 0:
-            self.reset_idx(reset_env_ids)
-
-        set_target_ids = (self.progress_buf % 500 == 0).nonzero(as_tuple=False).squeeze(-1)
-        if len(set_target_ids) > 0:
-            self.set_targets(set_target_ids)
-
-        actions = actions.clone().to(self._device)
-        self.actions = actions
-
-        # clamp to [-1.0, 1.0]
-        thrust_cmds = torch.clamp(actions, min=-1.0, max=1.0)
-        # scale to [0.0, 1.0]
-        thrust_cmds = (thrust_cmds + 1.0) / 2.0
-        # filtering the thruster and adding noise
-        motor_tau = self.motor_tau_up * torch.ones((self._num_envs, 4), dtype=torch.float32, device=self._device)
-        motor_tau[thrust_cmds < self.thrust_cmds_damp] = self.motor_tau_down
-        motor_tau[motor_tau > 1.0] = 1.0
-
-        # Since NN commands thrusts we need to convert to rot vel and back
-        thrust_rot = thrust_cmds**0.5
-        self.thrust_rot_damp = motor_tau * (thrust_rot - self.thrust_rot_damp) + self.thrust_rot_damp
-        self.thrust_cmds_damp = self.thrust_rot_damp**2
-
-        ## Adding noise
-        thrust_noise = 0.01 * torch.randn(4, dtype=torch.float32, device=self._device)
-        thrust_noise = thrust_cmds * thrust_noise
-        self.thrust_cmds_damp = torch.clamp(self.thrust_cmds_damp + thrust_noise, min=0.0, max=1.0)
-
-        thrusts = self.thrust_max * self.thrust_cmds_damp
-
-        # thrusts given rotation
-        root_quats = self.root_rot
-        rot_x = quat_axis(root_quats, 0)
-        rot_y = quat_axis(root_quats, 1)
-        rot_z = quat_axis(root_quats, 2)
-        rot_matrix = torch.cat((rot_x, rot_y, rot_z), 1).reshape(-1, 3, 3)
-
-        force_x = torch.zeros(self._num_envs, 4, dtype=torch.float32, device=self._device)
-        force_y = torch.zeros(self._num_envs, 4, dtype=torch.float32, device=self._device)
-        force_xy = torch.cat((force_x, force_y), 1).reshape(-1, 4, 2)
-        thrusts = thrusts.reshape(-1, 4, 1)
-        thrusts = torch.cat((force_xy, thrusts), 2)
-
-        thrusts_0 = thrusts[:, 0]
-        thrusts_0 = thrusts_0[:, :, None]
-
-        thrusts_1 = thrusts[:, 1]
-        thrusts_1 = thrusts_1[:, :, None]
+        self.apply_resets()
 
-        thrusts_2 = thrusts[:, 2]
-        thrusts_2 = thrusts_2[:, :, None]
+        if self.reset_scheduler.masked:
+            # targets due between two compactions are set on the next one, with the resets
+            self._set_target_mask.logical_or_(torch.remainder(self.progress_buf, 500) == 0)
+            set_target_ids = self.reset_scheduler.compact_mask(self._set_target_mask)
+            if set_target_ids is not None and len(set_target_ids) > 0:
+                self.set_targets(set_target_ids)
+        else:
+            set_target_ids = (self.progress_buf % 500 == 0).nonzero(as_tuple=False).squeeze(-1)
+            if len(set_target_ids) > 0:
+                self.set_targets(set_target_ids)
 
-        thrusts_3 = thrusts[:, 3]
-        thrusts_3 = thrusts_3[:, :, None]
+        self.actions.copy_(actions)
 
-        mod_thrusts_0 = torch.matmul(rot_matrix, thrusts_0)
-        mod_thrusts_1 = torch.matmul(rot_matrix, thrusts_1)
-        mod_thrusts_2 = torch.matmul(rot_matrix, thrusts_2)
-        mod_thrusts_3 = torch.matmul(rot_matrix, thrusts_3)
-
-        self.thrusts[:, 0] = torch.squeeze(mod_thrusts_0)
-        self.thrusts[:, 1] = torch.squeeze(mod_thrusts_1)
-        self.thrusts[:, 2] = torch.squeeze(mod_thrusts_2)
-        self.thrusts[:, 3] = torch.squeeze(mod_thrusts_3)
+        # filtered rotor thrusts, rotated to the world frame for all rotors at once
+        self.rotor_dynamics.step(self.actions)
+        self.rotor_dynamics.forces(self.root_rot, out=self.thrusts)
 
         # clear actions for reset envs
-        self.thrusts[reset_env_ids] = 0
+        self.thrusts.masked_fill_(self.reset_scheduler.held.view(-1, 1, 1), 0.0)
 
         # spin spinning rotors
-        prop_rot = self.thrust_cmds_damp * self.prop_max_rot
-        self.dof_vel[:, 0] = prop_rot[:, 0]
-        self.dof_vel[:, 1] = -1.0 * prop_rot[:, 1]
-        self.dof_vel[:, 2] = prop_rot[:, 2]
-        self.dof_vel[:, 3] = -1.0 * prop_rot[:, 3]
-
+        torch.mul(self.rotor_dynamics.thrust_cmds_damp, self._prop_rot_scale, out=self.dof_vel[:, 0:4])
         self._copters.set_joint_velocities(self.dof_vel)
 
         # apply actions
-        for i in range(4):
-            self._copters.physics_rotors[i].apply_forces(self.thrusts[:, i], indices=self.all_indices)
+        self._copters.rotors.apply_forces(self.thrusts.view(-1, 3))
 
     def post_reset(self):
         thrust_max = self.grav_z * self.mass * self.thrust_to_weight * self.motor_assymetry / 4.0
+        self.rotor_dynamics = RotorDynamics(
+            self._num_envs,
+            4,
+            self.dt,
+            thrust_max,
+            motor_damp_time_up=self.motor_damp_time_up,
+            motor_damp_time_down=self.motor_damp_time_down,
+            device=self._device,
+        )
         self.thrusts = torch.zeros((self._num_envs, 4, 3), dtype=torch.float32, device=self._device)
-        self.thrust_cmds_damp = torch.zeros((self._num_envs, 4), dtype=torch.float32, device=self._device)
-        self.thrust_rot_damp = torch.zeros((self._num_envs, 4), dtype=torch.float32, device=self._device)
-        self.thrust_max = torch.tensor(thrust_max, device=self._device, dtype=torch.float32)
 
         self.motor_linearity = 1.0
         self.prop_max_rot = 433.3
+        # rotors 1 and 3 spin the other way
+        self._prop_rot_scale = torch.tensor([1.0, -1.0, 1.0, -1.0], device=self._device) * self.prop_max_rot
 
         self.target_positions = torch.zeros((self._num_envs, 3), device=self._device, dtype=torch.float32)
         self.target_positions[:, 2] = 1
         self.actions = torch.zeros((self._num_envs, 4), device=self._device, dtype=torch.float32)
 
         self.all_indices = torch.arange(self._num_envs, dtype=torch.int32, device=self._device)
+        self._set_target_mask = torch.zeros(self._num_envs, dtype=torch.bool, device=self._device)
 
         # Extra info
         self.extras = {}
@@ -289,11 +243,6 @@ class CrazyflieTask(RLTask):
         self.initial_ball_pos, self.initial_ball_rot = self._balls.get_world_poses(clone=False)
         self.initial_root_pos, self.initial_root_rot = self.root_pos.clone(), self.root_rot.clone()
 
-        # control parameters
-        self.thrusts = torch.zeros((self._num_envs, 4, 3), dtype=torch.float32, device=self._device)
-        self.thrust_cmds_damp = torch.zeros((self._num_envs, 4), dtype=torch.float32, device=self._device)
-        self.thrust_rot_damp = torch.zeros((self._num_envs, 4), dtype=torch.float32, device=self._device)
-
         self.set_targets(self.all_indices)
 
     def set_targets(self, env_ids):
@@ -308,7 +257,27 @@ class CrazyflieTask(RLTask):
         ball_pos[:, 2] += 0.0
         self._balls.set_world_poses(ball_pos[:, 0:3], self.initial_ball_rot[envs_long].clone(), indices=env_ids)
 
-    def reset_idx(self, env_ids):
+    def reset_masked(self, mask):
+        """Starts a new episode for the envs in mask, their copters are written by reset_views."""
+        # bookkeeping
+        self.reset_buf.masked_fill_(mask, 0)
+        self.progress_buf.masked_fill_(mask, 0)
+
+        self.rotor_dynamics.reset(mask)
+
+        # fill extras, keeping the previous values on steps without resets
+        previous = self.extras.get("episode", {})
+        self.extras["episode"] = {}
+        for key in self.episode_sums.keys():
+            self.extras["episode"][key] = self.reset_scheduler.masked_mean(
+                self.episode_sums[key] / self._max_episode_length, previous.get(key)
+            )
+            self.episode_sums[key].masked_fill_(mask, 0.0)
+
+    def reset_views(self, env_ids):
+        self._reset_copters(env_ids)
+
+    def _reset_copters(self, env_ids):
         num_resets = len(env_ids)
 
         self.dof_pos[env_ids, :] = torch_rand_float(-0.0, 0.0, (num_resets, self._copters.num_dof), device=self._device)
@@ -328,12 +297,14 @@ class CrazyflieTask(RLTask):
         self._copters.set_world_poses(root_pos[env_ids], self.initial_root_rot[env_ids].clone(), indices=env_ids)
         self._copters.set_velocities(root_velocities[env_ids], indices=env_ids)
 
+    def reset_idx(self, env_ids):
+        self._reset_copters(env_ids)
+
         # bookkeeping
         self.reset_buf[env_ids] = 0
         self.progress_buf[env_ids] = 0
 
-        self.thrust_cmds_damp[env_ids] = 0
-        self.thrust_rot_damp[env_ids] = 0
+        self.rotor_dynamics.reset_idx(env_ids)
 
         # fill extras
         self.extras["episode"] = {}
@@ -14,8 +14,8 @@ from omni.isaac.core.utils.torch.rotations import  euler_angles_to_quats, get_eu
 from omni.isaac.core.objects import FixedCuboid, DynamicSphere, DynamicCuboid, VisualCuboid, FixedSphere
 from omniisaacgymenvs.robots.articulations.diana_tekken import DianaTekken
 from omniisaacgymenvs.robots.articulations.views.diana_tekken_view import DianaTekkenView
-from omniisaacgymenvs.robots.articulations.utils.kinematic_solver import KinematicsSolver
 from omniisaacgymenvs.tasks.diana_tekken_task import DianaTekkenTask
+from omniisaacgymenvs.tasks.utils.differential_ik import DifferentialIKController
 from abc import abstractmethod, ABC
 from omni.isaac.core.tasks import BaseTask
 
@@ -35,13 +35,10 @@ class DianaTekkenManualControlTask(DianaTekkenTask):
 
         self._ref_cubes = GeometryPrimView(prim_paths_expr="/World/envs/.*/ref_cube", name="ref_cube_view", reset_xform_properties=False)
         scene.add(self._ref_cubes)
-        
-        scene.add(self._robot)
-        
-        self._ik = KinematicsSolver(self._robot)
-        self._articulation_controller = self._robot.get_articulation_controller()
-        robot_base_translation,robot_base_orientation = self._robot.get_world_pose()
-        self._ik._kinematics_solver.set_robot_base_pose(np.array(robot_base_translation), np.array(robot_base_orientation))
+
+        # end effector of the IK, as in the Lula robot description
+        self._ee_frames = RigidPrimView(prim_paths_expr="/World/envs/.*/diana/link_7", name="ee_frames_view", reset_xform_properties=False)
+        scene.add(self._ee_frames)
 
     def get_reference_cube(self):
         self._ref_cube = VisualCuboid(prim_path= self.default_zero_env_path + "/ref_cube",
@@ -52,41 +49,63 @@ class DianaTekkenManualControlTask(DianaTekkenTask):
                                   color= torch.tensor([1, 0, 0], device=self._device))
 
     def post_reset(self):
-        self.cloned_robot_actions = np.zeros((22))
         super().post_reset()
-    
-    
-    def pre_physics_step(self, actions: np.array) -> None:
-        # Move target position and orientation
+
+        arm_dof_indices = self._robots.actuated_diana_dof_indices
+        finger_dof_indices = self._robots.actuated_finger_dof_indices
+        self._arm_dof_idx = torch.tensor(arm_dof_indices, dtype=torch.long, device=self._device)
+        # columns of the arm and finger DOFs among the actuated DOFs
+        self._arm_action_idx = torch.tensor(
+            [self.actuated_dof_indices.index(i) for i in arm_dof_indices], dtype=torch.long, device=self._device
+        )
+        self._finger_action_idx = torch.tensor(
+            [self.actuated_dof_indices.index(i) for i in finger_dof_indices], dtype=torch.long, device=self._device
+        )
+        # fixed base, the root body has no Jacobian
+        self._ee_jacobian_idx = self._robots.get_body_index("link_7") - 1
+
+        self._ik = DifferentialIKController(
+            self._num_envs,
+            len(arm_dof_indices),
+            damping=self._task_cfg["env"].get("ikDamping", 0.05),
+            device=self._device,
+        )
+        self._ik_joint_targets = torch.zeros((self._num_envs, self.num_actuated_dofs), device=self._device)
+        self._finger_closed = torch.full((len(finger_dof_indices),), np.pi / 2, device=self._device)
+
+    def pre_physics_step(self, actions) -> None:
+        if not self._env._world.is_playing():
+            return
+
+        # Move target positions and orientations. One operator input drives all the envs,
+        # or (num_envs, 5) inputs drive each env separately
+        actions = torch.as_tensor(actions, dtype=torch.float32, device=self._device)
+        if actions.dim() == 1:
+            actions = actions.unsqueeze(0).expand(self._num_envs, -1)
         target_pos, target_rot = self._ref_cubes.get_world_poses()
-        rpy_target = torch.tensor(get_euler_xyz(target_rot)).unsqueeze(0)
-        target_pos[0, :3] += actions[:3] * 0.0015
-        rpy_target[0, 1] += actions[3] * 0.0015
+        rpy_target = torch.stack(get_euler_xyz(target_rot), dim=-1)
+        target_pos += actions[:, :3] * 0.0015
+        rpy_target[:, 1] += actions[:, 3] * 0.0015
         target_rot = euler_angles_to_quats(rpy_target)
 
         self._ref_cubes.set_world_poses(positions=target_pos, orientations=target_rot)
 
-        robot_actions, succ = self._ik.compute_inverse_kinematics(
-            target_position=np.array(target_pos.squeeze(0)),
-            target_orientation=np.array(target_rot.squeeze(0)))
-        
-        if actions[-1] == 1:
-            self.cloned_robot_actions[self._robots.actuated_finger_dof_indices] = np.ones(len(self._robots.actuated_finger_dof_indices)) * np.pi/2
-        else:
-            self.cloned_robot_actions[self._robots.actuated_finger_dof_indices] = np.zeros(len(self._robots.actuated_finger_dof_indices))
-
-        if succ:
-            self.cloned_robot_actions[self._robots.actuated_diana_dof_indices] = robot_actions.joint_positions
-            robots_actions = torch.tensor((self.cloned_robot_actions.reshape(1,-1)).astype(np.float32))
-            robots_actions[:, self.actuated_dof_indices] = (robots_actions[:, self.actuated_dof_indices] - self._robots.get_applied_actions().joint_positions[:, self.actuated_dof_indices])/(self.dt * self.action_scale)
-            robots_actions[:, self.actuated_dof_indices] = tensor_clamp(robots_actions[:, self.actuated_dof_indices], -0.8 * torch.ones(1, self.num_actuated_dofs), 0.8 * torch.ones(1, self.num_actuated_dofs))
-            super().pre_physics_step(robots_actions[:, self.actuated_dof_indices])
-        else:
-            carb.log_warn("IK did not converge to a solution.  No action is being taken.")
-        
-        
-
-
+        # One damped least squares step towards the targets, for all the envs at once
+        ee_pos, ee_rot = self._ee_frames.get_world_poses(clone=False)
+        jacobian = torch.index_select(
+            self._robots.get_jacobians(clone=False)[:, self._ee_jacobian_idx], 2, self._arm_dof_idx
+        )
+        joint_pos = torch.index_select(self._robots.get_joint_positions(clone=False), 1, self._arm_dof_idx)
+        arm_targets = self._ik.compute(jacobian, ee_pos, ee_rot, target_pos, target_rot, joint_pos)
+        self._ik_joint_targets.index_copy_(1, self._arm_action_idx, arm_targets)
+
+        finger_targets = torch.where(actions[:, -1:] == 1, self._finger_closed, 0.0)
+        self._ik_joint_targets.index_copy_(1, self._finger_action_idx, finger_targets)
+
+        # Joint targets as the velocity actions of DianaTekkenTask
+        robots_actions = (self._ik_joint_targets - self._robot_dof_targets[:, self.actuated_dof_indices]) / (self.dt * self.action_scale)
+        robots_actions.clamp_(-0.8, 0.8)
+        super().pre_physics_step(robots_actions)
 
     def get_observations(self) -> dict:
         super().get_observations()
@@ -8,7 +8,10 @@ from omni.isaac.core.utils.torch.maths import tensor_clamp
 from omni.isaac.core.articulations import ArticulationView
 from omni.isaac.core.utils.prims import get_prim_at_path
 from omni.isaac.core.prims import GeometryPrimView, RigidPrimView, XFormPrimView
+from omniisaacgymenvs.tasks.base.observation_spec import ObservationSpec
 from omniisaacgymenvs.tasks.base.rl_task import RLTask
+from omniisaacgymenvs.tasks.utils.diana_tekken_reward import REWARD_TERMS, compute_diana_tekken_reward
+from omniisaacgymenvs.tasks.utils.frame_transforms import FrameTransformWorkspace
 from omni.isaac.core.utils.stage import add_reference_to_stage
 from omni.isaac.core.utils.torch.rotations import get_euler_xyz, quat_diff_rad, euler_angles_to_quats, quat_conjugate, quat_mul, quat_diff_rad
 from omni.isaac.core.objects import FixedCuboid, DynamicSphere, VisualSphere, FixedSphere, DynamicCuboid
@@ -22,7 +25,6 @@ from omni.isaac.core.utils.stage import get_current_stage
 
 
 class DianaTekkenTask(RLTask):
-
     def __init__(self, name: str, sim_config, env, offset=None) -> None:
         self._sim_config = sim_config
         self._cfg = sim_config.config
@@ -38,7 +40,15 @@ class DianaTekkenTask(RLTask):
 
         self.dt = self._task_cfg["sim"]["dt"]
 
-        self._num_observations = 45
+        self.observation_spec = ObservationSpec()
+        self.observation_spec.add_term("dof_pos", 12)
+        self.observation_spec.add_term("hand_pos", 3)
+        self.observation_spec.add_term("hand_rot", 4)
+        self.observation_spec.add_term("drill_pos", 3)
+        self.observation_spec.add_term("drill_rot", 4)
+        self.observation_spec.add_term("hand_in_drill_pos", 3)
+        self.observation_spec.add_term("hand_in_drill_rot", 4)
+        self.observation_spec.add_term("dof_vel", 12)
         if not hasattr(self, '_num_actions'): self._num_actions = 12 # If the number of actions has been defined from a child
 
 
@@ -163,8 +173,13 @@ class DianaTekkenTask(RLTask):
 
     def post_reset(self):
         # implement any logic required for simulation on-start here
-        self.manipulability = torch.zeros((self.num_envs), dtype=torch.bool, device = self._device)
+        self.manipulability = torch.zeros((self.num_envs), dtype=torch.long, device = self._device)
         self.bool_contacts = torch.zeros((self.num_envs, 15), dtype=torch.bool, device=self._device)
+        self.reward_terms = torch.zeros((self.num_envs, len(REWARD_TERMS)), device=self._device)
+        self._thumb_contact_idxs = torch.tensor([16, 21, 26], dtype=torch.long, device=self._device)
+        self._four_finger_contact_idxs = torch.tensor(
+            [i for i in range(12, 27) if i not in [16, 21, 26]], dtype=torch.long, device=self._device
+        )
     
         self.num_diana_tekken_dofs = self._robots.num_dof
         self.actuated_dof_indices = self._robots.actuated_dof_indices
@@ -201,9 +216,10 @@ class DianaTekkenTask(RLTask):
         self._robots.set_joint_velocities(torch.zeros((self.num_envs, self.num_diana_tekken_dofs), device=self._device))
         self._robots.set_joint_position_targets(pos)
 
-        self.drill_pos = torch.ones((self._num_envs, 3), device=self._device) * self._drill_position  - self._env_pos
-        self.drill_rot = torch.ones((self._num_envs, 4), device=self._device) * self._drills_rot
-        
+        self._init_observation_workspace()
+        self.drill_pos[:] = self._drill_position - self._env_pos
+        self.drill_rot[:] = self._drills_rot
+
         self.drill_zero_rot = torch.ones((self._num_envs, 4), device=self._device) * self._drills_rot
 
         # self.target_sphere_pos = torch.ones((self._num_envs, 3), device=self._device) * self._target_sphere_position
@@ -222,12 +238,11 @@ class DianaTekkenTask(RLTask):
         if not self._env._world.is_playing():
             return
         
-        reset_env_ids = self.reset_buf.nonzero(as_tuple=False).squeeze(-1)
-        if len(reset_env_ids) > 0:
-            # pass
-            self.reset_idx(reset_env_ids, False)
+        self.apply_resets()
 
         self.actions = actions.clone().to(self._device)
+        # envs whose reset state is not written yet keep their targets
+        self.actions.masked_fill_(self.reset_scheduler.pending.unsqueeze(-1), 0.0)
         self._robot_dof_targets[:, self.actuated_dof_indices] += self.actions * self.dt * self.action_scale
         self._robot_dof_targets[:, self.actuated_dof_indices] = tensor_clamp(self._robot_dof_targets[:, self.actuated_dof_indices], self._robot_dof_lower_limits[self.actuated_dof_indices], self._robot_dof_upper_limits[self.actuated_dof_indices])
         
@@ -257,93 +272,78 @@ class DianaTekkenTask(RLTask):
         self._drills_to_pull[self.pull_env_ids] = 0
         
     def get_observations(self) -> dict:
-        def get_in_object_pose(p1, p2, q1, q2):
-            """
-            Compute pose in coordinate in local frame.
-
-            Args:
-                local_pos1 (torch.Tensor): Local position 1.
-                local_pos2 (torch.Tensor): Local position 2.
-                world_pose1 (torch.Tensor): World pose 1 as a quaternion.
-                world_pose2 (torch.Tensor): World pose 2 as a quaternion.
-
-            Returns:
-                Tuple[torch.Tensor, torch.Tensor]: Tuple containing the transformed
-                position and quaternion representing the pose in the local frame.
-            """
-            # Compute relative position in the local frame
-            delta_pos = p2 - p1
-
-            # Initialize quaternion representation of relative position
-            p = torch.zeros((p1.shape[0], 4), device=self._device)
-            p[:, 1:4] = delta_pos
-
-            # Convert relative position to the local frame
-            q1I = quat_conjugate(q1)
-            p_prime = quat_mul(quat_mul(q1I, p), q1)[:, 1:4]
-
-            # Convert world_pose2 to the local frame
-            q_prime = quat_mul(q1I, q2)
-
-            return p_prime, q_prime
-        
+        obs = self.obs_views
+        ws = self._frame_workspace
 
-        self.dof_pos = self._robots.get_joint_positions(clone=False)
+        self.dof_pos = dof_pos = self._robots.get_joint_positions(clone=False)
         dof_vel = self._robots.get_joint_velocities(clone=False)
-        hand_pos_world,  self.hand_rot = self._robots._palm_centers.get_world_poses(clone=False)
-        index_pos_world, _ = self._robots._index_fingers.get_world_poses(clone=False)
-        middle_pos_world, _ = self._robots._middle_fingers.get_world_poses(clone=False)
-        ring_pos_world, _ = self._robots._ring_fingers.get_world_poses(clone=False)
-        little_pos_world, _ = self._robots._little_fingers.get_world_poses(clone=False)
-        thumb_pos_world, _ = self._robots._thumb_fingers.get_world_poses(clone=False)
-
-        drill_pos_world, self.drill_rot = self._drills.get_world_poses(clone=False)
-
-        self.hand_pos = hand_pos_world - self._env_pos
-        self.drill_pos = drill_pos_world - self._env_pos
-
-        self.hand_in_drill_pos, self.hand_in_drill_rot = get_in_object_pose(self.drill_pos, self.hand_pos, self.drill_rot, self.hand_rot)
-        self.drill_finger_targets_pos = drill_pos_world + self.finger_target_offset
+        hand_pos_world, hand_rot = self._robots._palm_centers.get_world_poses(clone=False)
+        drill_pos_world, drill_rot = self._drills.get_world_poses(clone=False)
+
+        torch.index_select(dof_pos, 1, self._actuated_dof_idx, out=obs["dof_pos"])
+        torch.sub(hand_pos_world, self._env_pos, out=obs["hand_pos"])
+        obs["hand_rot"].copy_(hand_rot)
+        torch.sub(drill_pos_world, self._env_pos, out=obs["drill_pos"])
+        obs["drill_rot"].copy_(drill_rot)
+        ws.to_local_frame(obs["drill_pos"], obs["drill_rot"], obs["hand_pos"], obs["hand_rot"],
+                          out_pos=obs["hand_in_drill_pos"], out_rot=obs["hand_in_drill_rot"])
+        torch.index_select(dof_vel, 1, self._actuated_dof_idx, out=obs["dof_vel"])
 
         # Rotate the offset vector from local frame to world frame.
         # Then add the drill position to get the position of the target in world
-        p = torch.zeros((self._num_envs, 4), device=self._device)
-        p[:, 1:4] = self.finger_target_offset
-        q = self.drill_rot
-        qI = quat_conjugate(q)
-        self.drill_finger_targets_pos = self.drill_pos + quat_mul(quat_mul(q, p), qI)[:, 1:4]
-        # print(self.drill_finger_targets_pos)
-        
-        # print(f'pos: {self.hand_in_drill_pos} rot:{self.hand_in_drill_rot}')
-        # print(f'Joints: {self.dof_pos[:, 7:]}')
-
-        self.index_pos = index_pos_world - self._env_pos
-        self.middle_pos = middle_pos_world - self._env_pos
-        self.ring_pos = ring_pos_world - self._env_pos
-        self.little_pos = little_pos_world - self._env_pos
-        self.thumb_pos = thumb_pos_world - self._env_pos
-
-        # self._target_spheres.set_world_poses(positions=self.drill_finger_targets_pos)
+        ws.to_world_frame(obs["drill_pos"], obs["drill_rot"], self.finger_target_offset, out_pos=self.drill_finger_targets_pos)
 
+        for fingers, finger_pos in self._finger_views:
+            torch.sub(fingers.get_world_poses(clone=False)[0], self._env_pos, out=finger_pos)
 
-        self.obs_buf[:, :12] = self.dof_pos[:, self.actuated_dof_indices]
-        self.obs_buf[:, 12:15] = self.hand_pos
-        self.obs_buf[:, 15:19] = self.hand_rot
-        self.obs_buf[:, 19:22] = self.drill_pos
-        self.obs_buf[:, 22:26] = self.drill_rot
-        self.obs_buf[:, 26:29] = self.hand_in_drill_pos
-        self.obs_buf[:, 29:33] = self.hand_in_drill_rot
-        # self.obs_buf[:, 34:37] = self.target_sphere_pos
-        self.obs_buf[:, 33:45] = dof_vel[:, self.actuated_dof_indices]
-
-
-        # self.obs_buf[:, 41:68] = dof_vel
         # # implement logic to retrieve observation states
         observations = {self._robots.name: {"obs_buf": self.obs_buf}}
         return observations
 
+    def _init_observation_workspace(self):
+        """Binds the raw observation term views and preallocates the buffers used by get_observations."""
+        self.obs_views = self.observation_spec.raw
+        self._frame_workspace = FrameTransformWorkspace(self._num_envs, self._device)
+        self._actuated_dof_idx = torch.tensor(self.actuated_dof_indices, dtype=torch.long, device=self._device)
+
+        # Task state is read from the raw observation buffer, without copies
+        self.hand_pos = self.obs_views["hand_pos"]
+        self.hand_rot = self.obs_views["hand_rot"]
+        self.drill_pos = self.obs_views["drill_pos"]
+        self.drill_rot = self.obs_views["drill_rot"]
+        self.hand_in_drill_pos = self.obs_views["hand_in_drill_pos"]
+        self.hand_in_drill_rot = self.obs_views["hand_in_drill_rot"]
+
+        self.drill_finger_targets_pos = torch.zeros((self._num_envs, 3), device=self._device)
+        self.index_pos = torch.zeros((self._num_envs, 3), device=self._device)
+        self.middle_pos = torch.zeros((self._num_envs, 3), device=self._device)
+        self.ring_pos = torch.zeros((self._num_envs, 3), device=self._device)
+        self.little_pos = torch.zeros((self._num_envs, 3), device=self._device)
+        self.thumb_pos = torch.zeros((self._num_envs, 3), device=self._device)
+        self._finger_views = [
+            (self._robots._index_fingers, self.index_pos),
+            (self._robots._middle_fingers, self.middle_pos),
+            (self._robots._ring_fingers, self.ring_pos),
+            (self._robots._little_fingers, self.little_pos),
+            (self._robots._thumb_fingers, self.thumb_pos),
+        ]
+
+    def reset_masked(self, mask):
+        """Starts a new episode for the envs in mask, their robots and drills are written by reset_views."""
+        self.reset_buf.masked_fill_(mask, 0)
+        self.progress_buf.masked_fill_(mask, 0)
+
+    def reset_views(self, env_ids):
+        self._reset_robots_and_drills(env_ids)
 
     def reset_idx(self, env_ids, deterministic=False):
+        self._reset_robots_and_drills(env_ids, deterministic)
+
+        # bookkeeping
+        self.reset_buf[env_ids] = 0
+        self.progress_buf[env_ids] = 0
+
+    def _reset_robots_and_drills(self, env_ids, deterministic=False):
         indices = env_ids.to(dtype=torch.int32)
         num_indices = len(indices)
 
@@ -412,99 +412,32 @@ class DianaTekkenTask(RLTask):
             self._ref_cubes.set_world_poses(positions=ref_cube_pos, orientations=rot, indices=indices)
 
 
-        # bookkeeping
-        self.reset_buf[env_ids] = 0
-        self.progress_buf[env_ids] = 0
-
-
     def calculate_metrics(self) -> None:
-        reward = torch.zeros(self._num_envs, device=self._device)
-        fail_penalty = 10
-        goal_achieved = 1
-        manipulability_prize = 0.05
-        # implement logic to compute rewards
-
-        # Distance hand to drill grasp pos
-        d = torch.norm(self.hand_in_drill_pos - self._ref_grasp_in_drill_pos, p=2, dim=1)
-        reward = self.add_reward_term(d, reward, 0.2)
-        reward = torch.where(torch.norm(self.hand_in_drill_pos - self._ref_grasp_in_drill_pos, p=2, dim=1) < 0.05, reward + 0.05, reward)
-
-        # rotation difference
-        d = quat_diff_rad(self.hand_in_drill_rot, self._ref_grasp_in_drill_rot)
-        reward = self.add_reward_term(d, reward, 0.2)
-        # print(d)
-
-        # Distance to target height
-        d = torch.abs(0.7 - self.drill_pos[:, 2])
-        reward = self.add_reward_term(d, reward, 0.5)
-
-        # Orientation cost
-        d = quat_diff_rad(self.drill_zero_rot, self.drill_rot)
-        reward = self.add_reward_term(d, reward, 0.2)
-        reward = torch.where(torch.logical_and(d < 0.15, self.drill_pos[:, 2] > 0.7), reward + 0.5, reward)
-
-        # Fingertip distance from reference
-        # reward = self.add_reward_term(torch.norm(self.drill_finger_targets_pos - self.index_pos, p=2, dim=1), reward, 0.5)
-        # reward = self.add_reward_term(torch.norm(self.drill_finger_targets_pos - self.middle_pos, p=2, dim=1), reward, 0.5)
-        # reward = self.add_reward_term(torch.norm(self.drill_finger_targets_pos - self.ring_pos, p=2, dim=1), reward, 0.5)
-        # reward = self.add_reward_term(torch.norm(self.drill_finger_targets_pos - self.little_pos, p=2, dim=1), reward, 0.5)
-        # reward = self.add_reward_term(torch.norm(self.drill_finger_targets_pos - self.thumb_pos, p=2, dim=1), reward, 0.5)
-
-        # Joint reference
-        # reward = self.add_reward_term(torch.norm(self.dof_pos[:, self._robots.actuated_finger_dof_indices] - self._ref_joint_targets, p=2, dim=1), reward, 0.5)
-
-        self.torques_to_manipulability()
-        reward += self.manipulability * manipulability_prize
-        # print(self.manipulability)
-
-        # Prize if goal achieved
-        reward = torch.where(self.drill_pos[:, 2] > 0.7, reward + goal_achieved, reward)
-
-        # If the drill is out of bound
-        reward = torch.where(torch.any(self.drill_pos[:, :2] >= self._drill_upper_bound[:2], dim=1), reward - fail_penalty, reward)
-        reward = torch.where(torch.any(self.drill_pos <= self._drill_reset_lower_bound, dim=1), reward - fail_penalty, reward)
-
-        # If the hand is out of bound
-        reward = torch.where(torch.any(self.hand_pos[:, :2] >= self._hand_upper_bound[:2], dim=1), reward - fail_penalty, reward)
-        reward = torch.where(torch.any(self.hand_pos[:, :2] <= self._hand_lower_bound[:2], dim=1), reward - fail_penalty, reward)
-        # print(reward)
-        
-
-        self.rew_buf[:] = reward
+        compute_diana_tekken_reward(
+            self.rew_buf,
+            self.reset_buf,
+            self.reward_terms,
+            self.manipulability,
+            self.progress_buf,
+            self._robots.get_measured_joint_efforts(clone=False),
+            self._thumb_contact_idxs,
+            self._four_finger_contact_idxs,
+            self.hand_pos,
+            self.hand_in_drill_pos,
+            self.hand_in_drill_rot,
+            self.drill_pos,
+            self.drill_rot,
+            self._ref_grasp_in_drill_pos,
+            self._ref_grasp_in_drill_rot,
+            self.drill_zero_rot,
+            self._hand_lower_bound,
+            self._hand_upper_bound,
+            self._drill_upper_bound,
+            self._drill_reset_lower_bound,
+            self._max_episode_length,
+        )
+        self.extras["reward_terms"] = self.reward_terms
 
     def is_done(self) -> None:
-        # implement logic to update dones/reset buffer
-        # reset if max episode length is exceeded
-        self.reset_buf = torch.where(self.progress_buf >= self._max_episode_length - 1, torch.ones_like(self.reset_buf), self.reset_buf)
-
-        # If the drill is out of bound
-        self.reset_buf = torch.where(torch.any(self.drill_pos[:, :2] >= self._drill_upper_bound[:2], dim=1), torch.ones_like(self.reset_buf), self.reset_buf)
-        self.reset_buf = torch.where(torch.any(self.drill_pos <= self._drill_reset_lower_bound, dim=1), torch.ones_like(self.reset_buf), self.reset_buf)
-
-        # # # If the hand is out of bound
-        self.reset_buf = torch.where(torch.any(self.hand_pos[:, :2] >= self._hand_upper_bound[:2], dim=1), torch.ones_like(self.reset_buf), self.reset_buf)
-        self.reset_buf = torch.where(torch.any(self.hand_pos[:, :2] <= self._hand_lower_bound[:2], dim=1), torch.ones_like(self.reset_buf), self.reset_buf)
-
-        # # # Task achieved
-        # self.reset_buf = torch.where(self.drill_pos[:, 2] > 0.6, torch.ones_like(self.reset_buf), self.reset_buf)
-
-        # If the resultant contact force between table and hand is more than a threshold
-        # self.reset_buf = torch.where(torch.sqrt(torch.sum(self._cubes.get_contact_force_matrix()[:, 0, :]**2, dim=1 )) >= 0.5, 
-        #                              torch.ones_like(self.reset_buf), self.reset_buf) #Doesn't work on gpu
-
-    def cm_bool_to_manipulability(self, cm, TOL=1e-3):
-        thumb_contact_idxs = [0, 1, 2]
-        res = torch.norm(cm, dim=2) > TOL
-        self.manipulability = torch.where(torch.logical_and(torch.any(res[:, thumb_contact_idxs], dim=1), torch.any(res[:, 3:], dim=1)),
-                                           torch.count_nonzero(res, dim=1), 0.)
-    
-    def torques_to_manipulability(self, TOL=1e-1):
-        thumb_contact_idxs = [16, 21, 26]
-        four_finger_idxs = [i for i in range(12,27, 1) if i not in thumb_contact_idxs]
-        t = self._robots.get_measured_joint_efforts()
-        res = t > TOL
-        self.manipulability = torch.where(torch.logical_and(torch.any(res[:, thumb_contact_idxs], dim=1), torch.any(res[:, four_finger_idxs], dim=1)),
-                                           torch.count_nonzero(res, dim=1), 0.)
-
-    def add_reward_term(self, d, reward, w=1):
-        return reward + torch.log(1 / (1.0 + d ** 2)) * w
\ No newline at end of file
+        # resets are computed together with the rewards in calculate_metrics
+        pass
@@ -196,12 +196,17 @@ class FactoryBase(RLTask, FactoryABCBase):
             (self.num_envs, self.num_actions), device=self.device
         )
 
+        self.task_mass_matrix_factor = None
+
     def refresh_base_tensors(self):
         """Refresh tensors."""
 
         if not self.world.is_playing():
             return
 
+        # Jacobian and mass matrix change below, factorize them again on next use
+        self.task_mass_matrix_factor = None
+
         self.dof_pos = self.frankas.get_joint_positions(clone=False)
         self.dof_vel = self.frankas.get_joint_velocities(clone=False)
 
@@ -307,6 +312,7 @@ class FactoryBase(RLTask, FactoryABCBase):
             "force_ctrl_method",
             "wrench_prop_gains",
             "force_ctrl_axes",
+            "task_mass_matrix_damping",
         }
         self.cfg_ctrl = {cfg_ctrl_key: None for cfg_ctrl_key in cfg_ctrl_keys}
 
@@ -318,6 +324,9 @@ class FactoryBase(RLTask, FactoryABCBase):
         self.cfg_ctrl["gripper_deriv_gains"] = torch.tensor(
             self.cfg_task.ctrl.all.gripper_deriv_gains, device=self.device
         ).repeat((self.num_envs, 1))
+        self.cfg_ctrl["task_mass_matrix_damping"] = self.cfg_task.ctrl.all.get(
+            "task_mass_matrix_damping", 0.0
+        )
 
         ctrl_type = self.cfg_task.ctrl.ctrl_type
         if ctrl_type == "gym_default":
@@ -533,6 +542,19 @@ class FactoryBase(RLTask, FactoryABCBase):
     def _set_dof_torque(self):
         """Set Franka DOF torque to move fingertips towards target pose."""
 
+        if (
+            self.cfg_ctrl["gain_space"] == "task"
+            and self.cfg_ctrl["do_motion_ctrl"]
+            and self.cfg_ctrl["do_inertial_comp"]
+            and self.task_mass_matrix_factor is None
+        ):
+            # Reused by every controller call until the next refresh_base_tensors
+            self.task_mass_matrix_factor = fc.get_task_mass_matrix_factor(
+                jacobian=self.fingertip_midpoint_jacobian_tf,
+                arm_mass_matrix=self.arm_mass_matrix,
+                damping=self.cfg_ctrl["task_mass_matrix_damping"],
+            )
+
         self.dof_torque = fc.compute_dof_torque(
             cfg_ctrl=self.cfg_ctrl,
             dof_pos=self.dof_pos,
@@ -550,6 +572,7 @@ class FactoryBase(RLTask, FactoryABCBase):
             ctrl_target_fingertip_midpoint_quat=self.ctrl_target_fingertip_midpoint_quat,
             ctrl_target_fingertip_contact_wrench=self.ctrl_target_fingertip_contact_wrench,
             device=self.device,
+            task_mass_matrix_factor=self.task_mass_matrix_factor,
         )
 
         self.frankas.set_joint_efforts(efforts=self.dof_torque)
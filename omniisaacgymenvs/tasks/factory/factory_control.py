@@ -92,8 +92,13 @@ def compute_dof_torque(
     ctrl_target_fingertip_midpoint_quat,
     ctrl_target_fingertip_contact_wrench,
     device,
+    task_mass_matrix_factor=None,
 ):
-    """Compute Franka DOF torque to move fingertips towards target pose."""
+    """Compute Franka DOF torque to move fingertips towards target pose.
+
+    task_mass_matrix_factor can be passed to reuse the output of get_task_mass_matrix_factor
+    while the Jacobian and mass matrix have not been refreshed.
+    """
     # References:
     # 1) https://ethz.ch/content/dam/ethz/special-interest/mavt/robotics-n-intelligent-systems/rsl-dam/documents/RobotDynamics2018/RD_HS2018script.pdf
     # 2) Modern Robotics
@@ -154,12 +159,14 @@ def compute_dof_torque(
 
             if cfg_ctrl["do_inertial_comp"]:
                 # Set tau = Lambda * tau, where Lambda is the task-space mass matrix
-                jacobian_T = torch.transpose(jacobian, dim0=1, dim1=2)
-                arm_mass_matrix_task = torch.inverse(
-                    jacobian @ torch.inverse(arm_mass_matrix) @ jacobian_T
-                )  # ETH eq. 3.86; geometric Jacobian is assumed
-                task_wrench_motion = (
-                    arm_mass_matrix_task @ task_wrench_motion.unsqueeze(-1)
+                if task_mass_matrix_factor is None:
+                    task_mass_matrix_factor = get_task_mass_matrix_factor(
+                        jacobian=jacobian,
+                        arm_mass_matrix=arm_mass_matrix,
+                        damping=cfg_ctrl.get("task_mass_matrix_damping") or 0.0,
+                    )  # ETH eq. 3.86; geometric Jacobian is assumed
+                task_wrench_motion = torch.cholesky_solve(
+                    task_wrench_motion.unsqueeze(-1), task_mass_matrix_factor
                 ).squeeze(-1)
 
             task_wrench = (
@@ -209,6 +216,39 @@ def compute_dof_torque(
     return dof_torque
 
 
+def get_task_mass_matrix_factor(jacobian, arm_mass_matrix, damping=0.0):
+    """Compute Cholesky factor of inverse of task-space mass matrix.
+
+    Lambda^-1 = J M^-1 J^T (ETH eq. 3.86) is built from a Cholesky factorization of M and a
+    triangular solve instead of two dense inverses, so that it is symmetric by construction.
+    A positive damping is added to the diagonal of Lambda^-1, which keeps Lambda bounded near
+    kinematic singularities. Lambda * x is then torch.cholesky_solve(x, factor).
+
+    Args:
+        jacobian (torch.Tensor): (num_envs, 6, num_arm_dofs) Jacobian.
+        arm_mass_matrix (torch.Tensor): (num_envs, num_arm_dofs, num_arm_dofs) joint-space mass matrix.
+        damping (float): value added to the diagonal of Lambda^-1.
+
+    Returns:
+        torch.Tensor: (num_envs, 6, 6) lower triangular L such that L L^T = Lambda^-1.
+    """
+
+    # cholesky_ex does not synchronize with the host to check for errors
+    arm_mass_matrix_factor, _ = torch.linalg.cholesky_ex(arm_mass_matrix)
+
+    # With X = L_M^-1 J^T, J M^-1 J^T = X^T X
+    jacobian_scaled = torch.linalg.solve_triangular(
+        arm_mass_matrix_factor, torch.transpose(jacobian, dim0=1, dim1=2), upper=False
+    )
+    arm_mass_matrix_task_inv = torch.transpose(jacobian_scaled, dim0=1, dim1=2) @ jacobian_scaled
+    if damping > 0.0:
+        arm_mass_matrix_task_inv.diagonal(dim1=1, dim2=2).add_(damping)
+
+    task_mass_matrix_factor, _ = torch.linalg.cholesky_ex(arm_mass_matrix_task_inv)
+
+    return task_mass_matrix_factor
+
+
 def get_pose_error(
     fingertip_midpoint_pos,
     fingertip_midpoint_quat,
@@ -36,23 +36,33 @@ Configuration defined in FactoryEnvNutBolt.yaml. Asset info defined in factory_a
 
 import hydra
 import numpy as np
+import omegaconf
 import torch
 
-from omni.isaac.core.prims import RigidPrimView, XFormPrim
+from omni.isaac.cloner import Cloner
+from omni.isaac.core.prims import RigidPrimView
+from omni.isaac.core.simulation_context import SimulationContext
 from omni.isaac.core.utils.nucleus import get_assets_root_path
-from omni.isaac.core.utils.stage import add_reference_to_stage
 from omniisaacgymenvs.tasks.base.rl_task import RLTask
-from omni.physx.scripts import physicsUtils, utils
+from omni.physx.scripts import utils
 
 from omniisaacgymenvs.robots.articulations.views.factory_franka_view import (
     FactoryFrankaView,
 )
 import omniisaacgymenvs.tasks.factory.factory_control as fc
 from omniisaacgymenvs.tasks.factory.factory_base import FactoryBase
+from omniisaacgymenvs.tasks.factory.factory_reset_state_bank import (
+    FactoryResetStateBank,
+)
 from omniisaacgymenvs.tasks.factory.factory_schema_class_env import FactoryABCEnv
 from omniisaacgymenvs.tasks.factory.factory_schema_config_env import (
     FactorySchemaConfigEnv,
 )
+from omniisaacgymenvs.tasks.utils.usd_utils import (
+    add_references,
+    bind_physics_material,
+    set_instanceable,
+)
 
 
 class FactoryEnvNutBolt(FactoryBase, FactoryABCEnv):
@@ -187,149 +197,132 @@ class FactoryEnvNutBolt(FactoryBase, FactoryABCEnv):
         )
 
     def _import_env_assets(self, add_to_stage=True):
-        """Set nut and bolt asset options. Import assets."""
+        """Set nut and bolt asset options. Import assets.
 
-        self.nut_heights = []
-        self.nut_widths_max = []
-        self.bolt_widths = []
-        self.bolt_head_heights = []
-        self.bolt_shank_lengths = []
-        self.thread_pitches = []
+        Subassemblies are assigned to all envs up front, and the per-env nut and
+        bolt geometry is gathered from a table with one row per desired subassembly.
+        On stage, the nut and bolt of a subassembly are authored once and cloned to
+        its group of envs.
+        """
 
-        assets_root_path = get_assets_root_path()
+        desired_subassemblies = self.cfg_env.env.desired_subassemblies
+        self.subassembly_ids = torch.from_numpy(
+            np.random.randint(0, len(desired_subassemblies), self._num_envs)
+        ).to(self._device)
 
-        for i in range(0, self._num_envs):
-            j = np.random.randint(0, len(self.cfg_env.env.desired_subassemblies))
-            subassembly = self.cfg_env.env.desired_subassemblies[j]
-            components = list(self.asset_info_nut_bolt[subassembly])
+        subassembly_table = self._get_subassembly_table(desired_subassemblies)
 
-            nut_translation = torch.tensor(
-                [
-                    0.0,
-                    self.cfg_env.env.nut_lateral_offset,
-                    self.cfg_base.env.table_height,
-                ],
-                device=self._device,
-            )
-            nut_orientation = torch.tensor([1.0, 0.0, 0.0, 0.0], device=self._device)
-
-            nut_height = self.asset_info_nut_bolt[subassembly][components[0]]["height"]
-            nut_width_max = self.asset_info_nut_bolt[subassembly][components[0]][
-                "width_max"
-            ]
-            self.nut_heights.append(nut_height)
-            self.nut_widths_max.append(nut_width_max)
-
-            nut_file = (
-                assets_root_path
-                + self.asset_info_nut_bolt[subassembly][components[0]]["usd_path"]
+        # For computing body COM pos
+        self.nut_heights = subassembly_table["nut_height"][self.subassembly_ids]
+        self.bolt_head_heights = subassembly_table["bolt_head_height"][
+            self.subassembly_ids
+        ]
+
+        # For setting initial state
+        self.nut_widths_max = subassembly_table["nut_width_max"][self.subassembly_ids]
+        self.bolt_shank_lengths = subassembly_table["bolt_shank_length"][
+            self.subassembly_ids
+        ]
+
+        # For defining success or failure
+        self.bolt_widths = subassembly_table["bolt_width"][self.subassembly_ids]
+        self.thread_pitches = subassembly_table["thread_pitch"][self.subassembly_ids]
+
+        if add_to_stage:
+            self._clone_subassemblies(desired_subassemblies)
+
+    def _get_subassembly_table(self, desired_subassemblies):
+        """Get geometry of desired subassemblies as (num_subassemblies, 1) tensors."""
+
+        table = {
+            "nut_height": [],
+            "nut_width_max": [],
+            "bolt_width": [],
+            "bolt_head_height": [],
+            "bolt_shank_length": [],
+            "thread_pitch": [],
+        }
+        for subassembly in desired_subassemblies:
+            asset_info = self.asset_info_nut_bolt[subassembly]
+            components = list(asset_info)
+            table["nut_height"].append(asset_info[components[0]]["height"])
+            table["nut_width_max"].append(asset_info[components[0]]["width_max"])
+            table["bolt_width"].append(asset_info[components[1]]["width"])
+            table["bolt_head_height"].append(asset_info[components[1]]["head_height"])
+            table["bolt_shank_length"].append(
+                asset_info[components[1]]["shank_length"]
             )
+            table["thread_pitch"].append(asset_info["thread_pitch"])
 
-            if add_to_stage:
-                add_reference_to_stage(nut_file, f"/World/envs/env_{i}" + "/nut")
-                XFormPrim(
-                    prim_path=f"/World/envs/env_{i}" + "/nut",
-                    translation=nut_translation,
-                    orientation=nut_orientation,
-                )
+        return {
+            name: torch.tensor(values, device=self._device).unsqueeze(-1)
+            for name, values in table.items()
+        }
 
-                self._stage.GetPrimAtPath(
-                    f"/World/envs/env_{i}" + f"/nut/factory_{components[0]}/collisions"
-                ).SetInstanceable(
-                    False
-                )  # This is required to be able to edit physics material
-                physicsUtils.add_physics_material_to_prim(
-                    self._stage,
-                    self._stage.GetPrimAtPath(
-                        f"/World/envs/env_{i}"
-                        + f"/nut/factory_{components[0]}/collisions/mesh_0"
-                    ),
-                    self.nutboltPhysicsMaterialPath,
-                )
+    def _clone_subassemblies(self, desired_subassemblies):
+        """Add nut and bolt of each subassembly to one env. Clone them to its group."""
 
-                # applies articulation settings from the task configuration yaml file
-                self._sim_config.apply_articulation_settings(
-                    "nut",
-                    self._stage.GetPrimAtPath(f"/World/envs/env_{i}" + "/nut"),
-                    self._sim_config.parse_actor_config("nut"),
-                )
+        assets_root_path = get_assets_root_path()
 
-            bolt_translation = torch.tensor(
-                [0.0, 0.0, self.cfg_base.env.table_height], device=self._device
+        translations = {
+            "nut": [
+                0.0,
+                self.cfg_env.env.nut_lateral_offset,
+                self.cfg_base.env.table_height,
+            ],
+            "bolt": [0.0, 0.0, self.cfg_base.env.table_height],
+        }
+        actor_configs = {
+            body: self._sim_config.parse_actor_config(body)
+            for body in ("nut", "bolt")
+        }
+
+        # Group envs by subassembly, repeated desired subassemblies share a group
+        subassembly_ids = self.subassembly_ids.cpu().numpy()
+        groups = {}
+        for j, subassembly in enumerate(desired_subassemblies):
+            groups.setdefault(subassembly, []).append(
+                np.flatnonzero(subassembly_ids == j)
             )
-            bolt_orientation = torch.tensor([1.0, 0.0, 0.0, 0.0], device=self._device)
-
-            bolt_width = self.asset_info_nut_bolt[subassembly][components[1]]["width"]
-
-            bolt_head_height = self.asset_info_nut_bolt[subassembly][components[1]][
-                "head_height"
-            ]
-            bolt_shank_length = self.asset_info_nut_bolt[subassembly][components[1]][
-                "shank_length"
-            ]
-            self.bolt_widths.append(bolt_width)
-            self.bolt_head_heights.append(bolt_head_height)
-            self.bolt_shank_lengths.append(bolt_shank_length)
-
-            if add_to_stage:
-                bolt_file = (
+
+        cloner = Cloner()
+        for subassembly, env_ids in groups.items():
+            env_ids = np.sort(np.concatenate(env_ids))
+            if len(env_ids) == 0:
+                continue
+            components = list(self.asset_info_nut_bolt[subassembly])
+
+            for body, component in zip(("nut", "bolt"), components[:2]):
+                source_path = f"/World/envs/env_{env_ids[0]}/{body}"
+                add_references(
+                    self._stage,
+                    [source_path],
                     assets_root_path
-                    + self.asset_info_nut_bolt[subassembly][components[1]]["usd_path"]
-                )
-                add_reference_to_stage(bolt_file, f"/World/envs/env_{i}" + "/bolt")
-                XFormPrim(
-                    prim_path=f"/World/envs/env_{i}" + "/bolt",
-                    translation=bolt_translation,
-                    orientation=bolt_orientation,
+                    + self.asset_info_nut_bolt[subassembly][component]["usd_path"],
+                    translations=[translations[body]],
                 )
 
-                self._stage.GetPrimAtPath(
-                    f"/World/envs/env_{i}" + f"/bolt/factory_{components[1]}/collisions"
-                ).SetInstanceable(
-                    False
-                )  # This is required to be able to edit physics material
-                physicsUtils.add_physics_material_to_prim(
+                # This is required to be able to edit physics material
+                collisions = f"{source_path}/factory_{component}/collisions"
+                set_instanceable(self._stage, [collisions], False)
+                bind_physics_material(
                     self._stage,
-                    self._stage.GetPrimAtPath(
-                        f"/World/envs/env_{i}"
-                        + f"/bolt/factory_{components[1]}/collisions/mesh_0"
-                    ),
+                    [collisions + "/mesh_0"],
                     self.nutboltPhysicsMaterialPath,
                 )
 
                 # applies articulation settings from the task configuration yaml file
                 self._sim_config.apply_articulation_settings(
-                    "bolt",
-                    self._stage.GetPrimAtPath(f"/World/envs/env_{i}" + "/bolt"),
-                    self._sim_config.parse_actor_config("bolt"),
+                    body, self._stage.GetPrimAtPath(source_path), actor_configs[body]
                 )
 
-            thread_pitch = self.asset_info_nut_bolt[subassembly]["thread_pitch"]
-            self.thread_pitches.append(thread_pitch)
-
-        # For computing body COM pos
-        self.nut_heights = torch.tensor(
-            self.nut_heights, device=self._device
-        ).unsqueeze(-1)
-        self.bolt_head_heights = torch.tensor(
-            self.bolt_head_heights, device=self._device
-        ).unsqueeze(-1)
-
-        # For setting initial state
-        self.nut_widths_max = torch.tensor(
-            self.nut_widths_max, device=self._device
-        ).unsqueeze(-1)
-        self.bolt_shank_lengths = torch.tensor(
-            self.bolt_shank_lengths, device=self._device
-        ).unsqueeze(-1)
-
-        # For defining success or failure
-        self.bolt_widths = torch.tensor(
-            self.bolt_widths, device=self._device
-        ).unsqueeze(-1)
-        self.thread_pitches = torch.tensor(
-            self.thread_pitches, device=self._device
-        ).unsqueeze(-1)
+                # Clones inherit the reference and the edits above from the source
+                cloner.clone(
+                    source_prim_path=source_path,
+                    prim_paths=[f"/World/envs/env_{i}/{body}" for i in env_ids],
+                    positions=np.array([translations[body]] * len(env_ids)),
+                    replicate_physics=False,
+                )
 
     def refresh_env_tensors(self):
         """Refresh tensors."""
@@ -362,3 +355,90 @@ class FactoryEnvNutBolt(FactoryBase, FactoryABCEnv):
         self.bolt_pos -= self.env_pos
 
         self.bolt_force = self.bolts.get_net_contact_forces(clone=False)
+
+    def acquire_reset_state_bank(self):
+        """Create bank of reset states if enabled in task config."""
+
+        self.reset_state_bank = None
+        bank_size = self.cfg_task.env.get("reset_state_bank_size", 0)
+        if bank_size <= 0:
+            return
+
+        # Everything that changes the states reached by a simulated reset
+        cfg_env = omegaconf.OmegaConf.to_container(self.cfg_task.env, resolve=True)
+        cfg_env = {
+            key: value
+            for key, value in cfg_env.items()
+            if key
+            not in ("numEnvs", "reset_state_bank_max_reuse", "reset_state_bank_dir")
+        }
+        cache_cfg = {
+            "task": type(self).__name__,
+            "env": cfg_env,
+            "randomize": omegaconf.OmegaConf.to_container(
+                self.cfg_task.randomize, resolve=True
+            ),
+            "ctrl": omegaconf.OmegaConf.to_container(self.cfg_task.ctrl, resolve=True),
+            "dt": self._task_cfg["sim"]["dt"],
+            "desired_subassemblies": list(self.cfg_env.env.desired_subassemblies),
+        }
+
+        self.reset_state_bank = FactoryResetStateBank(
+            fields={
+                "dof_pos": self.num_dofs,
+                "nut_pos": 3,
+                "nut_quat": 4,
+                "bolt_pos": 3,
+                "bolt_quat": 4,
+            },
+            size=bank_size,
+            groups=self.subassembly_ids,
+            device=self.device,
+            max_reuse=self.cfg_task.env.get("reset_state_bank_max_reuse", 8),
+            cache_dir=self.cfg_task.env.get("reset_state_bank_dir", None),
+            cache_cfg=cache_cfg,
+            name=type(self).__name__,
+        )
+
+    def add_to_reset_state_bank(self, env_ids):
+        """Add current states of Franka, nut, and bolt to reset state bank."""
+
+        self.refresh_base_tensors()
+        self.refresh_env_tensors()
+
+        self.reset_state_bank.add(
+            env_ids,
+            dof_pos=self.dof_pos[env_ids],
+            nut_pos=self.nut_pos[env_ids],
+            nut_quat=self.nut_quat[env_ids],
+            bolt_pos=self.bolt_pos[env_ids],
+            bolt_quat=self.bolt_quat[env_ids],
+        )
+
+    def reset_from_state_bank(self, env_ids):
+        """Reset Franka, nut, and bolt to states sampled from reset state bank."""
+
+        states = self.reset_state_bank.sample(env_ids)
+        indices = env_ids.to(dtype=torch.int32)
+
+        self.dof_pos[env_ids] = states["dof_pos"]
+        self.dof_vel[env_ids] = 0.0
+        self.ctrl_target_dof_pos[env_ids] = states["dof_pos"]
+        self.frankas.set_joint_positions(states["dof_pos"], indices=indices)
+        self.frankas.set_joint_velocities(self.dof_vel[env_ids], indices=indices)
+
+        self.nuts.set_world_poses(
+            states["nut_pos"] + self.env_pos[env_ids], states["nut_quat"], indices
+        )
+        self.nuts.set_velocities(
+            torch.zeros((len(env_ids), 6), device=self.device), indices
+        )
+        self.bolts.set_world_poses(
+            states["bolt_pos"] + self.env_pos[env_ids], states["bolt_quat"], indices
+        )
+
+        # Step once to update PhysX with the new states
+        SimulationContext.step(self.world, render=True)
+
+        self.refresh_base_tensors()
+        self.refresh_env_tensors()
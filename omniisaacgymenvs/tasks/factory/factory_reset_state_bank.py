@@ -0,0 +1,207 @@
+# Copyright (c) 2018-2023, NVIDIA Corporation
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Factory: reset state bank.
+
+Stores initial states reached by simulating a reset (e.g., moving the gripper to a random pose),
+so that later resets can restore one of them with a few tensor writes instead of stepping the
+simulator. Imported by task classes. Not directly executed.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+import torch
+
+# bump when the stored states change for a given config
+RESET_STATE_BANK_VERSION = 1
+
+
+def reset_state_bank_cache_key(cfg):
+    """Hash of the config that determines the reset states, used to name saved banks."""
+    key = json.dumps(
+        {"version": RESET_STATE_BANK_VERSION, "cfg": cfg}, sort_keys=True, default=str
+    )
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+class FactoryResetStateBank:
+    """Fixed-size bank of reset states, with one ring of states per group (e.g., per subassembly).
+
+    States of all the fields are stored side by side in a single (num_groups, size, state_dim)
+    tensor, so that sampling the states of any number of envs is one gather. While the bank is
+    not full, and again once it has served max_reuse resets per stored state, needs_refresh is set:
+    the task then simulates the next reset and adds the resulting states, which replace the oldest
+    ones. The bank is saved in a background thread after every refresh, and loaded on construction
+    if a bank with the same key exists.
+    """
+
+    def __init__(
+        self,
+        fields,
+        size,
+        groups,
+        device,
+        max_reuse=8,
+        cache_dir=None,
+        cache_cfg=None,
+        name="reset_states",
+    ):
+        """Initializes the bank.
+
+        Args:
+            fields (Dict[str, int]): name and size of the state fields.
+            size (int): number of states stored per group.
+            groups (torch.Tensor): group of every env.
+            device (str): device of the stored states.
+            max_reuse (int): average number of resets served by a stored state before the bank asks
+                for new states. 0 to never refresh a full bank.
+            cache_dir (Optional[str]): directory where banks are saved. Defaults to None (no saving).
+            cache_cfg (Optional[dict]): config that determines the reset states, hashed into the file name.
+            name (str): prefix of the file name.
+        """
+        self.size = size
+        self.device = device
+        self.max_reuse = max_reuse
+
+        self.fields = {}
+        state_dim = 0
+        for field_name, field_size in fields.items():
+            self.fields[field_name] = slice(state_dim, state_dim + field_size)
+            state_dim += field_size
+        self.state_dim = state_dim
+
+        self.groups = groups.to(device=device, dtype=torch.long)
+        self.num_groups = int(self.groups.max().item()) + 1
+        # groups without envs never receive states and are not required to fill up
+        self._required_groups = torch.unique(self.groups).tolist()
+
+        self.states = torch.zeros((self.num_groups, size, state_dim), device=device)
+        self._flat_states = self.states.view(-1, state_dim)
+        self._num_filled = [0] * self.num_groups
+        self._cursor = [0] * self.num_groups
+        self._num_draws = 0
+
+        self._cache_path = None
+        if cache_dir is not None:
+            cache_cfg = {
+                "fields": fields,
+                "size": size,
+                "num_groups": self.num_groups,
+                "cfg": cache_cfg,
+            }
+            cache_key = reset_state_bank_cache_key(cache_cfg)
+            self._cache_path = os.path.join(cache_dir, f"{name}_{cache_key}.pt")
+            if os.path.isfile(self._cache_path):
+                self._load(self._cache_path)
+        self._save_thread = None
+
+    @property
+    def is_full(self):
+        return all(
+            self._num_filled[group] == self.size for group in self._required_groups
+        )
+
+    @property
+    def needs_refresh(self):
+        """Whether the next reset should be simulated and its states added to the bank."""
+        if not self.is_full:
+            return True
+        num_states = self.size * len(self._required_groups)
+        return self.max_reuse > 0 and self._num_draws >= self.max_reuse * num_states
+
+    def add(self, env_ids, **states):
+        """Adds the states of envs, replacing the oldest states of their groups.
+
+        Args:
+            env_ids (torch.Tensor): envs the states come from.
+            **states (torch.Tensor): (len(env_ids), field_size) values of every field.
+        """
+        state = torch.cat([states[field_name] for field_name in self.fields], dim=-1)
+        groups = self.groups[env_ids]
+        for group in self._required_groups:
+            group_state = state[groups == group][: self.size]
+            num_states = len(group_state)
+            if num_states == 0:
+                continue
+            slots = torch.arange(num_states, device=self.device)
+            slots = (slots + self._cursor[group]) % self.size
+            self.states[group, slots] = group_state
+            self._cursor[group] = (self._cursor[group] + num_states) % self.size
+            self._num_filled[group] = min(
+                self._num_filled[group] + num_states, self.size
+            )
+
+        self._num_draws = max(0, self._num_draws - len(env_ids) * self.max_reuse)
+        if self._cache_path is not None:
+            self.save()
+
+    def sample(self, env_ids):
+        """Samples a random stored state for every env in env_ids, from the group of the env.
+
+        Returns:
+            Dict[str, torch.Tensor]: (len(env_ids), field_size) values of every field.
+        """
+        num_envs = len(env_ids)
+        slots = torch.randint(0, self.size, (num_envs,), device=self.device)
+        state = self._flat_states[self.groups[env_ids] * self.size + slots]
+        self._num_draws += num_envs
+        return {
+            field_name: state[:, field_slice]
+            for field_name, field_slice in self.fields.items()
+        }
+
+    def save(self):
+        """Saves the bank from a background thread."""
+        if self._save_thread is not None:
+            self._save_thread.join()
+        data = {
+            "states": self.states.to("cpu", copy=True),
+            "num_filled": list(self._num_filled),
+            "cursor": list(self._cursor),
+        }
+        self._save_thread = threading.Thread(
+            target=self._save, args=(self._cache_path, data), daemon=True
+        )
+        self._save_thread.start()
+
+    @staticmethod
+    def _save(path, data):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # write to a temporary file first so that an interrupted save never leaves a truncated bank
+        tmp_path = f"{path}.tmp"
+        torch.save(data, tmp_path)
+        os.replace(tmp_path, path)
+
+    def _load(self, path):
+        data = torch.load(path, map_location=self.device)
+        self.states.copy_(data["states"])
+        self._num_filled = list(data["num_filled"])
+        self._cursor = list(data["cursor"])
@@ -86,6 +86,7 @@ class All:
     gripper_deriv_gains: list[
         float
     ]  # derivative gains on left and right Franka gripper finger DOF position (2)
+    task_mass_matrix_damping: float  # damping added to inverse of task-space mass matrix in operational space control
 
 
 @dataclass
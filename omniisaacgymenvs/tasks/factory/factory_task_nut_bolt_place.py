@@ -92,6 +92,7 @@ class FactoryTaskNutBoltPlace(FactoryEnvNutBolt, FactoryABCTask):
 
         self.acquire_base_tensors()
         self._acquire_task_tensors()
+        self.acquire_reset_state_bank()
 
         self.refresh_base_tensors()
         self.refresh_env_tensors()
@@ -178,6 +179,17 @@ class FactoryTaskNutBoltPlace(FactoryEnvNutBolt, FactoryABCTask):
     def reset_idx(self, env_ids, randomize_gripper_pose) -> None:
         """Reset specified environments."""
 
+        if (
+            randomize_gripper_pose
+            and self.reset_state_bank is not None
+            and not self.reset_state_bank.needs_refresh
+        ):
+            # Restore a stored state instead of moving the gripper in simulation
+            self.reset_from_state_bank(env_ids)
+            self._refresh_task_tensors()
+            self._reset_buffers(env_ids)
+            return
+
         self._reset_franka(env_ids)
         self._reset_object(env_ids)
 
@@ -190,6 +202,8 @@ class FactoryTaskNutBoltPlace(FactoryEnvNutBolt, FactoryABCTask):
             self._randomize_gripper_pose(
                 env_ids, sim_steps=self.cfg_task.env.num_gripper_move_sim_steps
             )
+            if self.reset_state_bank is not None and self.world.is_playing():
+                self.add_to_reset_state_bank(env_ids)
 
         self._reset_buffers(env_ids)
 
@@ -246,6 +246,8 @@ class InHandManipulationTask(RLTask):
         self.goal_init_pos = self.goal_pos.clone()
         self.goal_init_rot = self.goal_rot.clone()
 
+        self.allocate_reset_buffers()
+
         # randomize all envs
         indices = torch.arange(self._num_envs, dtype=torch.int64, device=self._device)
         self.reset_idx(indices)
@@ -253,6 +255,28 @@ class InHandManipulationTask(RLTask):
         if self._dr_randomizer.randomize:
             self._dr_randomizer.set_up_domain_randomization(self)
 
+    def allocate_reset_buffers(self):
+        """Preallocates the scratch buffers of the reset path.
+
+        Resets only use views on the first len(env_ids) rows, so their cost follows the
+        number of resetting envs rather than num_envs.
+        """
+        self._reset_rand_floats = torch.zeros((self.num_envs, self.num_hand_dofs * 2 + 5), device=self.device)
+        self._goal_rand_floats = torch.zeros((self.num_envs, 4), device=self.device)
+        self._goal_world_pos = torch.zeros((self.num_envs, 3), device=self.device)
+        self._object_world_pos = torch.zeros((self.num_envs, 3), device=self.device)
+        self._reset_dof_pos = torch.zeros((self.num_envs, self.num_hand_dofs), device=self.device)
+        self._reset_dof_vel = torch.zeros((self.num_envs, self.num_hand_dofs), device=self.device)
+        # never written, the objects are reset at rest
+        self._reset_object_velocities = torch.zeros_like(self.object_init_velocities)
+
+        self._reset_dof_delta_min = self.hand_dof_lower_limits - self.hand_dof_default_pos
+        self._reset_dof_delta_range = self.hand_dof_upper_limits - self.hand_dof_lower_limits
+
+        # goals set by reset_masked and not written to the goal objects yet
+        self._goal_mask = torch.zeros(self.num_envs, dtype=torch.bool, device=self.device)
+        self._goal_pending = torch.zeros(self.num_envs, dtype=torch.bool, device=self.device)
+
     def get_object_goal_observations(self):
         self.object_pos, self.object_rot = self._objects.get_world_poses(clone=False)
         self.object_pos -= self._env_pos
@@ -315,18 +339,20 @@ class InHandManipulationTask(RLTask):
         if not self.world.is_playing():
             return
 
-        env_ids = self.reset_buf.nonzero(as_tuple=False).squeeze(-1)
-        goal_env_ids = self.reset_goal_buf.nonzero(as_tuple=False).squeeze(-1)
-
-        reset_buf = self.reset_buf.clone()
-
-        # if only goals need reset, then call set API
-        if len(goal_env_ids) > 0 and len(env_ids) == 0:
-            self.reset_target_pose(goal_env_ids)
-        elif len(goal_env_ids) > 0:
-            self.reset_target_pose(goal_env_ids)
-        if len(env_ids) > 0:
-            self.reset_idx(env_ids)
+        if self.reset_scheduler.masked:
+            self.apply_resets()
+            # goals set between two compactions are written on the next one, with the resets
+            goal_env_ids = self.reset_scheduler.compact_mask(self._goal_pending)
+            if goal_env_ids is not None and len(goal_env_ids) > 0:
+                self.write_goal_poses(goal_env_ids)
+            # the envs whose reset state is written at this step
+            reset_buf = self.reset_scheduler.held if self.reset_scheduler.due else None
+        else:
+            goal_env_ids = self.reset_goal_buf.nonzero(as_tuple=False).squeeze(-1)
+            reset_buf = self.reset_buf.clone()
+            if len(goal_env_ids) > 0:
+                self.reset_target_pose(goal_env_ids)
+            self.apply_resets()
 
         self.actions = actions.clone().to(self.device)
 
@@ -361,7 +387,7 @@ class InHandManipulationTask(RLTask):
             self.cur_targets[:, self.actuated_dof_indices], indices=None, joint_indices=self.actuated_dof_indices
         )
 
-        if self._dr_randomizer.randomize:
+        if self._dr_randomizer.randomize and reset_buf is not None:
             rand_envs = torch.where(
                 self.randomization_buf >= self._dr_randomizer.min_frequency,
                 torch.ones_like(self.randomization_buf),
@@ -376,69 +402,110 @@ class InHandManipulationTask(RLTask):
 
     def reset_target_pose(self, env_ids):
         # reset goal
-        indices = env_ids.to(dtype=torch.int32)
-        rand_floats = torch_rand_float(-1.0, 1.0, (len(env_ids), 4), device=self.device)
+        num_resets = len(env_ids)
+        rand_floats = torch.rand((num_resets, 4), device=self.device, out=self._goal_rand_floats[:num_resets])
+        rand_floats.mul_(2.0).sub_(1.0)
 
+        # the unit tensors have identical rows, a slice avoids gathering them
         new_rot = randomize_rotation(
-            rand_floats[:, 0], rand_floats[:, 1], self.x_unit_tensor[env_ids], self.y_unit_tensor[env_ids]
+            rand_floats[:, 0], rand_floats[:, 1], self.x_unit_tensor[:num_resets], self.y_unit_tensor[:num_resets]
         )
 
         self.goal_pos[env_ids] = self.goal_init_pos[env_ids, 0:3]
         self.goal_rot[env_ids] = new_rot
 
-        goal_pos, goal_rot = self.goal_pos.clone(), self.goal_rot.clone()
-        goal_pos[env_ids] = (
-            self.goal_pos[env_ids] + self.goal_displacement_tensor + self._env_pos[env_ids]
-        )  # add world env pos
-
-        self._goals.set_world_poses(goal_pos[env_ids], goal_rot[env_ids], indices)
+        self.write_goal_poses(env_ids)
         self.reset_goal_buf[env_ids] = 0
 
+    def write_goal_poses(self, env_ids):
+        """Writes goal_pos and goal_rot of env_ids to the goal objects."""
+        indices = env_ids.to(dtype=torch.int32)
+        num_resets = len(env_ids)
+
+        # add world env pos
+        goal_world_pos = torch.add(
+            self.goal_pos[env_ids], self._env_pos[env_ids], out=self._goal_world_pos[:num_resets]
+        )
+        goal_world_pos.add_(self.goal_displacement_tensor)
+
+        self._goals.set_world_poses(goal_world_pos, self.goal_rot[env_ids], indices)
+
+    def reset_masked(self, mask):
+        """Starts a new episode for the envs in mask and sets new goals, with masked operations.
+
+        The hands and objects of the envs in mask are written by reset_views, the goal objects
+        on the next compaction step.
+        """
+        # new goals for the envs that reached theirs and for the reset envs
+        goal_mask = torch.logical_or(self.reset_goal_buf != 0, mask, out=self._goal_mask)
+        rand_floats = torch.rand((self.num_envs, 4), device=self.device, out=self._goal_rand_floats)
+        rand_floats.mul_(2.0).sub_(1.0)
+        new_rot = randomize_rotation(rand_floats[:, 0], rand_floats[:, 1], self.x_unit_tensor, self.y_unit_tensor)
+
+        self.goal_pos.copy_(torch.where(goal_mask.unsqueeze(-1), self.goal_init_pos, self.goal_pos))
+        self.goal_rot.copy_(torch.where(goal_mask.unsqueeze(-1), new_rot, self.goal_rot))
+        self._goal_pending.logical_or_(goal_mask)
+        self.reset_goal_buf.masked_fill_(goal_mask, 0)
+
+        self.progress_buf.masked_fill_(mask, 0)
+        self.reset_buf.masked_fill_(mask, 0)
+        self.successes.masked_fill_(mask, 0)
+
+    def reset_views(self, env_ids):
+        self._reset_hands_and_objects(env_ids)
+
     def reset_idx(self, env_ids):
+        self._reset_hands_and_objects(env_ids, reset_goals=True)
+
+        self.progress_buf[env_ids] = 0
+        self.reset_buf[env_ids] = 0
+        self.successes[env_ids] = 0
+
+    def _reset_hands_and_objects(self, env_ids, reset_goals=False):
         indices = env_ids.to(dtype=torch.int32)
-        rand_floats = torch_rand_float(-1.0, 1.0, (len(env_ids), self.num_hand_dofs * 2 + 5), device=self.device)
+        num_resets = len(env_ids)
+        rand_floats = torch.rand(
+            (num_resets, self.num_hand_dofs * 2 + 5), device=self.device, out=self._reset_rand_floats[:num_resets]
+        )
+        rand_floats.mul_(2.0).sub_(1.0)
 
-        self.reset_target_pose(env_ids)
+        if reset_goals:
+            self.reset_target_pose(env_ids)
 
         # reset object
-        new_object_pos = (
-            self.object_init_pos[env_ids] + self.reset_position_noise * rand_floats[:, 0:3] + self._env_pos[env_ids]
+        new_object_pos = torch.add(
+            self.object_init_pos[env_ids], self._env_pos[env_ids], out=self._object_world_pos[:num_resets]
         )  # add world env pos
+        new_object_pos.add_(rand_floats[:, 0:3], alpha=self.reset_position_noise)
 
         new_object_rot = randomize_rotation(
-            rand_floats[:, 3], rand_floats[:, 4], self.x_unit_tensor[env_ids], self.y_unit_tensor[env_ids]
+            rand_floats[:, 3], rand_floats[:, 4], self.x_unit_tensor[:num_resets], self.y_unit_tensor[:num_resets]
         )
 
-        object_velocities = torch.zeros_like(self.object_init_velocities, dtype=torch.float, device=self.device)
-        self._objects.set_velocities(object_velocities[env_ids], indices)
+        self._objects.set_velocities(self._reset_object_velocities[:num_resets], indices)
         self._objects.set_world_poses(new_object_pos, new_object_rot, indices)
 
         # reset hand
-        delta_max = self.hand_dof_upper_limits - self.hand_dof_default_pos
-        delta_min = self.hand_dof_lower_limits - self.hand_dof_default_pos
-        rand_delta = delta_min + (delta_max - delta_min) * 0.5 * (rand_floats[:, 5 : 5 + self.num_hand_dofs] + 1.0)
-
-        pos = self.hand_dof_default_pos + self.reset_dof_pos_noise * rand_delta
-        dof_pos = torch.zeros((self.num_envs, self.num_hand_dofs), device=self.device)
-        dof_pos[env_ids, :] = pos
-
-        dof_vel = torch.zeros((self.num_envs, self.num_hand_dofs), device=self.device)
-        dof_vel[env_ids, :] = (
-            self.hand_dof_default_vel
-            + self.reset_dof_vel_noise * rand_floats[:, 5 + self.num_hand_dofs : 5 + self.num_hand_dofs * 2]
+        # pos = default + noise * (delta_min + (delta_max - delta_min) * 0.5 * (rand + 1))
+        pos = self._reset_dof_pos[:num_resets]
+        torch.add(rand_floats[:, 5 : 5 + self.num_hand_dofs], 1.0, out=pos)
+        pos.mul_(0.5 * self._reset_dof_delta_range).add_(self._reset_dof_delta_min)
+        pos.mul_(self.reset_dof_pos_noise).add_(self.hand_dof_default_pos)
+
+        dof_vel = torch.mul(
+            rand_floats[:, 5 + self.num_hand_dofs : 5 + self.num_hand_dofs * 2],
+            self.reset_dof_vel_noise,
+            out=self._reset_dof_vel[:num_resets],
         )
+        dof_vel.add_(self.hand_dof_default_vel)
 
         self.prev_targets[env_ids, : self.num_hand_dofs] = pos
         self.cur_targets[env_ids, : self.num_hand_dofs] = pos
         self.hand_dof_targets[env_ids, :] = pos
 
-        self._hands.set_joint_position_targets(self.hand_dof_targets[env_ids], indices)
-        self._hands.set_joint_positions(dof_pos[env_ids], indices)
-        self._hands.set_joint_velocities(dof_vel[env_ids], indices)
-
-        self.progress_buf[env_ids] = 0
-        self.reset_buf[env_ids] = 0
-        self.successes[env_ids] = 0
+        self._hands.set_joint_position_targets(pos, indices)
+        self._hands.set_joint_positions(pos, indices)
+        self._hands.set_joint_velocities(dof_vel, indices)
 
 
 #####################################################################
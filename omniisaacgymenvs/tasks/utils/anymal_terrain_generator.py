@@ -26,16 +26,81 @@
 # OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import glob
+import hashlib
+import json
 import math
+import os
+
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 import torch
 from omniisaacgymenvs.utils.terrain_utils.terrain_utils import *
 
+# bump when the generated terrain changes for a given config and seed
+TERRAIN_CACHE_VERSION = 1
+
+
+def terrain_cache_key(cfg, seed):
+    """Hash of the terrain config and seed, used to name cached terrain files."""
+    cfg = {name: value for name, value in cfg.items() if name not in ("cacheDir", "cacheSize", "numWorkers")}
+    key = json.dumps({"version": TERRAIN_CACHE_VERSION, "seed": seed, "cfg": cfg}, sort_keys=True, default=str)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def prune_terrain_cache(cache_dir, max_entries):
+    """Deletes the least recently used cached terrains of cache_dir beyond the max_entries most recent ones."""
+    paths = glob.glob(os.path.join(cache_dir, "terrain_*.npz"))
+    if len(paths) <= max_entries:
+        return
+    mtimes = {}
+    for path in paths:
+        try:
+            mtimes[path] = os.path.getmtime(path)
+        except FileNotFoundError:
+            # pruned by a concurrent run
+            pass
+    for path in sorted(mtimes, key=mtimes.get, reverse=True)[max_entries:]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def generate_sub_terrain_batch(terrains, ops):
+    """Applies batched generators to a SubTerrainBatch and returns its heightfields.
+
+    Args:
+        terrains (SubTerrainBatch): the terrains.
+        ops (list): (generator, kwargs) pairs applied in order.
+
+    Returns:
+        np.ndarray: (num_terrains, width, length) heightfields.
+    """
+    for generator, kwargs in ops:
+        generator(terrains, **kwargs)
+    return terrains.height_field_raw
+
 
 # terrain generator
 class Terrain:
-    def __init__(self, cfg, num_robots) -> None:
+    def __init__(self, cfg, num_robots, seed=None, cache_dir=None) -> None:
+        """Generates the terrain heightfield and its triangle mesh.
+
+        Args:
+            cfg (dict): terrain config of the task.
+            num_robots (int): number of robots placed on the terrain.
+            seed (Optional[int]): seed of the terrain generation. The global numpy random state is
+                left untouched when a seed is given. Defaults to None (use the global random state).
+            cache_dir (Optional[str]): directory where terrains are cached, keyed by config and seed.
+                Only used when a seed is given. Defaults to None (no caching).
+
+        The optional numWorkers entry of cfg sets the number of processes used to generate the
+        sub-terrain batches. Defaults to 0 (generate in this process). The optional cacheSize entry
+        sets the number of terrains kept in cache_dir, the least recently used ones are deleted
+        beyond it, so that runs with random seeds do not fill the disk. Defaults to 8.
+        """
         self.horizontal_scale = 0.1
         self.vertical_scale = 0.005
         self.border_size = 20
@@ -44,6 +109,8 @@ class Terrain:
         self.env_width = cfg["mapWidth"]
         self.proportions = [np.sum(cfg["terrainProportions"][: i + 1]) for i in range(len(cfg["terrainProportions"]))]
 
+        self.num_workers = cfg.get("numWorkers", 0)
+
         self.env_rows = cfg["numLevels"]
         self.env_cols = cfg["numTerrains"]
         self.num_maps = self.env_rows * self.env_cols
@@ -57,6 +124,29 @@ class Terrain:
         self.tot_cols = int(self.env_cols * self.width_per_env_pixels) + 2 * self.border
         self.tot_rows = int(self.env_rows * self.length_per_env_pixels) + 2 * self.border
 
+        cache_path = None
+        if seed is not None and cache_dir is not None:
+            cache_path = os.path.join(cache_dir, f"terrain_{terrain_cache_key(cfg, seed)}.npz")
+        if cache_path is not None and os.path.isfile(cache_path):
+            self._load(cache_path)
+            # mark as recently used
+            os.utime(cache_path)
+            return
+
+        if seed is None:
+            self._generate(cfg, num_robots)
+        else:
+            random_state = np.random.get_state()
+            np.random.seed(seed)
+            try:
+                self._generate(cfg, num_robots)
+            finally:
+                np.random.set_state(random_state)
+        if cache_path is not None:
+            self._save(cache_path)
+            prune_terrain_cache(cache_dir, cfg.get("cacheSize", 8))
+
+    def _generate(self, cfg, num_robots):
         self.height_field_raw = np.zeros((self.tot_rows, self.tot_cols), dtype=np.int16)
         if cfg["curriculum"]:
             self.curiculum(num_robots, num_terrains=self.env_cols, num_levels=self.env_rows)
@@ -67,105 +157,220 @@ class Terrain:
             self.height_field_raw, self.horizontal_scale, self.vertical_scale, cfg["slopeTreshold"]
         )
 
+    def _load(self, path):
+        with np.load(path) as data:
+            self.height_field_raw = data["height_field_raw"]
+            self.vertices = data["vertices"]
+            self.triangles = data["triangles"]
+            self.env_origins = data["env_origins"]
+        self.heightsamples = self.height_field_raw
+
+    def _save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write to a temporary file first so that concurrent runs never read a partial cache
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                height_field_raw=self.height_field_raw,
+                vertices=self.vertices,
+                triangles=self.triangles,
+                env_origins=self.env_origins,
+            )
+        os.replace(tmp_path, path)
+
+    def _new_batch(self, num_terrains):
+        return SubTerrainBatch(
+            num_terrains,
+            "terrain",
+            width=self.width_per_env_pixels,
+            length=self.width_per_env_pixels,
+            vertical_scale=self.vertical_scale,
+            horizontal_scale=self.horizontal_scale,
+        )
+
+    def _generate_batches(self, batches):
+        """Generates batches of sub-terrains and places them in the heightfield.
+
+        Args:
+            batches (list): (levels, types, terrains, ops) tuples, where levels and types are the map
+                coordinates of the terrains of the SubTerrainBatch and ops the batched generators to
+                apply to it, with their random samples already drawn.
+        """
+        if self.num_workers > 1 and len(batches) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.num_workers, len(batches))) as executor:
+                fields = list(
+                    executor.map(
+                        generate_sub_terrain_batch,
+                        [terrains for _, _, terrains, _ in batches],
+                        [ops for _, _, _, ops in batches],
+                    )
+                )
+        else:
+            fields = [generate_sub_terrain_batch(terrains, ops) for _, _, terrains, ops in batches]
+
+        x1 = int((self.env_length / 2.0 - 1) / self.horizontal_scale)
+        x2 = int((self.env_length / 2.0 + 1) / self.horizontal_scale)
+        y1 = int((self.env_width / 2.0 - 1) / self.horizontal_scale)
+        y2 = int((self.env_width / 2.0 + 1) / self.horizontal_scale)
+        for (levels, types, _, _), field in zip(batches, fields):
+            for i, j, height_field_raw in zip(levels, types, field):
+                # Heightfield coordinate system
+                start_x = self.border + i * self.length_per_env_pixels
+                end_x = self.border + (i + 1) * self.length_per_env_pixels
+                start_y = self.border + j * self.width_per_env_pixels
+                end_y = self.border + (j + 1) * self.width_per_env_pixels
+                self.height_field_raw[start_x:end_x, start_y:end_y] = height_field_raw
+
+            # Env coordinates in the world
+            levels = np.asarray(levels)
+            types = np.asarray(types)
+            self.env_origins[levels, types, 0] = (levels + 0.5) * self.env_length
+            self.env_origins[levels, types, 1] = (types + 0.5) * self.env_width
+            self.env_origins[levels, types, 2] = np.max(field[:, x1:x2, y1:y2], axis=(1, 2)) * self.vertical_scale
+
     def randomized_terrain(self):
+        # terrain types and random parameters are drawn map by map, as with one generator call per
+        # map, then the maps of each type are generated as a batch
+        template = self._new_batch(1)
+        maps = {"slope": [], "rough_slope": [], "stairs": [], "discrete": []}
         for k in range(self.num_maps):
             # Env coordinates in the world
             (i, j) = np.unravel_index(k, (self.env_rows, self.env_cols))
 
-            # Heightfield coordinate system from now on
-            start_x = self.border + i * self.length_per_env_pixels
-            end_x = self.border + (i + 1) * self.length_per_env_pixels
-            start_y = self.border + j * self.width_per_env_pixels
-            end_y = self.border + (j + 1) * self.width_per_env_pixels
-
-            terrain = SubTerrain(
-                "terrain",
-                width=self.width_per_env_pixels,
-                length=self.width_per_env_pixels,
-                vertical_scale=self.vertical_scale,
-                horizontal_scale=self.horizontal_scale,
-            )
             choice = np.random.uniform(0, 1)
             if choice < 0.1:
                 if np.random.choice([0, 1]):
-                    pyramid_sloped_terrain(terrain, np.random.choice([-0.3, -0.2, 0, 0.2, 0.3]))
-                    random_uniform_terrain(terrain, min_height=-0.1, max_height=0.1, step=0.05, downsampled_scale=0.2)
+                    slope = np.random.choice([-0.3, -0.2, 0, 0.2, 0.3])
+                    heights = sample_random_uniform_heights(
+                        template, min_height=-0.1, max_height=0.1, step=0.05, downsampled_scale=0.2
+                    )
+                    maps["rough_slope"].append((i, j, slope, heights[0]))
                 else:
-                    pyramid_sloped_terrain(terrain, np.random.choice([-0.3, -0.2, 0, 0.2, 0.3]))
+                    maps["slope"].append((i, j, np.random.choice([-0.3, -0.2, 0, 0.2, 0.3])))
             elif choice < 0.6:
                 # step_height = np.random.choice([-0.18, -0.15, -0.1, -0.05, 0.05, 0.1, 0.15, 0.18])
-                step_height = np.random.choice([-0.15, 0.15])
-                pyramid_stairs_terrain(terrain, step_width=0.31, step_height=step_height, platform_size=3.0)
+                maps["stairs"].append((i, j, np.random.choice([-0.15, 0.15])))
             elif choice < 1.0:
-                discrete_obstacles_terrain(terrain, 0.15, 1.0, 2.0, 40, platform_size=3.0)
-
-            self.height_field_raw[start_x:end_x, start_y:end_y] = terrain.height_field_raw
+                rects = sample_discrete_obstacles(template, 0.15, 1.0, 2.0, 40)
+                maps["discrete"].append((i, j, rects[0]))
 
-            env_origin_x = (i + 0.5) * self.env_length
-            env_origin_y = (j + 0.5) * self.env_width
-            x1 = int((self.env_length / 2.0 - 1) / self.horizontal_scale)
-            x2 = int((self.env_length / 2.0 + 1) / self.horizontal_scale)
-            y1 = int((self.env_width / 2.0 - 1) / self.horizontal_scale)
-            y2 = int((self.env_width / 2.0 + 1) / self.horizontal_scale)
-            env_origin_z = np.max(terrain.height_field_raw[x1:x2, y1:y2]) * self.vertical_scale
-            self.env_origins[i, j] = [env_origin_x, env_origin_y, env_origin_z]
+        batches = []
+        for kind, params in maps.items():
+            if len(params) == 0:
+                continue
+            levels, types, *samples = zip(*params)
+            terrains = self._new_batch(len(params))
+            if kind == "slope":
+                ops = [(pyramid_sloped_terrain_batch, dict(slopes=samples[0]))]
+            elif kind == "rough_slope":
+                ops = [
+                    (pyramid_sloped_terrain_batch, dict(slopes=samples[0])),
+                    (
+                        random_uniform_terrain_batch,
+                        dict(
+                            min_height=-0.1,
+                            max_height=0.1,
+                            step=0.05,
+                            downsampled_scale=0.2,
+                            heights=np.stack(samples[1]),
+                        ),
+                    ),
+                ]
+            elif kind == "stairs":
+                ops = [
+                    (
+                        pyramid_stairs_terrain_batch,
+                        dict(step_width=0.31, step_heights=samples[0], platform_size=3.0),
+                    )
+                ]
+            else:
+                ops = [
+                    (
+                        discrete_obstacles_terrain_batch,
+                        dict(
+                            max_heights=0.15,
+                            min_size=1.0,
+                            max_size=2.0,
+                            num_rects=40,
+                            platform_size=3.0,
+                            rects=np.stack(samples[0]),
+                        ),
+                    )
+                ]
+            batches.append((levels, types, terrains, ops))
+        self._generate_batches(batches)
 
     def curiculum(self, num_robots, num_terrains, num_levels):
-        num_robots_per_map = int(num_robots / num_terrains)
-        left_over = num_robots % num_terrains
-        idx = 0
+        # all levels of a terrain type are generated as one batch, types in the order of the
+        # original per sub-terrain loop so that random samples are drawn in the same order
+        levels = np.arange(num_levels)
+        difficulty = levels / num_levels
+        batches = []
         for j in range(num_terrains):
-            for i in range(num_levels):
-                terrain = SubTerrain(
-                    "terrain",
-                    width=self.width_per_env_pixels,
-                    length=self.width_per_env_pixels,
-                    vertical_scale=self.vertical_scale,
-                    horizontal_scale=self.horizontal_scale,
+            terrains = self._new_batch(num_levels)
+            choice = j / num_terrains
+
+            slope = difficulty * 0.4
+            step_height = 0.05 + 0.175 * difficulty
+            discrete_obstacles_height = 0.025 + difficulty * 0.15
+            stepping_stones_size = 2 - 1.8 * difficulty
+            if choice < self.proportions[0]:
+                if choice < 0.05:
+                    slope *= -1
+                ops = [(pyramid_sloped_terrain_batch, dict(slopes=slope, platform_size=3.0))]
+            elif choice < self.proportions[1]:
+                if choice < 0.15:
+                    slope *= -1
+                heights = sample_random_uniform_heights(
+                    terrains, min_height=-0.1, max_height=0.1, step=0.025, downsampled_scale=0.2
                 )
-                difficulty = i / num_levels
-                choice = j / num_terrains
-
-                slope = difficulty * 0.4
-                step_height = 0.05 + 0.175 * difficulty
-                discrete_obstacles_height = 0.025 + difficulty * 0.15
-                stepping_stones_size = 2 - 1.8 * difficulty
-                if choice < self.proportions[0]:
-                    if choice < 0.05:
-                        slope *= -1
-                    pyramid_sloped_terrain(terrain, slope=slope, platform_size=3.0)
-                elif choice < self.proportions[1]:
-                    if choice < 0.15:
-                        slope *= -1
-                    pyramid_sloped_terrain(terrain, slope=slope, platform_size=3.0)
-                    random_uniform_terrain(terrain, min_height=-0.1, max_height=0.1, step=0.025, downsampled_scale=0.2)
-                elif choice < self.proportions[3]:
-                    if choice < self.proportions[2]:
-                        step_height *= -1
-                    pyramid_stairs_terrain(terrain, step_width=0.31, step_height=step_height, platform_size=3.0)
-                elif choice < self.proportions[4]:
-                    discrete_obstacles_terrain(terrain, discrete_obstacles_height, 1.0, 2.0, 40, platform_size=3.0)
-                else:
-                    stepping_stones_terrain(
-                        terrain, stone_size=stepping_stones_size, stone_distance=0.1, max_height=0.0, platform_size=3.0
+                ops = [
+                    (pyramid_sloped_terrain_batch, dict(slopes=slope, platform_size=3.0)),
+                    (
+                        random_uniform_terrain_batch,
+                        dict(min_height=-0.1, max_height=0.1, step=0.025, downsampled_scale=0.2, heights=heights),
+                    ),
+                ]
+            elif choice < self.proportions[3]:
+                if choice < self.proportions[2]:
+                    step_height *= -1
+                ops = [
+                    (
+                        pyramid_stairs_terrain_batch,
+                        dict(step_width=0.31, step_heights=step_height, platform_size=3.0),
                     )
-
-                # Heightfield coordinate system
-                start_x = self.border + i * self.length_per_env_pixels
-                end_x = self.border + (i + 1) * self.length_per_env_pixels
-                start_y = self.border + j * self.width_per_env_pixels
-                end_y = self.border + (j + 1) * self.width_per_env_pixels
-                self.height_field_raw[start_x:end_x, start_y:end_y] = terrain.height_field_raw
-
-                robots_in_map = num_robots_per_map
-                if j < left_over:
-                    robots_in_map += 1
-
-                env_origin_x = (i + 0.5) * self.env_length
-                env_origin_y = (j + 0.5) * self.env_width
-                x1 = int((self.env_length / 2.0 - 1) / self.horizontal_scale)
-                x2 = int((self.env_length / 2.0 + 1) / self.horizontal_scale)
-                y1 = int((self.env_width / 2.0 - 1) / self.horizontal_scale)
-                y2 = int((self.env_width / 2.0 + 1) / self.horizontal_scale)
-                env_origin_z = np.max(terrain.height_field_raw[x1:x2, y1:y2]) * self.vertical_scale
-                self.env_origins[i, j] = [env_origin_x, env_origin_y, env_origin_z]
+                ]
+            elif choice < self.proportions[4]:
+                rects = sample_discrete_obstacles(terrains, discrete_obstacles_height, 1.0, 2.0, 40)
+                ops = [
+                    (
+                        discrete_obstacles_terrain_batch,
+                        dict(
+                            max_heights=discrete_obstacles_height,
+                            min_size=1.0,
+                            max_size=2.0,
+                            num_rects=40,
+                            platform_size=3.0,
+                            rects=rects,
+                        ),
+                    )
+                ]
+            else:
+                samples = sample_stepping_stones(
+                    terrains, stone_sizes=stepping_stones_size, stone_distance=0.1, max_height=0.0
+                )
+                ops = [
+                    (
+                        stepping_stones_terrain_batch,
+                        dict(
+                            stone_sizes=stepping_stones_size,
+                            stone_distance=0.1,
+                            max_height=0.0,
+                            platform_size=3.0,
+                            samples=samples,
+                        ),
+                    )
+                ]
+            batches.append((levels, np.full(num_levels, j), terrains, ops))
+        self._generate_batches(batches)
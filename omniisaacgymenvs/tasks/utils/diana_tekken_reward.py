@@ -0,0 +1,146 @@
+# Copyright (c) 2018-2022, NVIDIA Corporation
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+
+"""Scripted reward and reset computation of DianaTekkenTask.
+
+Only depends on torch, so it can be imported and benchmarked without Isaac Sim.
+"""
+
+import torch
+
+# Columns of DianaTekkenTask.reward_terms
+REWARD_TERMS = [
+    "grasp_pos",
+    "grasp_rot",
+    "drill_height",
+    "drill_rot",
+    "manipulability",
+    "goal",
+    "drill_out_of_bound",
+    "hand_out_of_bound",
+]
+
+
+@torch.jit.script
+def quat_diff_rad(a, b):
+    """Angle between the unit quaternions a and b, (w, x, y, z) first, as in omni.isaac.core."""
+    # vector part of a * conj(b)
+    w1, x1, y1, z1 = a[:, 0], a[:, 1], a[:, 2], a[:, 3]
+    w2, x2, y2, z2 = b[:, 0], -b[:, 1], -b[:, 2], -b[:, 3]
+    x = w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2
+    y = w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2
+    z = w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2
+    return 2.0 * torch.asin(torch.clamp(torch.sqrt(x * x + y * y + z * z), max=1.0))
+
+
+@torch.jit.script
+def log_distance_reward(d, w: float):
+    # equal to log(1 / (1 + d^2)) * w
+    return -torch.log1p(d * d) * w
+
+
+@torch.jit.script
+def contacts_to_manipulability(joint_efforts, thumb_contact_idxs, four_finger_contact_idxs, tol: float):
+    in_contact = joint_efforts > tol
+    thumb_contact = torch.any(in_contact.index_select(1, thumb_contact_idxs), dim=1)
+    finger_contact = torch.any(in_contact.index_select(1, four_finger_contact_idxs), dim=1)
+    num_contacts = torch.count_nonzero(in_contact, dim=1)
+    return (thumb_contact & finger_contact) * num_contacts
+
+
+@torch.jit.script
+def compute_diana_tekken_reward(
+    rew_buf,
+    reset_buf,
+    reward_terms,
+    manipulability,
+    progress_buf,
+    joint_efforts,
+    thumb_contact_idxs,
+    four_finger_contact_idxs,
+    hand_pos,
+    hand_in_drill_pos,
+    hand_in_drill_rot,
+    drill_pos,
+    drill_rot,
+    ref_grasp_in_drill_pos,
+    ref_grasp_in_drill_rot,
+    drill_zero_rot,
+    hand_lower_bound,
+    hand_upper_bound,
+    drill_upper_bound,
+    drill_reset_lower_bound,
+    max_episode_length: int,
+    fail_penalty: float = 10.0,
+    goal_achieved: float = 1.0,
+    manipulability_prize: float = 0.05,
+    goal_height: float = 0.7,
+    contact_tol: float = 0.1,
+):
+    """Writes rewards, resets, per-term rewards and manipulability in place into the given buffers."""
+    drill_height = drill_pos[:, 2]
+    goal = drill_height > goal_height
+
+    # Distance hand to drill grasp pos
+    d = torch.norm(hand_in_drill_pos - ref_grasp_in_drill_pos, p=2, dim=1)
+    reward_terms[:, 0] = log_distance_reward(d, 0.2) + (d < 0.05) * 0.05
+
+    # Rotation difference
+    d = quat_diff_rad(hand_in_drill_rot, ref_grasp_in_drill_rot)
+    reward_terms[:, 1] = log_distance_reward(d, 0.2)
+
+    # Distance to target height
+    reward_terms[:, 2] = log_distance_reward(torch.abs(goal_height - drill_height), 0.5)
+
+    # Orientation cost
+    d = quat_diff_rad(drill_zero_rot, drill_rot)
+    reward_terms[:, 3] = log_distance_reward(d, 0.2) + ((d < 0.15) & goal) * 0.5
+
+    manipulability.copy_(
+        contacts_to_manipulability(joint_efforts, thumb_contact_idxs, four_finger_contact_idxs, contact_tol)
+    )
+    reward_terms[:, 4] = manipulability * manipulability_prize
+
+    # Prize if goal achieved
+    reward_terms[:, 5] = goal * goal_achieved
+
+    # If the drill or the hand are out of bound
+    drill_out_upper = torch.any(drill_pos[:, :2] >= drill_upper_bound[:2], dim=1)
+    drill_out_lower = torch.any(drill_pos <= drill_reset_lower_bound, dim=1)
+    hand_out_upper = torch.any(hand_pos[:, :2] >= hand_upper_bound[:2], dim=1)
+    hand_out_lower = torch.any(hand_pos[:, :2] <= hand_lower_bound[:2], dim=1)
+    reward_terms[:, 6] = (drill_out_upper.float() + drill_out_lower.float()) * -fail_penalty
+    reward_terms[:, 7] = (hand_out_upper.float() + hand_out_lower.float()) * -fail_penalty
+
+    torch.sum(reward_terms, dim=1, out=rew_buf)
+
+    out_of_bound = drill_out_upper | drill_out_lower | hand_out_upper | hand_out_lower
+    resets = (progress_buf >= max_episode_length - 1) | out_of_bound
+    reset_buf.logical_or_(resets)
\ No newline at end of file
@@ -0,0 +1,127 @@
+# Copyright (c) 2018-2022, NVIDIA Corporation
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import torch
+
+
+class DifferentialIKController:
+    """Damped least squares inverse kinematics for a batch of articulations.
+
+    Each call to `compute` takes one Levenberg-Marquardt step for all the envs at once,
+
+        dq = J^T (J J^T + damping^2 I)^-1 e
+
+    where e stacks the position error and the axis-angle orientation error of the end effector,
+    all in the world frame. The 6x6 system is solved with a Cholesky factorization, so the
+    step is defined even at singular configurations. Called once per control step with the
+    current Jacobian, the joint targets converge to the target pose over successive steps.
+    """
+
+    def __init__(self, num_envs, num_dofs, damping=0.05, max_delta=None, device="cpu"):
+        """Allocates the solver buffers.
+
+        Args:
+            num_envs (int): number of articulations.
+            num_dofs (int): number of DOFs driven by the controller.
+            damping (float): damping of the least squares problem, in units of the task error.
+            max_delta (Optional[float]): bound on the absolute change of any DOF in one step.
+                Defaults to None (no bound).
+            device (str): device of the buffers.
+        """
+        self.num_envs = num_envs
+        self.num_dofs = num_dofs
+        self.damping = damping
+        self.max_delta = max_delta
+        self.device = device
+
+        self._damping_matrix = torch.eye(6, device=device) * damping**2
+        self._error = torch.zeros((num_envs, 6, 1), device=device)
+        self._jjt = torch.zeros((num_envs, 6, 6), device=device)
+        self._delta = torch.zeros((num_envs, num_dofs, 1), device=device)
+
+    def compute(self, jacobian, ee_pos, ee_rot, target_pos, target_rot, joint_pos, out=None):
+        """Computes joint positions one damped least squares step closer to the target poses.
+
+        Args:
+            jacobian (torch.Tensor): (num_envs, 6, num_dofs) world frame Jacobian of the end effector.
+            ee_pos (torch.Tensor): (num_envs, 3) end effector positions.
+            ee_rot (torch.Tensor): (num_envs, 4) end effector orientations (w, x, y, z).
+            target_pos (torch.Tensor): (num_envs, 3) target positions.
+            target_rot (torch.Tensor): (num_envs, 4) target orientations (w, x, y, z).
+            joint_pos (torch.Tensor): (num_envs, num_dofs) current positions of the DOFs.
+            out (Optional[torch.Tensor]): (num_envs, num_dofs) output joint positions.
+
+        Returns:
+            torch.Tensor: (num_envs, num_dofs) joint positions.
+        """
+        self._error.copy_(pose_error(ee_pos, ee_rot, target_pos, target_rot).unsqueeze(-1))
+
+        # (J J^T + damping^2 I) x = e, then dq = J^T x
+        torch.bmm(jacobian, jacobian.transpose(1, 2), out=self._jjt)
+        self._jjt.add_(self._damping_matrix)
+        factor, _ = torch.linalg.cholesky_ex(self._jjt)
+        torch.bmm(jacobian.transpose(1, 2), torch.cholesky_solve(self._error, factor), out=self._delta)
+
+        delta = self._delta.squeeze(-1)
+        if self.max_delta is not None:
+            delta.clamp_(-self.max_delta, self.max_delta)
+        if out is None:
+            return joint_pos + delta
+        return torch.add(joint_pos, delta, out=out)
+
+
+###=========================jit functions=========================###
+###=================================================================###
+
+
+@torch.jit.script
+def pose_error(
+    ee_pos: torch.Tensor, ee_rot: torch.Tensor, target_pos: torch.Tensor, target_rot: torch.Tensor
+) -> torch.Tensor:
+    # world frame position error and axis-angle of target_rot * ee_rot^-1, along the shortest path
+    w1, x1, y1, z1 = target_rot[:, 0], target_rot[:, 1], target_rot[:, 2], target_rot[:, 3]
+    w2, x2, y2, z2 = ee_rot[:, 0], -ee_rot[:, 1], -ee_rot[:, 2], -ee_rot[:, 3]
+    w = w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2
+    xyz = torch.stack(
+        (
+            w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+            w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+            w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2,
+        ),
+        dim=-1,
+    )
+    sign = torch.where(w < 0.0, -1.0, 1.0)
+    w = w * sign
+    xyz = xyz * sign.unsqueeze(-1)
+
+    sin_half_angle = torch.norm(xyz, dim=-1)
+    angle = 2.0 * torch.atan2(sin_half_angle, w)
+    # angle / sin(angle / 2) tends to 2 for small angles
+    scale = torch.where(sin_half_angle > 1e-6, angle / sin_half_angle.clamp(min=1e-6), 2.0)
+    return torch.cat((target_pos - ee_pos, xyz * scale.unsqueeze(-1)), dim=-1)
@@ -0,0 +1,119 @@
+# Copyright (c) 2018-2022, NVIDIA Corporation
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import torch
+
+# Hamilton product of (w, x, y, z) quaternions written as
+#   (a * b)[i] = sum_k _QUAT_MUL_SIGNS[i, k] * a[k] * b[_QUAT_MUL_B_IDX[i, k]]
+_QUAT_MUL_B_IDX = [
+    [0, 1, 2, 3],
+    [1, 0, 3, 2],
+    [2, 3, 0, 1],
+    [3, 2, 1, 0],
+]
+_QUAT_MUL_SIGNS = [
+    [1.0, -1.0, -1.0, -1.0],
+    [1.0, 1.0, 1.0, -1.0],
+    [1.0, -1.0, 1.0, 1.0],
+    [1.0, 1.0, -1.0, 1.0],
+]
+
+
+class FrameTransformWorkspace:
+    """Preallocated scratch space for batched quaternion products and frame transforms.
+
+    All methods write their result into a caller provided `out` tensor, which can be a
+    (non-contiguous) slice of an observation buffer, and do not allocate device memory.
+    Quaternions are (w, x, y, z), as in omni.isaac.core.utils.torch.rotations.
+    """
+
+    def __init__(self, num_envs, device):
+        """Allocates the workspace for batches of `num_envs` quaternions.
+
+        Args:
+            num_envs (int): batch size of all the inputs.
+            device (str): device of the inputs.
+        """
+        self.num_envs = num_envs
+        self.device = device
+
+        self._b_idx = torch.tensor(_QUAT_MUL_B_IDX, dtype=torch.long, device=device).flatten()
+        signs = torch.tensor(_QUAT_MUL_SIGNS, dtype=torch.float, device=device)
+        conj = torch.tensor([1.0, -1.0, -1.0, -1.0], device=device)
+        # conjugating a flips the sign of columns k > 0, conjugating b the entries that gather b[j > 0]
+        conj_b = conj[self._b_idx].view(4, 4)
+        self._signs = {
+            (False, False): signs,
+            (True, False): signs * conj,
+            (False, True): signs * conj_b,
+            (True, True): signs * conj * conj_b,
+        }
+
+        self._products = torch.zeros((num_envs, 16), device=device)
+        self._vec_quat = torch.zeros((num_envs, 4), device=device)
+        self._tmp_quat = torch.zeros((num_envs, 4), device=device)
+        self._rot_quat = torch.zeros((num_envs, 4), device=device)
+
+    def quat_mul(self, a, b, out, conj_a=False, conj_b=False):
+        """Computes (a* if conj_a else a) * (b* if conj_b else b) into out."""
+        products = self._products.view(self.num_envs, 4, 4)
+        torch.index_select(b, 1, self._b_idx, out=self._products)
+        products.mul_(a.unsqueeze(1))
+        products.mul_(self._signs[(conj_a, conj_b)])
+        return torch.sum(products, dim=2, out=out)
+
+    def quat_rotate(self, q, v, out, inverse=False):
+        """Rotates the vectors v by q (or by q* if inverse) into out."""
+        self._vec_quat[:, 1:].copy_(v)
+        # q v q* or q* v q
+        self.quat_mul(q, self._vec_quat, out=self._tmp_quat, conj_a=inverse)
+        self.quat_mul(self._tmp_quat, q, out=self._rot_quat, conj_b=not inverse)
+        return out.copy_(self._rot_quat[:, 1:])
+
+    def to_local_frame(self, frame_pos, frame_rot, pos, rot, out_pos, out_rot):
+        """Expresses the pose (pos, rot) in the frame (frame_pos, frame_rot).
+
+        Args:
+            frame_pos (torch.Tensor): (num_envs, 3) positions of the frames.
+            frame_rot (torch.Tensor): (num_envs, 4) orientations of the frames.
+            pos (torch.Tensor): (num_envs, 3) positions to transform.
+            rot (torch.Tensor): (num_envs, 4) orientations to transform.
+            out_pos (torch.Tensor): (num_envs, 3) output positions in the local frames.
+            out_rot (torch.Tensor): (num_envs, 4) output orientations in the local frames.
+        """
+        torch.sub(pos, frame_pos, out=self._vec_quat[:, 1:])
+        self.quat_mul(frame_rot, self._vec_quat, out=self._tmp_quat, conj_a=True)
+        self.quat_mul(self._tmp_quat, frame_rot, out=self._rot_quat)
+        out_pos.copy_(self._rot_quat[:, 1:])
+        self.quat_mul(frame_rot, rot, out=out_rot, conj_a=True)
+
+    def to_world_frame(self, frame_pos, frame_rot, local_pos, out_pos):
+        """Maps positions expressed in the frame (frame_pos, frame_rot) back to the parent frame."""
+        self.quat_rotate(frame_rot, local_pos, out=out_pos)
+        return out_pos.add_(frame_pos)
@@ -0,0 +1,231 @@
+# Copyright (c) 2018-2022, NVIDIA Corporation
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import math
+
+import torch
+
+
+class HeightfieldSampler:
+    """Samples the height of a terrain heightfield at batches of points.
+
+    Points are quantized to the heightfield cell below them, as done for the height
+    measurements of AnymalTerrainTask, and sampled with one of the modes:
+
+        nearest:  height of the first corner of the cell.
+        min:      minimum of the first corner and its diagonal neighbour.
+        bilinear: bilinear interpolation of the four corners of the cell.
+
+    The heights of every cell are precomputed in meters for the modes in use, so that a
+    query is a single gather (four values for bilinear) from a flat table.
+    """
+
+    MODES = ("nearest", "min", "bilinear")
+
+    def __init__(self, height_samples, horizontal_scale, vertical_scale, border_size=0.0, mode="min"):
+        """Prepares the sampler for a heightfield.
+
+        Args:
+            height_samples (torch.Tensor): (num_rows, num_cols) heightfield, in units of vertical_scale.
+            horizontal_scale (float): size of a heightfield cell [m].
+            vertical_scale (float): height of a heightfield unit [m].
+            border_size (float): position of the world origin in the heightfield frame [m].
+            mode (str): default sampling mode, one of MODES.
+        """
+        self._check_mode(mode)
+        self.mode = mode
+        self.num_rows, self.num_cols = height_samples.shape
+        self.horizontal_scale = float(horizontal_scale)
+        self.vertical_scale = float(vertical_scale)
+        self.border_size = float(border_size)
+        self.device = height_samples.device
+
+        self._heights = height_samples.to(torch.float) * self.vertical_scale
+        self._tables = {}
+
+    def _check_mode(self, mode):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown heightfield sampling mode {mode}, expected one of {self.MODES}")
+
+    def _table(self, mode):
+        # tables cover the cells [0, num_rows - 2] x [0, num_cols - 2] that points are clipped to
+        if mode not in self._tables:
+            h = self._heights
+            if mode == "nearest":
+                table = h[:-1, :-1].reshape(-1)
+            elif mode == "min":
+                table = torch.minimum(h[:-1, :-1], h[1:, 1:]).reshape(-1)
+            else:
+                table = torch.stack((h[:-1, :-1], h[:-1, 1:], h[1:, :-1], h[1:, 1:]), dim=-1).reshape(-1, 4)
+            self._tables[mode] = table.contiguous()
+        return self._tables[mode]
+
+    def sample(self, points, mode=None, out=None):
+        """Samples the terrain height below points.
+
+        Args:
+            points (torch.Tensor): (..., D) points in the world frame, with D >= 2 and x, y in the first columns.
+            mode (Optional[str]): sampling mode. Defaults to the mode of the sampler.
+            out (Optional[torch.Tensor]): (...) tensor to write the heights to.
+
+        Returns:
+            torch.Tensor: (...) terrain heights [m].
+        """
+        mode = self.mode if mode is None else mode
+        self._check_mode(mode)
+        args = (
+            points[..., 0],
+            points[..., 1],
+            self.border_size,
+            self.horizontal_scale,
+            self.num_rows,
+            self.num_cols,
+        )
+        if mode == "bilinear":
+            heights = sample_bilinear_heights(self._table(mode), *args)
+        else:
+            heights = sample_cell_heights(self._table(mode), *args)
+        if out is None:
+            return heights
+        return out.copy_(heights)
+
+
+class HeightScanPattern:
+    """Grid of points around each robot, rotated with the robot heading.
+
+    Rotating the pattern only needs the yaw of the base, so instead of repeating the base
+    quaternions over every point, the pattern is rotated by a per-env cosine and sine. With
+    a yaw resolution, the rotated patterns are precomputed for every yaw bin and looked up.
+    """
+
+    def __init__(self, points, num_envs, device, yaw_resolution=None):
+        """Stores the pattern and allocates the world frame points.
+
+        Args:
+            points (torch.Tensor): (num_points, 2) x, y offsets of the pattern in the base frame [m].
+            num_envs (int): number of environments.
+            device (str): device of the pattern.
+            yaw_resolution (Optional[float]): size of the yaw bins of the lookup table [rad].
+                Defaults to None (rotate the pattern by the exact yaw).
+        """
+        self.num_envs = num_envs
+        self.device = device
+        self.points = points.to(device=device, dtype=torch.float)
+        self.num_points = self.points.shape[0]
+        self.world_points = torch.zeros((num_envs, self.num_points, 2), device=device)
+
+        self._rotated = None
+        if yaw_resolution is not None:
+            self.num_yaw_bins = int(round(2 * math.pi / yaw_resolution))
+            yaws = torch.arange(self.num_yaw_bins, device=device) * (2 * math.pi / self.num_yaw_bins)
+            cos, sin = torch.cos(yaws)[:, None], torch.sin(yaws)[:, None]
+            x, y = self.points[:, 0], self.points[:, 1]
+            self._rotated = torch.stack((cos * x - sin * y, sin * x + cos * y), dim=-1)
+
+    def transform(self, pos, quat, out=None):
+        """Places the pattern at the given base poses.
+
+        Args:
+            pos (torch.Tensor): (N, 3) base positions.
+            quat (torch.Tensor): (N, 4) base orientations (w, x, y, z).
+            out (Optional[torch.Tensor]): (N, num_points, 2) output. Defaults to world_points when N is num_envs.
+
+        Returns:
+            torch.Tensor: (N, num_points, 2) x, y of the pattern points in the world frame.
+        """
+        if out is None:
+            if pos.shape[0] == self.num_envs:
+                out = self.world_points
+            else:
+                out = torch.empty((pos.shape[0], self.num_points, 2), device=self.device)
+        if self._rotated is None:
+            rotate_yaw(self.points, quat, out)
+        else:
+            yaw = 2.0 * torch.atan2(quat[:, 3], quat[:, 0])
+            bins = torch.round(yaw * (self.num_yaw_bins / (2 * math.pi))).long().remainder_(self.num_yaw_bins)
+            torch.index_select(self._rotated, 0, bins, out=out)
+        return out.add_(pos[:, None, 0:2])
+
+
+###=========================jit functions=========================###
+###=================================================================###
+
+
+@torch.jit.script
+def sample_cell_heights(
+    table: torch.Tensor,
+    x: torch.Tensor,
+    y: torch.Tensor,
+    border_size: float,
+    horizontal_scale: float,
+    num_rows: int,
+    num_cols: int,
+) -> torch.Tensor:
+    px = ((x + border_size) / horizontal_scale).long().clamp_(0, num_rows - 2)
+    py = ((y + border_size) / horizontal_scale).long().clamp_(0, num_cols - 2)
+    return torch.take(table, px * (num_cols - 1) + py)
+
+
+@torch.jit.script
+def sample_bilinear_heights(
+    table: torch.Tensor,
+    x: torch.Tensor,
+    y: torch.Tensor,
+    border_size: float,
+    horizontal_scale: float,
+    num_rows: int,
+    num_cols: int,
+) -> torch.Tensor:
+    fx = (x + border_size) / horizontal_scale
+    fy = (y + border_size) / horizontal_scale
+    x0 = fx.floor().clamp_(0, num_rows - 2)
+    y0 = fy.floor().clamp_(0, num_cols - 2)
+    tx = (fx - x0).clamp_(0.0, 1.0)
+    ty = (fy - y0).clamp_(0.0, 1.0)
+    cells = x0.long() * (num_cols - 1) + y0.long()
+    corners = table[cells]
+    low = torch.lerp(corners[..., 0], corners[..., 1], ty)
+    high = torch.lerp(corners[..., 2], corners[..., 3], ty)
+    return torch.lerp(low, high, tx)
+
+
+@torch.jit.script
+def rotate_yaw(points: torch.Tensor, quat: torch.Tensor, out: torch.Tensor) -> torch.Tensor:
+    # rotation of the yaw component of quat, i.e. of (w, 0, 0, z) normalized
+    w = quat[:, 0:1]
+    z = quat[:, 3:4]
+    norm = w * w + z * z
+    cos = (w * w - z * z) / norm
+    sin = 2.0 * w * z / norm
+    x = points[:, 0].unsqueeze(0)
+    y = points[:, 1].unsqueeze(0)
+    out[..., 0] = cos * x - sin * y
+    out[..., 1] = sin * x + cos * y
+    return out
@@ -0,0 +1,149 @@
+# Copyright (c) 2018-2022, NVIDIA Corporation
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import torch
+
+EPS = 1e-6  # small constant to avoid divisions by 0
+
+
+class RotorDynamics:
+    """First order motor model of the rotors of a batch of multirotors.
+
+    Maps normalized thrust commands in [-1, 1] to rotor thrusts. The rotor speed, taken as
+    the square root of the normalized thrust, follows the command with a first order filter
+    whose time constant differs when spinning up and down, and multiplicative noise shared
+    by all the envs is added to the filtered thrust. All buffers are preallocated, so a
+    step does not allocate device memory.
+    """
+
+    def __init__(
+        self,
+        num_envs,
+        num_rotors,
+        dt,
+        thrust_max,
+        motor_damp_time_up=0.15,
+        motor_damp_time_down=0.15,
+        noise_std=0.01,
+        device="cpu",
+    ):
+        """Allocates the rotor states.
+
+        Args:
+            num_envs (int): number of multirotors.
+            num_rotors (int): number of rotors of each multirotor.
+            dt (float): control time step.
+            thrust_max (Union[float, Sequence[float]]): thrust of a rotor at full command, per rotor or shared.
+            motor_damp_time_up (float): time for the rotor speed to settle when spinning up.
+            motor_damp_time_down (float): time for the rotor speed to settle when spinning down.
+            noise_std (float): standard deviation of the relative thrust noise.
+            device (str): device of the buffers.
+        """
+        self.num_envs = num_envs
+        self.num_rotors = num_rotors
+        self.noise_std = noise_std
+        self.device = device
+
+        # 4 * T is about the time for a step response of a first order filter with time constant T to settle
+        tau_up = min(4 * dt / (motor_damp_time_up + EPS), 1.0)
+        tau_down = min(4 * dt / (motor_damp_time_down + EPS), 1.0)
+        self._tau_up = torch.tensor(tau_up, dtype=torch.float32, device=device)
+        self._tau_down = torch.tensor(tau_down, dtype=torch.float32, device=device)
+        self.thrust_max = torch.as_tensor(thrust_max, dtype=torch.float32, device=device).expand(num_rotors).clone()
+
+        shape = (num_envs, num_rotors)
+        self.thrust_cmds = torch.zeros(shape, dtype=torch.float32, device=device)
+        self.thrust_cmds_damp = torch.zeros(shape, dtype=torch.float32, device=device)
+        self.thrust_rot_damp = torch.zeros(shape, dtype=torch.float32, device=device)
+        self.thrusts = torch.zeros(shape, dtype=torch.float32, device=device)
+        self._motor_tau = torch.zeros(shape, dtype=torch.float32, device=device)
+        self._spin_down = torch.zeros(shape, dtype=torch.bool, device=device)
+        self._scratch = torch.zeros(shape, dtype=torch.float32, device=device)
+        self._noise = torch.zeros(num_rotors, dtype=torch.float32, device=device)
+
+    def step(self, actions):
+        """Advances the rotors by one control step.
+
+        Args:
+            actions (torch.Tensor): (num_envs, num_rotors) thrust commands, clamped to [-1, 1].
+
+        Returns:
+            torch.Tensor: (num_envs, num_rotors) rotor thrusts.
+        """
+        # [-1, 1] -> [0, 1]
+        torch.clamp(actions, min=-1.0, max=1.0, out=self.thrust_cmds)
+        self.thrust_cmds.add_(1.0).mul_(0.5)
+
+        torch.lt(self.thrust_cmds, self.thrust_cmds_damp, out=self._spin_down)
+        torch.where(self._spin_down, self._tau_down, self._tau_up, out=self._motor_tau)
+
+        # the filter runs on the rotor speed, proportional to the square root of the thrust
+        torch.sqrt(self.thrust_cmds, out=self._scratch)
+        self._scratch.sub_(self.thrust_rot_damp).mul_(self._motor_tau)
+        self.thrust_rot_damp.add_(self._scratch)
+        torch.mul(self.thrust_rot_damp, self.thrust_rot_damp, out=self.thrust_cmds_damp)
+
+        self._noise.normal_(mean=0.0, std=self.noise_std)
+        torch.mul(self.thrust_cmds, self._noise, out=self._scratch)
+        self.thrust_cmds_damp.add_(self._scratch).clamp_(min=0.0, max=1.0)
+
+        return torch.mul(self.thrust_cmds_damp, self.thrust_max, out=self.thrusts)
+
+    def reset(self, mask):
+        """Stops the rotors of the envs in the (num_envs,) boolean mask."""
+        mask = mask.unsqueeze(-1)
+        self.thrust_cmds_damp.masked_fill_(mask, 0.0)
+        self.thrust_rot_damp.masked_fill_(mask, 0.0)
+
+    def reset_idx(self, env_ids):
+        """Stops the rotors of the envs in env_ids."""
+        self.thrust_cmds_damp[env_ids] = 0.0
+        self.thrust_rot_damp[env_ids] = 0.0
+
+    def forces(self, quats, out):
+        """Writes the world frame rotor forces into out.
+
+        Args:
+            quats (torch.Tensor): (num_envs, 4) orientations (w, x, y, z) of the multirotors.
+            out (torch.Tensor): (num_envs, num_rotors, 3) output forces.
+        """
+        return torch.mul(self.thrusts.unsqueeze(-1), thrust_directions(quats).unsqueeze(1), out=out)
+
+
+###=========================jit functions=========================###
+###=================================================================###
+
+
+@torch.jit.script
+def thrust_directions(quats: torch.Tensor) -> torch.Tensor:
+    # z components of the body axes, (rot_x[2], rot_y[2], rot_z[2]), i.e. the third row of the
+    # rotation matrix: the direction CrazyflieTask has always applied the rotor thrusts along
+    w, x, y, z = quats[:, 0], quats[:, 1], quats[:, 2], quats[:, 3]
+    return torch.stack((2.0 * (x * z - w * y), 2.0 * (y * z + w * x), 1.0 - 2.0 * (x * x + y * y)), dim=-1)
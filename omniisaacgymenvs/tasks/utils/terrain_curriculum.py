@@ -0,0 +1,199 @@
+# Copyright (c) 2018-2022, NVIDIA Corporation
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import torch
+
+
+class TerrainCurriculum:
+    """Assigns envs to the levels and types of a terrain grid and moves them through the levels.
+
+    The level, type and origin of every env, and the per-level statistics, are device
+    tensors. Updates are masked or indexed batch operations that never read a value back
+    on the host, so they can run in reset paths that do not synchronize.
+
+    After every episode an env is promoted one level if it walked farther than
+    promote_distance from its origin, and demoted one level if it walked less than the
+    distance it was required to (e.g. a fraction of its commanded distance). Envs meeting
+    both conditions stay on their level. Envs promoted past the last level are handled
+    with solved_level:
+
+        wrap:   start again from level 0.
+        random: move to a random level.
+        clamp:  stay on the last level.
+    """
+
+    SOLVED_LEVEL_MODES = ("wrap", "random", "clamp")
+
+    def __init__(self, terrain_origins, num_envs, device, max_init_level=0, promote_distance=4.0, solved_level="wrap"):
+        """Assigns every env a random type and a random level up to max_init_level.
+
+        Args:
+            terrain_origins (torch.Tensor): (num_levels, num_types, 3) origins of the sub-terrains [m].
+            num_envs (int): number of environments.
+            device (str): device of the curriculum tensors.
+            max_init_level (int): highest level of the initial assignment.
+            promote_distance (float): distance from the origin an env must walk to be promoted [m].
+            solved_level (str): what happens to envs promoted past the last level, one of SOLVED_LEVEL_MODES.
+        """
+        if solved_level not in self.SOLVED_LEVEL_MODES:
+            raise ValueError(f"Unknown solved level mode {solved_level}, expected one of {self.SOLVED_LEVEL_MODES}")
+        self.num_envs = num_envs
+        self.device = device
+        self.num_levels, self.num_types = terrain_origins.shape[:2]
+        self.max_init_level = min(max_init_level, self.num_levels - 1)
+        self.promote_distance = promote_distance
+        self.solved_level = solved_level
+
+        self.terrain_origins = terrain_origins.to(device=device, dtype=torch.float)
+        self.levels = torch.randint(0, self.max_init_level + 1, (num_envs,), device=device)
+        self.types = torch.randint(0, self.num_types, (num_envs,), device=device)
+        self.env_origins = self.terrain_origins[self.levels, self.types]
+        self._ones = torch.ones(num_envs, dtype=torch.float, device=device)
+
+        # per-level statistics of the episodes ended since the last reset_stats
+        self.episodes = torch.zeros(self.num_levels, dtype=torch.float, device=device)
+        self.promotions = torch.zeros(self.num_levels, dtype=torch.float, device=device)
+        self.demotions = torch.zeros(self.num_levels, dtype=torch.float, device=device)
+
+    def assign(self, env_ids, levels=None, types=None):
+        """Moves envs to the given levels and types, or to random ones when not given.
+
+        Random levels are drawn up to max_init_level. Can be used by tasks that place envs
+        on the terrain without the distance rules, e.g. for evaluation on fixed levels.
+
+        Args:
+            env_ids (torch.Tensor): ids of the envs to move.
+            levels (Optional[Union[int, torch.Tensor]]): new level of every env.
+            types (Optional[Union[int, torch.Tensor]]): new type of every env.
+        """
+        if levels is None:
+            levels = torch.randint(0, self.max_init_level + 1, (len(env_ids),), device=self.device)
+        if types is None:
+            types = torch.randint(0, self.num_types, (len(env_ids),), device=self.device)
+        self.levels[env_ids] = levels
+        self.types[env_ids] = types
+        self.env_origins[env_ids] = self.terrain_origins[self.levels[env_ids], self.types[env_ids]]
+
+    def update(self, env_ids, distance, required_distance):
+        """Promotes or demotes the envs of env_ids at the end of their episodes.
+
+        Args:
+            env_ids (torch.Tensor): ids of the envs whose episodes ended.
+            distance (torch.Tensor): (len(env_ids),) distance walked from the env origin [m].
+            required_distance (torch.Tensor): (len(env_ids),) distance below which an env is demoted [m].
+        """
+        levels = self.levels[env_ids]
+        far = distance > self.promote_distance
+        short = distance < required_distance
+        promoted = far & ~short
+        demoted = short & ~far
+        self._record(levels, promoted, demoted, torch.ones_like(distance))
+
+        levels = self._next_levels(levels, promoted, demoted)
+        self.levels[env_ids] = levels
+        self.env_origins[env_ids] = self.terrain_origins[levels, self.types[env_ids]]
+
+    def update_masked(self, mask, distance, required_distance):
+        """Promotes or demotes the envs of mask, with full batch operations.
+
+        Args:
+            mask (torch.Tensor): (num_envs,) bool mask of the envs whose episodes ended.
+            distance (torch.Tensor): (num_envs,) distance walked from the env origin [m].
+            required_distance (torch.Tensor): (num_envs,) distance below which an env is demoted [m].
+        """
+        far = distance > self.promote_distance
+        short = distance < required_distance
+        promoted = mask & far & ~short
+        demoted = mask & short & ~far
+        self._record(self.levels, promoted, demoted, mask.float())
+
+        levels = self._next_levels(self.levels, promoted, demoted)
+        self.levels.copy_(levels)
+        torch.where(
+            mask.unsqueeze(-1), self.terrain_origins[levels, self.types], self.env_origins, out=self.env_origins
+        )
+
+    def _record(self, levels, promoted, demoted, ended):
+        self.episodes.index_add_(0, levels, ended)
+        self.promotions.index_add_(0, levels, promoted.float())
+        self.demotions.index_add_(0, levels, demoted.float())
+
+    def _next_levels(self, levels, promoted, demoted):
+        levels = levels + promoted.long() - demoted.long()
+        levels.clamp_(min=0)
+        if self.solved_level == "wrap":
+            return levels % self.num_levels
+        if self.solved_level == "random":
+            random_levels = torch.randint(0, self.num_levels, levels.shape, device=self.device)
+            return torch.where(levels >= self.num_levels, random_levels, levels)
+        return levels.clamp_(max=self.num_levels - 1)
+
+    def sample_positions(self, env_ids, spread=0.5):
+        """Samples spawn positions around the origins of envs, uniformly in [-spread, spread] along x and y.
+
+        Args:
+            env_ids (torch.Tensor): ids of the envs.
+            spread (float): half size of the spawn square [m].
+
+        Returns:
+            torch.Tensor: (len(env_ids), 3) positions in the terrain frame.
+        """
+        positions = self.env_origins[env_ids].clone()
+        positions[:, 0:2] += torch.rand((len(env_ids), 2), device=self.device) * (2.0 * spread) - spread
+        return positions
+
+    def sample_levels(self, num_samples, max_level=None):
+        """Samples levels and types uniformly, up to max_level (default: the last level).
+
+        Returns:
+            Tuple[torch.Tensor, torch.Tensor]: (num_samples,) levels and types.
+        """
+        max_level = self.num_levels - 1 if max_level is None else max_level
+        levels = torch.randint(0, max_level + 1, (num_samples,), device=self.device)
+        types = torch.randint(0, self.num_types, (num_samples,), device=self.device)
+        return levels, types
+
+    def mean_level(self):
+        """Mean level of the envs, as a device scalar."""
+        return self.levels.float().mean()
+
+    def level_counts(self):
+        """Number of envs on every level, as a (num_levels,) device tensor."""
+        counts = torch.zeros(self.num_levels, dtype=torch.float, device=self.device)
+        return counts.index_add_(0, self.levels, self._ones)
+
+    def success_rates(self):
+        """Fraction of the episodes ended on every level that were promoted, as a (num_levels,) device tensor."""
+        return self.promotions / self.episodes.clamp(min=1.0)
+
+    def reset_stats(self):
+        """Clears the per-level statistics."""
+        self.episodes.zero_()
+        self.promotions.zero_()
+        self.demotions.zero_()
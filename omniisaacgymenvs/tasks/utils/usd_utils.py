@@ -29,7 +29,7 @@
 
 from omni.isaac.core.utils.prims import get_prim_at_path
 from omni.isaac.core.utils.stage import get_current_stage
-from pxr import UsdLux, UsdPhysics
+from pxr import Gf, Sdf, UsdLux, UsdPhysics
 
 
 def set_drive_type(prim_path, drive_type):
@@ -88,3 +88,165 @@ def set_drive(prim_path, drive_type, target_type, target_value, stiffness, dampi
     set_drive_damping(drive, damping)
     set_drive_max_force(drive, max_force)
 
+
+# The functions below author prims directly in the edit target layer through the Sdf API,
+# inside a single Sdf.ChangeBlock, so that the stage is recomposed once per call instead of
+# once per edit. They do not read the composed stage, and per-env values such as the env
+# positions returned by the cloner are passed in. Prims that only differ by a few values are
+# authored once and copied with Sdf.CopySpec, which copies the whole spec in a single call.
+
+
+def _prim_spec(layer, path, type_name=None):
+    spec = Sdf.CreatePrimInLayer(layer, path)
+    if type_name is not None:
+        spec.specifier = Sdf.SpecifierDef
+        spec.typeName = type_name
+    return spec
+
+
+def _set_attribute(spec, name, type_name, value):
+    attr = spec.attributes.get(name)
+    if attr is None:
+        attr = Sdf.AttributeSpec(spec, name, type_name)
+    attr.default = value
+    return attr
+
+
+def _set_relationship(spec, name, targets):
+    rel = spec.relationships.get(name)
+    if rel is None:
+        rel = Sdf.RelationshipSpec(spec, name)
+    rel.targetPathList.explicitItems = [Sdf.Path(target) for target in targets]
+    return rel
+
+
+def _prepend_api_schemas(spec, schemas):
+    api_schemas = spec.GetInfo("apiSchemas") if spec.HasInfo("apiSchemas") else Sdf.TokenListOp()
+    prepended = list(api_schemas.prependedItems)
+    prepended += [schema for schema in schemas if schema not in prepended]
+    spec.SetInfo("apiSchemas", Sdf.TokenListOp.Create(prependedItems=prepended))
+
+
+def _copy_specs(layer, template, paths):
+    """Copies the template spec to every path and yields the new specs. Parents are created as overs."""
+    for path in paths:
+        path = Sdf.Path(path)
+        if path == template.path:
+            yield template
+            continue
+        Sdf.CreatePrimInLayer(layer, path.GetParentPath())
+        Sdf.CopySpec(layer, template.path, layer, path)
+        yield layer.GetPrimAtPath(path)
+
+
+def add_references(stage, prim_paths, usd_path, translations=None, orientations=None):
+    """Adds a reference to usd_path on every prim, like add_reference_to_stage followed by XFormPrim.
+
+    Args:
+        stage (Usd.Stage): stage to author on, in its edit target layer.
+        prim_paths (Sequence[str]): prims to define as Xforms referencing the asset.
+        usd_path (str): path of the referenced asset.
+        translations (Optional[Sequence[Sequence[float]]]): local translation of every prim.
+        orientations (Optional[Sequence[Sequence[float]]]): local orientation of every prim, as (w, x, y, z).
+    """
+    if len(prim_paths) == 0:
+        return
+    translation = None if translations is None else list(map(float, translations[0]))
+    orientation = None if orientations is None else list(map(float, orientations[0]))
+    layer = stage.GetEditTarget().GetLayer()
+    with Sdf.ChangeBlock():
+        template = _prim_spec(layer, prim_paths[0], "Xform")
+        template.referenceList.Prepend(Sdf.Reference(usd_path))
+        if translations is not None or orientations is not None:
+            w, x, y, z = (1.0, 0.0, 0.0, 0.0) if orientation is None else orientation
+            _set_attribute(
+                template, "xformOp:translate", Sdf.ValueTypeNames.Double3, Gf.Vec3d(*(translation or (0.0, 0.0, 0.0)))
+            )
+            _set_attribute(template, "xformOp:orient", Sdf.ValueTypeNames.Quatd, Gf.Quatd(w, x, y, z))
+            _set_attribute(template, "xformOp:scale", Sdf.ValueTypeNames.Double3, Gf.Vec3d(1.0, 1.0, 1.0))
+            _set_attribute(
+                template,
+                "xformOpOrder",
+                Sdf.ValueTypeNames.TokenArray,
+                ["xformOp:translate", "xformOp:orient", "xformOp:scale"],
+            )
+
+        # copies already hold the values of the first prim, only the ones that differ are set
+        for i, spec in enumerate(_copy_specs(layer, template, prim_paths)):
+            if translations is not None and list(map(float, translations[i])) != translation:
+                spec.attributes["xformOp:translate"].default = Gf.Vec3d(*map(float, translations[i]))
+            if orientations is not None and list(map(float, orientations[i])) != orientation:
+                w, x, y, z = map(float, orientations[i])
+                spec.attributes["xformOp:orient"].default = Gf.Quatd(w, x, y, z)
+
+
+def set_instanceable(stage, prim_paths, instanceable):
+    """Sets the instanceable flag of every prim, e.g. to edit prims inside referenced assets."""
+    layer = stage.GetEditTarget().GetLayer()
+    with Sdf.ChangeBlock():
+        for prim_path in prim_paths:
+            _prim_spec(layer, prim_path).instanceable = instanceable
+
+
+def bind_physics_material(stage, prim_paths, material_path):
+    """Binds a physics material to every prim, like physicsUtils.add_physics_material_to_prim."""
+    layer = stage.GetEditTarget().GetLayer()
+    with Sdf.ChangeBlock():
+        for prim_path in prim_paths:
+            spec = _prim_spec(layer, prim_path)
+            _prepend_api_schemas(spec, ["MaterialBindingAPI"])
+            rel = _set_relationship(spec, "material:binding:physics", [material_path])
+            rel.SetInfo("bindMaterialAs", "weakerThanDescendants")
+
+
+def define_fixed_joints(
+    stage,
+    joint_paths,
+    body0_paths,
+    body1_paths,
+    local_positions0,
+    local_position1=(0.0, 0.0, 0.0),
+    locked_axes=("transX", "transY", "transZ"),
+):
+    """Defines joints that lock the given axes between pairs of bodies.
+
+    Every axis is locked with a LimitAPI whose low limit is greater than its high limit,
+    the way the D6 joints of the ball balance task fix its legs to the ground.
+
+    Args:
+        stage (Usd.Stage): stage to author on, in its edit target layer.
+        joint_paths (Sequence[str]): paths of the joints to define.
+        body0_paths (Union[str, Sequence[str]]): first body of every joint, or one body shared by all of them.
+        body1_paths (Union[str, Sequence[str]]): second body of every joint, or one body shared by all of them.
+        local_positions0 (Sequence[Sequence[float]]): joint position in the frame of every body0.
+        local_position1 (Sequence[float]): joint position in the frame of body1, shared by all joints.
+        locked_axes (Sequence[str]): axes locked by the joints.
+    """
+    if len(joint_paths) == 0:
+        return
+    shared_body0 = isinstance(body0_paths, str)
+    shared_body1 = isinstance(body1_paths, str)
+    identity = Gf.Quatf(1.0, Gf.Vec3f(0.0, 0.0, 0.0))
+
+    layer = stage.GetEditTarget().GetLayer()
+    with Sdf.ChangeBlock():
+        template = _prim_spec(layer, joint_paths[0], "PhysicsJoint")
+        _set_relationship(template, "physics:body0", [body0_paths if shared_body0 else body0_paths[0]])
+        _set_relationship(template, "physics:body1", [body1_paths if shared_body1 else body1_paths[0]])
+        _set_attribute(template, "physics:localPos0", Sdf.ValueTypeNames.Point3f, Gf.Vec3f(0.0, 0.0, 0.0))
+        _set_attribute(template, "physics:localRot0", Sdf.ValueTypeNames.Quatf, identity)
+        _set_attribute(
+            template, "physics:localPos1", Sdf.ValueTypeNames.Point3f, Gf.Vec3f(*map(float, local_position1))
+        )
+        _set_attribute(template, "physics:localRot1", Sdf.ValueTypeNames.Quatf, identity)
+        _prepend_api_schemas(template, [f"PhysicsLimitAPI:{axis}" for axis in locked_axes])
+        for axis in locked_axes:
+            _set_attribute(template, f"limit:{axis}:physics:low", Sdf.ValueTypeNames.Float, 1.0)
+            _set_attribute(template, f"limit:{axis}:physics:high", Sdf.ValueTypeNames.Float, -1.0)
+
+        for i, spec in enumerate(_copy_specs(layer, template, joint_paths)):
+            spec.attributes["physics:localPos0"].default = Gf.Vec3f(*map(float, local_positions0[i]))
+            if not shared_body0:
+                spec.relationships["physics:body0"].targetPathList.explicitItems = [Sdf.Path(body0_paths[i])]
+            if not shared_body1:
+                spec.relationships["physics:body1"].targetPathList.explicitItems = [Sdf.Path(body1_paths[i])]
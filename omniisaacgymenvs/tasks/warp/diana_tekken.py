@@ -0,0 +1,521 @@
+# Copyright (c) 2018-2022, NVIDIA Corporation
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+
+from omniisaacgymenvs.robots.articulations.diana_tekken import DianaTekken
+from omniisaacgymenvs.robots.articulations.drill import Drill
+from omniisaacgymenvs.robots.articulations.views.diana_tekken_view import DianaTekkenView
+
+from omni.isaac.core.objects import FixedCuboid
+from omni.isaac.core.prims import GeometryPrimView, RigidPrimView, XFormPrimView
+from omni.isaac.core.utils.prims import get_prim_at_path
+from omniisaacgymenvs.tasks.base.rl_task import RLTaskWarp
+
+import torch
+import warp as wp
+
+
+class DianaTekkenTask(RLTaskWarp):
+    """Warp implementation of the DianaTekken drill lifting task.
+
+    Observations, rewards and resets are computed by one kernel each, with the same layout
+    and values as omniisaacgymenvs.tasks.diana_tekken_task.DianaTekkenTask:
+
+        dof_pos 12 | hand_pos 3 | hand_rot 4 | drill_pos 3 | drill_rot 4 |
+        hand_in_drill_pos 3 | hand_in_drill_rot 4 | dof_vel 12
+
+    Quaternions are (w, x, y, z) in the buffers, as returned by the views.
+    """
+
+    def __init__(
+        self,
+        name,
+        sim_config,
+        env,
+        offset=None
+    ) -> None:
+
+        self._sim_config = sim_config
+        self._cfg = sim_config.config
+        self._task_cfg = sim_config.task_config
+
+        self._num_envs = self._task_cfg["env"]["numEnvs"]
+        self._env_spacing = self._task_cfg["env"]["envSpacing"]
+        self.action_scale = self._task_cfg["env"]["actionScale"]
+        self._max_episode_length = self._task_cfg["env"]["episodeLength"]
+        self.dt = self._task_cfg["sim"]["dt"]
+
+        self._robot_translation = torch.tensor([0.0, -0.15, 0.0])
+
+        self._hand_lower_bound = wp.vec3(0.0, -0.5, 0.2)
+        self._hand_upper_bound = wp.vec3(0.9, 0.5, 0.9)
+        self._drill_position = wp.vec3(0.6, 0.0, 0.53)
+        self._drill_lower_bound = wp.vec3(0.3, -0.5, 0.53)
+        self._drill_reset_lower_bound = wp.vec3(0.3, -0.5, 0.45)
+        self._drill_upper_bound = wp.vec3(0.8, 0.5, 0.53)
+        # (x, y, z, w) as in warp
+        self._drill_zero_rot = wp.quat(0.0, 0.0, 0.0, 1.0)
+        self._ref_grasp_in_drill_pos = wp.vec3(-0.0269, -0.0307, -0.0138)
+        self._ref_grasp_in_drill_rot = wp.quat(0.1128, 0.0436, -0.0108, -0.9926)
+
+        self._num_observations = 45
+        self._num_actions = 12
+        self.robots_to_log = []
+
+        RLTaskWarp.__init__(self, name, env)
+        return
+
+    def set_up_scene(self, scene) -> None:
+        self.get_robot(name="diana", translation=self._robot_translation)
+        self.get_cube()
+        self.get_drill()
+        RLTaskWarp.set_up_scene(self, scene)
+
+        self._robots = DianaTekkenView(prim_paths_expr="/World/envs/.*/diana", name="tekken_view")
+        self.robots_to_log.append(self._robots)
+        scene.add(self._robots)
+        scene.add(self._robots._palm_centers)
+
+        self._cubes = GeometryPrimView(
+            prim_paths_expr="/World/envs/.*/cube", name="cube_view", reset_xform_properties=False
+        )
+        scene.add(self._cubes)
+        self._drills = RigidPrimView(
+            prim_paths_expr="/World/envs/.*/drill", name="drill_view", reset_xform_properties=False
+        )
+        scene.add(self._drills)
+        self._drills_finger_targets = XFormPrimView(
+            prim_paths_expr="/World/envs/.*/drill/finger_target_pos",
+            name="finger_targets",
+            reset_xform_properties=False,
+        )
+        scene.add(self._drills_finger_targets)
+        return
+
+    def get_robot(self, name, translation):
+        robot = DianaTekken(prim_path=self.default_zero_env_path + "/" + name, name=name, translation=translation)
+        self._sim_config.apply_articulation_settings(
+            name, get_prim_at_path(robot.prim_path), self._sim_config.parse_actor_config(name)
+        )
+
+    def get_drill(self):
+        drill = Drill(
+            prim_path=self.default_zero_env_path + "/drill", name="drill", position=torch.tensor(self._drill_position)
+        )
+        self._sim_config.apply_articulation_settings(
+            "drill", get_prim_at_path(drill.prim_path), self._sim_config.parse_actor_config("drill")
+        )
+
+    def get_cube(self):
+        cube = FixedCuboid(
+            prim_path=self.default_zero_env_path + "/cube",
+            name="cube",
+            translation=torch.tensor([0.6, 0.0, 0.2]),
+            scale=torch.tensor([0.6, 1.0, 0.4]),
+            color=torch.tensor([0.22, 0.22, 0.22]),
+        )
+        self._sim_config.apply_articulation_settings(
+            "cube", get_prim_at_path(cube.prim_path), self._sim_config.parse_actor_config("cube")
+        )
+
+    def post_reset(self):
+        self.num_diana_tekken_dofs = self._robots.num_dof
+        self.num_actuated_dofs = len(self._robots.actuated_dof_indices)
+        self._actuated_dof_indices = wp.array(self._robots.actuated_dof_indices, dtype=wp.int32, device=self._device)
+        self._actuated_finger_dof_indices = wp.array(
+            self._robots.actuated_finger_dof_indices, dtype=wp.int32, device=self._device
+        )
+        self._clamped_finger_dof_indices = wp.array(
+            self._robots.clamped_finger_dof_indices, dtype=wp.int32, device=self._device
+        )
+
+        # 0 for the arm, 1 for the thumb and 2 for the other fingers, see contacts_to_manipulability
+        contact_groups = [0] * self.num_diana_tekken_dofs
+        for j in range(12, 27):
+            contact_groups[j] = 1 if j in [16, 21, 26] else 2
+        self._contact_groups = wp.array(contact_groups, dtype=wp.int32, device=self._device)
+
+        self.default_dof_pos = wp.array(
+            [0.3311, -0.8079, -0.4242, 2.2495, 2.7821, 0.0904, 1.6300] + [0.0] * (self.num_diana_tekken_dofs - 7),
+            dtype=wp.float32,
+            device=self._device,
+        )
+        dof_limits = self._robots.get_dof_limits().to(self._device)
+        self._robot_dof_lower_limits = wp.from_torch(dof_limits[0, :, 0].contiguous())
+        self._robot_dof_upper_limits = wp.from_torch(dof_limits[0, :, 1].contiguous())
+
+        drill_pos, _ = self._drills.get_world_poses()
+        drill_finger_targets, _ = self._drills_finger_targets.get_world_poses()
+        self.finger_target_offset = wp.zeros((self._num_envs, 3), dtype=wp.float32, device=self._device)
+        wp.launch(sub_positions, dim=self._num_envs,
+            inputs=[self.finger_target_offset, drill_finger_targets, drill_pos], device=self._device)
+        self.drill_finger_targets_pos = wp.zeros((self._num_envs, 3), dtype=wp.float32, device=self._device)
+
+        self.reward_terms = wp.zeros((self._num_envs, 8), dtype=wp.float32, device=self._device)
+
+        num_dofs = self.num_diana_tekken_dofs
+        self._robot_dof_targets = wp.zeros((self._num_envs, num_dofs), dtype=wp.float32, device=self._device)
+        self.dof_pos = wp.zeros((self._num_envs, num_dofs), dtype=wp.float32, device=self._device)
+        self.dof_vel = wp.zeros((self._num_envs, num_dofs), dtype=wp.float32, device=self._device)
+        self.drill_pos = wp.zeros((self._num_envs, 3), dtype=wp.float32, device=self._device)
+        self.drill_rot = wp.zeros((self._num_envs, 4), dtype=wp.float32, device=self._device)
+        self.drill_vel = wp.zeros((self._num_envs, 6), dtype=wp.float32, device=self._device)
+        self._num_reset_calls = 0
+
+        # randomize all envs
+        self.reset_idx()
+
+    def pre_physics_step(self, actions) -> None:
+        if not self._env._world.is_playing():
+            return
+
+        self.reset_idx()
+
+        actions_wp = wp.from_torch(actions)
+        wp.launch(compute_targets, dim=self._num_envs,
+            inputs=[self._robot_dof_targets, actions_wp, self._actuated_dof_indices, self._robot_dof_lower_limits,
+                self._robot_dof_upper_limits, self._actuated_finger_dof_indices, self._clamped_finger_dof_indices,
+                self.num_actuated_dofs, self.dt * self.action_scale], device=self._device)
+        self._robots.set_joint_position_targets(self._robot_dof_targets)
+
+    def reset_idx(self, deterministic=False):
+        reset_env_ids = wp.to_torch(self.reset_buf).nonzero(as_tuple=False).squeeze(-1)
+        num_resets = len(reset_env_ids)
+        indices = wp.from_torch(reset_env_ids.to(dtype=torch.int32), dtype=wp.int32)
+
+        if num_resets > 0:
+            # a new seed per call, or an env would draw the same reset state every episode
+            self._num_reset_calls += 1
+            wp.launch(reset_idx, dim=num_resets,
+                inputs=[self.dof_pos, self.dof_vel, self._robot_dof_targets,
+                    self.drill_pos, self.drill_rot, self.drill_vel,
+                    self.default_dof_pos, self._robot_dof_lower_limits, self._robot_dof_upper_limits,
+                    self._actuated_dof_indices, self.num_actuated_dofs, self.num_diana_tekken_dofs,
+                    self._drill_position, self._drill_lower_bound, self._drill_upper_bound,
+                    self._env_pos, 0.0 if deterministic else 0.25, indices, self.reset_buf, self.progress_buf,
+                    self._rand_seed + self._num_reset_calls], device=self._device)
+
+            # apply resets
+            self._robots.set_joint_positions(self.dof_pos[indices], indices=indices)
+            self._robots.set_joint_velocities(self.dof_vel[indices], indices=indices)
+            self._robots.set_joint_position_targets(self._robot_dof_targets[indices], indices=indices)
+
+            self._drills.set_velocities(self.drill_vel[indices], indices=indices)
+            self._drills.set_world_poses(self.drill_pos[indices], self.drill_rot[indices], indices=indices)
+
+    def get_observations(self) -> dict:
+        dof_pos = self._robots.get_joint_positions(clone=False)
+        dof_vel = self._robots.get_joint_velocities(clone=False)
+        hand_pos, hand_rot = self._robots._palm_centers.get_world_poses(clone=False)
+        drill_pos, drill_rot = self._drills.get_world_poses(clone=False)
+
+        wp.launch(get_observations, dim=self._num_envs,
+            inputs=[self.obs_buf, self.drill_finger_targets_pos, dof_pos, dof_vel,
+                hand_pos, hand_rot, drill_pos, drill_rot,
+                self._env_pos, self.finger_target_offset, self._actuated_dof_indices, self.num_actuated_dofs],
+            device=self._device)
+
+        observations = {
+            self._robots.name: {
+                "obs_buf": self.obs_buf
+            }
+        }
+        return observations
+
+    def calculate_metrics(self) -> None:
+        joint_efforts = self._robots.get_measured_joint_efforts(clone=False)
+        wp.launch(calculate_metrics, dim=self._num_envs,
+            inputs=[self.rew_buf, self.reset_buf, self.reward_terms, self.progress_buf, self.obs_buf, joint_efforts,
+                self._contact_groups, self.num_diana_tekken_dofs, self._ref_grasp_in_drill_pos,
+                self._ref_grasp_in_drill_rot, self._drill_zero_rot, self._hand_lower_bound, self._hand_upper_bound,
+                self._drill_upper_bound, self._drill_reset_lower_bound, self._max_episode_length], device=self._device)
+        self.extras["reward_terms"] = wp.to_torch(self.reward_terms)
+
+    def is_done(self) -> None:
+        # resets are computed together with the rewards in calculate_metrics
+        pass
+
+
+#####################################################################
+###==========================warp kernels=========================###
+#####################################################################
+
+@wp.func
+def get_vec3(x: wp.array(dtype=wp.float32, ndim=2), i: int, offset: int):
+    return wp.vec3(x[i, offset], x[i, offset + 1], x[i, offset + 2])
+
+@wp.func
+def get_quat(x: wp.array(dtype=wp.float32, ndim=2), i: int, offset: int):
+    # (w, x, y, z) columns to a warp (x, y, z, w) quaternion
+    return wp.quat(x[i, offset + 1], x[i, offset + 2], x[i, offset + 3], x[i, offset])
+
+@wp.func
+def quat_diff_rad(a: wp.quat, b: wp.quat):
+    # same as omni.isaac.core.utils.torch.rotations.quat_diff_rad
+    q = wp.mul(a, wp.quat_inverse(b))
+    return 2.0 * wp.asin(wp.min(wp.length(wp.vec3(q[0], q[1], q[2])), 1.0))
+
+@wp.func
+def log_distance_reward(d: float, w: float):
+    return -wp.log(1.0 + d * d) * w
+
+@wp.kernel
+def sub_positions(out: wp.array(dtype=wp.float32, ndim=2),
+                  a: wp.indexedarray(dtype=wp.float32, ndim=2),
+                  b: wp.indexedarray(dtype=wp.float32, ndim=2)):
+    i = wp.tid()
+    for j in range(3):
+        out[i, j] = a[i, j] - b[i, j]
+
+@wp.kernel
+def reset_idx(dof_pos: wp.array(dtype=wp.float32, ndim=2),
+              dof_vel: wp.array(dtype=wp.float32, ndim=2),
+              dof_targets: wp.array(dtype=wp.float32, ndim=2),
+              drill_pos: wp.array(dtype=wp.float32, ndim=2),
+              drill_rot: wp.array(dtype=wp.float32, ndim=2),
+              drill_vel: wp.array(dtype=wp.float32, ndim=2),
+              default_dof_pos: wp.array(dtype=wp.float32),
+              dof_limits_lower: wp.array(dtype=wp.float32),
+              dof_limits_upper: wp.array(dtype=wp.float32),
+              actuated_dof_indices: wp.array(dtype=wp.int32),
+              num_actuated_dofs: int,
+              num_dofs: int,
+              drill_position: wp.vec3,
+              drill_lower_bound: wp.vec3,
+              drill_upper_bound: wp.vec3,
+              env_pos: wp.array(dtype=wp.float32, ndim=2),
+              noise: float,
+              indices: wp.array(dtype=wp.int32),
+              reset_buf: wp.array(dtype=wp.int32),
+              progress_buf: wp.array(dtype=wp.int32),
+              rand_seed: int):
+    i = wp.tid()
+    idx = indices[i]
+
+    rand_state = wp.rand_init(rand_seed, idx)
+
+    # randomize the actuated DOF positions around the default pose, the others are zeroed
+    for j in range(num_dofs):
+        dof_pos[idx, j] = 0.0
+        dof_vel[idx, j] = 0.0
+    for j in range(num_actuated_dofs):
+        k = actuated_dof_indices[j]
+        pos = default_dof_pos[k] + noise * (wp.randf(rand_state) - 0.5)
+        dof_pos[idx, k] = wp.clamp(pos, dof_limits_lower[k], dof_limits_upper[k])
+    for j in range(num_dofs):
+        dof_targets[idx, j] = dof_pos[idx, j]
+
+    # randomize the drill position on the table
+    for j in range(3):
+        pos = drill_position[j] + noise * (wp.randf(rand_state) - 0.5)
+        drill_pos[idx, j] = wp.clamp(pos, drill_lower_bound[j], drill_upper_bound[j]) + env_pos[idx, j]
+    drill_rot[idx, 0] = 1.0
+    for j in range(3):
+        drill_rot[idx, j + 1] = 0.0
+    for j in range(6):
+        drill_vel[idx, j] = 0.0
+
+    # bookkeeping
+    reset_buf[idx] = 0
+    progress_buf[idx] = 0
+
+@wp.kernel
+def compute_targets(dof_targets: wp.array(dtype=wp.float32, ndim=2),
+                    actions: wp.array(dtype=wp.float32, ndim=2),
+                    actuated_dof_indices: wp.array(dtype=wp.int32),
+                    dof_limits_lower: wp.array(dtype=wp.float32),
+                    dof_limits_upper: wp.array(dtype=wp.float32),
+                    actuated_finger_dof_indices: wp.array(dtype=wp.int32),
+                    clamped_finger_dof_indices: wp.array(dtype=wp.int32),
+                    num_actions: int,
+                    action_scale: float):
+    i = wp.tid()
+
+    for j in range(num_actions):
+        k = actuated_dof_indices[j]
+        target = dof_targets[i, k] + actions[i, j] * action_scale
+        dof_targets[i, k] = wp.clamp(target, dof_limits_lower[k], dof_limits_upper[k])
+
+    # the second and third joint of every finger follow the actuated one, see clamp_joint0_joint1_joint2
+    for j in range(5):
+        target = dof_targets[i, actuated_finger_dof_indices[j]]
+        dof_targets[i, clamped_finger_dof_indices[j]] = target
+        dof_targets[i, clamped_finger_dof_indices[j + 5]] = target
+
+@wp.kernel
+def get_observations(obs_buf: wp.array(dtype=wp.float32, ndim=2),
+                     drill_finger_targets_pos: wp.array(dtype=wp.float32, ndim=2),
+                     dof_pos: wp.indexedarray(dtype=wp.float32, ndim=2),
+                     dof_vel: wp.indexedarray(dtype=wp.float32, ndim=2),
+                     hand_pos_world: wp.indexedarray(dtype=wp.float32, ndim=2),
+                     hand_rot: wp.indexedarray(dtype=wp.float32, ndim=2),
+                     drill_pos_world: wp.indexedarray(dtype=wp.float32, ndim=2),
+                     drill_rot: wp.indexedarray(dtype=wp.float32, ndim=2),
+                     env_pos: wp.array(dtype=wp.float32, ndim=2),
+                     finger_target_offset: wp.array(dtype=wp.float32, ndim=2),
+                     actuated_dof_indices: wp.array(dtype=wp.int32),
+                     num_actuated_dofs: int):
+    i = wp.tid()
+
+    hand_pos = wp.vec3(hand_pos_world[i, 0] - env_pos[i, 0],
+                       hand_pos_world[i, 1] - env_pos[i, 1],
+                       hand_pos_world[i, 2] - env_pos[i, 2])
+    drill_pos = wp.vec3(drill_pos_world[i, 0] - env_pos[i, 0],
+                        drill_pos_world[i, 1] - env_pos[i, 1],
+                        drill_pos_world[i, 2] - env_pos[i, 2])
+    hand_quat = wp.quat(hand_rot[i, 1], hand_rot[i, 2], hand_rot[i, 3], hand_rot[i, 0])
+    drill_quat = wp.quat(drill_rot[i, 1], drill_rot[i, 2], drill_rot[i, 3], drill_rot[i, 0])
+
+    # hand pose in the drill frame
+    hand_in_drill_pos = wp.quat_rotate_inv(drill_quat, hand_pos - drill_pos)
+    hand_in_drill_rot = wp.mul(wp.quat_inverse(drill_quat), hand_quat)
+
+    # obs_buf shapes: num_actuated_dofs, 3, 4, 3, 4, 3, 4, num_actuated_dofs
+    for j in range(num_actuated_dofs):
+        obs_buf[i, j] = dof_pos[i, actuated_dof_indices[j]]
+    obs_offset = num_actuated_dofs
+    for j in range(3):
+        obs_buf[i, obs_offset + j] = hand_pos[j]
+    obs_offset = obs_offset + 3
+    for j in range(4):
+        obs_buf[i, obs_offset + j] = hand_rot[i, j]
+    obs_offset = obs_offset + 4
+    for j in range(3):
+        obs_buf[i, obs_offset + j] = drill_pos[j]
+    obs_offset = obs_offset + 3
+    for j in range(4):
+        obs_buf[i, obs_offset + j] = drill_rot[i, j]
+    obs_offset = obs_offset + 4
+    for j in range(3):
+        obs_buf[i, obs_offset + j] = hand_in_drill_pos[j]
+    obs_offset = obs_offset + 3
+    obs_buf[i, obs_offset] = hand_in_drill_rot[3]
+    for j in range(3):
+        obs_buf[i, obs_offset + j + 1] = hand_in_drill_rot[j]
+    obs_offset = obs_offset + 4
+    for j in range(num_actuated_dofs):
+        obs_buf[i, obs_offset + j] = dof_vel[i, actuated_dof_indices[j]]
+
+    # finger target of the drill, from the drill frame to the env frame
+    finger_target = wp.quat_rotate(drill_quat, get_vec3(finger_target_offset, i, 0)) + drill_pos
+    for j in range(3):
+        drill_finger_targets_pos[i, j] = finger_target[j]
+
+@wp.kernel
+def calculate_metrics(rew_buf: wp.array(dtype=wp.float32),
+                      reset_buf: wp.array(dtype=wp.int32),
+                      reward_terms: wp.array(dtype=wp.float32, ndim=2),
+                      progress_buf: wp.array(dtype=wp.int32),
+                      obs_buf: wp.array(dtype=wp.float32, ndim=2),
+                      joint_efforts: wp.indexedarray(dtype=wp.float32, ndim=2),
+                      contact_groups: wp.array(dtype=wp.int32),
+                      num_dofs: int,
+                      ref_grasp_in_drill_pos: wp.vec3,
+                      ref_grasp_in_drill_rot: wp.quat,
+                      drill_zero_rot: wp.quat,
+                      hand_lower_bound: wp.vec3,
+                      hand_upper_bound: wp.vec3,
+                      drill_upper_bound: wp.vec3,
+                      drill_reset_lower_bound: wp.vec3,
+                      max_episode_length: int):
+    i = wp.tid()
+
+    # terms of compute_diana_tekken_reward, with its default weights
+    fail_penalty = 10.0
+    goal_height = 0.7
+    contact_tol = 0.1
+
+    hand_pos = get_vec3(obs_buf, i, 12)
+    drill_pos = get_vec3(obs_buf, i, 19)
+    drill_rot = get_quat(obs_buf, i, 22)
+    hand_in_drill_pos = get_vec3(obs_buf, i, 26)
+    hand_in_drill_rot = get_quat(obs_buf, i, 29)
+
+    goal = float(0.0)
+    if drill_pos[2] > goal_height:
+        goal = 1.0
+
+    # distance hand to drill grasp pos
+    d = wp.length(hand_in_drill_pos - ref_grasp_in_drill_pos)
+    grasp_pos = log_distance_reward(d, 0.2)
+    if d < 0.05:
+        grasp_pos = grasp_pos + 0.05
+    reward_terms[i, 0] = grasp_pos
+
+    # rotation difference
+    reward_terms[i, 1] = log_distance_reward(quat_diff_rad(hand_in_drill_rot, ref_grasp_in_drill_rot), 0.2)
+
+    # distance to target height
+    reward_terms[i, 2] = log_distance_reward(wp.abs(goal_height - drill_pos[2]), 0.5)
+
+    # orientation cost
+    d = quat_diff_rad(drill_zero_rot, drill_rot)
+    drill_rot_reward = log_distance_reward(d, 0.2)
+    if d < 0.15:
+        drill_rot_reward = drill_rot_reward + goal * 0.5
+    reward_terms[i, 3] = drill_rot_reward
+
+    # number of joints in contact, if both the thumb and another finger are in contact
+    num_contacts = int(0)
+    thumb_contact = int(0)
+    finger_contact = int(0)
+    for j in range(num_dofs):
+        if joint_efforts[i, j] > contact_tol:
+            num_contacts = num_contacts + 1
+            if contact_groups[j] == 1:
+                thumb_contact = 1
+            if contact_groups[j] == 2:
+                finger_contact = 1
+    reward_terms[i, 4] = float(thumb_contact * finger_contact * num_contacts) * 0.05
+
+    # prize if goal achieved
+    reward_terms[i, 5] = goal
+
+    # if the drill or the hand are out of bound
+    drill_out = int(0)
+    if drill_pos[0] >= drill_upper_bound[0] or drill_pos[1] >= drill_upper_bound[1]:
+        drill_out = drill_out + 1
+    if (drill_pos[0] <= drill_reset_lower_bound[0] or drill_pos[1] <= drill_reset_lower_bound[1]
+            or drill_pos[2] <= drill_reset_lower_bound[2]):
+        drill_out = drill_out + 1
+    hand_out = int(0)
+    if hand_pos[0] >= hand_upper_bound[0] or hand_pos[1] >= hand_upper_bound[1]:
+        hand_out = hand_out + 1
+    if hand_pos[0] <= hand_lower_bound[0] or hand_pos[1] <= hand_lower_bound[1]:
+        hand_out = hand_out + 1
+    reward_terms[i, 6] = float(drill_out) * -fail_penalty
+    reward_terms[i, 7] = float(hand_out) * -fail_penalty
+
+    rew = float(0.0)
+    for j in range(8):
+        rew = rew + reward_terms[i, j]
+    rew_buf[i] = rew
+
+    if progress_buf[i] >= max_episode_length - 1 or drill_out > 0 or hand_out > 0:
+        reset_buf[i] = 1
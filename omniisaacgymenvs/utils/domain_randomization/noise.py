@@ -0,0 +1,195 @@
+# Copyright (c) 2018-2022, NVIDIA Corporation
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import numpy as np
+import torch
+
+# accepted spellings of the distributions supported for observations and actions
+DISTRIBUTIONS = {
+    "gaussian": "gaussian",
+    "normal": "gaussian",
+    "uniform": "uniform",
+    "loguniform": "loguniform",
+    "log_uniform": "loguniform",
+}
+OPERATIONS = ("additive", "scaling")
+
+
+class NoiseGenerator:
+    """Samples noise of one distribution into a preallocated (num_envs, dim) buffer.
+
+    The distribution is resolved once, the parameters are kept as device tensors that
+    broadcast over the columns, and each generator draws from its own torch.Generator so
+    that a stream is reproducible regardless of what else consumes random numbers.
+    """
+
+    def __init__(self, distribution, distribution_parameters, num_envs, dim, device, seed=None):
+        """Compiles the distribution and allocates the sample buffer.
+
+        Args:
+            distribution (str): gaussian/normal, uniform or loguniform/log_uniform.
+            distribution_parameters (Sequence): [mean, std] or [lower, upper], scalars or per column.
+            num_envs (int): number of rows of the samples.
+            dim (int): number of columns of the samples.
+            device (str): device of the samples.
+            seed (Optional[int]): seed of the generator. A random seed is used if None.
+        """
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"The specified {distribution} distribution is not supported.")
+        self.distribution = DISTRIBUTIONS[distribution]
+        self.num_envs = num_envs
+        self.dim = dim
+        self.device = device
+
+        self.generator = torch.Generator(device=device)
+        if seed is None:
+            self.generator.seed()
+        else:
+            self.generator.manual_seed(seed)
+
+        self.buffer = torch.zeros((num_envs, dim), device=device, dtype=torch.float)
+        self._param_0 = torch.zeros(dim, device=device, dtype=torch.float)
+        self._param_1 = torch.zeros(dim, device=device, dtype=torch.float)
+        self.set_parameters(distribution_parameters)
+
+    def set_parameters(self, distribution_parameters):
+        """Updates the distribution parameters in place."""
+        if len(distribution_parameters) != 2:
+            raise ValueError("Noise distribution parameters must be given as [dist_param_1, dist_param_2]")
+        param_0, param_1 = (
+            np.broadcast_to(np.asarray(param, dtype=np.float64), (self.dim,)) for param in distribution_parameters
+        )
+        if self.distribution == "uniform":
+            # samples are drawn as lower + (upper - lower) * U(0, 1)
+            param_1 = param_1 - param_0
+        elif self.distribution == "loguniform":
+            param_0, param_1 = np.log(param_0), np.log(param_1) - np.log(param_0)
+        self._param_0.copy_(torch.from_numpy(param_0.astype(np.float32)))
+        self._param_1.copy_(torch.from_numpy(param_1.astype(np.float32)))
+
+    def sample(self):
+        """Fills the buffer with new samples for every env and returns it."""
+        if self.distribution == "gaussian":
+            self.buffer.normal_(generator=self.generator)
+        else:
+            self.buffer.uniform_(generator=self.generator)
+        # mean + std * N(0, 1), or offset + span * U(0, 1)
+        self.buffer.mul_(self._param_1).add_(self._param_0)
+        if self.distribution == "loguniform":
+            self.buffer.exp_()
+        return self.buffer
+
+
+class BufferNoise:
+    """Compiled on_reset and on_interval randomization of an observation or action buffer.
+
+    on_reset noise is resampled for the envs flagged in reset_buf and applied every step
+    until their next reset. on_interval noise is sampled for the envs whose step counter
+    reached frequency_interval and applied for that step only. Env selection is done with
+    masks instead of index lists, so applying the noise never synchronizes with the host.
+    """
+
+    def __init__(self, dr_params, num_envs, dim, device, seed=None):
+        """Compiles the randomization parameters of one buffer.
+
+        Args:
+            dr_params (dict): the observations or actions entry of randomization_params.
+            num_envs (int): number of environments.
+            dim (int): number of columns of the randomized buffer.
+            device (str): device of the randomized buffer.
+            seed (Optional[int]): base seed of the noise streams; on_reset uses seed and on_interval seed + 1.
+        """
+        self.num_envs = num_envs
+        self.dim = dim
+        self.device = device
+
+        self.counter = torch.zeros(num_envs, dtype=torch.int, device=device)
+        self._reset_mask = torch.zeros(num_envs, dtype=torch.bool, device=device)
+        self._interval_mask = torch.zeros(num_envs, dtype=torch.bool, device=device)
+        self._skip_mask = torch.zeros(num_envs, dtype=torch.bool, device=device)
+
+        self.on_reset = None
+        self.on_interval = None
+        if "on_reset" in dr_params:
+            self.on_reset = self._compile(dr_params["on_reset"], seed)
+            # noise kept between resets, initialized to the identity of the operation
+            self.correlated_noise = torch.full(
+                (num_envs, dim), self.on_reset["identity"], device=device, dtype=torch.float
+            )
+        if "on_interval" in dr_params:
+            self.on_interval = self._compile(dr_params["on_interval"], None if seed is None else seed + 1)
+            self.frequency_interval = int(dr_params["on_interval"]["frequency_interval"])
+
+    def _compile(self, params, seed):
+        operation = params["operation"]
+        if operation not in OPERATIONS:
+            raise ValueError(f"The specified {operation} operation type is not supported.")
+        return {
+            "generator": NoiseGenerator(
+                params["distribution"], params["distribution_parameters"], self.num_envs, self.dim, self.device, seed
+            ),
+            "additive": operation == "additive",
+            "identity": 0.0 if operation == "additive" else 1.0,
+        }
+
+    def set_parameters(self, trigger, distribution_parameters):
+        """Updates the distribution parameters of the on_reset or on_interval noise."""
+        getattr(self, trigger)["generator"].set_parameters(distribution_parameters)
+
+    def apply(self, buffer, reset_buf):
+        """Applies the noise to buffer in place and returns it.
+
+        Args:
+            buffer (torch.Tensor): (num_envs, dim) observations or actions.
+            reset_buf (torch.Tensor): (num_envs,) reset flags of the task.
+        """
+        torch.ne(reset_buf, 0, out=self._reset_mask)
+        self.counter.masked_fill_(self._reset_mask, 0).add_(1)
+
+        if self.on_reset is not None:
+            noise = self.on_reset["generator"].sample()
+            torch.where(self._reset_mask.unsqueeze(1), noise, self.correlated_noise, out=self.correlated_noise)
+            self._apply(buffer, self.correlated_noise, self.on_reset["additive"])
+
+        if self.on_interval is not None:
+            torch.ge(self.counter, self.frequency_interval, out=self._interval_mask)
+            self.counter.masked_fill_(self._interval_mask, 0)
+            noise = self.on_interval["generator"].sample()
+            torch.logical_not(self._interval_mask, out=self._skip_mask)
+            noise.masked_fill_(self._skip_mask.unsqueeze(1), self.on_interval["identity"])
+            self._apply(buffer, noise, self.on_interval["additive"])
+        return buffer
+
+    @staticmethod
+    def _apply(buffer, noise, additive):
+        if additive:
+            buffer.add_(noise)
+        else:
+            buffer.mul_(noise)
@@ -35,6 +35,8 @@ import torch
 import omni
 from omni.isaac.core.prims import RigidPrimView
 from omni.isaac.core.utils.extensions import enable_extension
+from omniisaacgymenvs.utils.domain_randomization.noise import BufferNoise
+from omniisaacgymenvs.utils.domain_randomization.schema import RandomizationPlan
 
 
 class Randomizer:
@@ -64,81 +66,48 @@ class Randomizer:
                 self.rep = rep
                 self.dr = dr
 
+                # validate and flatten the config once, reporting every problem up front
+                self._plan = RandomizationPlan(
+                    randomization_params,
+                    simulation_attributes=dr.SIMULATION_CONTEXT_ATTRIBUTES,
+                    rigid_prim_attributes=dr.RIGID_PRIM_ATTRIBUTES,
+                    articulation_attributes=dr.ARTICULATION_ATTRIBUTES,
+                )
+                for warning in self._plan.warnings:
+                    print(f"Warning: {warning}")
+
     def apply_on_startup_domain_randomization(self, task):
         if self.randomize:
             torch.manual_seed(self._config["seed"])
-            randomization_params = self._cfg["domain_randomization"]["randomization_params"]
-            for opt in randomization_params.keys():
-                if opt == "rigid_prim_views":
-                    if randomization_params["rigid_prim_views"] is not None:
-                        for view_name in randomization_params["rigid_prim_views"].keys():
-                            if randomization_params["rigid_prim_views"][view_name] is not None:
-                                for attribute, params in randomization_params["rigid_prim_views"][view_name].items():
-                                    params = randomization_params["rigid_prim_views"][view_name][attribute]
-                                    if attribute in ["scale", "mass", "density"] and params is not None:
-                                        if "on_startup" in params.keys():
-                                            if not set(
-                                                ("operation", "distribution", "distribution_parameters")
-                                            ).issubset(params["on_startup"]):
-                                                raise ValueError(
-                                                    f"Please ensure the following randomization parameters for {view_name} {attribute} "
-                                                    + "on_startup are provided: operation, distribution, distribution_parameters."
-                                                )
-                                            view = task.world.scene._scene_registry.rigid_prim_views[view_name]
-                                            if attribute == "scale":
-                                                self.randomize_scale_on_startup(
-                                                    view=view,
-                                                    distribution=params["on_startup"]["distribution"],
-                                                    distribution_parameters=params["on_startup"][
-                                                        "distribution_parameters"
-                                                    ],
-                                                    operation=params["on_startup"]["operation"],
-                                                    sync_dim_noise=True,
-                                                )
-                                            elif attribute == "mass":
-                                                self.randomize_mass_on_startup(
-                                                    view=view,
-                                                    distribution=params["on_startup"]["distribution"],
-                                                    distribution_parameters=params["on_startup"][
-                                                        "distribution_parameters"
-                                                    ],
-                                                    operation=params["on_startup"]["operation"],
-                                                )
-                                            elif attribute == "density":
-                                                self.randomize_density_on_startup(
-                                                    view=view,
-                                                    distribution=params["on_startup"]["distribution"],
-                                                    distribution_parameters=params["on_startup"][
-                                                        "distribution_parameters"
-                                                    ],
-                                                    operation=params["on_startup"]["operation"],
-                                                )
-                if opt == "articulation_views":
-                    if randomization_params["articulation_views"] is not None:
-                        for view_name in randomization_params["articulation_views"].keys():
-                            if randomization_params["articulation_views"][view_name] is not None:
-                                for attribute, params in randomization_params["articulation_views"][view_name].items():
-                                    params = randomization_params["articulation_views"][view_name][attribute]
-                                    if attribute in ["scale"] and params is not None:
-                                        if "on_startup" in params.keys():
-                                            if not set(
-                                                ("operation", "distribution", "distribution_parameters")
-                                            ).issubset(params["on_startup"]):
-                                                raise ValueError(
-                                                    f"Please ensure the following randomization parameters for {view_name} {attribute} "
-                                                    + "on_startup are provided: operation, distribution, distribution_parameters."
-                                                )
-                                            view = task.world.scene._scene_registry.articulated_views[view_name]
-                                            if attribute == "scale":
-                                                self.randomize_scale_on_startup(
-                                                    view=view,
-                                                    distribution=params["on_startup"]["distribution"],
-                                                    distribution_parameters=params["on_startup"][
-                                                        "distribution_parameters"
-                                                    ],
-                                                    operation=params["on_startup"]["operation"],
-                                                    sync_dim_noise=True,
-                                                )
+            registry = task.world.scene._scene_registry
+            for (group, view_name), ops in self._plan.startup_ops().items():
+                if group == "rigid_prim_views":
+                    view = registry.rigid_prim_views[view_name]
+                else:
+                    view = registry.articulated_views[view_name]
+                for op in ops:
+                    if op.attribute == "scale":
+                        self.randomize_scale_on_startup(
+                            view=view,
+                            distribution=op.distribution,
+                            distribution_parameters=op.distribution_parameters,
+                            operation=op.operation,
+                            sync_dim_noise=True,
+                        )
+                    elif op.attribute == "mass":
+                        self.randomize_mass_on_startup(
+                            view=view,
+                            distribution=op.distribution,
+                            distribution_parameters=op.distribution_parameters,
+                            operation=op.operation,
+                        )
+                    elif op.attribute == "density":
+                        self.randomize_density_on_startup(
+                            view=view,
+                            distribution=op.distribution,
+                            distribution_parameters=op.distribution_parameters,
+                            operation=op.operation,
+                        )
         else:
             dr_config = self._cfg.get("domain_randomization", None)
             if dr_config is None:
@@ -150,52 +119,28 @@ class Randomizer:
 
     def set_up_domain_randomization(self, task):
         if self.randomize:
-            randomization_params = self._cfg["domain_randomization"]["randomization_params"]
             self.rep.set_global_seed(self._config["seed"])
+            registry = task.world.scene._scene_registry
             with self.dr.trigger.on_rl_frame(num_envs=self._cfg["env"]["numEnvs"]):
-                for opt in randomization_params.keys():
-                    if opt == "observations":
-                        self._set_up_observations_randomization(task)
-                    elif opt == "actions":
-                        self._set_up_actions_randomization(task)
-                    elif opt == "simulation":
-                        if randomization_params["simulation"] is not None:
-                            self.distributions["simulation"] = dict()
-                            self.dr.physics_view.register_simulation_context(task.world)
-                            for attribute, params in randomization_params["simulation"].items():
-                                self._set_up_simulation_randomization(attribute, params)
-                    elif opt == "rigid_prim_views":
-                        if randomization_params["rigid_prim_views"] is not None:
-                            self.distributions["rigid_prim_views"] = dict()
-                            for view_name in randomization_params["rigid_prim_views"].keys():
-                                if randomization_params["rigid_prim_views"][view_name] is not None:
-                                    self.distributions["rigid_prim_views"][view_name] = dict()
-                                    self.dr.physics_view.register_rigid_prim_view(
-                                        rigid_prim_view=task.world.scene._scene_registry.rigid_prim_views[
-                                            view_name
-                                        ],
-                                    )
-                                    for attribute, params in randomization_params["rigid_prim_views"][
-                                        view_name
-                                    ].items():
-                                        if attribute not in ["scale", "density"]:
-                                            self._set_up_rigid_prim_view_randomization(view_name, attribute, params)
-                    elif opt == "articulation_views":
-                        if randomization_params["articulation_views"] is not None:
-                            self.distributions["articulation_views"] = dict()
-                            for view_name in randomization_params["articulation_views"].keys():
-                                if randomization_params["articulation_views"][view_name] is not None:
-                                    self.distributions["articulation_views"][view_name] = dict()
-                                    self.dr.physics_view.register_articulation_view(
-                                        articulation_view=task.world.scene._scene_registry.articulated_views[
-                                            view_name
-                                        ],
-                                    )
-                                    for attribute, params in randomization_params["articulation_views"][
-                                        view_name
-                                    ].items():
-                                        if attribute not in ["scale"]:
-                                            self._set_up_articulation_view_randomization(view_name, attribute, params)
+                if "observations" in self._plan.groups:
+                    self._set_up_observations_randomization(task)
+                if "actions" in self._plan.groups:
+                    self._set_up_actions_randomization(task)
+                if "simulation" in self._plan.groups:
+                    self.distributions["simulation"] = dict()
+                    self.dr.physics_view.register_simulation_context(task.world)
+                for view_name in self._plan.views["rigid_prim_views"]:
+                    self.distributions.setdefault("rigid_prim_views", dict())[view_name] = dict()
+                    self.dr.physics_view.register_rigid_prim_view(
+                        rigid_prim_view=registry.rigid_prim_views[view_name],
+                    )
+                for view_name in self._plan.views["articulation_views"]:
+                    self.distributions.setdefault("articulation_views", dict())[view_name] = dict()
+                    self.dr.physics_view.register_articulation_view(
+                        articulation_view=registry.articulated_views[view_name],
+                    )
+                for op in self._plan.replicator_ops():
+                    self._set_up_replicator_randomization(op)
             self.rep.orchestrator.run()
             if self._config.get("enable_recording", False):
                 # we need to deal with initializing render product here because it has to be initialized after orchestrator.run.
@@ -215,359 +160,74 @@ class Randomizer:
     def _set_up_observations_randomization(self, task):
         task.randomize_observations = True
         self._observations_dr_params = self._cfg["domain_randomization"]["randomization_params"]["observations"]
-        if self._observations_dr_params is None:
-            raise ValueError(f"Observations randomization parameters are not provided.")
-        if "on_reset" in self._observations_dr_params.keys():
-            if not set(("operation", "distribution", "distribution_parameters")).issubset(
-                self._observations_dr_params["on_reset"].keys()
-            ):
-                raise ValueError(
-                    f"Please ensure the following observations on_reset randomization parameters are provided: "
-                    + "operation, distribution, distribution_parameters."
-                )
-            self.active_domain_randomizations[("observations", "on_reset")] = np.array(
-                self._observations_dr_params["on_reset"]["distribution_parameters"]
-            )
-        if "on_interval" in self._observations_dr_params.keys():
-            if not set(("frequency_interval", "operation", "distribution", "distribution_parameters")).issubset(
-                self._observations_dr_params["on_interval"].keys()
-            ):
-                raise ValueError(
-                    f"Please ensure the following observations on_interval randomization parameters are provided: "
-                    + "frequency_interval, operation, distribution, distribution_parameters."
-                )
-            self.active_domain_randomizations[("observations", "on_interval")] = np.array(
-                self._observations_dr_params["on_interval"]["distribution_parameters"]
-            )
-        self._observations_counter_buffer = torch.zeros(
-            (self._cfg["env"]["numEnvs"]), dtype=torch.int, device=self._config["rl_device"]
-        )
-        self._observations_correlated_noise = torch.zeros(
-            (self._cfg["env"]["numEnvs"], task.num_observations), device=self._config["rl_device"]
+        for op in self._plan.buffer_ops("observations"):
+            self.active_domain_randomizations[op.path] = np.array(op.distribution_parameters)
+        self._observations_noise = BufferNoise(
+            self._observations_dr_params,
+            num_envs=self._cfg["env"]["numEnvs"],
+            dim=task.num_observations,
+            device=self._config["rl_device"],
+            seed=self._noise_seed(0),
         )
 
     def _set_up_actions_randomization(self, task):
         task.randomize_actions = True
         self._actions_dr_params = self._cfg["domain_randomization"]["randomization_params"]["actions"]
-        if self._actions_dr_params is None:
-            raise ValueError(f"Actions randomization parameters are not provided.")
-        if "on_reset" in self._actions_dr_params.keys():
-            if not set(("operation", "distribution", "distribution_parameters")).issubset(
-                self._actions_dr_params["on_reset"].keys()
-            ):
-                raise ValueError(
-                    f"Please ensure the following actions on_reset randomization parameters are provided: "
-                    + "operation, distribution, distribution_parameters."
-                )
-            self.active_domain_randomizations[("actions", "on_reset")] = np.array(
-                self._actions_dr_params["on_reset"]["distribution_parameters"]
-            )
-        if "on_interval" in self._actions_dr_params.keys():
-            if not set(("frequency_interval", "operation", "distribution", "distribution_parameters")).issubset(
-                self._actions_dr_params["on_interval"].keys()
-            ):
-                raise ValueError(
-                    f"Please ensure the following actions on_interval randomization parameters are provided: "
-                    + "frequency_interval, operation, distribution, distribution_parameters."
-                )
-            self.active_domain_randomizations[("actions", "on_interval")] = np.array(
-                self._actions_dr_params["on_interval"]["distribution_parameters"]
-            )
-        self._actions_counter_buffer = torch.zeros(
-            (self._cfg["env"]["numEnvs"]), dtype=torch.int, device=self._config["rl_device"]
-        )
-        self._actions_correlated_noise = torch.zeros(
-            (self._cfg["env"]["numEnvs"], task.num_actions), device=self._config["rl_device"]
+        for op in self._plan.buffer_ops("actions"):
+            self.active_domain_randomizations[op.path] = np.array(op.distribution_parameters)
+        self._actions_noise = BufferNoise(
+            self._actions_dr_params,
+            num_envs=self._cfg["env"]["numEnvs"],
+            dim=task.num_actions,
+            device=self._config["rl_device"],
+            seed=self._noise_seed(1),
         )
 
     def apply_observations_randomization(self, observations, reset_buf):
-        env_ids = reset_buf.nonzero(as_tuple=False).squeeze(-1)
-        self._observations_counter_buffer[env_ids] = 0
-        self._observations_counter_buffer += 1
-
-        if "on_reset" in self._observations_dr_params.keys():
-            observations[:] = self._apply_correlated_noise(
-                buffer_type="observations",
-                buffer=observations,
-                reset_ids=env_ids,
-                operation=self._observations_dr_params["on_reset"]["operation"],
-                distribution=self._observations_dr_params["on_reset"]["distribution"],
-                distribution_parameters=self._observations_dr_params["on_reset"]["distribution_parameters"],
-            )
-
-        if "on_interval" in self._observations_dr_params.keys():
-            randomize_ids = (
-                (self._observations_counter_buffer >= self._observations_dr_params["on_interval"]["frequency_interval"])
-                .nonzero(as_tuple=False)
-                .squeeze(-1)
-            )
-            self._observations_counter_buffer[randomize_ids] = 0
-            observations[:] = self._apply_uncorrelated_noise(
-                buffer=observations,
-                randomize_ids=randomize_ids,
-                operation=self._observations_dr_params["on_interval"]["operation"],
-                distribution=self._observations_dr_params["on_interval"]["distribution"],
-                distribution_parameters=self._observations_dr_params["on_interval"]["distribution_parameters"],
-            )
-        return observations
+        return self._observations_noise.apply(observations, reset_buf)
 
     def apply_actions_randomization(self, actions, reset_buf):
-        env_ids = reset_buf.nonzero(as_tuple=False).squeeze(-1)
-        self._actions_counter_buffer[env_ids] = 0
-        self._actions_counter_buffer += 1
-
-        if "on_reset" in self._actions_dr_params.keys():
-            actions[:] = self._apply_correlated_noise(
-                buffer_type="actions",
-                buffer=actions,
-                reset_ids=env_ids,
-                operation=self._actions_dr_params["on_reset"]["operation"],
-                distribution=self._actions_dr_params["on_reset"]["distribution"],
-                distribution_parameters=self._actions_dr_params["on_reset"]["distribution_parameters"],
-            )
-        if "on_interval" in self._actions_dr_params.keys():
-            randomize_ids = (
-                (self._actions_counter_buffer >= self._actions_dr_params["on_interval"]["frequency_interval"])
-                .nonzero(as_tuple=False)
-                .squeeze(-1)
-            )
-            self._actions_counter_buffer[randomize_ids] = 0
-            actions[:] = self._apply_uncorrelated_noise(
-                buffer=actions,
-                randomize_ids=randomize_ids,
-                operation=self._actions_dr_params["on_interval"]["operation"],
-                distribution=self._actions_dr_params["on_interval"]["distribution"],
-                distribution_parameters=self._actions_dr_params["on_interval"]["distribution_parameters"],
-            )
-        return actions
-
-    def _apply_uncorrelated_noise(self, buffer, randomize_ids, operation, distribution, distribution_parameters):
-        if distribution == "gaussian" or distribution == "normal":
-            noise = torch.normal(
-                mean=distribution_parameters[0],
-                std=distribution_parameters[1],
-                size=(len(randomize_ids), buffer.shape[1]),
-                device=self._config["rl_device"],
-            )
-        elif distribution == "uniform":
-            noise = (distribution_parameters[1] - distribution_parameters[0]) * torch.rand(
-                (len(randomize_ids), buffer.shape[1]), device=self._config["rl_device"]
-            ) + distribution_parameters[0]
-        elif distribution == "loguniform" or distribution == "log_uniform":
-            noise = torch.exp(
-                (np.log(distribution_parameters[1]) - np.log(distribution_parameters[0]))
-                * torch.rand((len(randomize_ids), buffer.shape[1]), device=self._config["rl_device"])
-                + np.log(distribution_parameters[0])
-            )
-        else:
-            print(f"The specified {distribution} distribution is not supported.")
-
-        if operation == "additive":
-            buffer[randomize_ids] += noise
-        elif operation == "scaling":
-            buffer[randomize_ids] *= noise
+        return self._actions_noise.apply(actions, reset_buf)
+
+    def _noise_seed(self, stream):
+        # observations and actions each own two consecutive streams (on_reset, on_interval)
+        seed = self._config.get("seed", None)
+        return None if seed is None else seed + 2 * stream
+
+    def _set_up_replicator_randomization(self, op):
+        physics_view = self.dr.physics_view
+        kwargs = {"operation": op.operation}
+        if op.group == "simulation":
+            dimension = physics_view._simulation_context_initial_values[op.attribute].shape[0]
+            randomize = physics_view.randomize_simulation_context
+            distributions = self.distributions["simulation"]
         else:
-            print(f"The specified {operation} operation type is not supported.")
-        return buffer
-
-    def _apply_correlated_noise(self, buffer_type, buffer, reset_ids, operation, distribution, distribution_parameters):
-        if buffer_type == "observations":
-            correlated_noise_buffer = self._observations_correlated_noise
-        elif buffer_type == "actions":
-            correlated_noise_buffer = self._actions_correlated_noise
-
-        if len(reset_ids) > 0:
-            if distribution == "gaussian" or distribution == "normal":
-                correlated_noise_buffer[reset_ids] = torch.normal(
-                    mean=distribution_parameters[0],
-                    std=distribution_parameters[1],
-                    size=(len(reset_ids), buffer.shape[1]),
-                    device=self._config["rl_device"],
-                )
-            elif distribution == "uniform":
-                correlated_noise_buffer[reset_ids] = (
-                    distribution_parameters[1] - distribution_parameters[0]
-                ) * torch.rand(
-                    (len(reset_ids), buffer.shape[1]), device=self._config["rl_device"]
-                ) + distribution_parameters[
-                    0
-                ]
-            elif distribution == "loguniform" or distribution == "log_uniform":
-                correlated_noise_buffer[reset_ids] = torch.exp(
-                    (np.log(distribution_parameters[1]) - np.log(distribution_parameters[0]))
-                    * torch.rand((len(reset_ids), buffer.shape[1]), device=self._config["rl_device"])
-                    + np.log(distribution_parameters[0])
-                )
+            if op.group == "rigid_prim_views":
+                dimension = physics_view._rigid_prim_views_initial_values[op.view_name][op.attribute].shape[1]
+                randomize = physics_view.randomize_rigid_prim_view
             else:
-                print(f"The specified {distribution} distribution is not supported.")
-
-        if operation == "additive":
-            buffer += correlated_noise_buffer
-        elif operation == "scaling":
-            buffer *= correlated_noise_buffer
-        else:
-            print(f"The specified {operation} operation type is not supported.")
-        return buffer
-
-    def _set_up_simulation_randomization(self, attribute, params):
-        if params is None:
-            raise ValueError(f"Randomization parameters for simulation {attribute} is not provided.")
-        if attribute in self.dr.SIMULATION_CONTEXT_ATTRIBUTES:
-            self.distributions["simulation"][attribute] = dict()
-            if "on_reset" in params.keys():
-                if not set(("operation", "distribution", "distribution_parameters")).issubset(params["on_reset"]):
-                    raise ValueError(
-                        f"Please ensure the following randomization parameters for simulation {attribute} on_reset are provided: "
-                        + "operation, distribution, distribution_parameters."
-                    )
-                self.active_domain_randomizations[("simulation", attribute, "on_reset")] = np.array(
-                    params["on_reset"]["distribution_parameters"]
-                )
-                kwargs = {"operation": params["on_reset"]["operation"]}
-                self.distributions["simulation"][attribute]["on_reset"] = self._generate_distribution(
-                    dimension=self.dr.physics_view._simulation_context_initial_values[attribute].shape[0],
-                    view_name="simulation",
-                    attribute=attribute,
-                    params=params["on_reset"],
-                )
-                kwargs[attribute] = self.distributions["simulation"][attribute]["on_reset"]
-                with self.dr.gate.on_env_reset():
-                    self.dr.physics_view.randomize_simulation_context(**kwargs)
-            if "on_interval" in params.keys():
-                if not set(("frequency_interval", "operation", "distribution", "distribution_parameters")).issubset(
-                    params["on_interval"]
-                ):
-                    raise ValueError(
-                        f"Please ensure the following randomization parameters for simulation {attribute} on_interval are provided: "
-                        + "frequency_interval, operation, distribution, distribution_parameters."
-                    )
-                self.active_domain_randomizations[("simulation", attribute, "on_interval")] = np.array(
-                    params["on_interval"]["distribution_parameters"]
-                )
-                kwargs = {"operation": params["on_interval"]["operation"]}
-                self.distributions["simulation"][attribute]["on_interval"] = self._generate_distribution(
-                    dimension=self.dr.physics_view._simulation_context_initial_values[attribute].shape[0],
-                    view_name="simulation",
-                    attribute=attribute,
-                    params=params["on_interval"],
-                )
-                kwargs[attribute] = self.distributions["simulation"][attribute]["on_interval"]
-                with self.dr.gate.on_interval(interval=params["on_interval"]["frequency_interval"]):
-                    self.dr.physics_view.randomize_simulation_context(**kwargs)
-
-    def _set_up_rigid_prim_view_randomization(self, view_name, attribute, params):
-        if params is None:
-            raise ValueError(f"Randomization parameters for rigid prim view {view_name} {attribute} is not provided.")
-        if attribute in self.dr.RIGID_PRIM_ATTRIBUTES:
-            self.distributions["rigid_prim_views"][view_name][attribute] = dict()
-            if "on_reset" in params.keys():
-                if not set(("operation", "distribution", "distribution_parameters")).issubset(params["on_reset"]):
-                    raise ValueError(
-                        f"Please ensure the following randomization parameters for {view_name} {attribute} on_reset are provided: "
-                        + "operation, distribution, distribution_parameters."
-                    )
-                self.active_domain_randomizations[("rigid_prim_views", view_name, attribute, "on_reset")] = np.array(
-                    params["on_reset"]["distribution_parameters"]
-                )
-                kwargs = {"view_name": view_name, "operation": params["on_reset"]["operation"]}
-                if attribute == "material_properties" and "num_buckets" in params["on_reset"].keys():
-                    kwargs["num_buckets"] = params["on_reset"]["num_buckets"]
-
-                self.distributions["rigid_prim_views"][view_name][attribute]["on_reset"] = self._generate_distribution(
-                    dimension=self.dr.physics_view._rigid_prim_views_initial_values[view_name][attribute].shape[1],
-                    view_name=view_name,
-                    attribute=attribute,
-                    params=params["on_reset"],
-                )
-                kwargs[attribute] = self.distributions["rigid_prim_views"][view_name][attribute]["on_reset"]
-                with self.dr.gate.on_env_reset():
-                    self.dr.physics_view.randomize_rigid_prim_view(**kwargs)
-            if "on_interval" in params.keys():
-                if not set(("frequency_interval", "operation", "distribution", "distribution_parameters")).issubset(
-                    params["on_interval"]
-                ):
-                    raise ValueError(
-                        f"Please ensure the following randomization parameters for {view_name} {attribute} on_interval are provided: "
-                        + "frequency_interval, operation, distribution, distribution_parameters."
-                    )
-                self.active_domain_randomizations[("rigid_prim_views", view_name, attribute, "on_interval")] = np.array(
-                    params["on_interval"]["distribution_parameters"]
-                )
-                kwargs = {"view_name": view_name, "operation": params["on_interval"]["operation"]}
-                if attribute == "material_properties" and "num_buckets" in params["on_interval"].keys():
-                    kwargs["num_buckets"] = params["on_interval"]["num_buckets"]
-
-                self.distributions["rigid_prim_views"][view_name][attribute][
-                    "on_interval"
-                ] = self._generate_distribution(
-                    dimension=self.dr.physics_view._rigid_prim_views_initial_values[view_name][attribute].shape[1],
-                    view_name=view_name,
-                    attribute=attribute,
-                    params=params["on_interval"],
-                )
-                kwargs[attribute] = self.distributions["rigid_prim_views"][view_name][attribute]["on_interval"]
-                with self.dr.gate.on_interval(interval=params["on_interval"]["frequency_interval"]):
-                    self.dr.physics_view.randomize_rigid_prim_view(**kwargs)
-        else:
-            raise ValueError(f"The attribute {attribute} for {view_name} is invalid for domain randomization.")
-
-    def _set_up_articulation_view_randomization(self, view_name, attribute, params):
-        if params is None:
-            raise ValueError(f"Randomization parameters for articulation view {view_name} {attribute} is not provided.")
-        if attribute in self.dr.ARTICULATION_ATTRIBUTES:
-            self.distributions["articulation_views"][view_name][attribute] = dict()
-            if "on_reset" in params.keys():
-                if not set(("operation", "distribution", "distribution_parameters")).issubset(params["on_reset"]):
-                    raise ValueError(
-                        f"Please ensure the following randomization parameters for {view_name} {attribute} on_reset are provided: "
-                        + "operation, distribution, distribution_parameters."
-                    )
-                self.active_domain_randomizations[("articulation_views", view_name, attribute, "on_reset")] = np.array(
-                    params["on_reset"]["distribution_parameters"]
-                )
-                kwargs = {"view_name": view_name, "operation": params["on_reset"]["operation"]}
-                if attribute == "material_properties" and "num_buckets" in params["on_reset"].keys():
-                    kwargs["num_buckets"] = params["on_reset"]["num_buckets"]
-
-                self.distributions["articulation_views"][view_name][attribute][
-                    "on_reset"
-                ] = self._generate_distribution(
-                    dimension=self.dr.physics_view._articulation_views_initial_values[view_name][attribute].shape[1],
-                    view_name=view_name,
-                    attribute=attribute,
-                    params=params["on_reset"],
-                )
-                kwargs[attribute] = self.distributions["articulation_views"][view_name][attribute]["on_reset"]
-                with self.dr.gate.on_env_reset():
-                    self.dr.physics_view.randomize_articulation_view(**kwargs)
-            if "on_interval" in params.keys():
-                if not set(("frequency_interval", "operation", "distribution", "distribution_parameters")).issubset(
-                    params["on_interval"]
-                ):
-                    raise ValueError(
-                        f"Please ensure the following randomization parameters for {view_name} {attribute} on_interval are provided: "
-                        + "frequency_interval, operation, distribution, distribution_parameters."
-                    )
-                self.active_domain_randomizations[
-                    ("articulation_views", view_name, attribute, "on_interval")
-                ] = np.array(params["on_interval"]["distribution_parameters"])
-                kwargs = {"view_name": view_name, "operation": params["on_interval"]["operation"]}
-                if attribute == "material_properties" and "num_buckets" in params["on_interval"].keys():
-                    kwargs["num_buckets"] = params["on_interval"]["num_buckets"]
-
-                self.distributions["articulation_views"][view_name][attribute][
-                    "on_interval"
-                ] = self._generate_distribution(
-                    dimension=self.dr.physics_view._articulation_views_initial_values[view_name][attribute].shape[1],
-                    view_name=view_name,
-                    attribute=attribute,
-                    params=params["on_interval"],
-                )
-                kwargs[attribute] = self.distributions["articulation_views"][view_name][attribute]["on_interval"]
-                with self.dr.gate.on_interval(interval=params["on_interval"]["frequency_interval"]):
-                    self.dr.physics_view.randomize_articulation_view(**kwargs)
+                dimension = physics_view._articulation_views_initial_values[op.view_name][op.attribute].shape[1]
+                randomize = physics_view.randomize_articulation_view
+            distributions = self.distributions[op.group][op.view_name]
+            kwargs["view_name"] = op.view_name
+        if op.num_buckets is not None:
+            kwargs["num_buckets"] = op.num_buckets
+
+        self.active_domain_randomizations[op.path] = np.array(op.distribution_parameters)
+        distribution = self._generate_distribution(
+            dimension=dimension,
+            view_name=op.view_name if op.view_name is not None else op.group,
+            attribute=op.attribute,
+            params={"distribution": op.distribution, "distribution_parameters": op.distribution_parameters},
+        )
+        distributions.setdefault(op.attribute, dict())[op.trigger] = distribution
+        kwargs[op.attribute] = distribution
+        if op.trigger == "on_reset":
+            gate = self.dr.gate.on_env_reset()
         else:
-            raise ValueError(f"The attribute {attribute} for {view_name} is invalid for domain randomization.")
+            gate = self.dr.gate.on_interval(interval=op.frequency_interval)
+        with gate:
+            randomize(**kwargs)
 
     def _generate_distribution(self, view_name, attribute, dimension, params):
         dist_params = self._sanitize_distribution_parameters(attribute, dimension, params["distribution_parameters"])
@@ -611,6 +271,7 @@ class Randomizer:
         if distribution_path[0] == "observations":
             if len(distribution_parameters) == 2:
                 self._observations_dr_params[distribution_path[1]]["distribution_parameters"] = distribution_parameters
+                self._observations_noise.set_parameters(distribution_path[1], distribution_parameters)
             else:
                 raise ValueError(
                     f"Please provide distribution_parameters for observations {distribution_path[1]} "
@@ -619,6 +280,7 @@ class Randomizer:
         elif distribution_path[0] == "actions":
             if len(distribution_parameters) == 2:
                 self._actions_dr_params[distribution_path[1]]["distribution_parameters"] = distribution_parameters
+                self._actions_noise.set_parameters(distribution_path[1], distribution_parameters)
             else:
                 raise ValueError(
                     f"Please provide distribution_parameters for actions {distribution_path[1]} "
@@ -0,0 +1,209 @@
+# Copyright (c) 2018-2022, NVIDIA Corporation
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from omniisaacgymenvs.utils.domain_randomization.noise import DISTRIBUTIONS, OPERATIONS
+
+TRIGGERS = ("on_startup", "on_reset", "on_interval")
+VIEW_GROUPS = ("rigid_prim_views", "articulation_views")
+# attributes that are randomized once, by writing to the views, instead of through replicator
+STARTUP_ATTRIBUTES = {"rigid_prim_views": ("scale", "mass", "density"), "articulation_views": ("scale",)}
+STARTUP_ONLY_ATTRIBUTES = {"rigid_prim_views": ("scale", "density"), "articulation_views": ("scale",)}
+VIEW_OPERATIONS = ("additive", "scaling", "direct")
+
+
+@dataclass
+class RandomizationOp:
+    group: str  # observations, actions, simulation, rigid_prim_views or articulation_views
+    view_name: Optional[str]  # name of the view for rigid_prim_views and articulation_views
+    attribute: Optional[str]  # randomized attribute, None for observations and actions
+    trigger: str  # on_startup, on_reset or on_interval
+    operation: str  # additive, scaling or direct
+    distribution: str  # name of the distribution as given in the config
+    distribution_parameters: Any  # [dist_param_1, dist_param_2]
+    frequency_interval: Optional[int] = None  # steps between randomizations, on_interval only
+    num_buckets: Optional[int] = None  # material_properties only
+
+    @property
+    def path(self):
+        """Key of the op in Randomizer.active_domain_randomizations."""
+        return tuple(key for key in (self.group, self.view_name, self.attribute, self.trigger) if key is not None)
+
+
+class RandomizationPlan:
+    """Flat list of the randomization ops of a domain_randomization config.
+
+    The nested randomization_params dict is validated and flattened once, so that the
+    Randomizer only iterates over typed ops. All the problems of the config are collected
+    and raised together in a single ValueError. Entries that earlier versions ignored without
+    notice (unknown groups, unsupported simulation attributes and triggers, such as scale
+    on_reset) are skipped and reported in `warnings` instead, so existing configs keep working.
+    """
+
+    def __init__(
+        self, randomization_params, simulation_attributes=(), rigid_prim_attributes=(), articulation_attributes=()
+    ):
+        """Parses and validates randomization_params.
+
+        Args:
+            randomization_params (dict): the randomization_params entry of the task config.
+            simulation_attributes (Sequence[str]): attributes of the simulation context supported by replicator.
+            rigid_prim_attributes (Sequence[str]): attributes of rigid prim views supported by replicator.
+            articulation_attributes (Sequence[str]): attributes of articulation views supported by replicator.
+        """
+        self.ops = []
+        self.groups = []
+        self.views = {group: [] for group in VIEW_GROUPS}
+        self.warnings = []
+        self._errors = []
+        view_attributes = {"rigid_prim_views": rigid_prim_attributes, "articulation_views": articulation_attributes}
+
+        for group, group_params in randomization_params.items():
+            if group in ("observations", "actions"):
+                if group_params is None:
+                    self._errors.append(f"{group.capitalize()} randomization parameters are not provided.")
+                    continue
+                self.groups.append(group)
+                self._add_ops(group, None, None, group_params, ("on_reset", "on_interval"), OPERATIONS)
+            elif group == "simulation":
+                if group_params is None:
+                    continue
+                self.groups.append(group)
+                for attribute, params in group_params.items():
+                    if attribute not in simulation_attributes:
+                        self.warnings.append(
+                            f"The attribute {attribute} for simulation is invalid for domain randomization, "
+                            + "it is ignored."
+                        )
+                    elif params is None:
+                        self._errors.append(f"Randomization parameters for simulation {attribute} is not provided.")
+                    else:
+                        self._add_ops(group, None, attribute, params, ("on_reset", "on_interval"), VIEW_OPERATIONS)
+            elif group in VIEW_GROUPS:
+                if group_params is None:
+                    continue
+                self.groups.append(group)
+                for view_name, view_params in group_params.items():
+                    if view_params is None:
+                        continue
+                    self.views[group].append(view_name)
+                    for attribute, params in view_params.items():
+                        self._add_view_ops(group, view_name, attribute, params, view_attributes[group])
+            else:
+                self.warnings.append(f"Unknown domain randomization group {group}, it is ignored.")
+
+        if len(self._errors) > 0:
+            errors, self._errors = self._errors, []
+            raise ValueError("Invalid domain randomization parameters:\n  - " + "\n  - ".join(errors))
+
+    def _add_view_ops(self, group, view_name, attribute, params, replicator_attributes):
+        if attribute in STARTUP_ONLY_ATTRIBUTES[group]:
+            triggers = ("on_startup",)
+        elif attribute in STARTUP_ATTRIBUTES[group]:
+            triggers = TRIGGERS
+        elif attribute in replicator_attributes:
+            triggers = ("on_reset", "on_interval")
+        else:
+            self._errors.append(f"The attribute {attribute} for {view_name} is invalid for domain randomization.")
+            return
+        if params is None:
+            self._errors.append(f"Randomization parameters for {view_name} {attribute} is not provided.")
+            return
+        self._add_ops(group, view_name, attribute, params, triggers, VIEW_OPERATIONS)
+
+    def _add_ops(self, group, view_name, attribute, params, triggers, operations):
+        name = " ".join(key for key in (group if view_name is None else view_name, attribute) if key is not None)
+        for trigger in params.keys():
+            if trigger not in triggers:
+                self.warnings.append(
+                    f"{name} does not support {trigger} randomization, it is ignored. Options: {', '.join(triggers)}."
+                )
+
+        for trigger in TRIGGERS:
+            if trigger not in triggers or trigger not in params:
+                continue
+            trigger_params = params[trigger]
+            required = ["operation", "distribution", "distribution_parameters"]
+            if trigger == "on_interval":
+                required.insert(0, "frequency_interval")
+            if trigger_params is None or not set(required).issubset(trigger_params.keys()):
+                self._errors.append(
+                    f"Please ensure the following randomization parameters for {name} {trigger} are provided: "
+                    + f"{', '.join(required)}."
+                )
+                continue
+
+            if trigger_params["operation"] not in operations:
+                self._errors.append(
+                    f"The operation {trigger_params['operation']} for {name} {trigger} is not supported. "
+                    + f"Options: {', '.join(operations)}"
+                )
+            if trigger_params["distribution"] not in DISTRIBUTIONS:
+                self._errors.append(
+                    f"The provided distribution for {name} {trigger} is not supported. "
+                    + "Options: uniform, gaussian/normal, loguniform/log_uniform"
+                )
+            distribution_parameters = trigger_params["distribution_parameters"]
+            if not hasattr(distribution_parameters, "__len__") or len(distribution_parameters) != 2:
+                self._errors.append(
+                    f"Please provide distribution_parameters for {name} {trigger} "
+                    + "in the form of [dist_param_1, dist_param_2]"
+                )
+            self.ops.append(
+                RandomizationOp(
+                    group=group,
+                    view_name=view_name,
+                    attribute=attribute,
+                    trigger=trigger,
+                    operation=trigger_params["operation"],
+                    distribution=trigger_params["distribution"],
+                    distribution_parameters=distribution_parameters,
+                    frequency_interval=trigger_params.get("frequency_interval", None),
+                    num_buckets=trigger_params.get("num_buckets", None) if attribute == "material_properties" else None,
+                )
+            )
+
+    def startup_ops(self):
+        """Returns the on_startup ops grouped by view, as {(group, view_name): [ops]}."""
+        ops_by_view = dict()
+        for op in self.ops:
+            if op.trigger == "on_startup":
+                ops_by_view.setdefault((op.group, op.view_name), []).append(op)
+        return ops_by_view
+
+    def replicator_ops(self):
+        """Returns the on_reset and on_interval ops of the simulation context and the views."""
+        return [op for op in self.ops if op.trigger != "on_startup" and op.group in ("simulation",) + VIEW_GROUPS]
+
+    def buffer_ops(self, group):
+        """Returns the ops of the observations or actions buffer."""
+        return [op for op in self.ops if op.group == group]
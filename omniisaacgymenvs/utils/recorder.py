@@ -0,0 +1,213 @@
+# Copyright (c) 2018-2022, NVIDIA Corporation
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import json
+import os
+import queue
+import threading
+
+import numpy as np
+import torch
+
+RECORDING_META_FILE = "recording.json"
+
+
+class StreamingRecorder:
+    """Records per-step tensor snapshots to chunked binary files.
+
+    Each recorded field is copied into a preallocated ring of host buffers, pinned
+    when CUDA is available so that device to host copies are asynchronous. Once a
+    buffer holds `chunk_length` steps it is handed over to a background thread
+    that writes it to `chunk_XXXXXX.npz` and returns it to the ring. Memory use is
+    bounded by `num_buffers * chunk_length` steps; if the writer falls behind,
+    `record` blocks until a buffer is free.
+    """
+
+    def __init__(self, save_dir, chunk_length=256, num_buffers=3, pin_memory=None, metadata=None):
+        """Initializes the recorder. Buffers are allocated on the first call to `record`.
+
+        Args:
+            save_dir (str): directory to write the chunks and the recording metadata to.
+            chunk_length (int): number of steps stored in each chunk file.
+            num_buffers (int): number of host buffers in the ring (at least 2).
+            pin_memory (Optional[bool]): pin the host buffers. Defaults to torch.cuda.is_available().
+            metadata (Optional[dict]): extra JSON serializable data stored with the recording.
+        """
+        if num_buffers < 2:
+            raise ValueError("StreamingRecorder needs at least 2 buffers")
+
+        self.save_dir = save_dir
+        self.chunk_length = chunk_length
+        self.num_buffers = num_buffers
+        self.pin_memory = torch.cuda.is_available() if pin_memory is None else pin_memory
+        self.metadata = {} if metadata is None else metadata
+
+        self._buffers = None
+        self._fields = None
+        self._free = queue.Queue()
+        self._pending = queue.Queue()
+        self._buffer_idx = None
+        self._step = 0
+        self._num_chunks = 0
+        self._num_steps = 0
+        self._error = None
+        self._closed = False
+
+        os.makedirs(self.save_dir, exist_ok=True)
+        self._writer = threading.Thread(target=self._write_loop, name="StreamingRecorder", daemon=True)
+        self._writer.start()
+
+    def _allocate(self, tensors):
+        self._fields = {
+            name: {"shape": list(tensor.shape), "dtype": str(tensor.dtype).replace("torch.", "")}
+            for name, tensor in tensors.items()
+        }
+        self._buffers = []
+        for i in range(self.num_buffers):
+            self._buffers.append(
+                {
+                    name: torch.empty(
+                        (self.chunk_length, *tensor.shape), dtype=tensor.dtype, pin_memory=self.pin_memory
+                    )
+                    for name, tensor in tensors.items()
+                }
+            )
+            self._free.put(i)
+
+    def record(self, **tensors):
+        """Copies one step of data into the ring buffers.
+
+        Args:
+            **tensors (torch.Tensor): field name -> tensor. Shapes and dtypes must not change between calls.
+        """
+        if self._error is not None:
+            raise self._error
+        if self._closed:
+            raise RuntimeError("Cannot record on a closed StreamingRecorder")
+        if self._buffers is None:
+            self._allocate(tensors)
+        if self._buffer_idx is None:
+            self._buffer_idx = self._free.get()
+            self._step = 0
+
+        buffer = self._buffers[self._buffer_idx]
+        for name, tensor in tensors.items():
+            buffer[name][self._step].copy_(tensor.detach(), non_blocking=True)
+        self._step += 1
+
+        if self._step == self.chunk_length:
+            self._submit()
+
+    def _submit(self):
+        event = None
+        if torch.cuda.is_available():
+            event = torch.cuda.Event()
+            event.record()
+        self._pending.put((self._buffer_idx, self._step, self._num_chunks, event))
+        self._num_chunks += 1
+        self._num_steps += self._step
+        self._buffer_idx = None
+
+    def _write_loop(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            buffer_idx, length, chunk_idx, event = item
+            try:
+                if event is not None:
+                    event.synchronize()
+                # numpy views on the host buffers, no extra copy before writing
+                arrays = {name: tensor[:length].numpy() for name, tensor in self._buffers[buffer_idx].items()}
+                np.savez(os.path.join(self.save_dir, f"chunk_{chunk_idx:06d}.npz"), **arrays)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._free.put(buffer_idx)
+
+    def close(self):
+        """Flushes the partially filled buffer, waits for the writer and writes the recording metadata."""
+        if self._closed:
+            return
+        if self._buffer_idx is not None and self._step > 0:
+            self._submit()
+        self._closed = True
+        self._pending.put(None)
+        self._writer.join()
+
+        meta = {
+            "chunk_length": self.chunk_length,
+            "num_chunks": self._num_chunks,
+            "num_steps": self._num_steps,
+            "fields": self._fields,
+            "metadata": self.metadata,
+        }
+        with open(os.path.join(self.save_dir, RECORDING_META_FILE), "w") as f:
+            json.dump(meta, f, indent=2)
+        if self._error is not None:
+            raise self._error
+
+    @property
+    def num_steps(self):
+        """Number of steps recorded so far."""
+        return self._num_steps + (self._step if self._buffer_idx is not None else 0)
+
+
+def is_recording(path):
+    """Checks whether a directory holds a recording written by StreamingRecorder."""
+    return os.path.isfile(os.path.join(path, RECORDING_META_FILE))
+
+
+def load_recording(path, fields=None):
+    """Loads a recording written by StreamingRecorder.
+
+    Args:
+        path (str): directory of the recording.
+        fields (Optional[Sequence[str]]): fields to load. Defaults to all of them.
+
+    Returns:
+        dict: field name -> np.ndarray of shape (num_steps, *field_shape).
+    """
+    with open(os.path.join(path, RECORDING_META_FILE)) as f:
+        meta = json.load(f)
+    fields = list(meta["fields"]) if fields is None else fields
+
+    data = {}
+    for name in fields:
+        info = meta["fields"][name]
+        data[name] = np.empty((meta["num_steps"], *info["shape"]), dtype=info["dtype"])
+
+    step = 0
+    for chunk_idx in range(meta["num_chunks"]):
+        with np.load(os.path.join(path, f"chunk_{chunk_idx:06d}.npz")) as chunk:
+            length = len(chunk[fields[0]])
+            for name in fields:
+                data[name][step : step + length] = chunk[name]
+        step += length
+    return data
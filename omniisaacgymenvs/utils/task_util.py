@@ -27,79 +27,147 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 
-def import_tasks(cfg):
-    from omniisaacgymenvs.tasks.allegro_hand import AllegroHandTask
-    from omniisaacgymenvs.tasks.ant import AntLocomotionTask
-    from omniisaacgymenvs.tasks.anymal import AnymalTask
-    from omniisaacgymenvs.tasks.anymal_terrain import AnymalTerrainTask
-    from omniisaacgymenvs.tasks.ball_balance import BallBalanceTask
-    from omniisaacgymenvs.tasks.cartpole import CartpoleTask
-    from omniisaacgymenvs.tasks.cartpole_camera import CartpoleCameraTask
-    from omniisaacgymenvs.tasks.crazyflie import CrazyflieTask
-    from omniisaacgymenvs.tasks.factory.factory_task_nut_bolt_pick import FactoryTaskNutBoltPick
-    from omniisaacgymenvs.tasks.factory.factory_task_nut_bolt_place import FactoryTaskNutBoltPlace
-    from omniisaacgymenvs.tasks.factory.factory_task_nut_bolt_screw import FactoryTaskNutBoltScrew
-    from omniisaacgymenvs.tasks.franka_cabinet import FrankaCabinetTask
-    from omniisaacgymenvs.tasks.franka_deformable import FrankaDeformableTask
-    from omniisaacgymenvs.tasks.humanoid import HumanoidLocomotionTask
-    from omniisaacgymenvs.tasks.ingenuity import IngenuityTask
-    from omniisaacgymenvs.tasks.quadcopter import QuadcopterTask
-    from omniisaacgymenvs.tasks.shadow_hand import ShadowHandTask
-    from omniisaacgymenvs.tasks.diana_tekken_task import DianaTekkenTask
-    from omniisaacgymenvs.tasks.warp.ant import AntLocomotionTask as AntLocomotionTaskWarp
-    from omniisaacgymenvs.tasks.warp.cartpole import CartpoleTask as CartpoleTaskWarp
-    from omniisaacgymenvs.tasks.warp.humanoid import HumanoidLocomotionTask as HumanoidLocomotionTaskWarp
-
-    if (cfg["task_name"] == "DianaTekkenManualControl"):
-        from omniisaacgymenvs.tasks.diana_tekken_manual_control import DianaTekkenManualControlTask
-
-    # Mappings from strings to environments
-    task_map = {
-        "AllegroHand": AllegroHandTask,
-        "Ant": AntLocomotionTask,
-        "Anymal": AnymalTask,
-        "AnymalTerrain": AnymalTerrainTask,
-        "BallBalance": BallBalanceTask,
-        "Cartpole": CartpoleTask,
-        "CartpoleCamera": CartpoleCameraTask,
-        "FactoryTaskNutBoltPick": FactoryTaskNutBoltPick,
-        "FactoryTaskNutBoltPlace": FactoryTaskNutBoltPlace,
-        "FactoryTaskNutBoltScrew": FactoryTaskNutBoltScrew,
-        "FrankaCabinet": FrankaCabinetTask,
-        "FrankaDeformable": FrankaDeformableTask,
-        "Humanoid": HumanoidLocomotionTask,
-        "Ingenuity": IngenuityTask,
-        "Quadcopter": QuadcopterTask,
-        "Crazyflie": CrazyflieTask,
-        "ShadowHand": ShadowHandTask,
-        "ShadowHandOpenAI_FF": ShadowHandTask,
-        "ShadowHandOpenAI_LSTM": ShadowHandTask,
-        "DianaTekken": DianaTekkenTask,
-    }
-    if (cfg["task_name"] == "DianaTekkenManualControl"):
-        task_map["DianaTekkenManualControl"] = DianaTekkenManualControlTask
-    
-
-    task_map_warp = {
-        "Cartpole": CartpoleTaskWarp,
-        "Ant":AntLocomotionTaskWarp,
-        "Humanoid": HumanoidLocomotionTaskWarp
-    }
-
-    return task_map, task_map_warp
+import importlib
+from collections.abc import Mapping
+
+# Mappings from task names to the "module:Class" of the task. Tasks are only imported
+# when they are looked up, so that a run does not pay for the dependencies of every task.
+TASKS = {
+    "AllegroHand": "omniisaacgymenvs.tasks.allegro_hand:AllegroHandTask",
+    "Ant": "omniisaacgymenvs.tasks.ant:AntLocomotionTask",
+    "Anymal": "omniisaacgymenvs.tasks.anymal:AnymalTask",
+    "AnymalTerrain": "omniisaacgymenvs.tasks.anymal_terrain:AnymalTerrainTask",
+    "BallBalance": "omniisaacgymenvs.tasks.ball_balance:BallBalanceTask",
+    "Cartpole": "omniisaacgymenvs.tasks.cartpole:CartpoleTask",
+    "CartpoleCamera": "omniisaacgymenvs.tasks.cartpole_camera:CartpoleCameraTask",
+    "FactoryTaskNutBoltPick": "omniisaacgymenvs.tasks.factory.factory_task_nut_bolt_pick:FactoryTaskNutBoltPick",
+    "FactoryTaskNutBoltPlace": "omniisaacgymenvs.tasks.factory.factory_task_nut_bolt_place:FactoryTaskNutBoltPlace",
+    "FactoryTaskNutBoltScrew": "omniisaacgymenvs.tasks.factory.factory_task_nut_bolt_screw:FactoryTaskNutBoltScrew",
+    "FrankaCabinet": "omniisaacgymenvs.tasks.franka_cabinet:FrankaCabinetTask",
+    "FrankaDeformable": "omniisaacgymenvs.tasks.franka_deformable:FrankaDeformableTask",
+    "Humanoid": "omniisaacgymenvs.tasks.humanoid:HumanoidLocomotionTask",
+    "Ingenuity": "omniisaacgymenvs.tasks.ingenuity:IngenuityTask",
+    "Quadcopter": "omniisaacgymenvs.tasks.quadcopter:QuadcopterTask",
+    "Crazyflie": "omniisaacgymenvs.tasks.crazyflie:CrazyflieTask",
+    "ShadowHand": "omniisaacgymenvs.tasks.shadow_hand:ShadowHandTask",
+    "ShadowHandOpenAI_FF": "omniisaacgymenvs.tasks.shadow_hand:ShadowHandTask",
+    "ShadowHandOpenAI_LSTM": "omniisaacgymenvs.tasks.shadow_hand:ShadowHandTask",
+    "DianaTekken": "omniisaacgymenvs.tasks.diana_tekken_task:DianaTekkenTask",
+}
+
+WARP_TASKS = {
+    "Cartpole": "omniisaacgymenvs.tasks.warp.cartpole:CartpoleTask",
+    "Ant": "omniisaacgymenvs.tasks.warp.ant:AntLocomotionTask",
+    "Humanoid": "omniisaacgymenvs.tasks.warp.humanoid:HumanoidLocomotionTask",
+    "DianaTekken": "omniisaacgymenvs.tasks.warp.diana_tekken:DianaTekkenTask",
+}
+
+# Packages can add tasks by declaring entry points in these groups, e.g. in setup.py
+#   entry_points={"omniisaacgymenvs.tasks": ["MyTask = my_package.my_task:MyTask"]}
+TASK_ENTRY_POINT_GROUP = "omniisaacgymenvs.tasks"
+WARP_TASK_ENTRY_POINT_GROUP = "omniisaacgymenvs.tasks.warp"
+
+_entry_points_loaded = False
+
+
+def register_task(name, entry_point, warp=False):
+    """Registers a task under name.
+
+    Args:
+        name (str): task_name used in the configs.
+        entry_point (Union[str, type]): the task class, or "module:Class" to import it on demand.
+        warp (bool): register the warp implementation of the task.
+    """
+    registry = WARP_TASKS if warp else TASKS
+    registry[name] = entry_point
+
+
+def _load_entry_points():
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+
+    from importlib.metadata import entry_points
+
+    all_entry_points = entry_points()
+    for group, warp in ((TASK_ENTRY_POINT_GROUP, False), (WARP_TASK_ENTRY_POINT_GROUP, True)):
+        if hasattr(all_entry_points, "select"):
+            group_entry_points = all_entry_points.select(group=group)
+        else:
+            group_entry_points = all_entry_points.get(group, [])
+        for entry_point in group_entry_points:
+            register_task(entry_point.name, entry_point.value, warp=warp)
+
+
+def load_task_class(name, warp=False):
+    """Imports and returns the class of a registered task.
+
+    Args:
+        name (str): task_name of the task.
+        warp (bool): load the warp implementation of the task.
+
+    Returns:
+        type: the task class.
+    """
+    _load_entry_points()
+    registry = WARP_TASKS if warp else TASKS
+    if name not in registry:
+        raise KeyError(
+            f"Unknown {'warp ' if warp else ''}task {name}. Registered tasks: {', '.join(sorted(registry))}"
+        )
+    entry_point = registry[name]
+    if isinstance(entry_point, str):
+        module_name, _, class_name = entry_point.partition(":")
+        entry_point = getattr(importlib.import_module(module_name), class_name)
+        registry[name] = entry_point
+    return entry_point
+
+
+class LazyTaskMap(Mapping):
+    """Read-only task name -> task class mapping that imports the tasks on access."""
+
+    def __init__(self, warp=False):
+        self._warp = warp
+        _load_entry_points()
+
+    def _registry(self):
+        return WARP_TASKS if self._warp else TASKS
+
+    def __getitem__(self, name):
+        if name not in self._registry():
+            raise KeyError(name)
+        return load_task_class(name, warp=self._warp)
+
+    def __iter__(self):
+        return iter(self._registry())
+
+    def __len__(self):
+        return len(self._registry())
+
+
+def import_tasks(cfg=None):
+    """Returns the task maps of the torch and warp tasks. Tasks are imported when looked up."""
+    if cfg is not None:
+        _register_config_task(cfg)
+    return LazyTaskMap(), LazyTaskMap(warp=True)
+
+
+def _register_config_task(cfg):
+    # task configs can point to their own class, e.g. for tasks forked from another one
+    entry_point = cfg.get("task", {}).get("entry_point", None)
+    if entry_point is not None:
+        register_task(cfg["task_name"], entry_point, warp=cfg.get("warp", False))
 
 
 def initialize_task(config, env, init_sim=True):
     from omniisaacgymenvs.utils.config_utils.sim_config import SimConfig
 
     sim_config = SimConfig(config)
-    task_map, task_map_warp = import_tasks(sim_config.config)
-
     cfg = sim_config.config
-    if cfg["warp"]:
-        task_map = task_map_warp
+    _register_config_task(cfg)
 
-    task = task_map[cfg["task_name"]](
+    task = load_task_class(cfg["task_name"], warp=cfg["warp"])(
         name=cfg["task_name"], sim_config=sim_config, env=env
     )
 
@@ -319,6 +319,320 @@ def stepping_stones_terrain(terrain, stone_size, stone_distance, max_height, pla
     return terrain
 
 
+# Batched generators
+#
+# The functions below apply the generators above to a SubTerrainBatch of (N, width, length)
+# heightfields at once. Random parameters are drawn by the sample_* functions, which consume
+# the global numpy random state exactly like calling the scalar generator on each terrain in
+# turn, so a batch is identical to N calls of the scalar version for the same seed. Drawing the
+# samples up front also lets the (deterministic) batched generators run in other processes.
+
+
+def sample_random_uniform_heights(terrains, min_height, max_height, step=1, downsampled_scale=None):
+    """
+    Draw the downsampled height grids of random_uniform_terrain for every terrain of a batch
+
+    Parameters
+        terrains (SubTerrainBatch): the terrains
+        min_height, max_height, step, downsampled_scale: see random_uniform_terrain
+    Returns:
+        heights (np.array(int)): array of shape (num_terrains, rows, cols) of downsampled heights [discrete units]
+    """
+    if downsampled_scale is None:
+        downsampled_scale = terrains.horizontal_scale
+
+    # switch parameters to discrete units
+    min_height = int(min_height / terrains.vertical_scale)
+    max_height = int(max_height / terrains.vertical_scale)
+    step = int(step / terrains.vertical_scale)
+
+    heights_range = np.arange(min_height, max_height + step, step)
+    return np.random.choice(
+        heights_range,
+        (
+            terrains.num_terrains,
+            int(terrains.width * terrains.horizontal_scale / downsampled_scale),
+            int(terrains.length * terrains.horizontal_scale / downsampled_scale),
+        ),
+    )
+
+
+def random_uniform_terrain_batch(terrains, min_height, max_height, step=1, downsampled_scale=None, heights=None):
+    """
+    Batched random_uniform_terrain
+
+    Parameters
+        terrains (SubTerrainBatch): the terrains
+        min_height, max_height, step, downsampled_scale: see random_uniform_terrain
+        heights (np.array(int)): heights drawn by sample_random_uniform_heights. Drawn now if None (default: None)
+    Returns:
+        terrains (SubTerrainBatch): updated terrains
+    """
+    if heights is None:
+        heights = sample_random_uniform_heights(terrains, min_height, max_height, step, downsampled_scale)
+
+    x = np.linspace(0, terrains.width * terrains.horizontal_scale, heights.shape[1])
+    y = np.linspace(0, terrains.length * terrains.horizontal_scale, heights.shape[2])
+    x_upsampled = np.linspace(0, terrains.width * terrains.horizontal_scale, terrains.width)
+    y_upsampled = np.linspace(0, terrains.length * terrains.horizontal_scale, terrains.length)
+
+    # the spline fit is kept per terrain so that rounding matches the scalar version exactly
+    for k in range(terrains.num_terrains):
+        f = interpolate.RectBivariateSpline(y, x, heights[k])
+        terrains.height_field_raw[k] += np.rint(f(y_upsampled, x_upsampled)).astype(np.int16)
+    return terrains
+
+
+def pyramid_sloped_terrain_batch(terrains, slopes, platform_size=1.0):
+    """
+    Batched pyramid_sloped_terrain
+
+    Parameters:
+        terrains (SubTerrainBatch): the terrains
+        slopes (np.array(float)): slope of each terrain, positive or negative
+        platform_size (float): size of the flat platform at the center of the terrains [meters]
+    Returns:
+        terrains (SubTerrainBatch): updated terrains
+    """
+    slopes = np.broadcast_to(np.asarray(slopes, dtype=np.float64), (terrains.num_terrains,))
+    x = np.arange(0, terrains.width)
+    y = np.arange(0, terrains.length)
+    center_x = int(terrains.width / 2)
+    center_y = int(terrains.length / 2)
+    xx, yy = np.meshgrid(x, y, sparse=True)
+    xx = (center_x - np.abs(center_x - xx)) / center_x
+    yy = (center_y - np.abs(center_y - yy)) / center_y
+    xx = xx.reshape(terrains.width, 1)
+    yy = yy.reshape(1, terrains.length)
+    max_heights = (slopes * (terrains.horizontal_scale / terrains.vertical_scale) * (terrains.width / 2)).astype(np.int64)
+    terrains.height_field_raw += (max_heights[:, None, None] * xx * yy).astype(terrains.height_field_raw.dtype)
+
+    platform_size = int(platform_size / terrains.horizontal_scale / 2)
+    x1 = terrains.width // 2 - platform_size
+    y1 = terrains.length // 2 - platform_size
+
+    corners = terrains.height_field_raw[:, x1, y1]
+    min_h = np.minimum(corners, 0)[:, None, None]
+    max_h = np.maximum(corners, 0)[:, None, None]
+    np.clip(terrains.height_field_raw, min_h, max_h, out=terrains.height_field_raw)
+    return terrains
+
+
+def pyramid_stairs_terrain_batch(terrains, step_width, step_heights, platform_size=1.0):
+    """
+    Batched pyramid_stairs_terrain
+
+    Parameters:
+        terrains (SubTerrainBatch): the terrains
+        step_width (float): the width of the steps [meters]
+        step_heights (np.array(float)): the step height of each terrain [meters]
+        platform_size (float): size of the flat platform at the center of the terrains [meters]
+    Returns:
+        terrains (SubTerrainBatch): updated terrains
+    """
+    # switch parameters to discrete units
+    step_width = int(step_width / terrains.horizontal_scale)
+    step_heights = np.broadcast_to(np.asarray(step_heights, dtype=np.float64), (terrains.num_terrains,))
+    step_heights = (step_heights / terrains.vertical_scale).astype(np.int64)
+    platform_size = int(platform_size / terrains.horizontal_scale)
+
+    # number of steps before the remaining area is smaller than the platform
+    num_steps = 0
+    while (
+        terrains.width - 2 * num_steps * step_width > platform_size
+        and terrains.length - 2 * num_steps * step_width > platform_size
+    ):
+        num_steps += 1
+
+    # a point is on step s if it lies within s steps of every border
+    x = np.arange(terrains.width)
+    y = np.arange(terrains.length)
+    level_x = np.minimum(x, terrains.width - 1 - x) // step_width
+    level_y = np.minimum(y, terrains.length - 1 - y) // step_width
+    level = np.minimum(np.minimum(level_x[:, None], level_y[None, :]), num_steps)
+    np.copyto(
+        terrains.height_field_raw,
+        (step_heights[:, None, None] * level).astype(terrains.height_field_raw.dtype),
+        where=level > 0,
+    )
+    return terrains
+
+
+def sample_discrete_obstacles(terrains, max_heights, min_size, max_size, num_rects):
+    """
+    Draw the obstacles of discrete_obstacles_terrain for every terrain of a batch
+
+    Parameters:
+        terrains (SubTerrainBatch): the terrains
+        max_heights (np.array(float)): maximum height of the obstacles of each terrain [meters]
+        min_size, max_size, num_rects: see discrete_obstacles_terrain
+    Returns:
+        rects (np.array(int)): array of shape (num_terrains, num_rects, 5), each row holding the
+            start_i, start_j, width, length and height of an obstacle [discrete units]
+    """
+    max_heights = np.broadcast_to(np.asarray(max_heights, dtype=np.float64), (terrains.num_terrains,))
+    min_size = int(min_size / terrains.horizontal_scale)
+    max_size = int(max_size / terrains.horizontal_scale)
+
+    (i, j) = (terrains.width, terrains.length)
+    width_range = range(min_size, max_size, 4)
+    length_range = range(min_size, max_size, 4)
+
+    # np.random.choice(seq) draws np.random.randint(0, len(seq)), which is cheaper to call directly
+    rects = np.zeros((terrains.num_terrains, num_rects, 5), dtype=np.int64)
+    for k in range(terrains.num_terrains):
+        max_height = int(max_heights[k] / terrains.vertical_scale)
+        height_range = [-max_height, -max_height // 2, max_height // 2, max_height]
+        for r in range(num_rects):
+            width = width_range[np.random.randint(0, len(width_range))]
+            length = length_range[np.random.randint(0, len(length_range))]
+            start_i = 4 * np.random.randint(0, len(range(0, i - width, 4)))
+            start_j = 4 * np.random.randint(0, len(range(0, j - length, 4)))
+            height = height_range[np.random.randint(0, len(height_range))]
+            rects[k, r] = (start_i, start_j, width, length, height)
+    return rects
+
+
+def discrete_obstacles_terrain_batch(
+    terrains, max_heights, min_size, max_size, num_rects, platform_size=1.0, rects=None
+):
+    """
+    Batched discrete_obstacles_terrain
+
+    Parameters:
+        terrains (SubTerrainBatch): the terrains
+        max_heights (np.array(float)): maximum height of the obstacles of each terrain [meters]
+        min_size, max_size, num_rects, platform_size: see discrete_obstacles_terrain
+        rects (np.array(int)): obstacles drawn by sample_discrete_obstacles. Drawn now if None (default: None)
+    Returns:
+        terrains (SubTerrainBatch): updated terrains
+    """
+    if rects is None:
+        rects = sample_discrete_obstacles(terrains, max_heights, min_size, max_size, num_rects)
+    platform_size = int(platform_size / terrains.horizontal_scale)
+
+    start_i, start_j, width, length, height = np.moveaxis(rects, -1, 0)
+    x = np.arange(terrains.width)
+    y = np.arange(terrains.length)
+    in_x = (x >= start_i[..., None]) & (x < (start_i + width)[..., None])
+    in_y = (y >= start_j[..., None]) & (y < (start_j + length)[..., None])
+    covered = in_x[..., :, None] & in_y[..., None, :]
+
+    # obstacles are drawn in order, so each point takes the height of the last obstacle covering it
+    last = rects.shape[1] - 1 - np.argmax(covered[:, ::-1], axis=1)
+    heights = np.take_along_axis(height, last.reshape(terrains.num_terrains, -1), axis=1).reshape(last.shape)
+    np.copyto(
+        terrains.height_field_raw, heights.astype(terrains.height_field_raw.dtype), where=covered.any(axis=1)
+    )
+
+    x1 = (terrains.width - platform_size) // 2
+    x2 = (terrains.width + platform_size) // 2
+    y1 = (terrains.length - platform_size) // 2
+    y2 = (terrains.length + platform_size) // 2
+    terrains.height_field_raw[:, x1:x2, y1:y2] = 0
+    return terrains
+
+
+def _stepping_stones_axes(terrains):
+    # the scalar version lays rows of stones along the longest side of the terrain
+    if terrains.length >= terrains.width:
+        return terrains.length, terrains.width
+    return terrains.width, terrains.length
+
+
+def sample_stepping_stones(terrains, stone_sizes, stone_distance, max_height):
+    """
+    Draw the row offsets and stone heights of stepping_stones_terrain for every terrain of a batch
+
+    Parameters:
+        terrains (SubTerrainBatch): the terrains
+        stone_sizes (np.array(float)): horizontal size of the stepping stones of each terrain [meters]
+        stone_distance, max_height: see stepping_stones_terrain
+    Returns:
+        row_starts (np.array(int)): array of shape (num_terrains, num_rows) with the offset of the first stone of each row
+        heights (np.array(int)): array of shape (num_terrains, num_rows, num_stones + 1) with the height of the
+            hole filled before the first stone, followed by the heights of the stones of each row
+    """
+    stone_sizes = np.broadcast_to(np.asarray(stone_sizes, dtype=np.float64), (terrains.num_terrains,))
+    stone_sizes = (stone_sizes / terrains.horizontal_scale).astype(np.int64)
+    stone_distance = int(stone_distance / terrains.horizontal_scale)
+    max_height = int(max_height / terrains.vertical_scale)
+    height_range = np.arange(-max_height - 1, max_height, step=1)
+
+    num_rows, row_length = _stepping_stones_axes(terrains)
+    periods = stone_sizes + stone_distance
+    row_starts = np.zeros((terrains.num_terrains, -(-num_rows // periods.min())), dtype=np.int64)
+    heights = np.zeros((*row_starts.shape, -(-row_length // periods.min()) + 1), dtype=np.int64)
+    # np.random.choice(seq) draws np.random.randint(0, len(seq)), which is cheaper to call directly
+    for k in range(terrains.num_terrains):
+        start_row = 0
+        r = 0
+        while start_row < num_rows:
+            start = np.random.randint(0, stone_sizes[k])
+            row_starts[k, r] = start
+            # fill first hole
+            heights[k, r, 0] = height_range[np.random.randint(0, len(height_range))]
+            # fill row
+            s = 1
+            while start < row_length:
+                heights[k, r, s] = height_range[np.random.randint(0, len(height_range))]
+                start += periods[k]
+                s += 1
+            start_row += periods[k]
+            r += 1
+    return row_starts, heights
+
+
+def stepping_stones_terrain_batch(
+    terrains, stone_sizes, stone_distance, max_height, platform_size=1.0, depth=-10, samples=None
+):
+    """
+    Batched stepping_stones_terrain
+
+    Parameters:
+        terrains (SubTerrainBatch): the terrains
+        stone_sizes (np.array(float)): horizontal size of the stepping stones of each terrain [meters]
+        stone_distance, max_height, platform_size, depth: see stepping_stones_terrain
+        samples (tuple): row offsets and heights drawn by sample_stepping_stones. Drawn now if None (default: None)
+    Returns:
+        terrains (SubTerrainBatch): updated terrains
+    """
+    if samples is None:
+        samples = sample_stepping_stones(terrains, stone_sizes, stone_distance, max_height)
+    row_starts, heights = samples
+
+    # switch parameters to discrete units
+    stone_sizes = np.broadcast_to(np.asarray(stone_sizes, dtype=np.float64), (terrains.num_terrains,))
+    stone_sizes = (stone_sizes / terrains.horizontal_scale).astype(np.int64)[:, None, None]
+    stone_distance = int(stone_distance / terrains.horizontal_scale)
+    platform_size = int(platform_size / terrains.horizontal_scale)
+    periods = stone_sizes + stone_distance
+
+    # (terrain, row axis, along row axis) coordinates
+    num_rows, row_length = _stepping_stones_axes(terrains)
+    u = np.arange(num_rows)[None, :, None]
+    v = np.arange(row_length)[None, None, :]
+    rows = u // periods
+    starts = np.take_along_axis(row_starts, rows[:, :, 0], axis=1)[:, :, None]
+    offsets = v - starts
+    on_row = u % periods < stone_sizes
+    on_stone = (offsets >= 0) & (offsets % periods < stone_sizes)
+    in_first_hole = v < starts - stone_distance
+    stones = np.where(offsets >= 0, offsets // periods + 1, 0)
+    stone_heights = heights[np.arange(terrains.num_terrains)[:, None, None], rows, stones]
+    field = np.where(on_row & (on_stone | in_first_hole), stone_heights, int(depth / terrains.vertical_scale))
+    if terrains.length >= terrains.width:
+        field = field.transpose(0, 2, 1)
+    terrains.height_field_raw[:] = field
+
+    x1 = (terrains.width - platform_size) // 2
+    x2 = (terrains.width + platform_size) // 2
+    y1 = (terrains.length - platform_size) // 2
+    y2 = (terrains.length + platform_size) // 2
+    terrains.height_field_raw[:, x1:x2, y1:y2] = 0
+    return terrains
+
+
 def convert_heightfield_to_trimesh(height_field_raw, horizontal_scale, vertical_scale, slope_threshold=None):
     """
     Convert a heightfield array to a triangle mesh represented by vertices and triangles.
@@ -372,20 +686,10 @@ def convert_heightfield_to_trimesh(height_field_raw, horizontal_scale, vertical_
     vertices[:, 0] = xx.flatten()
     vertices[:, 1] = yy.flatten()
     vertices[:, 2] = hf.flatten() * vertical_scale
-    triangles = -np.ones((2 * (num_rows - 1) * (num_cols - 1), 3), dtype=np.uint32)
-    for i in range(num_rows - 1):
-        ind0 = np.arange(0, num_cols - 1) + i * num_cols
-        ind1 = ind0 + 1
-        ind2 = ind0 + num_cols
-        ind3 = ind2 + 1
-        start = 2 * i * (num_cols - 1)
-        stop = start + 2 * (num_cols - 1)
-        triangles[start:stop:2, 0] = ind0
-        triangles[start:stop:2, 1] = ind3
-        triangles[start:stop:2, 2] = ind1
-        triangles[start + 1 : stop : 2, 0] = ind0
-        triangles[start + 1 : stop : 2, 1] = ind2
-        triangles[start + 1 : stop : 2, 2] = ind3
+    # each grid cell is split into two triangles, given as vertex offsets from the first corner of the cell
+    ind0 = np.arange(num_rows - 1, dtype=np.uint32)[:, None] * num_cols + np.arange(num_cols - 1, dtype=np.uint32)
+    offsets = np.array([[0, num_cols + 1, 1], [0, num_cols, num_cols + 1]], dtype=np.uint32)
+    triangles = (ind0[:, :, None, None] + offsets).reshape(-1, 3)
 
     return vertices, triangles
 
@@ -415,3 +719,16 @@ class SubTerrain:
         self.width = width
         self.length = length
         self.height_field_raw = np.zeros((self.width, self.length), dtype=np.int16)
+
+
+class SubTerrainBatch:
+    def __init__(
+        self, num_terrains, terrain_name="terrain", width=256, length=256, vertical_scale=1.0, horizontal_scale=1.0
+    ):
+        self.num_terrains = num_terrains
+        self.terrain_name = terrain_name
+        self.vertical_scale = vertical_scale
+        self.horizontal_scale = horizontal_scale
+        self.width = width
+        self.length = length
+        self.height_field_raw = np.zeros((self.num_terrains, self.width, self.length), dtype=np.int16)